@@ -0,0 +1,229 @@
+import json as json_module
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.util.retry import Retry
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.ai_client')
+
+# Statuses worth retrying: rate limits and gateway/overload errors
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Connect time of the current call, per thread (requests runs on the caller's thread)
+_timing = threading.local()
+
+
+def _add_connect_ms(started):
+    _timing.connect_ms = getattr(_timing, 'connect_ms', 0.0) + (time.perf_counter() - started) * 1000
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_ms(started)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_ms(started)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections record how long TCP/TLS setup took."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+class AIClient:
+    """Shared HTTP client for Together AI calls.
+
+    One ``requests.Session`` keeps connections alive between calls, so only the
+    first request (or one after the server closes the socket) pays DNS, TCP and
+    TLS setup. Connection failures and 429/502/503/504 responses are retried
+    with exponential backoff; read timeouts are not, so a slow completion is
+    never billed twice.
+    """
+
+    def __init__(self, timeout: float = 30, connect_timeout: float = 5, pool_size: int = 4,
+                 max_retries: int = 2, backoff_factor: float = 0.5, session=None):
+        self.timeout = float(timeout)
+        self.connect_timeout = float(connect_timeout)
+        self.session = session if session is not None else self._build_session(pool_size, max_retries, backoff_factor)
+        self.last_timing = None
+
+    @classmethod
+    def from_config(cls):
+        cfg = config.AI_REQUEST_CONFIG
+        return cls(
+            timeout=cfg.get('timeout_seconds', 30),
+            connect_timeout=cfg.get('connect_timeout_seconds', 5),
+            pool_size=cfg.get('pool_size', 4),
+            max_retries=cfg.get('max_retries', 2),
+            backoff_factor=cfg.get('retry_backoff_seconds', 0.5),
+        )
+
+    @staticmethod
+    def _build_session(pool_size, max_retries, backoff_factor):
+        retry = Retry(
+            total=max(0, int(max_retries)),
+            connect=max(0, int(max_retries)),
+            read=0,
+            status=max(0, int(max_retries)),
+            backoff_factor=float(backoff_factor),
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'POST'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = TimedHTTPAdapter(pool_connections=1, pool_maxsize=max(1, int(pool_size)), max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def post(self, url, json, api_key=None, timeout=None, stream: bool = False):
+        """POST a JSON body; returns (response, timing).
+
+        ``timing`` holds ``connect_ms`` (0 when a kept-alive connection was
+        reused), ``ttfb_ms`` (until response headers arrived) and ``total_ms``
+        (until the body was read; equal to ``ttfb_ms`` when ``stream`` is set
+        and the caller reads the body itself).
+        """
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        read_timeout = float(timeout) if timeout is not None else self.timeout
+        _timing.connect_ms = 0.0
+        started = time.perf_counter()
+        resp = self.session.post(
+            url,
+            json=json,
+            headers=headers,
+            timeout=(self.connect_timeout, read_timeout),
+            stream=True,
+        )
+        ttfb_ms = (time.perf_counter() - started) * 1000
+        if not stream:
+            resp.content  # read the body so the connection goes back to the pool
+        timing = {
+            'connect_ms': int(getattr(_timing, 'connect_ms', 0.0)),
+            'ttfb_ms': int(ttfb_ms),
+            'total_ms': int((time.perf_counter() - started) * 1000),
+        }
+        self.last_timing = timing
+        logger.debug(f"AI call to {url}: {timing}")
+        return resp, timing
+
+    def stream_chat(self, url, json, api_key=None, timeout=None, on_delta=None):
+        """Stream a chat completion over server-sent events.
+
+        ``on_delta(text)`` is called (on the calling thread) for every content
+        delta as it arrives. Returns (response, text, usage, timing); ``timing``
+        adds ``ttft_ms``, the time until the first content token. On a non-200
+        response nothing is read and ``text`` is empty.
+        """
+        payload = dict(json, stream=True)
+        started = time.perf_counter()
+        resp, timing = self.post(url, json=payload, api_key=api_key, timeout=timeout, stream=True)
+        timing['ttft_ms'] = None
+        parts = []
+        usage = {}
+        try:
+            if resp.status_code != 200:
+                resp.content
+                return resp, "", usage, timing
+            for event in iter_sse(resp):
+                if event.get('usage'):
+                    usage = event['usage']
+                for choice in event.get('choices') or []:
+                    delta = (choice.get('delta') or {}).get('content') or ""
+                    if not delta:
+                        continue
+                    if timing['ttft_ms'] is None:
+                        timing['ttft_ms'] = int((time.perf_counter() - started) * 1000)
+                    parts.append(delta)
+                    if on_delta is not None:
+                        on_delta(delta)
+        finally:
+            timing['total_ms'] = int((time.perf_counter() - started) * 1000)
+            self.last_timing = timing
+            resp.close()
+        return resp, "".join(parts), usage, timing
+
+    def close(self):
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
+
+def iter_sse(resp):
+    """Yield the JSON payload of each ``data:`` event until ``[DONE]``.
+
+    The body is still read to the end so the connection can be reused.
+    """
+    data_lines = []
+    done = False
+    for line in resp.iter_lines(decode_unicode=True):
+        if done or line is None:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if line.startswith('data:'):
+            data_lines.append(line[5:].lstrip())
+            continue
+        if line or not data_lines:
+            continue  # comments, other fields, or keep-alive blank lines
+        data, data_lines = "\n".join(data_lines), []
+        if data == '[DONE]':
+            done = True
+            continue
+        try:
+            yield json_module.loads(data)
+        except ValueError:
+            logger.debug(f"Skipping malformed SSE event: {data[:200]}")
+    if data_lines and data_lines != ['[DONE]']:
+        try:
+            yield json_module.loads("\n".join(data_lines))
+        except ValueError:
+            pass
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide AIClient built from config on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AIClient.from_config()
+        return _client
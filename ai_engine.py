@@ -0,0 +1,358 @@
+import asyncio
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.ai_engine')
+
+# Job priorities (lower runs first)
+PRIORITY_INTERACTIVE = 0  # an explanation the user is waiting on
+PRIORITY_VIEW = 1         # questions for the card on screen
+PRIORITY_BACKGROUND = 2   # prefetch and pre-generation
+
+
+class Cancelled(Exception):
+    """Raised by ``AIJob.check()`` so a cancelled job can stop between steps."""
+
+
+class AIJob:
+    """One unit of AI work; ``func(job)`` runs on a worker thread.
+
+    ``func`` may call ``job.check()`` (e.g. for every streamed chunk) to stop
+    early once the job is cancelled. Every listener's ``on_done(result)`` or
+    ``on_error(exc)`` is handed to ``deliver`` (the Tk thread in the app);
+    errors no listener handles are logged. A cancelled job delivers nothing
+    and its ``result()`` raises ``concurrent.futures.CancelledError``.
+    """
+
+    def __init__(self, op, func, priority: int = PRIORITY_BACKGROUND, on_done=None, on_error=None, deliver=None):
+        self.op = op
+        self.func = func
+        self.priority = priority
+        self.deliver = deliver
+        self.future = Future()
+        self.started = False
+        self._listeners = []  # [on_done, on_error] pairs
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._on_cancel = None  # set by the engine that schedules the job
+        if on_done is not None or on_error is not None:
+            self.listen(on_done, on_error)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def listeners(self) -> int:
+        with self._lock:
+            return len(self._listeners)
+
+    def listen(self, on_done=None, on_error=None):
+        """Add a listener; returns a handle for ``unlisten``. Delivers at once if already finished."""
+        listener = [on_done, on_error]
+        with self._lock:
+            self._listeners.append(listener)
+            finished = self.future.done() and not self.future.cancelled()
+        if finished:
+            error = self.future.exception()
+            self._deliver(listener, error, None if error is not None else self.future.result())
+        return listener
+
+    def unlisten(self, listener) -> int:
+        """Remove a listener (it gets no result); returns how many are left."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+            return len(self._listeners)
+
+    def check(self):
+        """Raise Cancelled if the job was cancelled."""
+        if self._cancel_event.is_set():
+            raise Cancelled(f"{self.op} job cancelled")
+
+    def cancel(self) -> bool:
+        """Cancel the job; work already sent finishes, but its result is dropped."""
+        with self._lock:
+            if self._cancel_event.is_set():
+                return False
+            self._cancel_event.set()
+            self.future.cancel()
+        if self._on_cancel is not None:
+            self._on_cancel(self)
+        return True
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def run(self):
+        """Run ``func`` on the calling thread and settle the job."""
+        if self.cancelled:
+            return
+        self.started = True
+        try:
+            result = self.func(self)
+        except Exception as e:
+            if not self.cancelled:
+                self._settle(error=e)
+            return
+        self._settle(result=result)
+
+    def _settle(self, result=None, error=None):
+        with self._lock:
+            if self.future.done():
+                return
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(result)
+            listeners = list(self._listeners)
+        if error is not None and not any(listener[1] for listener in listeners):
+            logger.error(f"AI {self.op} job failed: {error}")
+        for listener in listeners:
+            self._deliver(listener, error, result)
+
+    def _deliver(self, listener, error, result):
+        callback, value = (listener[1], error) if error is not None else (listener[0], result)
+        if callback is None:
+            return
+
+        def call():
+            with self._lock:
+                # Cancelled, or the listener left, after the work finished but before delivery
+                if self.cancelled or not any(item is listener for item in self._listeners):
+                    return
+            try:
+                callback(value)
+            except Exception as e:
+                logger.error(f"AI {self.op} callback failed: {e}")
+        if self.deliver is None:
+            call()
+            return
+        try:
+            self.deliver(call)
+        except Exception as e:
+            logger.error(f"Could not deliver AI {self.op} result: {e}")
+
+
+class SingleFlight:
+    """Coalesces concurrent AI jobs that share a key, e.g. (fact_id, operation, content hash).
+
+    ``join`` returns the job already in flight for a key, adding the caller
+    as another listener, or registers the job built by ``make_job`` (which
+    the caller then schedules). Every listener gets the one result. A
+    joiner with a higher priority promotes a queued job through
+    ``promote(job, priority)``.
+    """
+
+    def __init__(self, promote=None):
+        self.promote = promote
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def join(self, key, make_job, priority=None, on_done=None, on_error=None):
+        """Returns (job, listener, created)."""
+        with self._lock:
+            job = self._jobs.get(key)
+            created = job is None or job.done()
+            if created:
+                # Finished entries are dropped as new ones arrive
+                for old_key in [k for k, j in self._jobs.items() if j.done()]:
+                    del self._jobs[old_key]
+                job = self._jobs[key] = make_job()
+        listener = job.listen(on_done, on_error)
+        if not created and priority is not None and priority < job.priority and self.promote is not None:
+            self.promote(job, priority)
+        return job, listener, created
+
+    def leave(self, job, listener, cancel_running: bool = True):
+        """Drop a listener; the job is cancelled once nobody is waiting for it.
+
+        With ``cancel_running`` False a job that has already started is left
+        to finish (its result is still stored by the job itself).
+        """
+        if job.unlisten(listener) == 0 and (cancel_running or not job.started):
+            job.cancel()
+
+    def find(self, match):
+        """Keys of unfinished jobs for which ``match(key)`` is true."""
+        with self._lock:
+            return [key for key, job in self._jobs.items() if not job.done() and match(key)]
+
+
+class AIEngine:
+    """Schedules AI jobs from an asyncio event loop on a dedicated thread.
+
+    Queued jobs start in priority order, then submission order, as long as
+    fewer than ``workers`` jobs run in total and fewer than ``limits[op]`` of
+    their operation. The blocking HTTP call of each job runs on a thread pool
+    of ``workers`` threads. Cancelling a queued job removes it; cancelling a
+    running one drops its result straight away and frees its slot once its
+    call returns (or once it notices via ``job.check()``).
+    """
+
+    def __init__(self, limits=None, workers: int = 4, deliver=None):
+        self.workers = max(1, int(workers))
+        self.limits = {op: max(1, int(limit)) for op, limit in (limits or {}).items() if limit}
+        self.deliver = deliver
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._queue = []      # heap of (priority, seq, job)
+        self._running = {}    # op -> running job count
+        self._active = set()  # running jobs
+        self._seq = itertools.count()
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, deliver=None):
+        """Build an engine using the AI_ENGINE_CONFIG settings."""
+        cfg = config.AI_ENGINE_CONFIG
+        return cls(
+            limits={
+                'EXPLANATION': cfg.get('explanation_concurrency', 2),
+                'QUESTION_GENERATION': cfg.get('question_concurrency', 2),
+            },
+            workers=cfg.get('workers', 4),
+            deliver=deliver,
+        )
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._ready.clear()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='factdari-ai')
+                self._thread = threading.Thread(target=self._run_loop, name='factdari-ai-engine', daemon=True)
+                self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            loop.close()
+
+    def submit(self, op, func, priority: int = PRIORITY_BACKGROUND, on_done=None, on_error=None) -> AIJob:
+        """Queue ``func(job)``; returns the AIJob handle."""
+        return self.schedule(AIJob(op, func, priority, on_done=on_done, on_error=on_error))
+
+    def schedule(self, job: AIJob) -> AIJob:
+        """Queue a job built by the caller (e.g. registered somewhere before it can finish)."""
+        loop = self._loop
+        if self._closed or loop is None or loop.is_closed():
+            raise RuntimeError("AI engine is not running")
+        if job.deliver is None:
+            job.deliver = self.deliver
+        job._on_cancel = self._forget
+        with self._lock:
+            heapq.heappush(self._queue, (job.priority, next(self._seq), job))
+        loop.call_soon_threadsafe(self._dispatch)
+        return job
+
+    def run(self, op, func, priority: int = PRIORITY_BACKGROUND, timeout=None):
+        """Submit and wait for the result (from a worker thread, never the loop thread)."""
+        return self.submit(op, func, priority).result(timeout)
+
+    def cancel_all(self, op=None):
+        """Cancel queued and running jobs (of one operation, or all)."""
+        with self._lock:
+            jobs = [item[2] for item in self._queue] + list(self._active)
+        for job in jobs:
+            if op is None or job.op == op:
+                job.cancel()
+
+    def promote(self, job, priority):
+        """Raise a queued job's priority (lower value); running jobs are left as they are."""
+        with self._lock:
+            if priority >= job.priority:
+                return
+            job.priority = priority
+            for i, item in enumerate(self._queue):
+                if item[2] is job:
+                    self._queue[i] = (priority, item[1], job)
+                    heapq.heapify(self._queue)
+                    break
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'queued': len(self._queue), 'running': dict(self._running)}
+
+    def close(self, timeout=None):
+        self._closed = True
+        self.cancel_all()
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError:
+                pass
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout if timeout is not None else 2.0)
+        executor = self._executor
+        if executor is not None:
+            # Calls already sent are left to finish on their daemon threads
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- Loop thread ---
+    def _forget(self, job):
+        with self._lock:
+            queued = [item for item in self._queue if item[2] is not job]
+            if len(queued) != len(self._queue):
+                heapq.heapify(queued)
+                self._queue = queued
+
+    def _dispatch(self):
+        if self._closed:
+            return
+        with self._lock:
+            started = []
+            skipped = []
+            running = sum(self._running.values())
+            while self._queue and running < self.workers:
+                item = heapq.heappop(self._queue)
+                job = item[2]
+                if job.cancelled:
+                    continue
+                if self._running.get(job.op, 0) >= self.limits.get(job.op, self.workers):
+                    skipped.append(item)  # its operation is at its limit; let lower priorities through
+                    continue
+                self._running[job.op] = self._running.get(job.op, 0) + 1
+                self._active.add(job)
+                running += 1
+                started.append(job)
+            for item in skipped:
+                heapq.heappush(self._queue, item)
+        for job in started:
+            self._loop.create_task(self._run_job(job))
+
+    async def _run_job(self, job):
+        try:
+            await self._loop.run_in_executor(self._executor, job.run)
+        except (asyncio.CancelledError, RuntimeError):
+            job.cancel()  # engine closing
+        finally:
+            with self._lock:
+                self._running[job.op] -= 1
+                self._active.discard(job)
+            self._dispatch()
@@ -6,7 +6,9 @@ from flask_limiter.util import get_remote_address
 import pyodbc
 from datetime import datetime, timedelta, date
 import os
+import threading
 import config  # Import the config module
+import search_index
 
 # Set up logging
 logger = config.setup_logging('factdari.analytics')
@@ -130,6 +132,72 @@ def get_default_profile_id():
         logger.error(f"Error parsing profile ID: {e}")
         return 1
 
+def fetch_explanation_cache_stats(profile_id):
+    """Explanation cache hits, hit rate and money saved (empty on databases without CostSaved)."""
+    try:
+        rows = fetch_query("""
+            SELECT
+                SUM(CASE WHEN OperationType = 'EXPLANATION_CACHE_HIT' THEN 1 ELSE 0 END) as CacheHits,
+                COUNT(*) as ExplanationRequests,
+                COALESCE(SUM(CostSaved), 0) as CostSaved
+            FROM AIUsageLogs
+            WHERE ProfileID = ? AND OperationType IN ('EXPLANATION', 'EXPLANATION_CACHE_HIT')
+        """, (profile_id,))
+    except Exception as e:
+        logger.warning(f"Could not load explanation cache stats: {e}")
+        return {}
+    row = rows[0] if rows else {}
+    hits = int(row.get('CacheHits') or 0)
+    requests_total = int(row.get('ExplanationRequests') or 0)
+    return {
+        'CacheHits': hits,
+        'CacheHitRate': round(hits * 100.0 / requests_total, 1) if requests_total else 0.0,
+        'CostSaved': float(row.get('CostSaved') or 0),
+    }
+
+def fetch_question_pregen_progress(profile_id):
+    """Background question generation: facts still waiting and today's spend against the budget."""
+    cfg = config.QUESTION_PREGEN_CONFIG
+    try:
+        rows = fetch_query("""
+            SELECT
+                (SELECT COUNT(*) FROM Facts f
+                 WHERE f.CreatedBy = ?
+                   AND NOT EXISTS (SELECT 1 FROM Questions q WHERE q.FactID = f.FactID AND q.Status = 'SUCCESS')) as FactsWithoutQuestions,
+                (SELECT COUNT(*) FROM Facts f
+                 WHERE f.CreatedBy = ? AND f.QuestionsRefreshCountdown <= ?
+                   AND EXISTS (SELECT 1 FROM Questions q WHERE q.FactID = f.FactID AND q.Status = 'SUCCESS')) as FactsDueForRefresh,
+                (SELECT COALESCE(SUM(COALESCE(InputTokens, 0) + COALESCE(OutputTokens, 0)), 0) FROM AIUsageLogs
+                 WHERE OperationType = 'QUESTION_GENERATION'
+                   AND CreatedAt >= CAST(CAST(dbo.LondonNow() AS DATE) AS DATETIME)) as TokensToday,
+                (SELECT COALESCE(SUM(Cost), 0) FROM AIUsageLogs
+                 WHERE OperationType = 'QUESTION_GENERATION'
+                   AND CreatedAt >= CAST(CAST(dbo.LondonNow() AS DATE) AS DATETIME)) as CostToday
+        """, (profile_id, profile_id, cfg.get('refresh_threshold', 3)))
+    except Exception as e:
+        logger.warning(f"Could not load question pre-generation progress: {e}")
+        return {}
+    row = rows[0] if rows else {}
+    tokens = int(row.get('TokensToday') or 0)
+    cost = float(row.get('CostToday') or 0)
+    token_budget = int(cfg.get('daily_token_budget') or 0)
+    cost_budget = float(cfg.get('daily_cost_budget') or 0)
+    shares = []
+    if token_budget:
+        shares.append(tokens / token_budget)
+    if cost_budget:
+        shares.append(cost / cost_budget)
+    return {
+        'Enabled': bool(cfg.get('enabled', True)),
+        'FactsWithoutQuestions': int(row.get('FactsWithoutQuestions') or 0),
+        'FactsDueForRefresh': int(row.get('FactsDueForRefresh') or 0),
+        'TokensToday': tokens,
+        'CostToday': cost,
+        'TokenBudget': token_budget,
+        'CostBudget': cost_budget,
+        'BudgetUsedPct': round(min(max(shares), 1.0) * 100, 1) if shares else None,
+    }
+
 @app.route('/')
 def index():
     """Render the main analytics page"""
@@ -735,7 +803,7 @@ def chart_data():
                 COALESCE(MIN(CASE WHEN OperationType = 'EXPLANATION' AND Status = 'SUCCESS' AND ReadingDurationSec > 0 THEN ReadingDurationSec END), 0) as MinReadingTime,
                 COALESCE(MAX(CASE WHEN OperationType = 'EXPLANATION' AND Status = 'SUCCESS' AND ReadingDurationSec > 0 THEN ReadingDurationSec END), 0) as MaxReadingTime
             FROM AIUsageLogs
-            WHERE ProfileID = ?
+            WHERE ProfileID = ? AND OperationType <> 'EXPLANATION_CACHE_HIT'
         """, (profile_id,)),
 
         'aiCostTimeline': fetch_query("""
@@ -1401,7 +1469,10 @@ def chart_data():
         'recent_achievements': recent_achievements,
         'achievements': achievements_full,
         # AI Usage Analytics
-        'ai_usage_summary': data['aiUsageSummary'][0] if data['aiUsageSummary'] else {},
+        'ai_usage_summary': {
+            **(data['aiUsageSummary'][0] if data['aiUsageSummary'] else {}),
+            **fetch_explanation_cache_stats(profile_id),
+        },
         'ai_cost_timeline': format_ai_cost_timeline(data['aiCostTimeline'], start_date=thirty_days_ago, end_date=today_str),
         'ai_token_distribution': format_ai_token_distribution(data['aiTokenDistribution']),
         'ai_usage_by_category': format_pie_chart(data['aiUsageByCategory'], 'CategoryName', 'CallCount'),
@@ -1417,6 +1488,7 @@ def chart_data():
         # Question Analytics
         'question_summary': data['questionSummary'][0] if data['questionSummary'] else {},
         'questions_generated_today': data['questionsGeneratedToday'][0].get('Count', 0) if data['questionsGeneratedToday'] else 0,
+        'question_pregen': fetch_question_pregen_progress(profile_id),
         'questions_shown_today': data['questionsShownToday'][0].get('Count', 0) if data['questionsShownToday'] else 0,
         'avg_question_reading_time': data['avgQuestionReadingTime'][0] if data['avgQuestionReadingTime'] else {},
         'questions_by_category': format_pie_chart(data['questionsByCategory'], 'CategoryName', 'QuestionCount'),
@@ -1606,6 +1678,75 @@ def chart_data():
 
     return jsonify(formatted_data)
 
+_search_index = None
+_search_index_mtime = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the shared search index, reloading it when the widget saved a newer file."""
+    global _search_index, _search_index_mtime
+    path = config.SEARCH_CONFIG['index_path']
+    with _search_index_lock:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        if _search_index is not None and (mtime is None or mtime == _search_index_mtime):
+            return _search_index
+        with pyodbc.connect(CONN_STR) as conn:
+            _search_index = search_index.load_or_build(conn, path)
+        try:
+            _search_index_mtime = os.path.getmtime(path)
+        except OSError:
+            _search_index_mtime = None
+        return _search_index
+
+
+@app.route('/api/search')
+@csrf.exempt  # Exempt from CSRF (read-only endpoint)
+@limiter.limit(f"{config.ANALYTICS_CONFIG['rate_limit_per_second']}/second")
+def search_facts():
+    """Ranked full-text search over fact text (served from the local inverted index)"""
+    query = (request.args.get('q') or '').strip()
+    max_results = int(config.SEARCH_CONFIG.get('max_results', 20) or 20)
+    try:
+        limit = max(1, min(int(request.args.get('limit', max_results)), 100))
+    except (TypeError, ValueError):
+        limit = max_results
+    if not query:
+        return jsonify({'query': query, 'results': []})
+    try:
+        ranked = get_search_index().search(query, limit)
+    except Exception as e:
+        logger.error(f"Search index unavailable: {e}")
+        return jsonify({'error': 'Search index unavailable'}), 503
+    if not ranked:
+        return jsonify({'query': query, 'results': []})
+    scores = dict(ranked)
+    placeholders = ",".join("?" for _ in scores)
+    rows = fetch_query(
+        f"""
+        SELECT f.FactID, f.Content, c.CategoryName
+        FROM Facts f
+        LEFT JOIN Categories c ON c.CategoryID = f.CategoryID
+        WHERE f.CreatedBy = ? AND f.FactID IN ({placeholders})
+        """,
+        (get_default_profile_id(), *scores)
+    )
+    results = [
+        {
+            'FactID': row['FactID'],
+            'Content': row['Content'],
+            'CategoryName': row['CategoryName'],
+            'Score': round(scores[row['FactID']], 4),
+        }
+        for row in rows
+    ]
+    results.sort(key=lambda r: (-r['Score'], r['FactID']))
+    return jsonify({'query': query, 'results': results})
+
+
 def calculate_review_streak(profile_id: int):
     """Calculate the current review streak for a profile"""
     # Fetch longest streak from GamificationProfile
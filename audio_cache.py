@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.audio_cache')
+
+SUFFIX = '.wav.gz'
+
+
+def text_key(text: str) -> str:
+    """Hash of the spoken text (whitespace-normalised)."""
+    normalized = " ".join(str(text or "").split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]
+
+
+def voice_key(voice_settings) -> str:
+    """Hash of the voice settings the audio was rendered with."""
+    return hashlib.sha256(json.dumps(list(voice_settings or ()), default=str).encode('utf-8')).hexdigest()[:12]
+
+
+class AudioCache:
+    """Size-bounded on-disk LRU of rendered speech.
+
+    Each entry is a gzip-compressed WAV named ``<text hash>-<voice hash>.wav.gz``,
+    so changing the voice, rate or volume never plays stale audio, and all
+    renderings of one text can be dropped together. Recency is kept in the
+    files' modification times, so the LRU order survives restarts. Once the
+    folder grows past ``max_bytes`` the least recently played files are deleted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries = OrderedDict()  # file name -> size, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    @classmethod
+    def from_config(cls):
+        """Build a cache using the AUDIO_CACHE_CONFIG settings."""
+        cfg = config.AUDIO_CACHE_CONFIG
+        return cls(cfg['directory'], max_bytes=int(cfg.get('max_mb', 200) * 1024 * 1024))
+
+    def _scan(self):
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(SUFFIX):
+                if name.endswith('.tmp'):
+                    self._remove(path)  # left over from an interrupted store
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found.append((stat.st_mtime, name, stat.st_size))
+        with self._lock:
+            for _, name, size in sorted(found):
+                self._entries[name] = size
+                self._bytes += size
+            self._evict_locked()
+
+    @staticmethod
+    def file_name(text: str, voice_settings) -> str:
+        return f"{text_key(text)}-{voice_key(voice_settings)}{SUFFIX}"
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def has(self, text: str, voice_settings) -> bool:
+        with self._lock:
+            return self.file_name(text, voice_settings) in self._entries
+
+    def get(self, text: str, voice_settings):
+        """Path of the cached audio (marked as recently used), or None."""
+        name = self.file_name(text, voice_settings)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._bytes -= self._entries.pop(name, 0)
+            return None
+        return path
+
+    def store(self, text: str, voice_settings, wav_path: str) -> str:
+        """Compress a rendered WAV into the cache; returns the cached path."""
+        name = self.file_name(text, voice_settings)
+        path = os.path.join(self.directory, name)
+        tmp = path + '.tmp'
+        with open(wav_path, 'rb') as src, gzip.open(tmp, 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._bytes += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._evict_locked()
+        return path
+
+    @staticmethod
+    def extract(path: str, dest: str) -> str:
+        """Decompress a cached entry to a playable WAV at ``dest``."""
+        with gzip.open(path, 'rb') as src, open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        return dest
+
+    def invalidate(self, text: str) -> int:
+        """Drop every rendering of ``text``; returns how many files were removed."""
+        prefix = text_key(text) + '-'
+        with self._lock:
+            names = [name for name in self._entries if name.startswith(prefix)]
+            for name in names:
+                self._bytes -= self._entries.pop(name)
+        for name in names:
+            self._remove(os.path.join(self.directory, name))
+        return len(names)
+
+    def clear(self):
+        with self._lock:
+            names = list(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        for name in names:
+            self._remove(os.path.join(self.directory, name))
+
+    def _evict_locked(self):
+        while self._entries and self._bytes > self.max_bytes:
+            name, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.debug(f"Could not remove cached audio {path}: {e}")
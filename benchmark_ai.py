@@ -0,0 +1,224 @@
+"""Latency benchmark for the widget's AI code paths.
+
+    python benchmark_ai.py [--workload explain stream questions batch] [--requests 100] [--concurrency 4]
+                           [--latency lognormal:400:0.5] [--error-rate 0.02] [--endpoint URL] [--db]
+
+Every request goes through the widget's own client code
+(``_call_together_ai``, ``_call_together_ai_for_questions`` and
+``_call_together_ai_for_question_batch``) and the shared keep-alive
+``AIClient``, then its usage is logged with ``_record_ai_usage``. Without
+``--endpoint`` a ``fake_together`` server is started in-process with the
+given latency, error rate and streaming speed. Without ``--db`` the
+AIUsageLogs insert goes to an in-memory sink, so the logging figures are the
+Python-side cost only; with ``--db`` rows are written to the configured
+database (use a test database - they count towards the profile's AI totals).
+"""
+import argparse
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ai_client
+import config
+import fake_together
+
+# Set up logging
+logger = config.setup_logging('factdari.benchmark_ai')
+
+WORKLOADS = ('explain', 'stream', 'questions', 'batch')
+
+SAMPLE_FACTS = (
+    "Honey never spoils because its low water content and acidity stop bacteria from growing.",
+    "Octopuses have three hearts: two pump blood through the gills and one through the body.",
+    "Light from the Sun takes about 8 minutes and 20 seconds to reach Earth.",
+    "Bananas are berries, but strawberries are not.",
+    "The Eiffel Tower grows about 15 cm taller in summer as the iron expands.",
+)
+
+
+def percentile(values, pct: float):
+    """Linear-interpolated percentile of ``values`` (None when empty)."""
+    data = sorted(values)
+    if not data:
+        return None
+    rank = (len(data) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(data) - 1)
+    return data[low] + (data[high] - data[low]) * (rank - low)
+
+
+def summarize(values) -> dict:
+    values = list(values)
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'mean': sum(values) / len(values) if values else None,
+        'max': max(values) if values else None,
+    }
+
+
+class NullUsageSink:
+    """Stands in for the AIUsageLogs insert (and the lookups around it) on an app instance."""
+
+    def __init__(self):
+        self.rows = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def attach(self, app):
+        app.execute_insert_return_id = self.insert
+        app.column_exists = lambda table, column: True
+        app.get_active_profile_id = lambda: 1
+        app.gamify = None
+        return app
+
+    def insert(self, query, params=None):
+        with self._lock:
+            self.rows.append(params)
+            return next(self._ids)
+
+
+def build_app(endpoint: str, concurrency: int = 4, db: bool = False, retries: int = 0):
+    """A widget instance with only the AI settings loaded (no Tk window)."""
+    import factdari
+
+    app = factdari.FactDariApp.__new__(factdari.FactDariApp)
+    app._load_ai_settings()
+    app.ai_endpoint = endpoint
+    app.ai_stream_explanations = True
+    app.current_session_id = None
+    app.ai_client = ai_client.AIClient(
+        timeout=app.ai_timeout_seconds, pool_size=max(1, concurrency), max_retries=retries
+    )
+    if db:
+        import db_pool
+        import gamification
+
+        app.CONN_STR = config.get_connection_string()
+        app.db_pool = db_pool.ConnectionPool.from_config(app.CONN_STR)
+        app.gamify = gamification.Gamification(app.CONN_STR, pool=app.db_pool)
+        app.profile_context = app.gamify.profile
+    else:
+        NullUsageSink().attach(app)
+    return app
+
+
+def _call(app, workload, i, api_key, batch_size):
+    """Run one request; returns (ok, usage_info)."""
+    fact = SAMPLE_FACTS[i % len(SAMPLE_FACTS)]
+    if workload == 'explain':
+        _, usage = app._call_together_ai(fact, api_key)
+    elif workload == 'stream':
+        _, usage = app._call_together_ai(fact, api_key, on_delta=lambda delta: None)
+    elif workload == 'questions':
+        _, usage = app._call_together_ai_for_questions(fact, api_key)
+    elif workload == 'batch':
+        facts = [(i * batch_size + n + 1, SAMPLE_FACTS[(i + n) % len(SAMPLE_FACTS)]) for n in range(batch_size)]
+        _, usage = app._call_together_ai_for_question_batch(facts, api_key)
+    else:
+        raise ValueError(f"Unknown workload: {workload}")
+    return usage.get('status') == 'SUCCESS', usage
+
+
+def run_workload(app, workload: str, requests: int = 100, concurrency: int = 4, api_key: str = 'benchmark',
+                 fact_id: int = 1, batch_size: int = 5) -> dict:
+    """Send ``requests`` calls from ``concurrency`` threads and time the call and its usage logging."""
+    samples = []
+    lock = threading.Lock()
+
+    def one(i):
+        started = time.perf_counter()
+        ok, usage = _call(app, workload, i, api_key, batch_size)
+        called = time.perf_counter()
+        app._record_ai_usage(usage, fact_id)
+        logged = time.perf_counter()
+        with lock:
+            samples.append((ok, (called - started) * 1000, (logged - called) * 1000, usage.get('ttft_ms')))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='benchmark-ai') as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    call_ms = [s[1] for s in samples]
+    log_ms = [s[2] for s in samples]
+    total_ms = sum(call_ms) + sum(log_ms)
+    return {
+        'workload': workload,
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if not s[0]),
+        'wall_seconds': wall,
+        'throughput_rps': len(samples) / wall if wall > 0 else 0.0,
+        'latency_ms': summarize(call_ms),
+        'ttft_ms': summarize(s[3] for s in samples if s[3] is not None),
+        'logging_ms': summarize(log_ms),
+        'logging_share': sum(log_ms) / total_ms if total_ms else 0.0,
+    }
+
+
+def format_report(results) -> str:
+    def ms(value):
+        return "-" if value is None else f"{value:.1f}"
+
+    lines = [
+        f"{'workload':<10} {'reqs':>5} {'errors':>6} {'req/s':>7} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8} {'ttft p50':>9} {'log p50':>8} {'log p99':>8} {'log %':>6}"
+    ]
+    for r in results:
+        lat, log = r['latency_ms'], r['logging_ms']
+        lines.append(
+            f"{r['workload']:<10} {r['requests']:>5} {r['errors']:>6} {r['throughput_rps']:>7.1f} "
+            f"{ms(lat['p50']):>8} {ms(lat['p95']):>8} {ms(lat['p99']):>8} {ms(r['ttft_ms']['p50']):>9} "
+            f"{ms(log['p50']):>8} {ms(log['p99']):>8} {r['logging_share'] * 100:>5.1f}%"
+        )
+    lines.append("Latencies in ms; 'log' is the time spent in _record_ai_usage after each call.")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FactDari's AI calls and usage logging.")
+    parser.add_argument('--workload', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument('--requests', type=int, default=100, help="Requests per workload")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=5, help="Facts per request in the batch workload")
+    parser.add_argument('--endpoint', default=None, help="Benchmark this endpoint instead of a local fake server")
+    parser.add_argument('--api-key', default=None, help="API key for --endpoint (defaults to the configured key)")
+    parser.add_argument('--latency', default='lognormal:400:0.5',
+                        help="Fake server time to first byte: fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fake server failure share (0-1)")
+    parser.add_argument('--chunk-delay-ms', type=float, default=20.0, help="Fake server delay between streamed chunks")
+    parser.add_argument('--retries', type=int, default=0, help="Client retries for 429/5xx (the app default is 2)")
+    parser.add_argument('--db', action='store_true', help="Write usage rows to the configured database")
+    parser.add_argument('--fact-id', type=int, default=1, help="FactID the usage rows are logged against")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = None
+    endpoint = args.endpoint
+    api_key = args.api_key or (config.get_together_api_key() if endpoint else 'benchmark')
+    if endpoint is None:
+        server = fake_together.FakeTogetherServer(
+            latency=args.latency, error_rate=args.error_rate, chunk_delay_ms=args.chunk_delay_ms, seed=args.seed
+        ).start()
+        endpoint = server.url
+    try:
+        app = build_app(endpoint, args.concurrency, db=args.db, retries=args.retries)
+        results = []
+        for workload in args.workload:
+            print(f"Running {workload} ({args.requests} requests, concurrency {args.concurrency})...")
+            results.append(run_workload(
+                app, workload, args.requests, args.concurrency, api_key,
+                fact_id=args.fact_id, batch_size=args.batch_size,
+            ))
+    finally:
+        if server is not None:
+            server.stop()
+    print(format_report(results))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,252 @@
+"""Streaming export of FactDari tables to compressed CSV / JSON Lines (or Parquet).
+
+    python bulk_export.py backups/2024-06-01 [--format csv|jsonl|parquet] [--tables Facts FactLogs]
+
+Rows are read in keyset-paged batches (``WHERE pk > last ORDER BY pk``) with
+``fetchmany``, so memory stays constant regardless of table size. After every
+page, progress is checkpointed to ``export_state.json`` in the output folder; an
+interrupted export re-run with the same arguments continues where it stopped.
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.bulk_export')
+
+# Exportable tables and their (monotonic identity) key columns
+TABLES = {
+    'Facts': 'FactID',
+    'ProfileFacts': 'ProfileFactID',
+    'FactLogs': 'FactLogID',
+    'QuestionLogs': 'QuestionLogID',
+    'AIUsageLogs': 'AIUsageID',
+}
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+STATE_FILE = 'export_state.json'
+
+
+def _plain(value):
+    """Convert DB values to JSON/CSV friendly Python values."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return value
+
+
+class Exporter:
+    """Export tables page by page with resumable checkpoints."""
+
+    def __init__(self, conn, out_dir, fmt: str = 'csv', page_size: int = 50000, chunk_size: int = 5000,
+                 resume: bool = True, progress=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if fmt == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ValueError("Parquet export needs the optional 'pyarrow' package")
+        self.conn = conn
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.page_size = max(1, int(page_size))
+        self.chunk_size = max(1, int(chunk_size))
+        self.progress = progress  # callable(table, rows_so_far)
+        os.makedirs(out_dir, exist_ok=True)
+        self.state_path = os.path.join(out_dir, STATE_FILE)
+        self.state = self._load_state() if resume else None
+        if not self.state or self.state.get('format') != fmt:
+            self.state = {'format': fmt, 'tables': {}}
+
+    @classmethod
+    def from_config(cls, conn, out_dir, fmt='csv', **kwargs):
+        kwargs.setdefault('page_size', config.EXPORT_CONFIG.get('page_size', 50000))
+        kwargs.setdefault('chunk_size', config.EXPORT_CONFIG.get('chunk_size', 5000))
+        return cls(conn, out_dir, fmt, **kwargs)
+
+    # --- State ---
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def output_path(self, table):
+        if self.fmt == 'parquet':
+            return os.path.join(self.out_dir, table)
+        return os.path.join(self.out_dir, f"{table}.{self.fmt}.gz")
+
+    # --- Export ---
+    def run(self, tables=None):
+        """Export the given tables (default: all); returns {table: total rows}."""
+        totals = {}
+        for table in tables or list(TABLES):
+            if table not in TABLES:
+                raise ValueError(f"Unknown table: {table}")
+            totals[table] = self.export_table(table)
+        return totals
+
+    def export_table(self, table):
+        key = TABLES[table]
+        entry = self.state['tables'].get(table)
+        if entry is None:
+            entry = {'last_key': None, 'rows': 0, 'bytes': 0, 'parts': 0, 'done': False, 'columns': None}
+            self.state['tables'][table] = entry
+            self._reset_output(table)
+        if entry['done']:
+            return entry['rows']
+        self._truncate_to_checkpoint(table, entry)
+
+        sql = f"SELECT TOP ({self.page_size}) * FROM {table} WHERE {key} > ? ORDER BY {key}"
+        first_sql = f"SELECT TOP ({self.page_size}) * FROM {table} ORDER BY {key}"
+        while True:
+            with self.conn.cursor() as cursor:
+                if entry['last_key'] is None:
+                    cursor.execute(first_sql)
+                else:
+                    cursor.execute(sql, (entry['last_key'],))
+                columns = [c[0] for c in cursor.description]
+                key_index = columns.index(key)
+                page_rows, last_key = self._write_page(table, entry, columns, cursor, key_index)
+            if page_rows == 0:
+                break
+            entry['last_key'] = last_key
+            entry['rows'] += page_rows
+            entry['columns'] = columns
+            self._save_state()
+            if self.progress:
+                self.progress(table, entry['rows'])
+            if page_rows < self.page_size:
+                break
+        entry['done'] = True
+        self._save_state()
+        logger.info(f"Exported {entry['rows']} rows from {table}")
+        return entry['rows']
+
+    def _chunks(self, cursor):
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                return
+            yield rows
+
+    def _write_page(self, table, entry, columns, cursor, key_index):
+        if self.fmt == 'parquet':
+            return self._write_parquet_page(table, entry, columns, cursor, key_index)
+        path = self.output_path(table)
+        count = 0
+        last_key = entry['last_key']
+        # Each page is its own gzip member; concatenated members are a valid gzip file
+        with gzip.open(path, 'ab') as raw:
+            text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+            writer = csv.writer(text) if self.fmt == 'csv' else None
+            if writer is not None and entry['rows'] == 0 and entry['bytes'] == 0:
+                writer.writerow(columns)
+            for rows in self._chunks(cursor):
+                for row in rows:
+                    values = [_plain(v) for v in row]
+                    if writer is not None:
+                        writer.writerow(values)
+                    else:
+                        text.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+                        text.write("\n")
+                count += len(rows)
+                last_key = rows[-1][key_index]
+            text.flush()
+            text.detach()
+        entry['bytes'] = os.path.getsize(path)
+        return count, last_key
+
+    def _write_parquet_page(self, table, entry, columns, cursor, key_index):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        folder = self.output_path(table)
+        os.makedirs(folder, exist_ok=True)
+        part_path = os.path.join(folder, f"part-{entry['parts']:05d}.parquet")
+        writer = None
+        count = 0
+        last_key = entry['last_key']
+        try:
+            for rows in self._chunks(cursor):
+                batch = pa.Table.from_pydict({
+                    col: [_plain(row[i]) for row in rows] for i, col in enumerate(columns)
+                })
+                if writer is None:
+                    writer = pq.ParquetWriter(part_path, batch.schema)
+                writer.write_table(batch.cast(writer.schema))
+                count += len(rows)
+                last_key = rows[-1][key_index]
+        finally:
+            if writer is not None:
+                writer.close()
+        if count:
+            entry['parts'] += 1
+        return count, last_key
+
+    def _reset_output(self, table):
+        path = self.output_path(table)
+        if self.fmt == 'parquet':
+            if os.path.isdir(path):
+                for name in os.listdir(path):
+                    if name.startswith('part-') and name.endswith('.parquet'):
+                        os.remove(os.path.join(path, name))
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def _truncate_to_checkpoint(self, table, entry):
+        """Drop anything written after the last checkpoint (an interrupted page)."""
+        path = self.output_path(table)
+        if self.fmt == 'parquet':
+            stale = os.path.join(path, f"part-{entry['parts']:05d}.parquet")
+            if os.path.exists(stale):
+                os.remove(stale)
+        elif os.path.exists(path) and os.path.getsize(path) > entry['bytes']:
+            with open(path, 'r+b') as f:
+                f.truncate(entry['bytes'])
+
+
+def main(argv=None):
+    import pyodbc
+
+    parser = argparse.ArgumentParser(description="Export FactDari tables as compressed CSV/JSONL or Parquet.")
+    parser.add_argument('out_dir', help="Folder to write the export (and its resume state) into")
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--tables', nargs='+', choices=list(TABLES), default=None)
+    parser.add_argument('--page-size', type=int, default=config.EXPORT_CONFIG['page_size'])
+    parser.add_argument('--no-resume', action='store_true', help="Start over instead of continuing a previous run")
+    args = parser.parse_args(argv)
+
+    with pyodbc.connect(config.get_connection_string()) as conn:
+        exporter = Exporter.from_config(
+            conn, args.out_dir, args.format,
+            page_size=args.page_size,
+            resume=not args.no_resume,
+            progress=lambda table, rows: print(f"  {table}: {rows} rows", end="\r"),
+        )
+        totals = exporter.run(args.tables)
+    for table, rows in totals.items():
+        print(f"{table}: {rows} rows -> {exporter.output_path(table)}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
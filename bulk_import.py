@@ -0,0 +1,373 @@
+"""Bulk import of facts from CSV, JSON/JSON Lines or Markdown files.
+
+    python bulk_import.py facts.csv more.md [--category "General Knowledge"] [--profile 1]
+
+CSV files need a Content (or Fact) column and may have a Category column.
+JSON files hold a list of {"category": ..., "content": ...} objects; JSON Lines
+files (.jsonl/.ndjson) hold one such object per line and are streamed.
+Markdown files use "## Category" headings followed by "- fact" bullets.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import time
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.bulk_import')
+
+# Mirrors the persisted Facts.ContentKey column (see factdari_setup.sql)
+CONTENT_KEY_LENGTH = 450
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s+(.*?)\s*#*\s*$")
+
+# SQL Server errors for a unique index / primary key violation
+DUPLICATE_KEY_ERRORS = (2627, 2601)
+
+
+def content_key(content):
+    """Python equivalent of the Facts.ContentKey computed column."""
+    text = str(content or "").replace("\r", " ").replace("\n", " ").replace("\t", " ")
+    return text.strip(" ").lower()[:CONTENT_KEY_LENGTH]
+
+
+def is_duplicate_key_error(exc) -> bool:
+    """True for a unique-key violation (SQLSTATE 23000 with error 2627/2601)."""
+    args = getattr(exc, 'args', ()) or ()
+    if not args or str(args[0]) != '23000':
+        return False
+    message = " ".join(str(a) for a in args[1:])
+    return any(f"({code})" in message for code in DUPLICATE_KEY_ERRORS) or 'duplicate key' in message.lower()
+
+
+# --- Readers: each yields (category_name or None, content) ---
+def _pick(row, *names):
+    lowered = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+    for name in names:
+        value = lowered.get(name)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def read_csv(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            yield _pick(row, 'category', 'categoryname'), _pick(row, 'content', 'fact')
+
+
+def _from_object(obj):
+    if isinstance(obj, str):
+        return None, obj
+    if isinstance(obj, dict):
+        return _pick(obj, 'category', 'categoryname'), _pick(obj, 'content', 'fact')
+    return None, None
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('facts') or []
+    for obj in data:
+        yield _from_object(obj)
+
+
+def read_jsonl(path):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield _from_object(json.loads(line))
+
+
+def read_markdown(path):
+    category = None
+    current = None
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            heading = _HEADING_RE.match(line)
+            bullet = _BULLET_RE.match(line)
+            if heading:
+                if current:
+                    yield category, current
+                category, current = heading.group(1).strip() or None, None
+            elif bullet:
+                if current:
+                    yield category, current
+                current = bullet.group(1).strip()
+            elif line.strip() and current is not None:
+                # Indented continuation of the previous bullet
+                current = f"{current} {line.strip()}"
+            elif not line.strip() and current:
+                yield category, current
+                current = None
+    if current:
+        yield category, current
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+    '.jsonl': read_jsonl,
+    '.ndjson': read_jsonl,
+    '.md': read_markdown,
+    '.markdown': read_markdown,
+}
+
+
+def read_facts(path):
+    """Stream (category, content) pairs from a supported file."""
+    ext = os.path.splitext(path)[1].lower()
+    reader = READERS.get(ext)
+    if reader is None:
+        raise ValueError(f"Unsupported file type: {ext or path}")
+    return reader(path)
+
+
+class BulkImporter:
+    """Insert many facts with batched ``fast_executemany`` and set-based follow-up.
+
+    - Categories are resolved through one cached name -> CategoryID map.
+    - Duplicates are skipped in memory against every existing ContentKey (the
+      unique index is global) and against rows seen earlier in the import.
+    - The IDs of the inserted rows are captured with ``OUTPUT INSERTED.FactID``
+      into a ``#ImportedFacts`` temp table, so facts added elsewhere while the
+      import runs are never mistaken for imported ones.
+    - ProfileFacts rows, FactLogs 'add' rows and session counters are written
+      once at the end with set-based statements over those IDs; gamification
+      is rolled up by the caller from ``result['inserted']``.
+    """
+
+    def __init__(self, conn, profile_id, batch_size: int = 1000, create_categories: bool = True,
+                 default_category=None, session_id=None, progress=None):
+        self.conn = conn
+        self.profile_id = int(profile_id)
+        self.batch_size = max(1, int(batch_size))
+        self.create_categories = create_categories
+        self.default_category = default_category
+        self.session_id = session_id
+        self.progress = progress  # callable(result dict) after each batch
+        self._categories = None
+        self._keys = None
+        self._batch = []
+        self.result = {
+            'read': 0,
+            'inserted': 0,
+            'duplicates': 0,
+            'skipped': 0,
+            'errors': 0,
+            'categories_created': 0,
+            'seconds': 0.0,
+        }
+
+    @classmethod
+    def from_config(cls, conn, profile_id, **kwargs):
+        kwargs.setdefault('batch_size', config.BULK_IMPORT_CONFIG.get('batch_size', 1000))
+        kwargs.setdefault('create_categories', config.BULK_IMPORT_CONFIG.get('create_categories', True))
+        return cls(conn, profile_id, **kwargs)
+
+    # --- Setup ---
+    def _load(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT CategoryID, CategoryName FROM Categories WHERE CreatedBy = ?",
+                (self.profile_id,)
+            )
+            self._categories = {str(name).strip().lower(): cid for cid, name in cursor.fetchall()}
+            cursor.execute("SELECT ContentKey FROM Facts")
+            self._keys = set()
+            while True:
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    break
+                self._keys.update(row[0] for row in rows)
+            cursor.execute(
+                "IF OBJECT_ID('tempdb..#ImportedFacts') IS NOT NULL DROP TABLE #ImportedFacts; "
+                "CREATE TABLE #ImportedFacts (FactID INT PRIMARY KEY)"
+            )
+        # Committed so rolling back a failed batch does not drop the table
+        self.conn.commit()
+
+    def _category_id(self, name):
+        name = (name or self.default_category or "").strip()
+        if not name:
+            return None
+        cid = self._categories.get(name.lower())
+        if cid is not None or not self.create_categories:
+            return cid
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO Categories (CategoryName, Description, CreatedBy) OUTPUT INSERTED.CategoryID VALUES (?, '', ?)",
+                (name[:100], self.profile_id)
+            )
+            cid = int(cursor.fetchone()[0])
+        self.conn.commit()
+        self._categories[name.lower()] = cid
+        self.result['categories_created'] += 1
+        return cid
+
+    # --- Import ---
+    def run(self, rows):
+        """Import (category, content) pairs; returns the result counters."""
+        started = time.perf_counter()
+        if self._categories is None:
+            self._load()
+        for category, content in rows:
+            self.result['read'] += 1
+            content = str(content or "").strip()
+            if not content:
+                self.result['skipped'] += 1
+                continue
+            key = content_key(content)
+            if key in self._keys:
+                self.result['duplicates'] += 1
+                continue
+            cid = self._category_id(category)
+            if cid is None:
+                self.result['skipped'] += 1
+                continue
+            self._keys.add(key)
+            self._batch.append((cid, content, self.profile_id))
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+        self._flush()
+        self._finish()
+        self.result['seconds'] = round(time.perf_counter() - started, 3)
+        return self.result
+
+    def _flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        sql = """
+            INSERT INTO Facts (CategoryID, Content, DateAdded, TotalViews, CreatedBy)
+            OUTPUT INSERTED.FactID INTO #ImportedFacts (FactID)
+            VALUES (?, ?, dbo.LondonNow(), 0, ?)
+        """
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.fast_executemany = True
+                cursor.executemany(sql, batch)
+            self.conn.commit()
+            self.result['inserted'] += len(batch)
+        except Exception as e:
+            # A row added concurrently (or an odd ContentKey collation) can break the batch;
+            # fall back to row-by-row so the rest still goes in
+            logger.warning(f"Batch insert failed, retrying row by row: {e}")
+            try:
+                self.conn.rollback()
+            except Exception:
+                pass
+            for row in batch:
+                try:
+                    with self.conn.cursor() as cursor:
+                        cursor.execute(sql, row)
+                    self.conn.commit()
+                    self.result['inserted'] += 1
+                except Exception as row_error:
+                    try:
+                        self.conn.rollback()
+                    except Exception:
+                        pass
+                    if is_duplicate_key_error(row_error):
+                        self.result['duplicates'] += 1
+                    else:
+                        logger.error(f"Could not import fact {row[1][:60]!r}: {row_error}")
+                        self.result['errors'] += 1
+        if self.progress:
+            try:
+                self.progress(dict(self.result))
+            except Exception:
+                pass
+
+    def _finish(self):
+        """Set-based follow-up for exactly the rows inserted by this import."""
+        with self.conn.cursor() as cursor:
+            if self.result['inserted']:
+                cursor.execute(
+                    """
+                    INSERT INTO ProfileFacts (ProfileID, FactID, PersonalReviewCount, IsFavorite, IsEasy, LastViewedByUser)
+                    SELECT ?, i.FactID, 0, 0, 0, NULL
+                    FROM #ImportedFacts i
+                    WHERE NOT EXISTS (SELECT 1 FROM ProfileFacts pf WHERE pf.ProfileID = ? AND pf.FactID = i.FactID)
+                    """,
+                    (self.profile_id, self.profile_id)
+                )
+                if self.session_id is not None:
+                    cursor.execute(
+                        """
+                        INSERT INTO FactLogs (FactID, ReviewDate, SessionID, FactReadingTime, Action, FactContentSnapshot, CategoryIDSnapshot)
+                        SELECT f.FactID, dbo.LondonNow(), ?, 0, 'add', f.Content, f.CategoryID
+                        FROM #ImportedFacts i
+                        JOIN Facts f ON f.FactID = i.FactID
+                        """,
+                        (self.session_id,)
+                    )
+                    cursor.execute(
+                        "UPDATE ReviewSessions SET FactsAdded = ISNULL(FactsAdded,0) + ? WHERE SessionID = ?",
+                        (self.result['inserted'], self.session_id)
+                    )
+            # The connection may go back to a pool; do not leave the table behind
+            cursor.execute("DROP TABLE #ImportedFacts")
+        self.conn.commit()
+
+
+def award_import(gamify, inserted):
+    """Roll gamification up once for an import: counter, achievements and XP."""
+    if not gamify or inserted <= 0:
+        return []
+    total = gamify.increment_counter('TotalAdds', int(inserted))
+    unlocked = gamify.unlock_achievements_if_needed('adds', total)
+    add_xp = int(config.XP_CONFIG.get('xp_add', 2))
+    if add_xp:
+        gamify.award_xp(add_xp * int(inserted))
+    return unlocked
+
+
+def main(argv=None):
+    import pyodbc
+    import gamification
+
+    parser = argparse.ArgumentParser(description="Bulk import facts from CSV, JSON/JSONL or Markdown files.")
+    parser.add_argument('files', nargs='+', help="Files to import")
+    parser.add_argument('--category', default=None, help="Category for rows that do not name one")
+    parser.add_argument('--profile', type=int, default=None, help="ProfileID that owns the facts (default: first profile)")
+    parser.add_argument('--batch-size', type=int, default=config.BULK_IMPORT_CONFIG['batch_size'])
+    parser.add_argument('--no-create-categories', action='store_true', help="Skip rows whose category does not exist")
+    args = parser.parse_args(argv)
+
+    conn_str = config.get_connection_string()
+    gamify = gamification.Gamification(conn_str)
+    profile_id = args.profile if args.profile is not None else gamify.profile.profile_id
+    with pyodbc.connect(conn_str) as conn:
+        importer = BulkImporter(
+            conn, profile_id,
+            batch_size=args.batch_size,
+            create_categories=not args.no_create_categories,
+            default_category=args.category,
+            progress=lambda r: print(f"  {r['inserted']} inserted, {r['duplicates']} duplicates...", end="\r"),
+        )
+
+        def all_rows():
+            for path in args.files:
+                yield from read_facts(path)
+
+        result = importer.run(all_rows())
+    unlocked = award_import(gamify, result['inserted'])
+    print(
+        f"Read {result['read']}, inserted {result['inserted']}, skipped {result['duplicates']} duplicates "
+        f"and {result['skipped']} empty/uncategorised rows, {result['errors']} failed, created {result['categories_created']} categories "
+        f"in {result['seconds']:.1f}s"
+    )
+    for achievement in unlocked:
+        print(f"Achievement unlocked: {achievement.get('Name')}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -61,6 +61,92 @@ DB_CONFIG = {
     'trust_server_certificate': os.environ.get('FACTDARI_DB_TRUST_CERT', ''),
 }
 
+# Connection pool used by the desktop widget (see db_pool.py)
+DB_POOL_CONFIG = {
+    # Idle connections kept open between statements
+    'pool_size': int(os.environ.get('FACTDARI_DB_POOL_SIZE', '4')),
+    # Extra short-lived connections allowed under load (closed when returned)
+    'max_overflow': int(os.environ.get('FACTDARI_DB_POOL_MAX_OVERFLOW', '4')),
+    # Seconds to wait for a free connection before giving up
+    'checkout_timeout_seconds': _get_float_env('FACTDARI_DB_POOL_CHECKOUT_TIMEOUT_SECONDS', '10'),
+    # Ping (SELECT 1) idle connections that have not been used for this long
+    'health_check_after_seconds': _get_float_env('FACTDARI_DB_POOL_HEALTH_CHECK_SECONDS', '30'),
+    # Recycle connections older than this (0 disables)
+    'max_lifetime_seconds': _get_float_env('FACTDARI_DB_POOL_MAX_LIFETIME_SECONDS', '1800'),
+}
+
+# Write-behind queue for review telemetry (see telemetry.py)
+TELEMETRY_CONFIG = {
+    # Set FACTDARI_TELEMETRY_WRITE_BEHIND=false to write synchronously on the UI thread
+    'enabled': _get_bool_env('FACTDARI_TELEMETRY_WRITE_BEHIND', 'true'),
+    # Maximum queued writes before callers are made to wait (back-pressure)
+    'max_queue': int(os.environ.get('FACTDARI_TELEMETRY_MAX_QUEUE', '1000')),
+    # Maximum writes drained and sent per worker pass
+    'batch_size': int(os.environ.get('FACTDARI_TELEMETRY_BATCH_SIZE', '200')),
+    # How long the worker waits for a burst of writes to accumulate
+    'flush_interval_ms': int(os.environ.get('FACTDARI_TELEMETRY_FLUSH_INTERVAL_MS', '250')),
+    # How long submit() waits for room before reporting back-pressure
+    'put_timeout_ms': int(os.environ.get('FACTDARI_TELEMETRY_PUT_TIMEOUT_MS', '50')),
+    # Upper bound on waiting for pending writes at session end / exit
+    'flush_timeout_seconds': _get_float_env('FACTDARI_TELEMETRY_FLUSH_TIMEOUT_SECONDS', '5'),
+}
+
+# Fact deck: compact ids in memory, fact bodies fetched on demand (see fact_deck.py)
+FACT_DECK_CONFIG = {
+    # Maximum fact bodies kept in the in-memory LRU content cache
+    'content_cache_size': int(os.environ.get('FACTDARI_FACT_CONTENT_CACHE_SIZE', '256')),
+    # Fact bodies fetched per round trip when a card's content is not cached
+    'prefetch_size': int(os.environ.get('FACTDARI_FACT_PREFETCH_SIZE', '20')),
+}
+
+# Look-ahead prefetch of upcoming cards (see prefetch.py)
+PREFETCH_CONFIG = {
+    # Set FACTDARI_PREFETCH_ENABLED=false to load each card only when it is shown
+    'enabled': _get_bool_env('FACTDARI_PREFETCH_ENABLED', 'true'),
+    # Number of upcoming cards warmed while the current card is read
+    'lookahead': int(os.environ.get('FACTDARI_PREFETCH_LOOKAHEAD', '3')),
+    # Also ask the AI to generate questions for upcoming cards that have none
+    'generate_questions': _get_bool_env('FACTDARI_PREFETCH_GENERATE_QUESTIONS', 'true'),
+}
+
+# Full-text search over fact text (see search_index.py)
+SEARCH_CONFIG = {
+    # Where the inverted index is saved so startup does not re-index
+    'index_path': os.environ.get('FACTDARI_SEARCH_INDEX_PATH', os.path.join(BASE_DIR, 'data', 'search_index.json')),
+    # Maximum ranked results returned by the widget and /api/search
+    'max_results': int(os.environ.get('FACTDARI_SEARCH_MAX_RESULTS', '20')),
+    # Delay before index changes from add/edit/delete are written to disk
+    'save_delay_ms': int(os.environ.get('FACTDARI_SEARCH_SAVE_DELAY_MS', '5000')),
+}
+
+# Near-duplicate warnings when adding facts (see near_duplicates.py)
+NEAR_DUPLICATE_CONFIG = {
+    # Set FACTDARI_NEAR_DUP_ENABLED=false to only block exact duplicates
+    'enabled': _get_bool_env('FACTDARI_NEAR_DUP_ENABLED', 'true'),
+    # Estimated similarity (0-1) at or above which a new fact is flagged
+    'threshold': _get_float_env('FACTDARI_NEAR_DUP_THRESHOLD', '0.6'),
+    # MinHash signature length (higher = more accurate, more memory)
+    'num_perm': int(os.environ.get('FACTDARI_NEAR_DUP_NUM_PERM', '128')),
+    # Character shingle length used to compare texts
+    'shingle_size': int(os.environ.get('FACTDARI_NEAR_DUP_SHINGLE_SIZE', '5')),
+}
+
+# Bulk fact import (see bulk_import.py)
+BULK_IMPORT_CONFIG = {
+    # Rows sent per fast_executemany batch
+    'batch_size': int(os.environ.get('FACTDARI_IMPORT_BATCH_SIZE', '1000')),
+    # Create categories named in the file that do not exist yet
+    'create_categories': _get_bool_env('FACTDARI_IMPORT_CREATE_CATEGORIES', 'true'),
+}
+
+# Streaming table export (see bulk_export.py)
+EXPORT_CONFIG = {
+    # Rows per keyset page; progress is checkpointed after each page
+    'page_size': int(os.environ.get('FACTDARI_EXPORT_PAGE_SIZE', '50000')),
+    # Rows pulled from the cursor per fetchmany call
+    'chunk_size': int(os.environ.get('FACTDARI_EXPORT_CHUNK_SIZE', '5000')),
+}
+
 # Idle timeout behavior (inactivity)
 # Seconds before considering the user idle (default: 300s = 5 minutes)
 IDLE_TIMEOUT_SECONDS = int(os.environ.get('FACTDARI_IDLE_TIMEOUT_SECONDS', '300'))
@@ -153,16 +239,107 @@ AI_PRICING = {
 AI_REQUEST_CONFIG = {
     'endpoint': os.environ.get('FACTDARI_AI_ENDPOINT', 'https://api.together.xyz/v1/chat/completions'),
     'timeout_seconds': int(os.environ.get('FACTDARI_AI_TIMEOUT_SECONDS', '30')),
+    # Shared HTTP session (see ai_client.py): TCP/TLS connect timeout, kept-alive
+    # connections, and retries with exponential backoff for connect errors and 429/5xx
+    'connect_timeout_seconds': _get_float_env('FACTDARI_AI_CONNECT_TIMEOUT_SECONDS', '5'),
+    'pool_size': int(os.environ.get('FACTDARI_AI_POOL_SIZE', '4')),
+    'max_retries': int(os.environ.get('FACTDARI_AI_MAX_RETRIES', '2')),
+    'retry_backoff_seconds': _get_float_env('FACTDARI_AI_RETRY_BACKOFF_SECONDS', '0.5'),
+    # Stream explanations over SSE and draw them as they arrive (false = wait for the full reply)
+    'stream_explanations': _get_bool_env('FACTDARI_AI_STREAM_EXPLANATIONS', 'true'),
+    # Minimum delay between redraws of a streaming explanation
+    'stream_render_interval_ms': int(os.environ.get('FACTDARI_AI_STREAM_RENDER_INTERVAL_MS', '50')),
     'explanation_max_tokens': int(os.environ.get('FACTDARI_AI_EXPLANATION_MAX_TOKENS', '800')),
     'explanation_temperature': _get_float_env('FACTDARI_AI_EXPLANATION_TEMPERATURE', '0.35'),
     'question_max_tokens': int(os.environ.get('FACTDARI_AI_QUESTION_MAX_TOKENS', '400')),
     'question_temperature': _get_float_env('FACTDARI_AI_QUESTION_TEMPERATURE', '0.7'),
     'question_cooldown_seconds': int(os.environ.get('FACTDARI_AI_QUESTION_COOLDOWN_SECONDS', '60')),
+    # Facts packed into one question-generation request by the background generator (1 = one call per fact)
+    'question_batch_size': int(os.environ.get('FACTDARI_AI_QUESTION_BATCH_SIZE', '5')),
     # DeepSeek V4 Pro reasoning toggle. Default off = Non-Think mode (fast, direct,
     # no chain-of-thought). Set FACTDARI_AI_REASONING_ENABLED=true for Think mode.
     'reasoning_enabled': _get_bool_env('FACTDARI_AI_REASONING_ENABLED', 'false'),
 }
 
+# Scheduler for all Together AI calls (see ai_engine.py)
+AI_ENGINE_CONFIG = {
+    # Set FACTDARI_AI_ENGINE_ENABLED=false to run each AI call on its own thread
+    'enabled': _get_bool_env('FACTDARI_AI_ENGINE_ENABLED', 'true'),
+    # AI calls running at once, across all operations
+    'workers': int(os.environ.get('FACTDARI_AI_ENGINE_WORKERS', '4')),
+    # Per-operation limits; keep question_concurrency below workers so explanations always find a free slot
+    'explanation_concurrency': int(os.environ.get('FACTDARI_AI_ENGINE_EXPLANATION_CONCURRENCY', '2')),
+    'question_concurrency': int(os.environ.get('FACTDARI_AI_ENGINE_QUESTION_CONCURRENCY', '2')),
+}
+
+# Reuse of earlier AI explanations (see explanation_cache.py)
+EXPLANATION_CACHE_CONFIG = {
+    # Set FACTDARI_EXPLANATION_CACHE_ENABLED=false to always make a fresh AI call
+    'enabled': _get_bool_env('FACTDARI_EXPLANATION_CACHE_ENABLED', 'true'),
+    # Explanations kept in the in-memory LRU in front of the AIExplanationCache table
+    'max_entries': int(os.environ.get('FACTDARI_EXPLANATION_CACHE_SIZE', '256')),
+}
+
+# Background question generation for facts that have none yet (see question_pregen.py)
+QUESTION_PREGEN_CONFIG = {
+    # Set FACTDARI_QUESTION_PREGEN_ENABLED=false to only generate questions when a card is reached
+    'enabled': _get_bool_env('FACTDARI_QUESTION_PREGEN_ENABLED', 'true'),
+    # Concurrent generation calls
+    'workers': int(os.environ.get('FACTDARI_QUESTION_PREGEN_WORKERS', '2')),
+    # Facts picked up per pass
+    'batch_size': int(os.environ.get('FACTDARI_QUESTION_PREGEN_BATCH_SIZE', '20')),
+    # Facts whose QuestionsRefreshCountdown is at or below this get fresh questions early
+    'refresh_threshold': int(os.environ.get('FACTDARI_QUESTION_PREGEN_REFRESH_THRESHOLD', '3')),
+    # Daily limits on question generation spend (all QUESTION_GENERATION calls today; 0 = no limit)
+    'daily_token_budget': int(os.environ.get('FACTDARI_QUESTION_PREGEN_DAILY_TOKENS', '50000')),
+    'daily_cost_budget': _get_float_env('FACTDARI_QUESTION_PREGEN_DAILY_COST', '0.25'),
+    # Maximum generation calls started per minute
+    'rate_per_minute': _get_float_env('FACTDARI_QUESTION_PREGEN_RATE_PER_MINUTE', '6'),
+    # Hold off while a review is in progress (false = keep generating in the background)
+    'pause_while_reviewing': _get_bool_env('FACTDARI_QUESTION_PREGEN_PAUSE_WHILE_REVIEWING', 'false'),
+    # Generate new questions in the background as soon as a fact's question set is purged
+    'regenerate_on_refresh': _get_bool_env('FACTDARI_QUESTION_REGENERATE_ON_REFRESH', 'true'),
+    # Wait between passes when there is nothing to do, the budget is spent, or generation is paused
+    'idle_seconds': _get_float_env('FACTDARI_QUESTION_PREGEN_IDLE_SECONDS', '120'),
+}
+
+# In-memory question cache: questions are loaded in bulk for the deck and rotated locally
+QUESTION_CACHE_CONFIG = {
+    # Set FACTDARI_QUESTION_CACHE_ENABLED=false to query the Questions table for every card
+    'enabled': _get_bool_env('FACTDARI_QUESTION_CACHE_ENABLED', 'true'),
+    # Facts whose questions are kept in memory (least recently used are dropped)
+    'max_facts': int(os.environ.get('FACTDARI_QUESTION_CACHE_MAX_FACTS', '5000')),
+    # Load the whole deck's questions in the background after the facts are loaded
+    'preload': _get_bool_env('FACTDARI_QUESTION_CACHE_PRELOAD', 'true'),
+    # Facts per preload query (SQL Server allows at most 2100 parameters)
+    'preload_chunk': int(os.environ.get('FACTDARI_QUESTION_CACHE_PRELOAD_CHUNK', '500')),
+    # Write TimesShown counters once this many questions have unflushed shows
+    'flush_every': int(os.environ.get('FACTDARI_QUESTION_CACHE_FLUSH_EVERY', '10')),
+}
+
+
+# Text-to-speech service (see speech.py): one long-lived engine on its own thread
+SPEECH_CONFIG = {
+    # Voice id as reported by pyttsx3 (empty = system default)
+    'voice': os.environ.get('FACTDARI_TTS_VOICE', ''),
+    # Words per minute (0 = engine default)
+    'rate': int(os.environ.get('FACTDARI_TTS_RATE', '0')),
+    # 0.0 - 1.0
+    'volume': _get_float_env('FACTDARI_TTS_VOLUME', '1.0'),
+    # How often the speech thread pumps engine events and checks for new requests while speaking
+    'poll_ms': int(os.environ.get('FACTDARI_TTS_POLL_MS', '20')),
+}
+
+# Pre-rendered speech (see audio_cache.py): compressed audio files played instead of live synthesis
+AUDIO_CACHE_CONFIG = {
+    # Set FACTDARI_AUDIO_CACHE_ENABLED=true to render speech ahead of time (playback needs Windows)
+    'enabled': _get_bool_env('FACTDARI_AUDIO_CACHE_ENABLED', 'false'),
+    'directory': os.environ.get('FACTDARI_AUDIO_CACHE_DIR', os.path.join(BASE_DIR, 'data', 'audio_cache')),
+    # Least recently played files are deleted once the folder grows past this
+    'max_mb': _get_float_env('FACTDARI_AUDIO_CACHE_MAX_MB', '200'),
+    # Render the upcoming cards' fact and question text while the current card is read
+    'prerender_upcoming': _get_bool_env('FACTDARI_AUDIO_CACHE_PRERENDER', 'true'),
+}
 
 # Helper functions
 def get_icon_path(icon_name):
@@ -21,6 +21,7 @@ GO
 IF OBJECT_ID('AchievementUnlocks', 'U') IS NOT NULL DROP TABLE AchievementUnlocks;
 IF OBJECT_ID('QuestionLogs', 'U') IS NOT NULL DROP TABLE QuestionLogs;
 IF OBJECT_ID('Questions', 'U') IS NOT NULL DROP TABLE Questions;
+IF OBJECT_ID('AIExplanationCache', 'U') IS NOT NULL DROP TABLE AIExplanationCache;
 IF OBJECT_ID('AIUsageLogs', 'U') IS NOT NULL DROP TABLE AIUsageLogs;
 IF OBJECT_ID('FactLogs', 'U') IS NOT NULL DROP TABLE FactLogs;
 IF OBJECT_ID('ReviewSessions', 'U') IS NOT NULL DROP TABLE ReviewSessions;
@@ -160,6 +161,8 @@ CREATE TABLE AIUsageLogs (
     Cost DECIMAL(19,9) NULL, -- store USD equivalent cost for the call
     CurrencyCode CHAR(3) NOT NULL CONSTRAINT DF_AIUsageLogs_CurrencyCode DEFAULT 'USD',
     LatencyMs INT NULL,
+    TimeToFirstTokenMs INT NULL, -- streamed calls: time until the first content token arrived
+    CostSaved DECIMAL(19,9) NULL, -- EXPLANATION_CACHE_HIT rows: cost of the original call that was reused
     ReadingDurationSec INT NOT NULL CONSTRAINT DF_AIUsageLogs_ReadingDurationSec DEFAULT 0, -- time user spent reading AI output (seconds)
     CreatedAt DATETIME NOT NULL CONSTRAINT DF_AIUsageLogs_CreatedAt DEFAULT dbo.LondonNow(),
     FactContentSnapshot NVARCHAR(MAX) NULL, -- copy of Facts.Content at call time; lets audit log render after Fact deletion
@@ -171,6 +174,23 @@ CREATE TABLE AIUsageLogs (
         REFERENCES ReviewSessions(SessionID) ON DELETE SET NULL
 );
 
+-- Step 10b: Create AIExplanationCache table (explanations reused instead of paying for a new call)
+-- CacheKey = SHA-256 of (content hash, model, prompt version, temperature); see explanation_cache.py
+CREATE TABLE AIExplanationCache (
+    CacheKey CHAR(64) NOT NULL PRIMARY KEY,
+    FactID INT NULL
+        CONSTRAINT FK_AIExplanationCache_Facts REFERENCES Facts(FactID) ON DELETE CASCADE,
+    ContentHash CHAR(64) NULL,
+    ModelName NVARCHAR(200) NULL,
+    PromptVersion INT NULL,
+    Temperature DECIMAL(4,2) NULL,
+    ExplanationText NVARCHAR(MAX) NOT NULL,
+    InputTokens INT NULL,
+    OutputTokens INT NULL,
+    Cost DECIMAL(19,9) NULL, -- cost of the call that produced the explanation
+    CreatedAt DATETIME NOT NULL CONSTRAINT DF_AIExplanationCache_CreatedAt DEFAULT dbo.LondonNow()
+);
+
 -- Step 11: Create Questions table (cache of pre-generated questions, up to 3 per fact)
 -- Note: LLM generation costs are logged to AIUsageLogs with OperationType='QUESTION_GENERATION'
 CREATE TABLE Questions (
@@ -251,6 +271,7 @@ CREATE INDEX IX_AIUsageLogs_FactID ON AIUsageLogs(FactID);
 CREATE INDEX IX_AIUsageLogs_SessionID ON AIUsageLogs(SessionID);
 CREATE INDEX IX_AIUsageLogs_ProfileID ON AIUsageLogs(ProfileID);
 CREATE INDEX IX_AIUsageLogs_CreatedAt ON AIUsageLogs(CreatedAt);
+CREATE INDEX IX_AIExplanationCache_FactID ON AIExplanationCache(FactID);
 CREATE INDEX IX_Questions_FactID ON Questions(FactID);
 CREATE INDEX IX_QuestionLogs_QuestionID ON QuestionLogs(QuestionID);
 CREATE INDEX IX_QuestionLogs_SessionID ON QuestionLogs(SessionID);
@@ -279,6 +300,18 @@ BEGIN
   ) PERSISTED;
 END
 
+/* Add time-to-first-token for streamed AI calls (databases created before it existed) */
+IF COL_LENGTH('dbo.AIUsageLogs', 'TimeToFirstTokenMs') IS NULL
+BEGIN
+  ALTER TABLE dbo.AIUsageLogs ADD TimeToFirstTokenMs INT NULL;
+END
+
+/* Add cost saved by explanation cache hits (databases created before it existed) */
+IF COL_LENGTH('dbo.AIUsageLogs', 'CostSaved') IS NULL
+BEGIN
+  ALTER TABLE dbo.AIUsageLogs ADD CostSaved DECIMAL(19,9) NULL;
+END
+
 /* Create the unique index on the normalized key */
 IF NOT EXISTS (
   SELECT 1
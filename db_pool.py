@@ -0,0 +1,235 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pyodbc
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.db_pool')
+
+# SQLSTATE codes that mean the link to SQL Server is gone (connection failure,
+# communication link failure, connection does not exist, connection rejected).
+DISCONNECT_SQLSTATES = frozenset({'08001', '08003', '08004', '08007', '08S01'})
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out before the timeout."""
+
+
+def is_disconnect_error(exc) -> bool:
+    """Return True if a pyodbc error indicates a broken/closed connection."""
+    if not isinstance(exc, pyodbc.Error):
+        return False
+    args = getattr(exc, 'args', ()) or ()
+    state = str(args[0]) if args else ''
+    if state in DISCONNECT_SQLSTATES:
+        return True
+    message = ' '.join(str(a) for a in args).lower()
+    return 'communication link failure' in message or 'connection is closed' in message
+
+
+class _PooledConnection:
+    """Bookkeeping wrapper around a raw pyodbc connection."""
+
+    __slots__ = ('raw', 'created_at', 'last_used_at')
+
+    def __init__(self, raw):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used_at = now
+
+
+class ConnectionPool:
+    """Small thread-safe pool of pyodbc connections.
+
+    - At most ``pool_size`` idle connections are kept open; up to ``max_overflow``
+      extra connections may be opened under load and are closed when returned.
+    - Each checkout belongs to one thread at a time, so the UI thread and the
+      TTS/AI worker threads never share a live connection.
+    - Idle connections older than ``health_check_after_seconds`` are pinged with
+      ``SELECT 1`` before reuse; connections past ``max_lifetime_seconds`` are recycled.
+    - ``run()`` retries once on a fresh connection when the link was broken.
+    """
+
+    def __init__(self, conn_str: str, pool_size: int = 4, max_overflow: int = 4,
+                 checkout_timeout_seconds: float = 10.0,
+                 health_check_after_seconds: float = 30.0,
+                 max_lifetime_seconds: float = 1800.0):
+        self.conn_str = conn_str
+        self.pool_size = max(0, int(pool_size))
+        self.max_overflow = max(0, int(max_overflow))
+        self.checkout_timeout_seconds = max(0.0, float(checkout_timeout_seconds))
+        self.health_check_after_seconds = max(0.0, float(health_check_after_seconds))
+        self.max_lifetime_seconds = max(0.0, float(max_lifetime_seconds))
+        self._idle = []  # LIFO stack of _PooledConnection
+        self._checked_out = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+    @classmethod
+    def from_config(cls, conn_str: str):
+        """Build a pool using the DB_POOL_CONFIG settings."""
+        cfg = config.DB_POOL_CONFIG
+        return cls(
+            conn_str,
+            pool_size=cfg.get('pool_size', 4),
+            max_overflow=cfg.get('max_overflow', 4),
+            checkout_timeout_seconds=cfg.get('checkout_timeout_seconds', 10),
+            health_check_after_seconds=cfg.get('health_check_after_seconds', 30),
+            max_lifetime_seconds=cfg.get('max_lifetime_seconds', 1800),
+        )
+
+    @property
+    def max_connections(self) -> int:
+        return max(1, self.pool_size + self.max_overflow)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'idle': len(self._idle),
+                'checked_out': self._checked_out,
+                'max_connections': self.max_connections,
+            }
+
+    # --- Checkout / return ---
+    def _open(self) -> _PooledConnection:
+        return _PooledConnection(pyodbc.connect(self.conn_str))
+
+    @staticmethod
+    def _close_quietly(pooled):
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, pooled) -> bool:
+        """Validate an idle connection before handing it out again."""
+        now = time.monotonic()
+        if self.max_lifetime_seconds and now - pooled.created_at > self.max_lifetime_seconds:
+            return False
+        if now - pooled.last_used_at < self.health_check_after_seconds:
+            return True
+        try:
+            cursor = pooled.raw.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception as e:
+            logger.info(f"Discarding pooled connection that failed health check: {e}")
+            return False
+
+    def acquire(self) -> _PooledConnection:
+        """Check out a connection, opening a new one if the pool allows it."""
+        deadline = time.monotonic() + self.checkout_timeout_seconds
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+                while not self._idle and self._checked_out >= self.max_connections:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self.checkout_timeout_seconds}s"
+                        )
+                    self._cond.wait(remaining)
+                pooled = self._idle.pop() if self._idle else None
+                self._checked_out += 1
+            # Validate or connect outside the lock so other threads are not blocked on I/O
+            if pooled is None:
+                try:
+                    return self._open()
+                except Exception:
+                    self._release_slot()
+                    raise
+            if self._is_usable(pooled):
+                return pooled
+            self._close_quietly(pooled)
+            self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._checked_out = max(0, self._checked_out - 1)
+            self._cond.notify()
+
+    def release(self, pooled, discard: bool = False):
+        """Return a checked-out connection; broken or surplus ones are closed."""
+        if not discard:
+            try:
+                # Never hand a connection with an open transaction to the next caller
+                pooled.raw.rollback()
+            except Exception:
+                discard = True
+        keep = False
+        with self._cond:
+            self._checked_out = max(0, self._checked_out - 1)
+            if not discard and not self._closed and len(self._idle) < self.pool_size:
+                pooled.last_used_at = time.monotonic()
+                self._idle.append(pooled)
+                keep = True
+            self._cond.notify()
+        if not keep:
+            self._close_quietly(pooled)
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a raw pyodbc connection.
+
+        Mirrors ``with pyodbc.connect(...) as conn``: commits on success and
+        rolls back on error, then returns the connection to the pool.
+        """
+        pooled = self.acquire()
+        try:
+            yield pooled.raw
+            pooled.raw.commit()
+        except BaseException as e:
+            try:
+                pooled.raw.rollback()
+            except Exception:
+                pass
+            self.release(pooled, discard=is_disconnect_error(e))
+            raise
+        else:
+            self.release(pooled)
+
+    def run(self, work, idempotent: bool = True):
+        """Call ``work(conn)`` with a pooled connection and return its result.
+
+        If the statement fails because the link to the server was broken, the
+        dead connection is dropped and the work is retried once on a fresh one.
+        Work that must not be applied twice (an INSERT, a counter increment)
+        passes ``idempotent=False``: its commit may have reached the server
+        before the link dropped, so the error is raised instead of retried.
+        """
+        try:
+            with self.connection() as conn:
+                return work(conn)
+        except pyodbc.Error as e:
+            if not is_disconnect_error(e):
+                raise
+            self.discard_idle()
+            if not idempotent:
+                logger.warning(f"Database connection lost during a write; not retrying: {e}")
+                raise
+            logger.warning(f"Database connection lost, reconnecting: {e}")
+        with self.connection() as conn:
+            return work(conn)
+
+    def discard_idle(self):
+        """Close every idle connection (e.g. after the server dropped them all)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._close_quietly(pooled)
+
+    def close(self):
+        """Close idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.discard_idle()
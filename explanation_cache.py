@@ -0,0 +1,157 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.explanation_cache')
+
+# AIUsageLogs.OperationType for explanations served from the cache (zero cost)
+CACHE_HIT_OPERATION = 'EXPLANATION_CACHE_HIT'
+
+
+def content_hash(content):
+    """SHA-256 of the fact text (surrounding whitespace ignored)."""
+    return hashlib.sha256(str(content or "").strip().encode('utf-8')).hexdigest()
+
+
+def cache_key(content, model, prompt_version, temperature):
+    """Key for one explanation: content hash + model + prompt version + temperature."""
+    parts = [content_hash(content), str(model or ""), str(prompt_version), f"{float(temperature or 0):.3f}"]
+    return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+
+class ExplanationCache:
+    """Two-tier cache of AI explanations: an in-memory LRU in front of the
+    AIExplanationCache table.
+
+    ``run`` is a ``ConnectionPool.run``-style callable (``run(work)`` calls
+    ``work(conn)``); without it only the in-memory tier is used. Database
+    errors are logged and treated as misses so the caller falls back to a
+    fresh AI call.
+    """
+
+    def __init__(self, run=None, max_entries: int = 256):
+        self._run = run
+        self.max_entries = max(1, int(max_entries))
+        self._entries = OrderedDict()  # key -> entry dict
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, run=None):
+        return cls(run, config.EXPLANATION_CACHE_CONFIG.get('max_entries', 256))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    # --- Memory tier ---
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # --- Lookups ---
+    def get(self, key):
+        """Cached entry for ``key`` ({'text', 'fact_id', 'input_tokens', 'output_tokens', 'cost'}) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return dict(entry)
+        if self._run is None:
+            return None
+
+        def work(conn):
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT FactID, ExplanationText, InputTokens, OutputTokens, Cost
+                    FROM AIExplanationCache
+                    WHERE CacheKey = ?
+                    """,
+                    (key,)
+                )
+                return cursor.fetchone()
+        try:
+            row = self._run(work)
+        except Exception as e:
+            logger.warning(f"Explanation cache lookup failed: {e}")
+            return None
+        if not row:
+            return None
+        entry = {
+            'fact_id': row[0],
+            'text': row[1],
+            'input_tokens': row[2],
+            'output_tokens': row[3],
+            'cost': float(row[4]) if row[4] is not None else 0.0,
+        }
+        self._remember(key, entry)
+        return dict(entry)
+
+    # --- Updates ---
+    def put(self, key, fact_id, text, model=None, prompt_version=None, temperature=None,
+            input_tokens=None, output_tokens=None, cost=None, content_sha=None):
+        """Store (or replace) an explanation in both tiers."""
+        entry = {
+            'fact_id': fact_id,
+            'text': text,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'cost': float(cost) if cost is not None else 0.0,
+        }
+        self._remember(key, entry)
+        if self._run is None:
+            return
+
+        def work(conn):
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE AIExplanationCache
+                    SET FactID = ?, ExplanationText = ?, InputTokens = ?, OutputTokens = ?, Cost = ?, CreatedAt = dbo.LondonNow()
+                    WHERE CacheKey = ?;
+                    IF @@ROWCOUNT = 0
+                        INSERT INTO AIExplanationCache (CacheKey, FactID, ContentHash, ModelName, PromptVersion, Temperature, ExplanationText, InputTokens, OutputTokens, Cost)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+                    """,
+                    (
+                        fact_id, text, input_tokens, output_tokens, cost, key,
+                        key, fact_id, content_sha, model, prompt_version, temperature,
+                        text, input_tokens, output_tokens, cost,
+                    )
+                )
+            conn.commit()
+        try:
+            self._run(work)
+        except Exception as e:
+            logger.warning(f"Explanation cache write failed: {e}")
+
+    def invalidate_fact(self, fact_id):
+        """Drop every cached explanation of a fact (its content changed or it was deleted)."""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.get('fact_id') == fact_id]:
+                del self._entries[key]
+        if self._run is None:
+            return
+
+        def work(conn):
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM AIExplanationCache WHERE FactID = ?", (fact_id,))
+            conn.commit()
+        try:
+            self._run(work)
+        except Exception as e:
+            logger.warning(f"Explanation cache invalidation failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,297 @@
+import random
+import threading
+from collections import OrderedDict
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.fact_deck')
+
+
+class ContentCache:
+    """Bounded, thread-safe LRU of fact bodies keyed by FactID."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max(1, int(max_entries))
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, fact_id):
+        return fact_id in self._items
+
+    def get(self, fact_id):
+        with self._lock:
+            if fact_id not in self._items:
+                return None
+            self._items.move_to_end(fact_id)
+            return self._items[fact_id]
+
+    def put(self, fact_id, content):
+        with self._lock:
+            self._items[fact_id] = content
+            self._items.move_to_end(fact_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def put_many(self, contents: dict):
+        for fact_id, content in contents.items():
+            self.put(fact_id, content)
+
+    def missing(self, fact_ids):
+        """Return the ids (in order, de-duplicated) that are not cached."""
+        with self._lock:
+            seen = set()
+            out = []
+            for fact_id in fact_ids:
+                if fact_id not in self._items and fact_id not in seen:
+                    seen.add(fact_id)
+                    out.append(fact_id)
+            return out
+
+    def discard(self, fact_id):
+        with self._lock:
+            self._items.pop(fact_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class FactDeck:
+    """Navigable deck of compact (FactID, IsFavorite, IsEasy) entries.
+
+    Indexing returns (FactID, Content, IsFavorite, IsEasy) tuples like the old
+    fully-loaded list, but Content is fetched on demand through a shared
+    ContentCache. A cache miss loads the body for the requested card plus the
+    next ``prefetch_size`` cards in a single ``loader`` call.
+    """
+
+    def __init__(self, entries=None, loader=None, cache=None, prefetch_size: int = 20):
+        self._entries = [self._compact(e) for e in (entries or [])]
+        self._loader = loader  # callable(list of FactIDs) -> {FactID: Content}
+        self.cache = cache if cache is not None else ContentCache()
+        self.prefetch_size = max(1, int(prefetch_size))
+
+    @staticmethod
+    def _compact(entry):
+        fact_id = entry[0]
+        is_favorite = bool(entry[1]) if len(entry) > 1 else False
+        is_easy = bool(entry[2]) if len(entry) > 2 else False
+        return (fact_id, is_favorite, is_easy)
+
+    # --- Sequence protocol (compatible with the old list of tuples) ---
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __iter__(self):
+        for i in range(len(self._entries)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        fact_id, is_favorite, is_easy = self._entries[index]
+        if index < 0:
+            index += len(self._entries)
+        return (fact_id, self.content_at(index), is_favorite, is_easy)
+
+    def __setitem__(self, index, value):
+        """Accepts a (FactID, Content, IsFavorite, IsEasy) tuple."""
+        value = tuple(value)
+        fact_id = value[0]
+        is_favorite = bool(value[2]) if len(value) > 2 else False
+        is_easy = bool(value[3]) if len(value) > 3 else False
+        self._entries[index] = (fact_id, is_favorite, is_easy)
+        if len(value) > 1 and value[1] is not None:
+            self.cache.put(fact_id, value[1])
+
+    def pop(self, index=-1):
+        """Remove a card; returns its compact (FactID, IsFavorite, IsEasy) entry."""
+        entry = self._entries.pop(index)
+        self.cache.discard(entry[0])
+        return entry
+
+    def append(self, value):
+        """Append a (FactID, Content, IsFavorite, IsEasy) tuple."""
+        self._entries.append((value[0], False, False))
+        self[len(self._entries) - 1] = value
+
+    # --- Deck helpers ---
+    def fact_id_at(self, index):
+        return self._entries[index][0]
+
+    def entries(self):
+        return list(self._entries)
+
+    def index_of(self, fact_id):
+        for i, entry in enumerate(self._entries):
+            if entry[0] == fact_id:
+                return i
+        return -1
+
+    def shuffle(self, avoid_first_id=None, rng=None):
+        """Shuffle client-side; optionally keep ``avoid_first_id`` off the top."""
+        (rng or random).shuffle(self._entries)
+        if avoid_first_id is not None and len(self._entries) > 1 and self._entries[0][0] == avoid_first_id:
+            self._entries.append(self._entries.pop(0))
+
+    def upcoming_ids(self, index, count):
+        """FactIDs for the ``count`` cards after ``index`` (wrapping around)."""
+        n = len(self._entries)
+        if n == 0 or count <= 0:
+            return []
+        return [self._entries[(index + k) % n][0] for k in range(1, min(count, n - 1) + 1)]
+
+    def prefetch(self, fact_ids):
+        """Load any uncached bodies for ``fact_ids`` with one loader call."""
+        missing = self.cache.missing(fact_ids)
+        if not missing or self._loader is None:
+            return 0
+        try:
+            contents = self._loader(missing) or {}
+        except Exception as e:
+            logger.error(f"Error loading fact content: {e}")
+            return 0
+        self.cache.put_many(contents)
+        return len(contents)
+
+    def content_at(self, index):
+        fact_id = self._entries[index][0]
+        content = self.cache.get(fact_id)
+        if content is not None:
+            return content
+        n = len(self._entries)
+        window = [self._entries[(index + k) % n][0] for k in range(min(self.prefetch_size, n))]
+        self.prefetch(window)
+        content = self.cache.get(fact_id)
+        return content if content is not None else ""
+
+
+class FactIndex:
+    """Per-profile in-memory index for deck filters.
+
+    Holds fact ids per category plus favorite and known id sets, so any
+    filter (including combinations such as favorites in one category that are
+    not known) is answered with set operations instead of a database query.
+    The widget keeps it current on toggle, add, edit and delete.
+    """
+
+    HEADER_FILTERS = ("All Categories", "Favorites", "Known", "Not Known", "Not Favorite")
+
+    def __init__(self, rows=None):
+        self._lock = threading.RLock()
+        self.clear()
+        for row in rows or []:
+            self.add(*row)
+
+    def clear(self):
+        with self._lock:
+            self._category_of = {}    # FactID -> CategoryID
+            self._by_category = {}    # CategoryID -> set of FactIDs
+            self._category_ids = {}   # CategoryName -> CategoryID
+            self._favorites = set()
+            self._known = set()
+
+    def __len__(self):
+        return len(self._category_of)
+
+    def __contains__(self, fact_id):
+        return fact_id in self._category_of
+
+    # --- Updates ---
+    def add(self, fact_id, category_id, category_name=None, is_favorite=False, is_known=False):
+        """Add (or replace) a fact; rows from the loader query fit this signature."""
+        with self._lock:
+            self.remove(fact_id)
+            self._category_of[fact_id] = category_id
+            self._by_category.setdefault(category_id, set()).add(fact_id)
+            if category_name is not None:
+                self._category_ids[category_name] = category_id
+            if is_favorite:
+                self._favorites.add(fact_id)
+            if is_known:
+                self._known.add(fact_id)
+
+    def remove(self, fact_id):
+        with self._lock:
+            category_id = self._category_of.pop(fact_id, None)
+            if category_id is not None:
+                self._by_category.get(category_id, set()).discard(fact_id)
+            self._favorites.discard(fact_id)
+            self._known.discard(fact_id)
+
+    def move(self, fact_id, category_id, category_name=None):
+        with self._lock:
+            if fact_id not in self._category_of:
+                return
+            self._by_category.get(self._category_of[fact_id], set()).discard(fact_id)
+            self._category_of[fact_id] = category_id
+            self._by_category.setdefault(category_id, set()).add(fact_id)
+            if category_name is not None:
+                self._category_ids[category_name] = category_id
+
+    def set_favorite(self, fact_id, value):
+        with self._lock:
+            (self._favorites.add if value else self._favorites.discard)(fact_id)
+
+    def set_known(self, fact_id, value):
+        with self._lock:
+            (self._known.add if value else self._known.discard)(fact_id)
+
+    def rename_category(self, category_id, new_name):
+        with self._lock:
+            for name, cid in list(self._category_ids.items()):
+                if cid == category_id:
+                    del self._category_ids[name]
+            self._category_ids[new_name] = category_id
+
+    def remove_category(self, category_id):
+        """Drop a category and every fact in it."""
+        with self._lock:
+            for fact_id in list(self._by_category.get(category_id, ())):
+                self.remove(fact_id)
+            self._by_category.pop(category_id, None)
+            for name, cid in list(self._category_ids.items()):
+                if cid == category_id:
+                    del self._category_ids[name]
+
+    # --- Queries ---
+    def query(self, category=None, favorite=None, known=None):
+        """Matching (FactID, IsFavorite, IsEasy) entries, ordered by FactID.
+
+        ``category`` is a category name (None for all); ``favorite`` and
+        ``known`` are True/False to require or exclude, None to ignore.
+        """
+        with self._lock:
+            if category is None:
+                ids = set(self._category_of)
+            else:
+                category_id = self._category_ids.get(category)
+                ids = set(self._by_category.get(category_id, ()))
+            if favorite is True:
+                ids &= self._favorites
+            elif favorite is False:
+                ids -= self._favorites
+            if known is True:
+                ids &= self._known
+            elif known is False:
+                ids -= self._known
+            return [(fid, fid in self._favorites, fid in self._known) for fid in sorted(ids)]
+
+    def for_filter(self, name):
+        """Entries for a category dropdown selection."""
+        if name == "All Categories":
+            return self.query()
+        if name == "Favorites":
+            return self.query(favorite=True)
+        if name == "Known":
+            return self.query(known=True)
+        if name == "Not Known":
+            return self.query(known=False)
+        if name == "Not Favorite":
+            return self.query(favorite=False)
+        return self.query(category=name)
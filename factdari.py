@@ -5,22 +5,66 @@ import signal
 import atexit
 import config
 import ctypes
-import pyodbc
-import pyttsx3
 import webbrowser
 import subprocess
 import tkinter as tk
-import random
 import threading
 import requests
 import time
 import re
+import json
 from ctypes import wintypes
 from PIL import Image, ImageTk
 from datetime import datetime
-from tkinter import ttk, messagebox
+from concurrent.futures import CancelledError
+from tkinter import ttk, messagebox, filedialog
 from tkinter import font as tkfont
 import gamification
+import db_pool
+import telemetry
+import stats_model
+import fact_deck
+import prefetch
+import search_index
+import near_duplicates
+import bulk_import
+import ai_client
+import explanation_cache
+import question_pregen
+import question_cache
+import ai_engine
+import speech
+import audio_cache
+
+# Part of the explanation cache key; bump when the explanation prompt changes
+EXPLANATION_PROMPT_VERSION = 1
+
+# Reviews of a fact before its questions are replaced (Facts.QuestionsRefreshCountdown)
+QUESTIONS_REFRESH_COUNTDOWN = 50
+
+QUESTION_SYSTEM_PROMPT = (
+    "Generate 3 distinct questions that test understanding of the fact. "
+    "Vary the angles - for example: one recall question (what/who/when), one reasoning question (why/how), "
+    "and one about implication, consequence, or comparison. "
+    "Keep each question under 20 words. "
+    "Each question must be fully answerable using only the fact provided, but do NOT restate or reveal "
+    "the answer inside the question. "
+    "Output ONLY a valid JSON array of exactly 3 strings, nothing else. "
+    "Example: [\"Question 1?\", \"Question 2?\", \"Question 3?\"]"
+)
+
+# Same rules for several facts at once; each fact is sent as "[<FactID>] <text>"
+QUESTION_BATCH_SYSTEM_PROMPT = (
+    "For EACH fact below, generate 3 distinct questions that test understanding of that fact. "
+    "Vary the angles - for example: one recall question (what/who/when), one reasoning question (why/how), "
+    "and one about implication, consequence, or comparison. "
+    "Keep each question under 20 words. "
+    "Each question must be fully answerable using only its own fact, but do NOT restate or reveal "
+    "the answer inside the question. "
+    "Each fact starts with its ID in square brackets. "
+    "Output ONLY a valid JSON object mapping each fact ID (as a string) to an array of exactly 3 strings, nothing else. "
+    "Example: {\"12\": [\"Question 1?\", \"Question 2?\", \"Question 3?\"], \"15\": [\"Question 1?\", \"Question 2?\", \"Question 3?\"]}"
+)
 
 class ToolTip:
     """Lightweight tooltip for Tk widgets."""
@@ -76,6 +120,49 @@ class FactDariApp:
     def __init__(self):
         # Get database connection string from config
         self.CONN_STR = config.get_connection_string()
+        # Shared connection pool for the UI thread and the TTS/AI worker threads
+        self.db_pool = db_pool.ConnectionPool.from_config(self.CONN_STR)
+        try:
+            atexit.register(self.db_pool.close)
+        except Exception:
+            pass
+        # Write-behind queue so review telemetry never blocks the Tk mainloop
+        self.telemetry = None
+        if config.TELEMETRY_CONFIG.get('enabled', True):
+            self.telemetry = telemetry.TelemetryWriter.from_config(
+                self.db_pool, on_backpressure=self._on_telemetry_backpressure
+            ).start()
+            try:
+                atexit.register(self.telemetry.close, config.TELEMETRY_CONFIG['flush_timeout_seconds'])
+            except Exception:
+                pass
+        # Scheduler for all AI calls: priorities, per-operation limits and cancellation
+        self.ai_engine = None
+        if config.AI_ENGINE_CONFIG.get('enabled', True):
+            self.ai_engine = ai_engine.AIEngine.from_config(deliver=self._deliver_ai_result).start()
+            try:
+                atexit.register(self.ai_engine.close)
+            except Exception:
+                pass
+        # Per-fact question cache: cards pick questions locally, shows are written in batches
+        self.question_cache = None
+        if config.QUESTION_CACHE_CONFIG.get('enabled', True):
+            self.question_cache = question_cache.QuestionCache.from_config()
+            try:
+                # Registered after the telemetry writer so it runs before the writer closes
+                atexit.register(self._flush_question_shows)
+            except Exception:
+                pass
+        # Look-ahead worker that warms the next cards while the current one is read
+        self.prefetcher = None
+        if config.PREFETCH_CONFIG.get('enabled', True):
+            self.prefetcher = prefetch.Prefetcher.from_config(self._warm_upcoming_facts).start()
+            try:
+                atexit.register(self.prefetcher.close)
+            except Exception:
+                pass
+        # Background question generation for uncovered facts (started once the UI is up)
+        self.question_pregen = None
         
         # Get UI configurations
         self.WINDOW_WIDTH = config.UI_CONFIG['window_width']
@@ -113,29 +200,10 @@ class FactDariApp:
         self.LARGE_FONT = config.get_font('large')
         self.STATS_FONT = config.get_font('stats')
 
-        # AI model/pricing (used for logging and cost estimation)
-        self.ai_model = config.AI_PRICING.get('model', "deepseek-ai/DeepSeek-V4-Pro")
-        self.ai_provider = config.AI_PRICING.get('provider', "together")
-        try:
-            self.ai_prompt_cost_per_1k = float(config.AI_PRICING.get('prompt_cost_per_1k', 0) or 0)
-        except Exception:
-            self.ai_prompt_cost_per_1k = 0.0
-        try:
-            self.ai_completion_cost_per_1k = float(config.AI_PRICING.get('completion_cost_per_1k', 0) or 0)
-        except Exception:
-            self.ai_completion_cost_per_1k = 0.0
-        self.ai_currency = config.AI_PRICING.get('currency', 'USD')
-
-        # AI request settings
-        ai_req = config.AI_REQUEST_CONFIG
-        self.ai_endpoint = ai_req['endpoint']
-        self.ai_timeout_seconds = int(ai_req['timeout_seconds'])
-        self.ai_explanation_max_tokens = int(ai_req['explanation_max_tokens'])
-        self.ai_explanation_temperature = float(ai_req['explanation_temperature'])
-        self.ai_question_max_tokens = int(ai_req['question_max_tokens'])
-        self.ai_question_temperature = float(ai_req['question_temperature'])
-        # DeepSeek V4 Pro reasoning toggle (False = Non-Think mode)
-        self.ai_reasoning_enabled = bool(ai_req.get('reasoning_enabled', False))
+        self._load_ai_settings()
+        # Shared keep-alive HTTP session for both AI paths
+        self.ai_client = ai_client.get_client()
+        atexit.register(self.ai_client.close)
 
         # UI timing/opacity settings
         ui_cfg = config.UI_CONFIG
@@ -156,13 +224,26 @@ class FactDariApp:
         self.y_window = 0
         self.current_fact_id = None
         self.is_home_page = True
-        self.all_facts = []  # Store all facts for navigation
+        deck_cfg = config.FACT_DECK_CONFIG
+        self.content_cache = fact_deck.ContentCache(deck_cfg['content_cache_size'])
+        self.all_facts = self._new_fact_deck()  # Compact deck of facts for navigation
+        self.fact_index = None  # In-memory category/favorite/known index (loaded on first use)
         self.current_fact_index = 0
         self.current_fact_is_favorite = False  # Track if current fact is a favorite
         self.current_fact_is_easy = False  # Track if current fact is known/easy
-        # Speech state
-        self.speaking_thread = None
-        self.active_tts_engine = None  # engine instance used by the current speech thread
+        # Optional pre-rendered speech, played instead of live synthesis
+        self.audio_cache = None
+        if config.AUDIO_CACHE_CONFIG.get('enabled', False):
+            try:
+                self.audio_cache = audio_cache.AudioCache.from_config()
+            except Exception as e:
+                print(f"Audio cache unavailable: {e}")
+        # Speech: one long-lived engine on its own thread (initialised now, not on the first press)
+        self.speech = speech.SpeechService.from_config(
+            on_event=self._on_speech_event, audio_cache=self.audio_cache
+        ).start()
+        atexit.register(self.speech.close)
+        self.speech_utterance_id = None  # utterance the speaker button is waiting on
 
         # Timing/session state
         self.current_session_id = None
@@ -175,15 +256,18 @@ class FactDariApp:
         self.pause_depth = 0
         self.category_dropdown_open = False
         self._dropdown_seen_open = False
-        # Prevent overlapping AI requests
+        # Set while the AI explanation popup is open (one popup at a time)
         self.ai_request_inflight = False
         # Question state (questions shown before facts/answers)
         self.current_question_id = None
         self.current_question_log_id = None
         self.question_shown_at = None
         self.answer_revealed = False
-        self.question_request_inflight = False
-        self.question_generation_fact_id = None
+        # Identical AI jobs in flight are shared (see ai_engine.SingleFlight);
+        # (job, listener) pairs the prefetcher and the card on screen are waiting on
+        self.ai_flights = None
+        self.prefetch_question_jobs = []
+        self._question_view = None
         # Question generation throttling to avoid rapid retries on failures
         self.question_generation_cooldown_seconds = int(config.AI_REQUEST_CONFIG['question_cooldown_seconds'])
         self.question_generation_last_attempt = {}
@@ -209,13 +293,37 @@ class FactDariApp:
         
         # Initialize gamification helper (profile + achievements)
         try:
-            self.gamify = gamification.Gamification(self.CONN_STR)
+            self.gamify = gamification.Gamification(self.CONN_STR, pool=self.db_pool)
             self.gamify.ensure_profile()
         except Exception:
             self.gamify = None
+        # Resolve the active profile once; every query reuses the cached id
+        if self.gamify is not None:
+            self.profile_context = self.gamify.profile
+        else:
+            self.profile_context = gamification.ProfileContext(self._query_active_profile_id)
         
+        # Status bar counters: seeded once, then updated by events
+        self.stats = stats_model.StatsModel()
+        self.stats.subscribe(self._on_stat_changed)
+
+        # Full-text search index: loaded (or rebuilt if stale) off the UI thread
+        self.search_index = None
+        self._search_index_dirty = False
+        self._search_save_pending = False
+        threading.Thread(target=self._load_search_index, daemon=True).start()
+        try:
+            atexit.register(self._save_search_index)
+        except Exception:
+            pass
+        # Near-duplicate index for add-fact warnings, also built off the UI thread
+        self.near_duplicate_index = None
+        if config.NEAR_DUPLICATE_CONFIG.get('enabled', True):
+            threading.Thread(target=self._load_near_duplicate_index, daemon=True).start()
+
         # Set up UI elements
         self.setup_ui()
+        self.seed_stats()
         
         # Set initial transparency
         self.root.attributes('-alpha', self.WINDOW_OPACITY_DEFAULT)
@@ -233,6 +341,8 @@ class FactDariApp:
         # Show the home page
         self.show_home_page()
 
+        self._start_question_pregen()
+
         # Ensure we close any active session at process exit
         try:
             atexit.register(self.end_active_session)
@@ -566,6 +676,9 @@ class FactDariApp:
         self.root.bind("k", lambda e: self.toggle_easy())  # Shortcut for known/easy
         self.root.bind("x", lambda e: self.explain_fact_with_ai())  # Shortcut for AI explain
         self.root.bind("v", lambda e: self.speak_text())  # Shortcut for speak/voice
+        self.root.bind("<slash>", lambda e: self.show_search_window())  # Shortcut for full-text search
+        self.root.bind("u", lambda e: self.show_import_dialog())  # Shortcut for bulk import
+        self.root.bind("t", lambda e: self.prerender_category_speech())  # Shortcut for pre-rendering speech
         self.root.bind("<Return>", lambda e: self._handle_reveal_shortcut())  # Reveal answer in question mode
 
     def apply_rounded_corners(self, radius=None):
@@ -656,6 +769,9 @@ class FactDariApp:
         row("Toggle Favorite", "f")
         row("Mark as Known", "k")
         row("Static Position", "s")
+        row("Search Facts", "/")
+        row("Import Facts", "u")
+        row("Pre-render Speech", "t")
 
         tk.Button(win, text="Close", command=on_close, bg=self.BLUE_COLOR, fg=self.TEXT_COLOR, cursor="hand2", borderwidth=0, highlightthickness=0, padx=10, pady=5).pack(pady=10)
 
@@ -861,16 +977,25 @@ class FactDariApp:
         return result['value']
     
     # Database Methods
+    def get_db_pool(self):
+        """Return the shared connection pool, creating it on first use."""
+        pool = getattr(self, 'db_pool', None)
+        if pool is None:
+            pool = db_pool.ConnectionPool.from_config(self.CONN_STR)
+            self.db_pool = pool
+        return pool
+
     def fetch_query(self, query, params=None):
         """Execute a SELECT query and return the results"""
+        def work(conn):
+            with conn.cursor() as cursor:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                return cursor.fetchall()
         try:
-            with pyodbc.connect(self.CONN_STR) as conn:
-                with conn.cursor() as cursor:
-                    if params:
-                        cursor.execute(query, params)
-                    else:
-                        cursor.execute(query)
-                    return cursor.fetchall()
+            return self.get_db_pool().run(work)
         except Exception as e:
             print(f"Database error in fetch_query: {e}")
             return []
@@ -892,37 +1017,125 @@ class FactDariApp:
     
     def execute_update(self, query, params=None):
         """Execute an UPDATE/INSERT/DELETE query with no return value"""
+        def work(conn):
+            with conn.cursor() as cursor:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                conn.commit()
         try:
-            with pyodbc.connect(self.CONN_STR) as conn:
-                with conn.cursor() as cursor:
-                    if params:
-                        cursor.execute(query, params)
-                    else:
-                        cursor.execute(query)
-                    conn.commit()
+            self.get_db_pool().run(work, idempotent=False)
             return True
         except Exception as e:
             print(f"Database error in execute_update: {e}")
             return False
 
+    def execute_returning_row(self, query, params=None):
+        """Execute a write batch that SELECTs/OUTPUTs one row and return that row (or None)."""
+        def work(conn):
+            with conn.cursor() as cursor:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                row = cursor.fetchone()
+                conn.commit()
+                return row
+        try:
+            return self.get_db_pool().run(work, idempotent=False)
+        except Exception as e:
+            print(f"Database error in execute_returning_row: {e}")
+            return None
+
     def execute_insert_return_id(self, query, params=None):
         """Execute an INSERT with OUTPUT ... RETURNING pattern and return the new ID."""
+        def work(conn):
+            with conn.cursor() as cursor:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                row = cursor.fetchone()
+                conn.commit()
+                return row[0] if row else None
         try:
-            with pyodbc.connect(self.CONN_STR) as conn:
-                with conn.cursor() as cursor:
-                    if params:
-                        cursor.execute(query, params)
-                    else:
-                        cursor.execute(query)
-                    row = cursor.fetchone()
-                    conn.commit()
-                    return row[0] if row else None
+            return self.get_db_pool().run(work, idempotent=False)
         except Exception as e:
             print(f"Database error in execute_insert_return_id: {e}")
             return None
 
+    def queue_write(self, query, params=None, key=None, returns_id=False, on_done=None):
+        """Queue a telemetry write on the write-behind worker, or run it now if disabled.
+
+        With ``returns_id`` the result is the new id (or a telemetry.PendingId that
+        can be passed to later queued writes). ``on_done`` receives the OUTPUT row
+        (``returns_id``) or the success flag; it may run on the worker thread.
+        """
+        writer = getattr(self, 'telemetry', None)
+        if writer is not None:
+            try:
+                return writer.submit(query, params, key=key, returns_id=returns_id, on_done=on_done)
+            except Exception as e:
+                print(f"Telemetry queue unavailable, writing synchronously: {e}")
+        if returns_id:
+            row = self.execute_returning_row(query, params)
+            if on_done:
+                on_done(row)
+            return row[0] if row else None
+        ok = self.execute_update(query, params)
+        if on_done:
+            on_done(ok)
+        return ok
+
+    def flush_telemetry(self, timeout=None):
+        """Wait for queued telemetry writes to reach the database."""
+        self._flush_question_shows()
+        writer = getattr(self, 'telemetry', None)
+        if writer is None:
+            return True
+        if timeout is None:
+            timeout = config.TELEMETRY_CONFIG.get('flush_timeout_seconds', 5)
+        try:
+            flushed = writer.flush(timeout)
+        except Exception:
+            return False
+        if not flushed:
+            print(f"Telemetry flush timed out with {writer.depth} write(s) pending")
+        return flushed
+
+    def _run_on_ui(self, func):
+        """Run func on the Tk thread (directly if already there)."""
+        if threading.current_thread() is threading.main_thread():
+            func()
+            return
+        try:
+            self.root.after(0, func)
+        except Exception:
+            pass
+
+    def _on_telemetry_backpressure(self, depth):
+        """Tell the user the database is falling behind (called on the submitting thread)."""
+        def show():
+            try:
+                self.status_label.config(text=f"Saving review data... ({depth} pending)", fg=self.YELLOW_COLOR)
+                self.clear_status_after_delay()
+            except Exception:
+                pass
+        self._run_on_ui(show)
+
     def get_active_profile_id(self) -> int:
-        """Fetch the current GamificationProfile ID, defaulting to 1."""
+        """Return the current GamificationProfile ID (cached), defaulting to 1."""
+        ctx = getattr(self, 'profile_context', None)
+        if ctx is not None:
+            try:
+                return ctx.profile_id
+            except Exception:
+                pass
+        return self._query_active_profile_id()
+
+    def _query_active_profile_id(self) -> int:
+        """Look the profile id up in the database (used to seed the profile context)."""
         try:
             if getattr(self, 'gamify', None):
                 prof = self.gamify.get_profile()
@@ -939,6 +1152,14 @@ class FactDariApp:
             pass
         return 1
 
+    def invalidate_profile_cache(self):
+        """Drop the cached profile id; call when the active profile changes."""
+        ctx = getattr(self, 'profile_context', None)
+        if ctx is not None:
+            ctx.invalidate()
+        # The filter index is per profile
+        self.fact_index = None
+
     def ensure_schema(self):
         """No-op: schema is managed externally via factdari_setup.sql."""
         return
@@ -951,22 +1172,30 @@ class FactDariApp:
     
     def get_facts_viewed_today(self):
         """Get count of unique facts viewed today"""
+        return len(self.get_fact_ids_viewed_today())
+
+    def get_fact_ids_viewed_today(self):
+        """Get the set of fact IDs viewed today (seeds the in-memory stats model)."""
         today = datetime.now().strftime('%Y-%m-%d')
         profile_id = self.get_active_profile_id()
         # Count only actual view actions (exclude add/edit/delete logs)
         query = """
-        SELECT COUNT(DISTINCT rl.FactID)
+        SELECT DISTINCT rl.FactID
         FROM FactLogs rl
         LEFT JOIN ReviewSessions rs ON rs.SessionID = rl.SessionID
         WHERE CONVERT(date, rl.ReviewDate) = CONVERT(date, ?)
           AND (rl.Action IS NULL OR rl.Action = 'view')
           AND (rs.ProfileID = ? OR rl.SessionID IS NULL)
+          AND rl.FactID IS NOT NULL
         """
-        result = self.fetch_query(query, (today, profile_id))
-        return result[0][0] if result and len(result) > 0 else 0
+        rows = self.fetch_query(query, (today, profile_id))
+        return {row[0] for row in rows} if rows else set()
 
     def update_level_progress(self):
-        """Update level label from gamification profile with next-level hint."""
+        """Update level label from gamification profile with next-level hint.
+
+        Called after XP changes; the label only re-renders if the text changed.
+        """
         try:
             if not hasattr(self, 'gamify') or not self.gamify:
                 return
@@ -975,27 +1204,29 @@ class FactDariApp:
             xp = prog.get('xp', 0)
             to_next = prog.get('xp_to_next', 0)
             if level >= 100:
-                self.level_label.config(text=f"Level {level} - {xp} XP (MAX)")
+                text = f"Level {level} - {xp} XP (MAX)"
             else:
                 # If progress shows no XP to next but level < 100, it's gated by achievements
                 if int(to_next or 0) <= 0:
-                    self.level_label.config(text=f"Level {level} - {xp} XP (achievements required)")
+                    text = f"Level {level} - {xp} XP (achievements required)"
                 else:
-                    self.level_label.config(text=f"Level {level} - {xp} XP ({to_next} to next)")
+                    text = f"Level {level} - {xp} XP ({to_next} to next)"
+            stats = getattr(self, 'stats', None)
+            if stats is not None:
+                stats.set_level_text(text)
+            else:
+                self.level_label.config(text=text)
         except Exception:
             pass
     
     def update_ui(self):
-        """Update UI elements periodically"""
+        """Periodic tick: only cheap, local work (status counters are event-driven)."""
         self.update_coordinates()
         if not self.is_home_page:
-            self.update_fact_count()
-            self.update_review_stats()
-            # Update gamification progress
-            try:
-                self.update_level_progress()
-            except Exception:
-                pass
+            # Reset "Seen Today" at midnight without querying the database
+            stats = getattr(self, 'stats', None)
+            if stats is not None:
+                stats.roll_day(datetime.now().date())
             # Check inactivity only while in reviewing mode
             try:
                 if self.current_session_id and not getattr(self, 'timer_paused', False):
@@ -1005,16 +1236,50 @@ class FactDariApp:
             except Exception:
                 pass
         self.root.after(self.UI_UPDATE_INTERVAL_MS, self.update_ui)
-    
+
+    def seed_stats(self):
+        """Load the status bar counters from the database once."""
+        try:
+            self.stats.seed(
+                total_facts=self.count_facts(),
+                seen_today=self.get_fact_ids_viewed_today(),
+                day=datetime.now().date()
+            )
+        except Exception as e:
+            print(f"Error loading status counters: {e}")
+        self.update_level_progress()
+
+    def _on_stat_changed(self, name, value):
+        """Render a status bar value that changed in the stats model."""
+        try:
+            if name == 'total_facts':
+                self.fact_count_label.config(text=f"Total Facts: {value}")
+            elif name == 'seen_today':
+                self.review_stats_label.config(text=f"Seen Today: {value}")
+            elif name == 'level_text':
+                self.level_label.config(text=value)
+            elif name == 'coordinates':
+                self.coordinate_label.config(text=f"Coordinates: {value[0]}, {value[1]}")
+        except Exception:
+            pass
+
     def update_fact_count(self):
-        """Update the fact count display"""
+        """Re-read the fact count from the database (after bulk changes)."""
         num_facts = self.count_facts()
-        self.fact_count_label.config(text=f"Total Facts: {num_facts}")
+        stats = getattr(self, 'stats', None)
+        if stats is not None:
+            stats.seed(total_facts=num_facts)
+        else:
+            self.fact_count_label.config(text=f"Total Facts: {num_facts}")
     
     def update_review_stats(self):
-        """Update the viewing statistics"""
-        facts_viewed = self.get_facts_viewed_today()
-        self.review_stats_label.config(text=f"Seen Today: {facts_viewed}")
+        """Re-read today's viewed facts from the database (after bulk changes)."""
+        viewed = self.get_fact_ids_viewed_today()
+        stats = getattr(self, 'stats', None)
+        if stats is not None:
+            stats.seed(seen_today=viewed, day=datetime.now().date())
+        else:
+            self.review_stats_label.config(text=f"Seen Today: {len(viewed)}")
     
     def on_press(self, event):
         """Handle mouse press on title bar for dragging"""
@@ -1023,13 +1288,17 @@ class FactDariApp:
     def update_coordinates(self):
         """Update the coordinate display"""
         x, y = self.root.winfo_x(), self.root.winfo_y()
-        self.coordinate_label.config(text=f"Coordinates: {x}, {y}")
+        stats = getattr(self, 'stats', None)
+        if stats is not None:
+            stats.set_coordinates(x, y)
+        else:
+            self.coordinate_label.config(text=f"Coordinates: {x}, {y}")
     
     def on_drag(self, event):
         """Handle window dragging"""
         x, y = event.x_root - self.x_window, event.y_root - self.y_window
         self.root.geometry(f"+{x}+{y}")
-        self.coordinate_label.config(text=f"Coordinates: {x}, {y}")
+        self.update_coordinates()
     
     def set_static_position(self, event=None):
         """Set window to a static position"""
@@ -1037,41 +1306,138 @@ class FactDariApp:
         self.update_coordinates()
     
     def speak_text(self):
-        """Speak the current fact or question text (non-blocking)."""
+        """Speak the current fact or question text (non-blocking; interrupts current speech)."""
         if self.is_home_page:
             return
         text = self.fact_label.cget("text")
-        
-        # Stop any ongoing speech first
-        self.stop_speaking()
-        
-        # Disable button while speaking
-        try:
-            self.speaker_button.config(state="disabled")
-        except Exception:
-            pass
-        
-        def _worker():
-            try:
-                # Initialize a fresh engine inside the worker to avoid reuse issues
-                engine = pyttsx3.init()
-                # Expose this engine so stop_speaking can interrupt it
-                self.active_tts_engine = engine
-                engine.say(text)
-                engine.runAndWait()
-            except Exception:
-                pass
-            finally:
+        self.speech_utterance_id = self._get_speech_service().speak(text)
+
+    def _get_speech_service(self):
+        """Shared speech service (created on first use)."""
+        service = getattr(self, 'speech', None)
+        if service is None:
+            service = speech.SpeechService.from_config(
+                on_event=self._on_speech_event, audio_cache=getattr(self, 'audio_cache', None)
+            ).start()
+            self.speech = service
+        return service
+
+    def _prerender_speech(self, fact_ids, on_done=None):
+        """Queue the fact and question text of these facts for rendering into the audio cache.
+
+        Returns how many texts were queued (already cached or queued ones are skipped).
+        """
+        service = getattr(self, 'speech', None)
+        if service is None or getattr(self, 'audio_cache', None) is None:
+            return 0
+        fact_ids = list(fact_ids)
+        contents = {}
+        content_cache = getattr(self, 'content_cache', None)
+        if content_cache is not None:
+            for fact_id in fact_ids:
+                text = content_cache.get(fact_id)
+                if text is not None:
+                    contents[fact_id] = text
+        missing = [fact_id for fact_id in fact_ids if fact_id not in contents]
+        if missing:
+            contents.update(self._load_fact_contents(missing))
+        questions = getattr(self, 'question_cache', None)
+        if questions is not None:
+            grouped = {fact_id: questions.get(fact_id) or [] for fact_id in fact_ids}
+        else:
+            grouped = self._fetch_questions_for_facts(fact_ids)
+        queued = 0
+        for fact_id in fact_ids:
+            texts = [contents.get(fact_id)] + [row[1] for row in grouped.get(fact_id) or []]
+            for text in texts:
+                if text and service.render(text, on_done):
+                    queued += 1
+        return queued
+
+    def prerender_category_speech(self):
+        """Render speech for every fact in the current category (and its questions) into the audio cache."""
+        if getattr(self, 'audio_cache', None) is None:
+            self.status_label.config(text="Audio cache is off (FACTDARI_AUDIO_CACHE_ENABLED)", fg=self.YELLOW_COLOR)
+            self.clear_status_after_delay()
+            return
+        fact_ids = [entry[0] for entry in self.all_facts.entries()]
+        if not fact_ids:
+            self.status_label.config(text="No facts to render", fg=self.YELLOW_COLOR)
+            self.clear_status_after_delay()
+            return
+        category = self.category_var.get()
+        progress = {'queued': 0, 'done': 0, 'listed': False}
+        lock = threading.Lock()
+
+        def show(text, color):
+            def apply():
                 try:
-                    # Clear active engine reference
-                    self.active_tts_engine = None
+                    self.status_label.config(text=text, fg=color)
+                    self.clear_status_after_delay()
                 except Exception:
                     pass
-                # Re-enable on UI thread
-                self.root.after(0, lambda: self.speaker_button.config(state="normal"))
+            self._run_on_ui(apply)
+
+        def report():
+            with lock:
+                done, queued, listed = progress['done'], progress['queued'], progress['listed']
+            if listed and done >= queued:
+                show(f"Speech ready for {category} ({queued} rendered)", self.GREEN_COLOR)
+            elif done % 10 == 0:
+                show(f"Rendering speech for {category}: {done}/{queued}", self.BLUE_COLOR)
+
+        def rendered(ok):
+            with lock:
+                progress['done'] += 1
+            report()
 
-        self.speaking_thread = threading.Thread(target=_worker, daemon=True)
-        self.speaking_thread.start()
+        def worker():
+            questions = getattr(self, 'question_cache', None)
+            chunk = max(1, int(config.QUESTION_CACHE_CONFIG.get('preload_chunk', 500)))
+            for start in range(0, len(fact_ids), chunk):
+                ids = fact_ids[start:start + chunk]
+                if questions is not None:
+                    missing = questions.missing(ids)
+                    grouped = self._fetch_questions_for_facts(missing)
+                    if grouped:
+                        questions.put_many(grouped, missing)
+                queued = self._prerender_speech(ids, on_done=rendered)
+                with lock:
+                    progress['queued'] += queued
+            with lock:
+                progress['listed'] = True
+            report()
+
+        show(f"Rendering speech for {category}...", self.BLUE_COLOR)
+        threading.Thread(target=worker, name='factdari-speech-prerender', daemon=True).start()
+
+    def _invalidate_speech_audio(self, old_text, new_text=None):
+        """Drop pre-rendered audio of text that changed or was deleted (and render its replacement)."""
+        cache = getattr(self, 'audio_cache', None)
+        if cache is None or not old_text:
+            return
+        try:
+            cache.invalidate(old_text)
+        except Exception as e:
+            print(f"Audio cache invalidation error: {e}")
+        service = getattr(self, 'speech', None)
+        if new_text and service is not None:
+            service.render(new_text)
+
+    def _on_speech_event(self, kind, utterance_id):
+        """Speech service callback (service thread); updates the speaker button on the Tk thread."""
+        def apply():
+            if utterance_id != getattr(self, 'speech_utterance_id', None):
+                return  # an earlier utterance; the button follows the latest one
+            try:
+                if kind == speech.EVENT_START:
+                    self.speaker_button.config(state="disabled")
+                else:
+                    self.speech_utterance_id = None
+                    self.speaker_button.config(state="normal")
+            except Exception:
+                pass
+        self._run_on_ui(apply)
 
     def explain_fact_with_ai(self):
         """Open a popup and ask Together AI to explain the current fact in simple words."""
@@ -1118,13 +1484,14 @@ class FactDariApp:
         ai_usage_row_id = None
         reading_started_at = None
         track_reading_time = False
+        explain_job = None
         # Disable the AI button until this window closes to avoid duplicate clicks
         try:
             self.ai_button.config(state="disabled")
         except Exception:
             pass
 
-        def on_close():
+        def save_reading_duration():
             nonlocal reading_started_at, ai_usage_row_id, track_reading_time
             duration_sec = 0
             if track_reading_time and reading_started_at is not None:
@@ -1142,6 +1509,15 @@ class FactDariApp:
                     )
                 except Exception as exc:
                     print(f"Failed to update AI reading duration: {exc}")
+            ai_usage_row_id = None
+            reading_started_at = None
+            track_reading_time = False
+
+        def on_close():
+            if explain_job is not None:
+                # Unless another caller shares it, stops a streaming reply at its next chunk
+                self._ai_flights().leave(*explain_job)
+            save_reading_duration()
             try:
                 self.resume_review_timer()
             except Exception:
@@ -1176,6 +1552,15 @@ class FactDariApp:
         explain_box.config(state="disabled")
         explain_box.pack(fill="both", expand=True, pady=4)
 
+        footer = tk.Frame(win, bg=self.BG_COLOR)
+        footer.pack(fill="x", padx=20, pady=(0, 10))
+        source_label = tk.Label(footer, text="", fg=self.STATUS_COLOR, bg=self.BG_COLOR, font=self.SMALL_FONT)
+        source_label.pack(side="left")
+        regenerate_btn = tk.Button(footer, text="Regenerate", state="disabled",
+                                   bg=self.BLUE_COLOR, fg=self.TEXT_COLOR, cursor="hand2",
+                                   borderwidth=0, highlightthickness=0, padx=10, pady=4)
+        regenerate_btn.pack(side="right")
+
         def update_text(text, use_markdown=False):
             try:
                 if not explain_box.winfo_exists():
@@ -1190,33 +1575,174 @@ class FactDariApp:
                 explain_box.insert("1.0", text.strip())
                 explain_box.config(state="disabled")
 
-        def mark_explanation_ready(text):
-            nonlocal reading_started_at
+        # Streamed deltas are buffered here and drawn at most once per render interval
+        streamed = []
+        stream_state = {}
+        stream_lock = threading.Lock()
+        render_pending = False
+        finished = False
+
+        def render_stream():
+            nonlocal render_pending
+            with stream_lock:
+                render_pending = False
+                text = "".join(streamed)
+            if finished or not text.strip():
+                return
+            try:
+                if not explain_box.winfo_exists():
+                    return
+                self._render_markdown_stream(explain_box, stream_state, text)
+            except Exception:
+                pass
+
+        def on_delta(delta):
+            nonlocal render_pending
+            with stream_lock:
+                streamed.append(delta)
+                if render_pending:
+                    return
+                render_pending = True
+            self.root.after(getattr(self, 'ai_stream_render_interval_ms', 50), render_stream)
+
+        def mark_explanation_ready(text, from_cache=False):
+            nonlocal reading_started_at, finished
+            finished = True
             update_text(text, use_markdown=True)
             if track_reading_time and reading_started_at is None:
                 try:
                     reading_started_at = time.perf_counter()
                 except Exception:
                     reading_started_at = None
+            try:
+                source_label.config(text="Saved explanation (no new AI call)" if from_cache else "")
+                regenerate_btn.config(state="normal")
+            except Exception:
+                pass
 
-        def worker():
-            nonlocal ai_usage_row_id, track_reading_time
-            result_text, usage_info = self._call_together_ai(fact_text, api_key)
+        def worker(job, force):
+            def on_job_delta(delta):
+                job.check()  # popup closed: stop reading the stream
+                on_delta(delta)
+
+            result_text, usage_info, from_cache = self._get_explanation(fact_id, fact_text, api_key, on_job_delta, force=force)
 
             try:
-                ai_usage_row_id = self._record_ai_usage(usage_info, fact_id=fact_id, session_id=session_id, reading_duration_sec=0)
+                usage_row_id = self._record_ai_usage(usage_info, fact_id=fact_id, session_id=session_id, reading_duration_sec=0)
             except Exception as exc:
                 print(f"AI usage logging error: {exc}")
-                ai_usage_row_id = None
+                usage_row_id = None
+            return result_text, from_cache, usage_row_id, usage_info.get("status") == "SUCCESS"
 
-            track_reading_time = (usage_info.get("status") == "SUCCESS")
-            
-            self.root.after(0, lambda: mark_explanation_ready(result_text))
+        def on_explained(result):
+            nonlocal ai_usage_row_id, track_reading_time
+            result_text, from_cache, ai_usage_row_id, track_reading_time = result
+            mark_explanation_ready(result_text, from_cache)
+
+        def start(force):
+            nonlocal explain_job
+            # A request already running for this text (e.g. the popup was reopened) is shared
+            key = (fact_id, "EXPLANATION_REGENERATE" if force else "EXPLANATION",
+                   explanation_cache.content_hash(fact_text))
+            job, listener, created = self._ai_flights().join(
+                key,
+                lambda: ai_engine.AIJob("EXPLANATION", lambda job: worker(job, force), ai_engine.PRIORITY_INTERACTIVE),
+                on_done=on_explained,
+                on_error=lambda exc: mark_explanation_ready(f"Failed to fetch explanation: {exc}"),
+            )
+            if created:
+                self._schedule_ai_job(job)
+            explain_job = (job, listener)
+
+        def regenerate():
+            nonlocal finished, render_pending
+            save_reading_duration()
+            with stream_lock:
+                streamed.clear()
+                render_pending = False
+            stream_state.clear()
+            finished = False
+            regenerate_btn.config(state="disabled")
+            source_label.config(text="")
+            update_text("Fetching a new explanation...")
+            start(True)
+
+        regenerate_btn.config(command=regenerate)
+        start(False)
+
+    def _explanation_cache_key(self, fact_text):
+        return explanation_cache.cache_key(
+            fact_text,
+            getattr(self, 'ai_model', "deepseek-ai/DeepSeek-V4-Pro"),
+            EXPLANATION_PROMPT_VERSION,
+            getattr(self, 'ai_explanation_temperature', 0),
+        )
 
-        threading.Thread(target=worker, daemon=True).start()
+    def _get_explanation(self, fact_id, fact_text, api_key, on_delta=None, force=False):
+        """Explanation for a fact, from the cache unless ``force``; returns (text, usage_info, from_cache).
+
+        Cache hits produce an EXPLANATION_CACHE_HIT usage row with zero cost and
+        the original call's cost as ``cost_saved``. Successful fresh calls are
+        stored in the cache (replacing any earlier explanation).
+        """
+        cache = self._get_explanation_cache()
+        key = self._explanation_cache_key(fact_text) if cache is not None else None
+        if cache is not None and not force:
+            cached = cache.get(key)
+            if cached and cached.get('text'):
+                usage_info = {
+                    "operation_type": explanation_cache.CACHE_HIT_OPERATION,
+                    "model": getattr(self, 'ai_model', "deepseek-ai/DeepSeek-V4-Pro"),
+                    "provider": getattr(self, 'ai_provider', "together"),
+                    "status": "SUCCESS",
+                    "cost": 0.0,
+                    "cost_saved": cached.get('cost') or 0.0,
+                }
+                return cached['text'], usage_info, True
+
+        text, usage_info = self._call_together_ai(fact_text, api_key, on_delta=on_delta)
+        if cache is not None and usage_info.get("status") == "SUCCESS" and text:
+            input_tokens = usage_info.get("input_tokens")
+            output_tokens = usage_info.get("output_tokens")
+            cache.put(
+                key, fact_id, text,
+                model=usage_info.get("model"),
+                prompt_version=EXPLANATION_PROMPT_VERSION,
+                temperature=getattr(self, 'ai_explanation_temperature', None),
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost=self._estimate_ai_cost(input_tokens or 0, output_tokens or 0),
+                content_sha=explanation_cache.content_hash(fact_text),
+            )
+        return text, usage_info, False
 
-    def _call_together_ai(self, fact_text: str, api_key: str):
-        """Call Together AI to explain a fact; returns (text, usage_info)."""
+    def _get_explanation_cache(self):
+        """Shared explanation cache, or None when disabled."""
+        if not config.EXPLANATION_CACHE_CONFIG.get('enabled', True):
+            return None
+        cache = getattr(self, 'explanation_cache', None)
+        if cache is None:
+            cache = explanation_cache.ExplanationCache.from_config(run=lambda work: self.get_db_pool().run(work))
+            self.explanation_cache = cache
+        return cache
+
+    def _invalidate_explanations(self, fact_id):
+        """Forget cached explanations of a fact whose content changed or was deleted."""
+        cache = self._get_explanation_cache()
+        if cache is None or fact_id is None:
+            return
+        try:
+            cache.invalidate_fact(fact_id)
+        except Exception as e:
+            print(f"Explanation cache invalidation error: {e}")
+
+    def _call_together_ai(self, fact_text: str, api_key: str, on_delta=None):
+        """Call Together AI to explain a fact; returns (text, usage_info).
+
+        When ``on_delta`` is given (and streaming is enabled) the completion is
+        streamed over SSE and ``on_delta(text)`` is called from this thread for
+        each chunk; ``usage_info['ttft_ms']`` records time to first token.
+        """
         started = time.perf_counter()
         usage_info = {
             "operation_type": "EXPLANATION",
@@ -1254,17 +1780,17 @@ class FactDariApp:
                 # Non-Think mode unless reasoning is explicitly enabled (DeepSeek V4 Pro)
                 "reasoning": {"enabled": getattr(self, 'ai_reasoning_enabled', False)},
             }
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-            resp = requests.post(
+            if on_delta is not None and getattr(self, 'ai_stream_explanations', True):
+                return self._stream_together_ai(payload, api_key, usage_info, on_delta, _record_latency)
+            resp, timing = self._get_ai_client().post(
                 self.ai_endpoint,
                 json=payload,
-                headers=headers,
+                api_key=api_key,
                 timeout=self.ai_timeout_seconds
             )
             _record_latency()
+            usage_info["connect_ms"] = timing.get("connect_ms")
+            usage_info["ttfb_ms"] = timing.get("ttfb_ms")
             if resp.status_code != 200:
                 usage_info["status"] = "FAILED"
                 return f"Error from AI ({resp.status_code}): {resp.text}", usage_info
@@ -1302,6 +1828,111 @@ class FactDariApp:
             usage_info["status"] = "FAILED"
             return f"Failed to fetch explanation: {exc}", usage_info
 
+    def _stream_together_ai(self, payload, api_key, usage_info, on_delta, record_latency):
+        """Streaming half of _call_together_ai; returns (text, usage_info)."""
+        received = []
+
+        def forward(delta):
+            received.append(delta)
+            on_delta(delta)
+
+        try:
+            resp, message, raw_usage, timing = self._get_ai_client().stream_chat(
+                self.ai_endpoint,
+                json=payload,
+                api_key=api_key,
+                timeout=self.ai_timeout_seconds,
+                on_delta=forward,
+            )
+        except Exception as exc:
+            record_latency()
+            usage_info["status"] = "FAILED"
+            if not received:
+                raise
+            # Keep what already arrived; the popup shows it with a note
+            return "".join(received).strip() + f"\n\n*(Explanation cut off: {exc})*", usage_info
+        record_latency()
+        usage_info["connect_ms"] = timing.get("connect_ms")
+        usage_info["ttfb_ms"] = timing.get("ttfb_ms")
+        usage_info["ttft_ms"] = timing.get("ttft_ms")
+        if resp.status_code != 200:
+            usage_info["status"] = "FAILED"
+            return f"Error from AI ({resp.status_code}): {resp.text}", usage_info
+        input_tokens = raw_usage.get("prompt_tokens")
+        output_tokens = raw_usage.get("completion_tokens")
+        total_tokens = raw_usage.get("total_tokens")
+        if total_tokens is None and (input_tokens is not None or output_tokens is not None):
+            total_tokens = int(input_tokens or 0) + int(output_tokens or 0)
+        usage_info.update({
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": total_tokens,
+        })
+        if not message.strip():
+            usage_info["status"] = "FAILED"
+            return "No explanation returned.", usage_info
+        return message.strip(), usage_info
+
+    def _load_ai_settings(self):
+        """Read AI model, pricing and request settings from config (the HTTP client is separate)."""
+        # AI model/pricing (used for logging and cost estimation)
+        self.ai_model = config.AI_PRICING.get('model', "deepseek-ai/DeepSeek-V4-Pro")
+        self.ai_provider = config.AI_PRICING.get('provider', "together")
+        try:
+            self.ai_prompt_cost_per_1k = float(config.AI_PRICING.get('prompt_cost_per_1k', 0) or 0)
+        except Exception:
+            self.ai_prompt_cost_per_1k = 0.0
+        try:
+            self.ai_completion_cost_per_1k = float(config.AI_PRICING.get('completion_cost_per_1k', 0) or 0)
+        except Exception:
+            self.ai_completion_cost_per_1k = 0.0
+        self.ai_currency = config.AI_PRICING.get('currency', 'USD')
+
+        # AI request settings
+        ai_req = config.AI_REQUEST_CONFIG
+        self.ai_endpoint = ai_req['endpoint']
+        self.ai_timeout_seconds = int(ai_req['timeout_seconds'])
+        self.ai_explanation_max_tokens = int(ai_req['explanation_max_tokens'])
+        self.ai_explanation_temperature = float(ai_req['explanation_temperature'])
+        self.ai_question_max_tokens = int(ai_req['question_max_tokens'])
+        self.ai_question_temperature = float(ai_req['question_temperature'])
+        # DeepSeek V4 Pro reasoning toggle (False = Non-Think mode)
+        self.ai_reasoning_enabled = bool(ai_req.get('reasoning_enabled', False))
+        self.ai_stream_explanations = bool(ai_req.get('stream_explanations', True))
+        self.ai_stream_render_interval_ms = int(ai_req.get('stream_render_interval_ms', 50))
+
+    def _get_ai_client(self):
+        """Shared AI HTTP client (created on first use)."""
+        client = getattr(self, 'ai_client', None)
+        if client is None:
+            client = ai_client.get_client()
+            self.ai_client = client
+        return client
+
+    def _deliver_ai_result(self, func):
+        """Run an AI job callback on the Tk thread."""
+        self.root.after(0, func)
+
+    def _schedule_ai_job(self, job):
+        """Queue an AIJob on the engine, or run it on its own thread when the engine is off."""
+        if job.deliver is None:
+            job.deliver = self._deliver_ai_result
+        engine = getattr(self, 'ai_engine', None)
+        if engine is not None:
+            try:
+                return engine.schedule(job)
+            except RuntimeError:
+                pass  # engine closed (app shutting down)
+        threading.Thread(target=job.run, daemon=True).start()
+        return job
+
+    def _run_ai_job(self, op, func, priority=ai_engine.PRIORITY_BACKGROUND):
+        """Run ``func(job)`` through the engine and wait for it (worker threads only)."""
+        engine = getattr(self, 'ai_engine', None)
+        if engine is None:
+            return func(ai_engine.AIJob(op, func, priority))
+        return engine.run(op, func, priority)
+
     def _estimate_ai_cost(self, prompt_tokens: int, completion_tokens: int) -> float:
         """Estimate call cost using configured per-1K token prices."""
         try:
@@ -1320,15 +1951,9 @@ class FactDariApp:
     # Question Mode: LLM-generated questions before showing facts
     # -----------------------------------------------------------------------------
 
-    def _call_together_ai_for_questions(self, fact_text: str, api_key: str):
-        """Call Together AI to generate 3 questions for a fact; returns (list_of_questions, usage_info)."""
+    def _post_question_prompt(self, system_prompt: str, user_content: str, api_key: str, max_tokens: int, usage_info: dict):
+        """Send one question-generation prompt; returns the reply text or None (usage_info is filled in)."""
         started = time.perf_counter()
-        usage_info = {
-            "operation_type": "QUESTION_GENERATION",
-            "model": getattr(self, 'ai_model', "deepseek-ai/DeepSeek-V4-Pro"),
-            "provider": getattr(self, 'ai_provider', "together"),
-            "status": "SUCCESS",
-        }
 
         def _record_latency():
             try:
@@ -1340,49 +1965,28 @@ class FactDariApp:
             payload = {
                 "model": usage_info["model"],
                 "messages": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "Generate 3 distinct questions that test understanding of the fact. "
-                            "Vary the angles - for example: one recall question (what/who/when), one reasoning question (why/how), "
-                            "and one about implication, consequence, or comparison. "
-                            "Keep each question under 20 words. "
-                            "Each question must be fully answerable using only the fact provided, but do NOT restate or reveal "
-                            "the answer inside the question. "
-                            "Output ONLY a valid JSON array of exactly 3 strings, nothing else. "
-                            "Example: [\"Question 1?\", \"Question 2?\", \"Question 3?\"]"
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Fact: {fact_text}"
-                    }
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content},
                 ],
-                "max_tokens": self.ai_question_max_tokens,
+                "max_tokens": max_tokens,
                 "temperature": self.ai_question_temperature,
                 # Non-Think mode unless reasoning is explicitly enabled (DeepSeek V4 Pro)
                 "reasoning": {"enabled": getattr(self, 'ai_reasoning_enabled', False)},
             }
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-            resp = requests.post(
+            resp, timing = self._get_ai_client().post(
                 self.ai_endpoint,
                 json=payload,
-                headers=headers,
+                api_key=api_key,
                 timeout=self.ai_timeout_seconds
             )
             _record_latency()
+            usage_info["connect_ms"] = timing.get("connect_ms")
+            usage_info["ttfb_ms"] = timing.get("ttfb_ms")
             if resp.status_code != 200:
                 usage_info["status"] = "FAILED"
-                return [], usage_info
+                return None
             data = resp.json()
             choices = data.get("choices") or []
-            if not choices:
-                usage_info["status"] = "FAILED"
-                return [], usage_info
-            message = choices[0].get("message", {}).get("content", "")
             raw_usage = data.get("usage") or {}
             input_tokens = raw_usage.get("prompt_tokens")
             output_tokens = raw_usage.get("completion_tokens")
@@ -1394,84 +1998,134 @@ class FactDariApp:
                 "output_tokens": output_tokens,
                 "total_tokens": total_tokens,
             })
-            # Parse JSON array from response
-            import json as json_module
-            try:
-                # Clean up the response - sometimes LLMs add extra text
-                text = message.strip()
-                # Find the JSON array in the response
-                start_idx = text.find('[')
-                end_idx = text.rfind(']')
-                if start_idx != -1 and end_idx != -1:
-                    text = text[start_idx:end_idx + 1]
-                questions = json_module.loads(text)
-                if isinstance(questions, list) and len(questions) >= 1:
-                    # Ensure all items are strings
-                    questions = [str(q).strip() for q in questions if q][:3]
-                    return questions, usage_info
-            except Exception:
-                pass
-            usage_info["status"] = "FAILED"
-            return [], usage_info
-        except requests.exceptions.Timeout:
-            _record_latency()
-            usage_info["status"] = "FAILED"
-            return [], usage_info
-        except requests.exceptions.ConnectionError:
-            _record_latency()
-            usage_info["status"] = "FAILED"
-            return [], usage_info
+            if not choices:
+                usage_info["status"] = "FAILED"
+                return None
+            return choices[0].get("message", {}).get("content", "")
         except Exception:
+            # Timeouts, connection errors and malformed replies alike
             _record_latency()
             usage_info["status"] = "FAILED"
-            return [], usage_info
+            return None
 
-    def _generate_questions_for_fact(self, fact_id: int, fact_content: str, count: int = 3):
-        """Generate questions for a fact via LLM and cache them in Questions table.
+    def _new_question_usage_info(self):
+        return {
+            "operation_type": "QUESTION_GENERATION",
+            "model": getattr(self, 'ai_model', "deepseek-ai/DeepSeek-V4-Pro"),
+            "provider": getattr(self, 'ai_provider', "together"),
+            "status": "SUCCESS",
+        }
 
-        Note: Always stores ALL questions returned by LLM to avoid wasting tokens.
-        The count parameter is kept for API compatibility but all questions are stored.
-        LLM costs are logged to AIUsageLogs with OperationType='QUESTION_GENERATION'.
-        """
-        api_key = config.get_together_api_key()
-        if not api_key:
+    @staticmethod
+    def _clean_questions(value):
+        """Up to 3 non-empty question strings from a parsed reply entry, or [] if it is not a list."""
+        if not isinstance(value, list):
             return []
+        return [str(q).strip() for q in value if q and str(q).strip()][:3]
 
-        questions, usage_info = self._call_together_ai_for_questions(fact_content, api_key)
-        if not questions:
-            return []
+    def _call_together_ai_for_questions(self, fact_text: str, api_key: str):
+        """Call Together AI to generate 3 questions for a fact; returns (list_of_questions, usage_info)."""
+        usage_info = self._new_question_usage_info()
+        message = self._post_question_prompt(
+            QUESTION_SYSTEM_PROMPT, f"Fact: {fact_text}", api_key, self.ai_question_max_tokens, usage_info
+        )
+        if message is None:
+            return [], usage_info
+        try:
+            # Clean up the response - sometimes LLMs add extra text
+            text = message.strip()
+            # Find the JSON array in the response
+            start_idx = text.find('[')
+            end_idx = text.rfind(']')
+            if start_idx != -1 and end_idx != -1:
+                text = text[start_idx:end_idx + 1]
+            questions = self._clean_questions(json.loads(text))
+            if questions:
+                return questions, usage_info
+        except Exception:
+            pass
+        usage_info["status"] = "FAILED"
+        return [], usage_info
 
-        # Extract usage info
-        input_tokens = usage_info.get("input_tokens") or 0
-        output_tokens = usage_info.get("output_tokens") or 0
-        total_tokens = usage_info.get("total_tokens") or 0
-        cost = self._estimate_ai_cost(input_tokens, output_tokens)
-        latency_ms = usage_info.get("latency_ms")
-        model = usage_info.get("model", "")
-        provider = usage_info.get("provider", "")
-        status = usage_info.get("status", "SUCCESS")
+    def _call_together_ai_for_question_batch(self, facts, api_key: str):
+        """Generate questions for several facts in one call.
 
-        # Log to AIUsageLogs (also updates profile aggregates)
+        ``facts`` is a list of (fact_id, fact_text). Returns ({fact_id: questions}, usage_info);
+        facts whose entry is missing or malformed are left out of the mapping.
+        """
+        usage_info = self._new_question_usage_info()
+        listing = "\n".join(f"[{fact_id}] {text}" for fact_id, text in facts)
+        message = self._post_question_prompt(
+            QUESTION_BATCH_SYSTEM_PROMPT, f"Facts:\n{listing}", api_key,
+            self.ai_question_max_tokens * len(facts), usage_info
+        )
+        if message is None:
+            return {}, usage_info
+        results = {}
         try:
+            text = message.strip()
+            start_idx = text.find('{')
+            end_idx = text.rfind('}')
+            if start_idx != -1 and end_idx != -1:
+                text = text[start_idx:end_idx + 1]
+            parsed = json.loads(text)
+        except Exception:
+            parsed = None
+        if isinstance(parsed, dict):
+            wanted = {str(fact_id): fact_id for fact_id, _ in facts}
+            for key, value in parsed.items():
+                fact_id = wanted.get(str(key).strip().strip('[]'))
+                questions = self._clean_questions(value)
+                if fact_id is not None and questions:
+                    results[fact_id] = questions
+        if not results:
+            usage_info["status"] = "FAILED"
+        return results, usage_info
+
+    @staticmethod
+    def _split_tokens(total, weights):
+        """Split an integer token count in proportion to ``weights`` (largest remainder; sums to total)."""
+        if total is None:
+            return [None] * len(weights)
+        total = int(total)
+        weight_sum = float(sum(weights))
+        if weight_sum <= 0:
+            weights = [1] * len(weights)
+            weight_sum = float(len(weights))
+        exact = [total * w / weight_sum for w in weights]
+        shares = [int(x) for x in exact]
+        leftover = total - sum(shares)
+        for i in sorted(range(len(exact)), key=lambda i: exact[i] - shares[i], reverse=True)[:leftover]:
+            shares[i] += 1
+        return shares
+
+    def _log_question_generation(self, fact_id, usage_info, input_tokens, output_tokens, status):
+        """Log one fact's share of a question-generation call to AIUsageLogs."""
+        try:
+            total_tokens = None
+            if input_tokens is not None or output_tokens is not None:
+                total_tokens = int(input_tokens or 0) + int(output_tokens or 0)
             self._log_ai_usage(
                 fact_id=fact_id,
                 session_id=getattr(self, 'current_session_id', None),
                 operation_type='QUESTION_GENERATION',
                 status=status,
-                model_name=model,
-                provider=provider,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                total_tokens=total_tokens,
-                cost=cost,
-                latency_ms=latency_ms,
+                model_name=usage_info.get("model", ""),
+                provider=usage_info.get("provider", ""),
+                input_tokens=input_tokens or 0,
+                output_tokens=output_tokens or 0,
+                total_tokens=total_tokens or 0,
+                cost=self._estimate_ai_cost(input_tokens or 0, output_tokens or 0),
+                latency_ms=usage_info.get("latency_ms"),
                 reading_duration_sec=0
             )
         except Exception:
             pass
 
-        # Store ALL questions in cache (simplified - no cost columns)
+    def _store_questions(self, fact_id, questions, status="SUCCESS"):
+        """Insert generated questions into the Questions cache; returns the new QuestionIDs."""
         inserted_ids = []
+        stored = []
         for q_text in questions:
             try:
                 q_id = self.execute_insert_return_id(
@@ -1484,35 +2138,119 @@ class FactDariApp:
                 )
                 if q_id:
                     inserted_ids.append(q_id)
+                    stored.append((q_id, q_text, 0))
             except Exception:
                 pass
-
+        cache = getattr(self, 'question_cache', None)
+        if cache is not None and status == "SUCCESS" and stored:
+            cache.add(fact_id, stored)
         return inserted_ids
 
+    def _generate_questions_for_fact(self, fact_id: int, fact_content: str, count: int = 3):
+        """Generate questions for a fact via LLM and cache them in Questions table.
+
+        Note: Always stores ALL questions returned by LLM to avoid wasting tokens.
+        The count parameter is kept for API compatibility but all questions are stored.
+        LLM costs are logged to AIUsageLogs with OperationType='QUESTION_GENERATION'.
+        """
+        api_key = config.get_together_api_key()
+        if not api_key:
+            return []
+
+        questions, usage_info = self._call_together_ai_for_questions(fact_content, api_key)
+        if not questions:
+            return []
+
+        # Log to AIUsageLogs (also updates profile aggregates)
+        self._log_question_generation(
+            fact_id, usage_info,
+            usage_info.get("input_tokens") or 0,
+            usage_info.get("output_tokens") or 0,
+            usage_info.get("status", "SUCCESS"),
+        )
+        # Store ALL questions in cache (simplified - no cost columns)
+        return self._store_questions(fact_id, questions, usage_info.get("status", "SUCCESS"))
+
+    def _generate_questions_for_facts(self, facts):
+        """Generate questions for several facts, ``question_batch_size`` facts per AI call.
+
+        ``facts`` is a list of (fact_id, fact_content). The shared prompt is sent
+        once per batch; each fact's AIUsageLogs row gets a share of the batch's
+        tokens (input by fact length, output by question length). Facts the
+        batch reply did not cover are retried one by one. Returns
+        {fact_id: [QuestionID, ...]} for the facts that got questions.
+        """
+        api_key = config.get_together_api_key()
+        if not api_key or not facts:
+            return {}
+        batch_size = max(1, int(config.AI_REQUEST_CONFIG.get('question_batch_size', 1)))
+        results = {}
+        for start in range(0, len(facts), batch_size):
+            batch = facts[start:start + batch_size]
+            if len(batch) == 1:
+                fact_id, content = batch[0]
+                inserted = self._generate_questions_for_fact(fact_id, content, count=3)
+                if inserted:
+                    results[fact_id] = inserted
+                continue
+
+            generated, usage_info = self._call_together_ai_for_question_batch(batch, api_key)
+            input_shares = self._split_tokens(
+                usage_info.get("input_tokens"), [len(content or "") for _, content in batch]
+            )
+            output_shares = self._split_tokens(
+                usage_info.get("output_tokens"), [len("".join(generated.get(fact_id, []))) for fact_id, _ in batch]
+            )
+            for (fact_id, content), input_tokens, output_tokens in zip(batch, input_shares, output_shares):
+                questions = generated.get(fact_id)
+                if input_tokens or output_tokens:
+                    self._log_question_generation(
+                        fact_id, usage_info, input_tokens, output_tokens, "SUCCESS" if questions else "FAILED"
+                    )
+                if questions:
+                    inserted = self._store_questions(fact_id, questions)
+                else:
+                    # Missing or malformed entry: fall back to a single-fact call
+                    inserted = self._generate_questions_for_fact(fact_id, content, count=3)
+                if inserted:
+                    results[fact_id] = inserted
+        return results
+
     def _get_or_generate_question(self, fact_id: int, fact_content: str):
         """
         Get a cached question or trigger generation.
         Returns (question_text, question_id) or (None, None) if unavailable.
         """
         fallback_question = "What does this fact say?"
-        try:
-            # Check how many questions exist for this fact
-            rows = self.fetch_query(
-                """
-                SELECT QuestionID, QuestionText, TimesShown
-                FROM Questions
-                WHERE FactID = ? AND Status = 'SUCCESS'
-                ORDER BY TimesShown ASC, NEWID()
-                """,
-                (fact_id,)
-            )
-        except Exception:
-            rows = []
-
-        if len(rows) > 0:
+        self._leave_question_view(keep_fact_id=fact_id)
+        cache = getattr(self, 'question_cache', None)
+        if cache is not None and fact_id in cache:
+            # Loaded with the deck (or earlier): no database read
+            picked = cache.pick(fact_id)
+        else:
+            try:
+                # Check how many questions exist for this fact
+                rows = self.fetch_query(
+                    """
+                    SELECT QuestionID, QuestionText, TimesShown
+                    FROM Questions
+                    WHERE FactID = ? AND Status = 'SUCCESS'
+                    ORDER BY TimesShown ASC, NEWID()
+                    """,
+                    (fact_id,)
+                )
+            except Exception:
+                rows = []
+            picked = (rows[0][0], rows[0][1]) if rows else None
+            # An empty result may be a failed query; only cache what was found
+            if cache is not None and rows:
+                cache.put(fact_id, rows)
+                picked = cache.pick(fact_id)
+
+        if picked is not None:
             # Questions exist, pick the least-shown one
             # (No partial regeneration - wait for countdown to hit 0 for full refresh)
-            q_id, q_text, _ = rows[0]
+            q_id, q_text = picked
             if q_text:
                 return q_text, q_id
 
@@ -1521,44 +2259,315 @@ class FactDariApp:
         if not api_key:
             return fallback_question, None
 
-        if self.question_request_inflight:
-            if self.question_generation_fact_id == fact_id:
-                return None, None
-            return fallback_question, None
+        if self._question_pregen_busy(fact_id):
+            return None, None  # the pre-generator refreshes this card when it finishes
 
-        now = time.time()
-        last_attempt = self.question_generation_last_attempt.get(fact_id)
-        if last_attempt and (now - last_attempt) < self.question_generation_cooldown_seconds:
-            return fallback_question, None
+        watching = getattr(self, '_question_view', None)
+        if watching is not None and watching[0] == fact_id and not watching[1].done():
+            return None, None  # already waiting for this card's questions
 
-        self.question_request_inflight = True
-        self.question_generation_fact_id = fact_id
-        self.question_generation_last_attempt[fact_id] = now
+        if not self._question_generation_busy(fact_id):
+            # Joining generation already in flight is free; only new calls are throttled
+            now = time.time()
+            last_attempt = self.question_generation_last_attempt.get(fact_id)
+            if last_attempt and (now - last_attempt) < self.question_generation_cooldown_seconds:
+                return fallback_question, None
+            self.question_generation_last_attempt[fact_id] = now
 
-        def gen_worker():
-            try:
-                self._generate_questions_for_fact(fact_id, fact_content, count=3)
-            finally:
-                self.question_request_inflight = False
-                self.question_generation_fact_id = None
+        def on_generated(_):
+            if getattr(self, '_question_view', None) is view:
+                self._question_view = None
             # Re-enable UI and refresh display after generation (on main thread)
-            self.root.after(0, self._enable_ui_after_generation)
-            def _refresh_if_still_current():
-                if self.is_home_page:
-                    return
-                if self.current_fact_id != fact_id:
-                    return
-                self.display_current_fact()
-            self.root.after(0, _refresh_if_still_current)
-
-        threading.Thread(target=gen_worker, daemon=True).start()
+            self._enable_ui_after_generation()
+            if self.is_home_page:
+                return
+            if self.current_fact_id != fact_id:
+                return
+            self.display_current_fact()
 
+        job, listener = self._generate_questions_once(fact_id, fact_content, ai_engine.PRIORITY_VIEW, on_generated)
+        view = self._question_view = (fact_id, job, listener)
         return None, None
 
+    def _ai_flights(self):
+        """Single-flight registry that coalesces identical AI jobs."""
+        flights = getattr(self, 'ai_flights', None)
+        if flights is None:
+            engine = getattr(self, 'ai_engine', None)
+            flights = self.ai_flights = ai_engine.SingleFlight(promote=engine.promote if engine is not None else None)
+        return flights
+
+    def _question_generation_busy(self, fact_id):
+        """True while questions for the fact are being generated by any path."""
+        in_flight = self._ai_flights().find(lambda key: key[0] == fact_id and key[1] == "QUESTION_GENERATION")
+        return bool(in_flight) or self._question_pregen_busy(fact_id)
+
+    def _generate_questions_once(self, fact_id, fact_content, priority, on_finished=None):
+        """Generate questions for a fact, joining a generation already running for the same content.
+
+        Keyed by (FactID, operation, content hash), so concurrent callers share
+        one AI call and one set of stored questions. ``on_finished(result)``
+        runs on the Tk thread on success or failure. Returns (job, listener).
+        """
+        key = (fact_id, "QUESTION_GENERATION", explanation_cache.content_hash(fact_content))
+        job, listener, created = self._ai_flights().join(
+            key,
+            lambda: ai_engine.AIJob(
+                "QUESTION_GENERATION",
+                lambda job: self._generate_questions_for_fact(fact_id, fact_content, count=3),
+                priority,
+            ),
+            priority=priority, on_done=on_finished, on_error=on_finished,
+        )
+        if created:
+            self._schedule_ai_job(job)
+        return job, listener
+
+    def _leave_question_view(self, keep_fact_id=None):
+        """Stop waiting for questions of a card the user has left (unstarted calls nobody else wants are dropped)."""
+        watching = getattr(self, '_question_view', None)
+        if watching is None or watching[0] == keep_fact_id:
+            return
+        self._question_view = None
+        self._ai_flights().leave(watching[1], watching[2], cancel_running=False)
+
+    def _schedule_prefetch(self):
+        """Warm the next cards in the background while the current one is read."""
+        prefetcher = getattr(self, 'prefetcher', None)
+        if prefetcher is None or not hasattr(self.all_facts, 'upcoming_ids'):
+            return
+        prefetcher.schedule(self.all_facts.upcoming_ids(self.current_fact_index, prefetcher.lookahead))
+
+    def _cancel_prefetch(self):
+        """Drop look-ahead work after the deck order or category changes."""
+        prefetcher = getattr(self, 'prefetcher', None)
+        if prefetcher is not None:
+            prefetcher.cancel()
+        # Generation for cards that are no longer next; calls already sent still finish and are stored
+        waits, self.prefetch_question_jobs = getattr(self, 'prefetch_question_jobs', []), []
+        for job, listener in waits:
+            self._ai_flights().leave(job, listener, cancel_running=False)
+
+    def _fetch_questions_for_facts(self, fact_ids):
+        """Cached SUCCESS questions for several facts: {FactID: [(QuestionID, QuestionText, TimesShown), ...]}"""
+        if not fact_ids:
+            return {}
+        placeholders = ",".join("?" for _ in fact_ids)
+        rows = self.fetch_query(
+            f"""
+            SELECT FactID, QuestionID, QuestionText, TimesShown
+            FROM Questions
+            WHERE Status = 'SUCCESS' AND FactID IN ({placeholders})
+            ORDER BY FactID, TimesShown ASC, NEWID()
+            """,
+            tuple(fact_ids)
+        )
+        grouped = {}
+        for row in rows or []:
+            grouped.setdefault(row[0], []).append((row[1], row[2], row[3]))
+        return grouped
+
+    def _warm_upcoming_facts(self, fact_ids, cancelled):
+        """Prefetch worker: load fact bodies, cached questions and, if needed, generate questions."""
+        deck = self.all_facts
+        if hasattr(deck, 'prefetch'):
+            deck.prefetch(fact_ids)
+        if cancelled():
+            return
+        cache = getattr(self, 'question_cache', None)
+        if cache is not None:
+            missing = cache.missing(fact_ids)
+            questions = self._fetch_questions_for_facts(missing)
+            if cancelled():
+                return
+            if questions:
+                cache.put_many(questions, missing)
+        if config.AUDIO_CACHE_CONFIG.get('prerender_upcoming', True):
+            self._prerender_speech(fact_ids)
+        if cache is None:
+            return
+
+        if not config.PREFETCH_CONFIG.get('generate_questions', True) or not config.get_together_api_key():
+            return
+        for fact_id in fact_ids:
+            if cancelled():
+                return
+            if cache.get(fact_id) or self._question_generation_busy(fact_id):
+                continue
+            now = time.time()
+            last_attempt = self.question_generation_last_attempt.get(fact_id)
+            if last_attempt and (now - last_attempt) < self.question_generation_cooldown_seconds:
+                continue
+            content = self.content_cache.get(fact_id)
+            if content is None:
+                content = self._load_fact_contents([fact_id]).get(fact_id)
+            if not content:
+                continue
+            self.question_generation_last_attempt[fact_id] = now
+            # Stored questions go straight into the cache; the user may have
+            # reached this card while it was generating
+            wait = self._generate_questions_once(
+                fact_id, content, ai_engine.PRIORITY_BACKGROUND,
+                lambda _, fid=fact_id: self._refresh_if_awaiting_question(fid),
+            )
+            self.prefetch_question_jobs = [w for w in getattr(self, 'prefetch_question_jobs', []) if not w[0].done()] + [wait]
+
+    def _refresh_if_awaiting_question(self, fact_id):
+        """Redraw the current card if it was left on "Generating question..." for this fact."""
+        if getattr(self, '_awaiting_question_fact_id', None) != fact_id:
+            return
+        self._awaiting_question_fact_id = None
+        if self.is_home_page or self.current_fact_id != fact_id:
+            return
+        self._enable_ui_after_generation()
+        self.display_current_fact()
+
+    def _start_question_pregen(self):
+        """Start background question generation if enabled and an API key is set."""
+        if not config.QUESTION_PREGEN_CONFIG.get('enabled', True) or not config.get_together_api_key():
+            return
+        self.question_pregen = question_pregen.QuestionPregenerator.from_config(
+            self._find_question_pregen_candidates,
+            self._pregenerate_questions,
+            spent_today=self._question_generation_spent_today,
+            is_busy=self._question_pregen_should_pause,
+            generate_batch=self._pregenerate_question_batch,
+            on_done=lambda fid, ok: self.root.after(0, lambda: self._refresh_if_awaiting_question(fid)),
+        ).start()
+        try:
+            atexit.register(self.question_pregen.close)
+        except Exception:
+            pass
+
+    def _question_pregen_busy(self, fact_id):
+        pregen = getattr(self, 'question_pregen', None)
+        return pregen is not None and pregen.in_progress(fact_id)
+
+    def _wake_question_pregen(self):
+        """New facts have no questions yet; let the pre-generator pick them up now."""
+        pregen = getattr(self, 'question_pregen', None)
+        if pregen is not None:
+            pregen.wake()
+
+    def _question_pregen_should_pause(self):
+        return config.QUESTION_PREGEN_CONFIG.get('pause_while_reviewing', False) and not self.is_home_page
+
+    def _find_question_pregen_candidates(self, limit):
+        """Facts with no cached questions, then facts about to refresh: [(FactID, Content, refresh)]."""
+        threshold = int(config.QUESTION_PREGEN_CONFIG.get('refresh_threshold', 3))
+        rows = self.fetch_query(
+            """
+            SELECT TOP (?) f.FactID, f.Content,
+                   CASE WHEN q.FactID IS NULL THEN 0 ELSE 1 END AS HasQuestions
+            FROM Facts f
+            LEFT JOIN (SELECT DISTINCT FactID FROM Questions WHERE Status = 'SUCCESS') q ON q.FactID = f.FactID
+            WHERE f.CreatedBy = ? AND (q.FactID IS NULL OR f.QuestionsRefreshCountdown <= ?)
+            ORDER BY HasQuestions, f.QuestionsRefreshCountdown, f.FactID
+            """,
+            (int(limit), self.get_active_profile_id(), threshold)
+        ) or []
+        now = time.time()
+        candidates = []
+        for fact_id, content, has_questions in rows:
+            if not content or self._question_generation_busy(fact_id):
+                continue
+            last_attempt = self.question_generation_last_attempt.get(fact_id)
+            if last_attempt and (now - last_attempt) < self.question_generation_cooldown_seconds:
+                continue
+            candidates.append((fact_id, content, bool(has_questions)))
+        return candidates
+
+    def _question_generation_spent_today(self):
+        """(tokens, cost) of today's QUESTION_GENERATION calls, for the pre-generation budget."""
+        rows = self.fetch_query(
+            """
+            SELECT COALESCE(SUM(COALESCE(InputTokens, 0) + COALESCE(OutputTokens, 0)), 0),
+                   COALESCE(SUM(Cost), 0)
+            FROM AIUsageLogs
+            WHERE OperationType = 'QUESTION_GENERATION'
+              AND CreatedAt >= CAST(CAST(dbo.LondonNow() AS DATE) AS DATETIME)
+            """
+        )
+        if not rows:
+            raise RuntimeError("AIUsageLogs query failed")
+        return int(rows[0][0] or 0), float(rows[0][1] or 0)
+
+    def _pregenerate_questions(self, fact_id, content, refresh=False):
+        """Pre-generation worker: generate questions; for ``refresh`` replace the old set early."""
+        self.question_generation_last_attempt[fact_id] = time.time()
+        # Shares the call (and its stored questions) if the card is already generating them
+        job, _ = self._generate_questions_once(fact_id, content, ai_engine.PRIORITY_BACKGROUND)
+        try:
+            inserted_ids = job.result()
+        except CancelledError:
+            return False
+        if not inserted_ids:
+            return False
+        self._finish_pregenerated_questions(fact_id, inserted_ids, refresh)
+        return True
+
+    def _pregenerate_question_batch(self, items):
+        """Pre-generation worker for several facts in one AI call; returns the ids that got questions."""
+        # The pre-generator already marks these facts as its own; only skip facts a card or prefetch is generating
+        items = [
+            item for item in items
+            if not self._ai_flights().find(lambda key, fid=item[0]: key[0] == fid and key[1] == "QUESTION_GENERATION")
+        ]
+        if not items:
+            return set()
+        now = time.time()
+        for fact_id, _, _ in items:
+            self.question_generation_last_attempt[fact_id] = now
+        generated = self._run_ai_job(
+            "QUESTION_GENERATION",
+            lambda job: self._generate_questions_for_facts([(fact_id, content) for fact_id, content, _ in items])
+        )
+        for fact_id, _, refresh in items:
+            if generated.get(fact_id):
+                self._finish_pregenerated_questions(fact_id, generated[fact_id], refresh)
+        return set(generated)
+
+    def _finish_pregenerated_questions(self, fact_id, inserted_ids, refresh):
+        if refresh:
+            # Same outcome as the countdown reaching 0, minus the wait on the next view;
+            # purge and reset commit together, like _decrement_question_countdown
+            placeholders = ",".join("?" for _ in inserted_ids)
+            replaced = self.execute_update(
+                f"""
+                SET NOCOUNT ON;
+                SET XACT_ABORT ON;
+                BEGIN TRY
+                    BEGIN TRANSACTION;
+
+                    DECLARE @FactID INT = ?;
+                    DECLARE @ResetTo INT = ?;
+
+                    DELETE FROM Questions WHERE FactID = @FactID AND QuestionID NOT IN ({placeholders});
+                    UPDATE Facts SET QuestionsRefreshCountdown = @ResetTo WHERE FactID = @FactID;
+
+                    COMMIT TRANSACTION;
+                END TRY
+                BEGIN CATCH
+                    IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION;
+                    THROW;
+                END CATCH
+                """,
+                (fact_id, QUESTIONS_REFRESH_COUNTDOWN, *inserted_ids)
+            )
+            cache = getattr(self, 'question_cache', None)
+            if replaced and cache is not None:
+                cache.keep_only(fact_id, inserted_ids)
+
     def _update_question_shown(self, question_id: int):
-        """Update TimesShown and LastShownAt for a question."""
+        """Update TimesShown and LastShownAt for a question (batched when the question cache is on)."""
+        cache = getattr(self, 'question_cache', None)
+        if cache is not None:
+            pending = cache.mark_shown(question_id)
+            if pending >= config.QUESTION_CACHE_CONFIG.get('flush_every', 10):
+                self._flush_question_shows()
+            return
         try:
-            self.execute_update(
+            self.queue_write(
                 """
                 UPDATE Questions
                 SET TimesShown = TimesShown + 1, LastShownAt = dbo.LondonNow()
@@ -1569,17 +2578,37 @@ class FactDariApp:
         except Exception:
             pass
 
+    def _flush_question_shows(self):
+        """Queue the TimesShown/LastShownAt changes counted in the question cache."""
+        cache = getattr(self, 'question_cache', None)
+        if cache is None:
+            return
+        for question_id, shows, seconds_ago in cache.drain():
+            try:
+                # Same statement for every question, so the writer sends them as one batch
+                self.queue_write(
+                    """
+                    UPDATE Questions
+                    SET TimesShown = TimesShown + ?, LastShownAt = DATEADD(SECOND, -?, dbo.LondonNow())
+                    WHERE QuestionID = ?
+                    """,
+                    (shows, seconds_ago, question_id)
+                )
+            except Exception:
+                pass
+
     def _log_question_view(self, question_id: int) -> int:
-        """Insert into QuestionLogs when a question is shown. Returns QuestionLogID."""
+        """Insert into QuestionLogs when a question is shown. Returns QuestionLogID (possibly pending)."""
         try:
-            log_id = self.execute_insert_return_id(
+            log_id = self.queue_write(
                 """
                 INSERT INTO QuestionLogs
                     (QuestionID, SessionID, ProfileID, QuestionShownAt, CreatedAt)
                 OUTPUT INSERTED.QuestionLogID
                 VALUES (?, ?, ?, dbo.LondonNow(), dbo.LondonNow())
                 """,
-                (question_id, self.current_session_id, self.get_active_profile_id())
+                (question_id, self.current_session_id, self.get_active_profile_id()),
+                returns_id=True
             )
             return log_id
         except Exception:
@@ -1592,13 +2621,14 @@ class FactDariApp:
         try:
             elapsed = (datetime.now() - self.question_shown_at).total_seconds()
             elapsed_int = int(max(0, elapsed))
-            self.execute_update(
+            self.queue_write(
                 """
                 UPDATE QuestionLogs
                 SET QuestionViewEndedAt = dbo.LondonNow(), QuestionReadingDurationSec = ?
                 WHERE QuestionLogID = ?
                 """,
-                (elapsed_int, self.current_question_log_id)
+                (elapsed_int, self.current_question_log_id),
+                key=('QuestionLogs.QuestionViewEndedAt', self.current_question_log_id)
             )
         except Exception:
             pass
@@ -1606,32 +2636,70 @@ class FactDariApp:
             self.current_question_log_id = None
             self.question_shown_at = None
 
-    def _decrement_question_countdown(self, fact_id: int):
-        """Decrement QuestionsRefreshCountdown. If it hits 0, delete old questions and reset."""
-        try:
-            # Decrement
-            self.execute_update(
-                """
+    def _decrement_question_countdown(self, fact_id: int, fact_content=None):
+        """Count one full review toward the question refresh; returns True if the questions were purged.
+
+        Decrementing, detecting the end of the countdown, purging the old
+        questions and resetting the countdown happen in one transaction and
+        one round trip. After a purge, new questions are generated in the
+        background (when ``regenerate_on_refresh`` is on) so the next view
+        of the fact does not wait on the AI.
+        """
+        row = self.execute_returning_row(
+            """
+            SET NOCOUNT ON;
+            SET XACT_ABORT ON;
+            BEGIN TRY
+                BEGIN TRANSACTION;
+
+                DECLARE @FactID INT = ?;
+                DECLARE @ResetTo INT = ?;
+                DECLARE @Before TABLE (Countdown INT);
+
                 UPDATE Facts
-                SET QuestionsRefreshCountdown = QuestionsRefreshCountdown - 1
-                WHERE FactID = ? AND QuestionsRefreshCountdown > 0
-                """,
-                (fact_id,)
-            )
-            # Check if it hit 0
-            rows = self.fetch_query(
-                "SELECT QuestionsRefreshCountdown FROM Facts WHERE FactID = ?",
-                (fact_id,)
-            )
-            if rows and rows[0][0] <= 0:
-                # Delete old questions and reset countdown
-                self.execute_update("DELETE FROM Questions WHERE FactID = ?", (fact_id,))
-                self.execute_update(
-                    "UPDATE Facts SET QuestionsRefreshCountdown = 50 WHERE FactID = ?",
-                    (fact_id,)
-                )
-        except Exception:
-            pass
+                SET QuestionsRefreshCountdown = CASE WHEN QuestionsRefreshCountdown <= 1 THEN @ResetTo
+                                                     ELSE QuestionsRefreshCountdown - 1 END
+                OUTPUT DELETED.QuestionsRefreshCountdown INTO @Before
+                WHERE FactID = @FactID;
+
+                DECLARE @Refreshed BIT = CASE WHEN EXISTS (SELECT 1 FROM @Before WHERE Countdown <= 1) THEN 1 ELSE 0 END;
+                IF @Refreshed = 1
+                    DELETE FROM Questions WHERE FactID = @FactID;
+
+                COMMIT TRANSACTION;
+
+                SELECT @Refreshed AS Refreshed;
+            END TRY
+            BEGIN CATCH
+                IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION;
+                THROW;
+            END CATCH
+            """,
+            (fact_id, QUESTIONS_REFRESH_COUNTDOWN)
+        )
+        refreshed = bool(row and row[0])
+        if refreshed:
+            cache = getattr(self, 'question_cache', None)
+            if cache is not None:
+                # Known to have no questions until the regenerated ones are stored
+                cache.put(fact_id, [])
+            if config.QUESTION_PREGEN_CONFIG.get('regenerate_on_refresh', True) and fact_content:
+                self._regenerate_questions_in_background(fact_id, fact_content)
+        return refreshed
+
+    def _regenerate_questions_in_background(self, fact_id, fact_content):
+        """Replace purged questions without blocking the UI (via the pre-generator when it runs)."""
+        pregen = getattr(self, 'question_pregen', None)
+        if pregen is not None:
+            pregen.request(fact_id, fact_content)
+            return
+        if not config.get_together_api_key():
+            return
+        self.question_generation_last_attempt[fact_id] = time.time()
+        self._generate_questions_once(
+            fact_id, fact_content, ai_engine.PRIORITY_BACKGROUND,
+            lambda _: self._refresh_if_awaiting_question(fact_id),
+        )
 
     def _disable_fact_action_buttons(self):
         """Disable action buttons while question is displayed (before answer is revealed).
@@ -1671,16 +2739,216 @@ class FactDariApp:
             return False
         return True
 
-    def _block_popup_when_questioning(self, message):
-        """Block popups while a question is shown; keep speaker enabled."""
-        if not self.is_home_page and not self.answer_revealed:
+    def _block_popup_when_questioning(self, message):
+        """Block popups while a question is shown; keep speaker enabled."""
+        if not self.is_home_page and not self.answer_revealed:
+            try:
+                self.status_label.config(text=message, fg=self.STATUS_COLOR)
+                self.clear_status_after_delay()
+            except Exception:
+                pass
+            return True
+        return False
+
+    # --- Full-text search ---
+    def _load_search_index(self):
+        """Worker: load the saved search index, rebuilding it if the Facts table changed."""
+        try:
+            with self.get_db_pool().connection() as conn:
+                self.search_index = search_index.load_or_build(conn, config.SEARCH_CONFIG['index_path'])
+            self._search_index_dirty = False
+        except Exception:
+            pass
+
+    def _save_search_index(self):
+        """Persist the search index with the current Facts fingerprint."""
+        index = getattr(self, 'search_index', None)
+        if index is None or not getattr(self, '_search_index_dirty', False):
+            return
+        try:
+            with self.get_db_pool().connection() as conn:
+                with conn.cursor() as cursor:
+                    fingerprint = search_index.fetch_fingerprint(cursor)
+            index.save(config.SEARCH_CONFIG['index_path'], fingerprint)
+            self._search_index_dirty = False
+        except Exception:
+            pass
+
+    def _update_search_index(self, method, *args):
+        """Apply an add/remove to the search index and schedule a save to disk."""
+        index = getattr(self, 'search_index', None)
+        if index is None:
+            return
+        getattr(index, method)(*args)
+        self._search_index_dirty = True
+        if getattr(self, '_search_save_pending', False):
+            return
+        self._search_save_pending = True
+
+        def _save_in_background():
+            self._search_save_pending = False
+            threading.Thread(target=self._save_search_index, daemon=True).start()
+        try:
+            self.root.after(config.SEARCH_CONFIG['save_delay_ms'], _save_in_background)
+        except Exception:
+            self._search_save_pending = False
+
+    # --- Near-duplicate detection ---
+    def _load_near_duplicate_index(self):
+        """Worker: build the near-duplicate index over the active profile's facts."""
+        try:
+            profile_id = self.get_active_profile_id()
+            with self.get_db_pool().connection() as conn:
+                with conn.cursor() as cursor:
+                    self.near_duplicate_index = near_duplicates.build_from_cursor(cursor, profile_id=profile_id)
+        except Exception:
+            pass
+
+    def _update_near_duplicate_index(self, method, *args):
+        """Apply an add/remove to the near-duplicate index if it is loaded."""
+        index = getattr(self, 'near_duplicate_index', None)
+        if index is not None:
+            getattr(index, method)(*args)
+
+    def find_near_duplicates(self, content, exclude=None):
+        """Existing facts similar to ``content``: [(FactID, similarity, Content), ...] best first."""
+        index = getattr(self, 'near_duplicate_index', None)
+        if index is None:
+            return []
+        matches = index.query(content, exclude=exclude, limit=3)
+        if not matches:
+            return []
+        ids = [fact_id for fact_id, _ in matches]
+        placeholders = ",".join("?" for _ in ids)
+        rows = self.fetch_query(
+            f"SELECT FactID, Content FROM Facts WHERE CreatedBy = ? AND FactID IN ({placeholders})",
+            (self.get_active_profile_id(), *ids)
+        )
+        contents = {row[0]: row[1] for row in rows or []}
+        return [(fact_id, sim, contents[fact_id]) for fact_id, sim in matches if fact_id in contents]
+
+    def search_facts(self, query, limit=None):
+        """Ranked search over fact text; returns [(FactID, Content, CategoryName), ...]."""
+        index = getattr(self, 'search_index', None)
+        if index is None or not query or not query.strip():
+            return []
+        ranked = index.search(query, limit or config.SEARCH_CONFIG['max_results'])
+        if not ranked:
+            return []
+        ids = [fact_id for fact_id, _ in ranked]
+        placeholders = ",".join("?" for _ in ids)
+        rows = self.fetch_query(
+            f"""
+            SELECT f.FactID, f.Content, c.CategoryName
+            FROM Facts f
+            LEFT JOIN Categories c ON c.CategoryID = f.CategoryID
+            WHERE f.CreatedBy = ? AND f.FactID IN ({placeholders})
+            """,
+            (self.get_active_profile_id(), *ids)
+        )
+        by_id = {row[0]: (row[0], row[1], row[2]) for row in rows or []}
+        return [by_id[fact_id] for fact_id in ids if fact_id in by_id]
+
+    def show_search_window(self):
+        """Open a popup to search fact text and jump to a result."""
+        if self._block_popup_when_questioning("Reveal the answer before searching"):
+            return
+        try:
+            self.pause_review_timer()
+        except Exception:
+            pass
+        win = tk.Toplevel(self.root)
+        win.title("Search Facts")
+        try:
+            win.geometry(f"{self.POPUP_INFO_SIZE}{self.POPUP_POSITION}")
+        except Exception:
+            win.geometry(self.POPUP_INFO_SIZE)
+        win.configure(bg=self.BG_COLOR)
+
+        def on_close():
             try:
-                self.status_label.config(text=message, fg=self.STATUS_COLOR)
-                self.clear_status_after_delay()
+                self.resume_review_timer()
             except Exception:
                 pass
-            return True
-        return False
+            win.destroy()
+
+        win.protocol("WM_DELETE_WINDOW", on_close)
+
+        tk.Label(win, text="Search Facts", fg=self.TEXT_COLOR, bg=self.BG_COLOR, font=self.TITLE_FONT).pack(pady=10)
+        query_entry = tk.Entry(win, font=self.NORMAL_FONT)
+        query_entry.pack(fill="x", padx=20)
+        info_label = tk.Label(win, text="", fg=self.STATUS_COLOR, bg=self.BG_COLOR, font=self.SMALL_FONT)
+        info_label.pack(pady=(4, 0))
+        results_list = tk.Listbox(win, bg=self.BG_COLOR, fg=self.TEXT_COLOR, font=self.NORMAL_FONT,
+                                  selectbackground=self.BLUE_COLOR, highlightthickness=0, borderwidth=0)
+        results_list.pack(fill="both", expand=True, padx=20, pady=10)
+        results = []
+        pending = {'after_id': None}
+
+        def run_search():
+            pending['after_id'] = None
+            query = query_entry.get()
+            if getattr(self, 'search_index', None) is None:
+                info_label.config(text="Search index is still loading...")
+                return
+            started = time.perf_counter()
+            results[:] = self.search_facts(query)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            results_list.delete(0, tk.END)
+            for _, content, category_name in results:
+                snippet = " ".join(str(content or "").split())
+                if len(snippet) > 90:
+                    snippet = snippet[:87] + "..."
+                results_list.insert(tk.END, f"[{category_name or '-'}] {snippet}")
+            info_label.config(text=f"{len(results)} result(s) in {elapsed_ms:.0f} ms" if query.strip() else "")
+
+        def schedule_search(_event=None):
+            if pending['after_id'] is not None:
+                win.after_cancel(pending['after_id'])
+            pending['after_id'] = win.after(150, run_search)
+
+        def open_selected(_event=None):
+            selection = results_list.curselection()
+            if not selection and results:
+                selection = (0,)
+            if not selection:
+                return
+            fact_id = results[selection[0]][0]
+            on_close()
+            self._open_search_result(fact_id)
+
+        query_entry.bind("<KeyRelease>", schedule_search)
+        query_entry.bind("<Return>", open_selected)
+        results_list.bind("<Double-Button-1>", open_selected)
+        results_list.bind("<Return>", open_selected)
+        win.bind("<Escape>", lambda e: on_close())
+        query_entry.focus_set()
+
+        tk.Button(win, text="Close", command=on_close, bg=self.BLUE_COLOR, fg=self.TEXT_COLOR, cursor="hand2", borderwidth=0, highlightthickness=0, padx=10, pady=5).pack(pady=10)
+
+    def _open_search_result(self, fact_id):
+        """Jump to a fact picked from search results."""
+        if self.is_home_page:
+            self.start_reviewing()
+        idx = self.all_facts.index_of(fact_id) if hasattr(self.all_facts, 'index_of') else -1
+        if idx < 0:
+            # Not in the current filter: switch to all categories
+            self.category_var.set("All Categories")
+            self.load_all_facts()
+            idx = self.all_facts.index_of(fact_id)
+        if idx < 0:
+            self.status_label.config(text="Fact not found", fg=self.RED_COLOR)
+            self.clear_status_after_delay()
+            return
+        try:
+            self.finalize_current_fact_view(timed_out=False)
+        except Exception:
+            pass
+        self._finalize_question_view()
+        self.current_fact_index = idx
+        self.answer_revealed = False
+        self.current_question_id = None
+        self.display_current_fact()
 
     def _disable_ui_during_generation(self):
         """Disable Home, navigation, and other buttons while questions are being generated."""
@@ -1752,7 +3020,7 @@ class FactDariApp:
 
             # Decrement question countdown (full review cycle complete)
             try:
-                self._decrement_question_countdown(fact_id)
+                self._decrement_question_countdown(fact_id, content)
             except Exception:
                 pass
 
@@ -1785,6 +3053,9 @@ class FactDariApp:
         # Disable action buttons until answer is revealed
         self._disable_fact_action_buttons()
 
+        # Remember a card left waiting on generation so the prefetcher can refresh it
+        self._awaiting_question_fact_id = fact_id if question_text is None else None
+
         if question_text is None:
             # Questions are being generated - disable ALL navigation
             self._disable_ui_during_generation()
@@ -1839,8 +3110,18 @@ class FactDariApp:
         """
         text_widget.config(state="normal")
         text_widget.delete("1.0", "end")
+        self._configure_markdown_tags(text_widget)
+
+        lines = markdown_text.strip().split('\n')
+
+        for i, line in enumerate(lines):
+            # Add newline between lines (headers already end with a paragraph break)
+            if not self._insert_markdown_line(text_widget, line) and i < len(lines) - 1:
+                text_widget.insert("end", "\n")
 
-        # Configure text tags for formatting
+        text_widget.config(state="disabled")
+
+    def _configure_markdown_tags(self, text_widget):
         font_family = self.NORMAL_FONT[0] if isinstance(self.NORMAL_FONT, tuple) else "Segoe UI"
         font_size = self.NORMAL_FONT[1] if isinstance(self.NORMAL_FONT, tuple) and len(self.NORMAL_FONT) > 1 else 10
 
@@ -1848,44 +3129,65 @@ class FactDariApp:
         text_widget.tag_configure("italic", font=(font_family, font_size, "italic"))
         text_widget.tag_configure("header", font=(font_family, font_size + 2, "bold"))
 
-        lines = markdown_text.strip().split('\n')
+    def _insert_markdown_line(self, text_widget, line):
+        """Insert one markdown line at the end; returns True if it was a header."""
+        # Handle headers (### Header)
+        header_match = re.match(r'^#{1,6}\s+(.+)$', line)
+        if header_match:
+            header_text = header_match.group(1).strip()
+            text_widget.insert("end", header_text, "header")
+            text_widget.insert("end", "\n\n")
+            return True
 
-        for i, line in enumerate(lines):
-            # Handle headers (### Header)
-            header_match = re.match(r'^#{1,6}\s+(.+)$', line)
-            if header_match:
-                header_text = header_match.group(1).strip()
-                text_widget.insert("end", header_text, "header")
-                text_widget.insert("end", "\n\n")
-                continue
+        # Process inline formatting (**bold** and *italic*)
+        # Pattern for **bold** or *italic* (bold first to avoid conflicts)
+        pattern = re.compile(r'(\*\*(.+?)\*\*|\*(.+?)\*)')
+        last_end = 0
 
-            # Process inline formatting (**bold** and *italic*)
-            pos = 0
-            # Pattern for **bold** or *italic* (bold first to avoid conflicts)
-            pattern = re.compile(r'(\*\*(.+?)\*\*|\*(.+?)\*)')
-            last_end = 0
+        for match in pattern.finditer(line):
+            # Insert text before the match
+            if match.start() > last_end:
+                text_widget.insert("end", line[last_end:match.start()])
 
-            for match in pattern.finditer(line):
-                # Insert text before the match
-                if match.start() > last_end:
-                    text_widget.insert("end", line[last_end:match.start()])
+            # Check if bold (**) or italic (*)
+            if match.group(2):  # Bold match
+                text_widget.insert("end", match.group(2), "bold")
+            elif match.group(3):  # Italic match
+                text_widget.insert("end", match.group(3), "italic")
 
-                # Check if bold (**) or italic (*)
-                if match.group(2):  # Bold match
-                    text_widget.insert("end", match.group(2), "bold")
-                elif match.group(3):  # Italic match
-                    text_widget.insert("end", match.group(3), "italic")
+            last_end = match.end()
 
-                last_end = match.end()
+        # Insert remaining text after last match
+        if last_end < len(line):
+            text_widget.insert("end", line[last_end:])
+        return False
 
-            # Insert remaining text after last match
-            if last_end < len(line):
-                text_widget.insert("end", line[last_end:])
+    def _render_markdown_stream(self, text_widget, state, markdown_text):
+        """Incrementally render streamed markdown.
 
-            # Add newline (double for paragraph breaks on empty lines)
-            if i < len(lines) - 1:
+        Completed lines are rendered once and kept; only the trailing, still
+        growing line is redrawn on each call. ``state`` is a dict owned by the
+        caller (start with ``{}``).
+        """
+        text = markdown_text.lstrip()
+        lines = text.split('\n')
+        text_widget.config(state="normal")
+        if not state:
+            text_widget.delete("1.0", "end")
+            self._configure_markdown_tags(text_widget)
+            state['done'] = 0
+            state['header'] = False
+        if state.get('tail_index'):
+            text_widget.delete(state['tail_index'], "end")
+        for line in lines[state['done']:-1]:
+            if state['done'] and not state['header']:
                 text_widget.insert("end", "\n")
-
+            state['header'] = self._insert_markdown_line(text_widget, line)
+            state['done'] += 1
+        state['tail_index'] = text_widget.index("end-1c")
+        if state['done'] and not state['header']:
+            text_widget.insert("end", "\n")
+        self._insert_markdown_line(text_widget, lines[-1])
         text_widget.config(state="disabled")
 
     def _record_ai_usage(self, usage_info: dict, fact_id: int, session_id=None, reading_duration_sec: int = 0):
@@ -1936,6 +3238,16 @@ class FactDariApp:
             latency_ms = int(latency_ms) if latency_ms is not None else None
         except Exception:
             latency_ms = None
+        ttft_ms = usage_info.get("ttft_ms")
+        try:
+            ttft_ms = int(ttft_ms) if ttft_ms is not None else None
+        except Exception:
+            ttft_ms = None
+        cost_saved = usage_info.get("cost_saved")
+        try:
+            cost_saved = float(cost_saved) if cost_saved is not None else None
+        except Exception:
+            cost_saved = None
 
         try:
             reading_duration_sec = int(reading_duration_sec) if reading_duration_sec is not None else 0
@@ -1965,9 +3277,31 @@ class FactDariApp:
             cost=cost,
             latency_ms=latency_ms,
             reading_duration_sec=reading_duration_sec,
+            ttft_ms=ttft_ms,
+            cost_saved=cost_saved,
         )
 
-    def _log_ai_usage(self, fact_id, session_id, operation_type, status, model_name, provider, input_tokens, output_tokens, total_tokens, cost, latency_ms, reading_duration_sec=0):
+    def _timed_out_column_exists(self, table):
+        """Cached check for the TimedOut column on FactLogs/ReviewSessions (added by a migration)."""
+        known = getattr(self, '_timed_out_columns', None)
+        if known is None:
+            known = {}
+            self._timed_out_columns = known
+        if table not in known:
+            known[table] = self.column_exists(table, 'TimedOut')
+        return known[table]
+
+    def _ai_usage_column_exists(self, column):
+        """Cached check for AIUsageLogs columns added after the original schema."""
+        known = getattr(self, '_ai_usage_columns', None)
+        if known is None:
+            known = {}
+            self._ai_usage_columns = known
+        if column not in known:
+            known[column] = self.column_exists('AIUsageLogs', column)
+        return known[column]
+
+    def _log_ai_usage(self, fact_id, session_id, operation_type, status, model_name, provider, input_tokens, output_tokens, total_tokens, cost, latency_ms, reading_duration_sec=0, ttft_ms=None, cost_saved=None):
         """Insert into AIUsageLogs and roll totals into GamificationProfile. Returns AIUsageID or None."""
         try:
             cost_val = None if cost is None else round(float(cost), 9)
@@ -1995,29 +3329,38 @@ class FactDariApp:
 
         profile_id = self.get_active_profile_id()
         ai_usage_id = None
+        params = (
+            fact_id,
+            session_id,
+            profile_id,
+            operation_type,
+            status,
+            model_name,
+            provider,
+            it,
+            ot,
+            cost_val,
+            getattr(self, 'ai_currency', 'USD'),
+            latency_ms,
+            reading_duration_sec,
+        )
+        # Newer optional columns are only written when present (older databases lack them)
+        optional = []
+        if ttft_ms is not None:
+            optional.append(('TimeToFirstTokenMs', int(ttft_ms)))
+        if cost_saved is not None:
+            optional.append(('CostSaved', round(float(cost_saved), 9)))
+        optional = [(col, val) for col, val in optional if self._ai_usage_column_exists(col)]
+        extra_cols = "".join(f", {col}" for col, _ in optional)
+        extra_marks = ", ?" * len(optional)
         try:
             ai_usage_id = self.execute_insert_return_id(
-                """
-                INSERT INTO AIUsageLogs (FactID, SessionID, ProfileID, OperationType, Status, ModelName, Provider, InputTokens, OutputTokens, Cost, CurrencyCode, LatencyMs, ReadingDurationSec, FactContentSnapshot)
+                f"""
+                INSERT INTO AIUsageLogs (FactID, SessionID, ProfileID, OperationType, Status, ModelName, Provider, InputTokens, OutputTokens, Cost, CurrencyCode, LatencyMs, ReadingDurationSec{extra_cols}, FactContentSnapshot)
                 OUTPUT INSERTED.AIUsageID
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT TOP 1 Content FROM Facts WHERE FactID = ?))
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?{extra_marks}, (SELECT TOP 1 Content FROM Facts WHERE FactID = ?))
                 """,
-                (
-                    fact_id,
-                    session_id,
-                    profile_id,
-                    operation_type,
-                    status,
-                    model_name,
-                    provider,
-                    it,
-                    ot,
-                    cost_val,
-                    getattr(self, 'ai_currency', 'USD'),
-                    latency_ms,
-                    reading_duration_sec,
-                    fact_id,
-                ),
+                params + tuple(val for _, val in optional) + (fact_id,),
             )
         except Exception as exc:
             print(f"Database error in _log_ai_usage: {exc}")
@@ -2031,31 +3374,13 @@ class FactDariApp:
         return ai_usage_id
 
     def stop_speaking(self):
-        """Stop any ongoing speech immediately."""
+        """Stop any ongoing speech immediately (does not wait for the engine)."""
+        self.speech_utterance_id = None
+        service = getattr(self, 'speech', None)
+        if service is not None:
+            service.stop()
         try:
-            # Signal the active engine (if any) to stop
-            if getattr(self, 'active_tts_engine', None) is not None:
-                try:
-                    self.active_tts_engine.stop()
-                except Exception:
-                    pass
-                finally:
-                    # Do not reuse this engine
-                    self.active_tts_engine = None
-            # If a worker thread exists, let it wind down
-            if self.speaking_thread and self.speaking_thread.is_alive():
-                # Allow thread to wind down
-                try:
-                    self.speaking_thread.join(timeout=1.0)
-                except Exception:
-                    pass
-            # Ensure UI button is enabled even if thread ended unexpectedly
-            try:
-                self.speaker_button.config(state="normal")
-            except Exception:
-                pass
-            # Clear reference
-            self.speaking_thread = None
+            self.speaker_button.config(state="normal")
         except Exception:
             pass
     
@@ -2101,49 +3426,98 @@ class FactDariApp:
                 os.killpg(os.getpgid(self.flask_process.pid), signal.SIGTERM)
     
     def load_all_facts(self):
-        """Load all facts for the current category"""
+        """Build the fact deck for the current category from the in-memory filter index"""
+        self._cancel_prefetch()
         category = self.category_var.get()
+        entries = self._get_fact_index().for_filter(category)
+        # Bodies are fetched on demand and the deck is shuffled client-side
+        self.all_facts = self._new_fact_deck(entries)
+        self.all_facts.shuffle()
+        self.current_fact_index = 0
+        self._preload_deck_questions()
+
+    def _preload_deck_questions(self):
+        """Load the deck's questions into the question cache on a background thread."""
+        cache = getattr(self, 'question_cache', None)
+        if cache is None or not config.QUESTION_CACHE_CONFIG.get('preload', True):
+            return
+        # Deck order, so the first cards are covered first
+        fact_ids = cache.missing(entry[0] for entry in self.all_facts.entries())
+        if not fact_ids:
+            return
+        chunk = max(1, int(config.QUESTION_CACHE_CONFIG.get('preload_chunk', 500)))
+
+        def worker():
+            for start in range(0, len(fact_ids), chunk):
+                ids = cache.missing(fact_ids[start:start + chunk])
+                grouped = self._fetch_questions_for_facts(ids)
+                # No rows at all may be a failed query; those facts are read on demand instead
+                if grouped:
+                    cache.put_many(grouped, ids)
+
+        threading.Thread(target=worker, name='factdari-question-preload', daemon=True).start()
+
+    def _get_fact_index(self):
+        """Return the per-profile FactIndex, loading it with one query on first use"""
+        index = getattr(self, 'fact_index', None)
+        if index is not None:
+            return index
         profile_id = self.get_active_profile_id()
-        base_select = """
+        rows = self.fetch_query(
+            """
             SELECT f.FactID,
-                   f.Content,
+                   f.CategoryID,
+                   c.CategoryName,
                    COALESCE(pf.IsFavorite, 0) AS IsFavorite,
                    COALESCE(pf.IsEasy, 0) AS IsEasy
             FROM Facts f
+            LEFT JOIN Categories c ON c.CategoryID = f.CategoryID AND c.CreatedBy = ?
             LEFT JOIN ProfileFacts pf ON pf.FactID = f.FactID AND pf.ProfileID = ?
             WHERE f.CreatedBy = ?
-        """
-
-        facts = []
-        if category == "All Categories":
-            query = base_select + " ORDER BY NEWID()"
-            facts = self.fetch_query(query, (profile_id, profile_id))
-        elif category == "Favorites":
-            query = base_select + " AND COALESCE(pf.IsFavorite,0) = 1 ORDER BY NEWID()"
-            facts = self.fetch_query(query, (profile_id, profile_id))
-        elif category == "Known":
-            query = base_select + " AND COALESCE(pf.IsEasy,0) = 1 ORDER BY NEWID()"
-            facts = self.fetch_query(query, (profile_id, profile_id))
-        elif category == "Not Known":
-            query = base_select + " AND COALESCE(pf.IsEasy,0) = 0 ORDER BY NEWID()"
-            facts = self.fetch_query(query, (profile_id, profile_id))
-        elif category == "Not Favorite":
-            query = base_select + " AND COALESCE(pf.IsFavorite,0) = 0 ORDER BY NEWID()"
-            facts = self.fetch_query(query, (profile_id, profile_id))
-        else:
-            query = base_select + """
-                AND EXISTS (
-                    SELECT 1 FROM Categories c
-                    WHERE c.CategoryID = f.CategoryID
-                      AND c.CategoryName = ?
-                      AND c.CreatedBy = ?
-                )
-                ORDER BY NEWID()
-            """
-            facts = self.fetch_query(query, (profile_id, profile_id, category, profile_id))
+            """,
+            (profile_id, profile_id, profile_id)
+        )
+        index = fact_deck.FactIndex(rows)
+        # An empty result may be a failed query; load again next time
+        if rows:
+            self.fact_index = index
+        return index
+
+    def _update_fact_index(self, method, *args):
+        """Apply a change (e.g. 'set_favorite') to the filter index if it is loaded"""
+        index = getattr(self, 'fact_index', None)
+        if index is not None:
+            getattr(index, method)(*args)
+
+    def _new_fact_deck(self, entries=None):
+        """Build a FactDeck that shares the app's content cache"""
+        cache = getattr(self, 'content_cache', None)
+        if cache is None:
+            cache = self.content_cache = fact_deck.ContentCache(config.FACT_DECK_CONFIG['content_cache_size'])
+        return fact_deck.FactDeck(
+            entries,
+            loader=self._load_fact_contents,
+            cache=cache,
+            prefetch_size=config.FACT_DECK_CONFIG['prefetch_size'],
+        )
 
-        self.all_facts = facts if facts else []
-        self.current_fact_index = 0
+    def _load_fact_contents(self, fact_ids):
+        """Fetch fact bodies for the given ids; returns {FactID: Content}"""
+        contents = {}
+        profile_id = self.get_active_profile_id()
+        ids = list(fact_ids)
+        # Stay well below SQL Server's 2100-parameter limit
+        chunk = 1000
+        for start in range(0, len(ids), chunk):
+            part = ids[start:start + chunk]
+            placeholders = ",".join("?" for _ in part)
+            rows = self.fetch_query(
+                f"SELECT FactID, Content FROM Facts WHERE CreatedBy = ? AND FactID IN ({placeholders})",
+                (profile_id, *part),
+            )
+            for row in rows or []:
+                contents[row[0]] = row[1]
+        return contents
     
     def show_next_fact(self):
         """Show the next fact in the list"""
@@ -2173,11 +3547,10 @@ class FactDariApp:
         if self.all_facts and len(self.all_facts) > 1:
             if self.current_fact_index >= len(self.all_facts) - 1:
                 # Completed a pass; reshuffle for a fresh random order
-                last_id = self.all_facts[self.current_fact_index][0]
-                random.shuffle(self.all_facts)
+                last_id = self.all_facts.fact_id_at(self.current_fact_index)
                 # Avoid showing the same fact twice in a row after shuffle
-                if self.all_facts and self.all_facts[0][0] == last_id and len(self.all_facts) > 1:
-                    self.all_facts.append(self.all_facts.pop(0))
+                self.all_facts.shuffle(avoid_first_id=last_id)
+                self._cancel_prefetch()
                 self.current_fact_index = 0
             else:
                 self.current_fact_index += 1
@@ -2246,6 +3619,8 @@ class FactDariApp:
         content = fact[1]
         self.current_fact_is_favorite = fact[2] if len(fact) > 2 else False
         self.current_fact_is_easy = fact[3] if len(fact) > 3 else False
+        # Warm the next cards while this one is being read
+        self._schedule_prefetch()
         
         # Update star icon based on favorite status
         if self.current_fact_is_favorite:
@@ -2288,7 +3663,9 @@ class FactDariApp:
         now = datetime.now()
         self.record_activity()
 
-        # 1) Finalize previous view's duration if any
+        # 1) Work out the previous view's duration if any
+        prev_log_id = None
+        prev_elapsed = None
         try:
             if self.current_fact_log_id and self.current_fact_start_time:
                 end_point = now
@@ -2298,106 +3675,136 @@ class FactDariApp:
                         end_point = self.pause_started_at
                 except Exception:
                     pass
-                elapsed = int((end_point - self.current_fact_start_time).total_seconds())
-                if elapsed < 0:
-                    elapsed = 0
-                self.execute_update(
-                    """
-                    UPDATE FactLogs
-                    SET FactReadingTime = ?
-                    WHERE FactLogID = ?
-                    """,
-                    (elapsed, self.current_fact_log_id)
-                )
-                # Award XP for the just-finished view
-                try:
-                    self._award_for_elapsed(elapsed, timed_out=False)
-                except Exception:
-                    pass
+                prev_elapsed = int((end_point - self.current_fact_start_time).total_seconds())
+                if prev_elapsed < 0:
+                    prev_elapsed = 0
+                prev_log_id = self.current_fact_log_id
         except Exception as _:
             pass
 
-        # 2) Update the fact's view count and last viewed date
-        self.execute_update("""
-            UPDATE Facts
-            SET TotalViews = TotalViews + 1
-            WHERE FactID = ? AND CreatedBy = ?
-        """, (fact_id, self.get_active_profile_id()))
-        # Per-profile view count and last viewed
-        try:
-            pid = self.get_active_profile_id()
-            self.execute_update(
-                """
-                MERGE ProfileFacts AS target
-                USING (SELECT ? AS ProfileID, ? AS FactID) AS src
-                ON target.ProfileID = src.ProfileID AND target.FactID = src.FactID
-                WHEN MATCHED THEN
-                    UPDATE SET PersonalReviewCount = ISNULL(target.PersonalReviewCount,0) + 1,
-                               LastViewedByUser = dbo.LondonNow()
-                WHEN NOT MATCHED THEN
-                    INSERT (ProfileID, FactID, PersonalReviewCount, IsFavorite, IsEasy, LastViewedByUser)
-                    VALUES (src.ProfileID, src.FactID, 1, 0, 0, dbo.LondonNow());
-                """,
-                (pid, fact_id)
-            )
-        except Exception:
-            pass
-
-        # 3) Start a new view log and remember its ID + start time
-        try:
-            # Ensure we have a session
-            if not self.current_session_id:
+        # Ensure we have a session before logging the view
+        if not self.current_session_id:
+            try:
                 self.start_new_session()
+            except Exception:
+                pass
 
-            new_id = self.execute_insert_return_id(
-                """
-                INSERT INTO FactLogs (FactID, ReviewDate, SessionID)
-                OUTPUT INSERTED.FactLogID
-                VALUES (?, dbo.LondonNow(), ?)
-                """,
-                (fact_id, self.current_session_id)
-            )
-            self.current_fact_log_id = new_id
-            self.current_fact_start_time = now
-        except Exception as _:
-            # If we couldn't insert with SessionID for some reason, fall back to basic insert
-            self.execute_update(
-                """
-                INSERT INTO FactLogs (FactID, ReviewDate)
-                VALUES (?, dbo.LondonNow())
-                """,
-                (fact_id,)
-            )
-            self.current_fact_log_id = None
-            self.current_fact_start_time = now
-        # Ensure streak/analytics can still see a session even if the insert fell back
-        if self.current_session_id is None:
+        # 2) Close the previous view, bump view counts and open the new log in one round trip
+        #    (queued on the write-behind worker; the new id may still be pending)
+        new_log_id = self._record_fact_view(fact_id, prev_log_id, prev_elapsed,
+                                            on_done=self._on_fact_view_recorded)
+        self.current_fact_log_id = new_log_id
+        self.current_fact_start_time = now
+        if new_log_id is None:
+            # The batch rolled back as a whole; nothing was half-recorded
+            return
+        stats = getattr(self, 'stats', None)
+        if stats is not None:
+            stats.record_view(fact_id, now.date())
+
+        # Award XP for the just-finished view
+        if prev_log_id is not None:
             try:
-                self.start_new_session()
+                self._award_for_elapsed(prev_elapsed, timed_out=False)
             except Exception:
                 pass
 
-        # Force a streak check-in now that a log exists for today
+    def _on_fact_view_recorded(self, row):
+        """Streak check-in once the view batch has been written.
+
+        Runs on the telemetry worker thread when write-behind is enabled, so the
+        check-in never blocks navigation; UI updates are marshalled to Tk.
+        """
+        if not row:
+            return
+        # 3) Streak check-in, only when the profile has not checked in today
+        checkin_due = bool(row[1]) if len(row) > 1 else True
+        streak = row[2] if len(row) > 2 else 0
         try:
-            if getattr(self, 'gamify', None):
-                # Calculate new streak based on the log we just inserted
+            if checkin_due and getattr(self, 'gamify', None):
+                # First view of the London day: advance the stored streak
                 result = self.gamify.daily_checkin()
-
-                # Optional: Update UI feedback immediately
                 prof = result.get('profile', {}) if isinstance(result, dict) else {}
                 streak = prof.get('CurrentStreak', 0)
-                if streak and int(streak) > 0:
+                # Check-in may have awarded XP
+                self._run_on_ui(self.update_level_progress)
+            if streak and int(streak) > 0 and not hasattr(self, '_streak_shown_today'):
+                self._streak_shown_today = True
+
+                def show():
                     # Update the status label briefly to show streak is active
-                    if not hasattr(self, '_streak_shown_today'):
-                        self.status_label.config(
-                            text=f"Streak active: {streak} day(s)!",
-                            fg=self.GREEN_COLOR
-                        )
-                        self.clear_status_after_delay()
-                        self._streak_shown_today = True
+                    self.status_label.config(
+                        text=f"Streak active: {streak} day(s)!",
+                        fg=self.GREEN_COLOR
+                    )
+                    self.clear_status_after_delay()
+                self._run_on_ui(show)
         except Exception as e:
             print(f"Error updating streak: {e}")
 
+    def _record_fact_view(self, fact_id, prev_log_id=None, prev_elapsed=None, on_done=None):
+        """Record a fact view as a single transactional batch.
+
+        Finalizes the previous view's reading time, increments Facts.TotalViews,
+        upserts ProfileFacts and inserts the new FactLogs row. The batch yields
+        (FactLogID, CheckinDue, CurrentStreak), which is passed to ``on_done``;
+        returns the new FactLogID (or a PendingId), or None if the batch failed.
+        """
+        return self.queue_write(
+            """
+            SET NOCOUNT ON;
+            SET XACT_ABORT ON;
+            BEGIN TRY
+                BEGIN TRANSACTION;
+
+                DECLARE @FactID INT = ?;
+                DECLARE @ProfileID INT = ?;
+                DECLARE @SessionID INT = ?;
+                DECLARE @PrevLogID INT = ?;
+                DECLARE @PrevElapsed INT = ?;
+                DECLARE @Now DATETIME = dbo.LondonNow();
+                DECLARE @NewLog TABLE (FactLogID INT);
+
+                IF @PrevLogID IS NOT NULL
+                    UPDATE FactLogs SET FactReadingTime = @PrevElapsed WHERE FactLogID = @PrevLogID;
+
+                UPDATE Facts
+                SET TotalViews = TotalViews + 1
+                WHERE FactID = @FactID AND CreatedBy = @ProfileID;
+
+                MERGE ProfileFacts AS target
+                USING (SELECT @ProfileID AS ProfileID, @FactID AS FactID) AS src
+                ON target.ProfileID = src.ProfileID AND target.FactID = src.FactID
+                WHEN MATCHED THEN
+                    UPDATE SET PersonalReviewCount = ISNULL(target.PersonalReviewCount,0) + 1,
+                               LastViewedByUser = @Now
+                WHEN NOT MATCHED THEN
+                    INSERT (ProfileID, FactID, PersonalReviewCount, IsFavorite, IsEasy, LastViewedByUser)
+                    VALUES (src.ProfileID, src.FactID, 1, 0, 0, @Now);
+
+                INSERT INTO FactLogs (FactID, ReviewDate, SessionID)
+                OUTPUT INSERTED.FactLogID INTO @NewLog
+                VALUES (@FactID, @Now, @SessionID);
+
+                COMMIT TRANSACTION;
+
+                SELECT nl.FactLogID,
+                       CASE WHEN gp.LastCheckinDate IS NULL OR gp.LastCheckinDate < CAST(@Now AS DATE)
+                            THEN 1 ELSE 0 END AS CheckinDue,
+                       ISNULL(gp.CurrentStreak, 0) AS CurrentStreak
+                FROM @NewLog nl
+                LEFT JOIN GamificationProfile gp ON gp.ProfileID = @ProfileID;
+            END TRY
+            BEGIN CATCH
+                IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION;
+                THROW;
+            END CATCH
+            """,
+            (fact_id, self.get_active_profile_id(), self.current_session_id, prev_log_id, prev_elapsed),
+            returns_id=True,
+            on_done=on_done
+        )
+
     def pause_review_timer(self):
         """Pause the current review timer (exclude time until resumed)."""
         try:
@@ -2456,25 +3863,22 @@ class FactDariApp:
                 elapsed = int((end_ts - self.current_fact_start_time).total_seconds())
                 if elapsed < 0:
                     elapsed = 0
-                # Try to update with TimedOut flag if column exists
-                updated = self.execute_update(
-                    """
+                # Only set TimedOut if the migration has added the column
+                if self._timed_out_column_exists('FactLogs'):
+                    query = """
                     UPDATE FactLogs
                     SET FactReadingTime = ?, TimedOut = ?
                     WHERE FactLogID = ?
-                    """,
-                    (elapsed, 1 if timed_out else 0, self.current_fact_log_id)
-                )
-                if not updated:
-                    # Fallback without TimedOut if migration hasn't applied
-                    self.execute_update(
-                        """
-                        UPDATE FactLogs
-                        SET FactReadingTime = ?
-                        WHERE FactLogID = ?
-                        """,
-                        (elapsed, self.current_fact_log_id)
-                    )
+                    """
+                    params = (elapsed, 1 if timed_out else 0, self.current_fact_log_id)
+                else:
+                    query = """
+                    UPDATE FactLogs
+                    SET FactReadingTime = ?
+                    WHERE FactLogID = ?
+                    """
+                    params = (elapsed, self.current_fact_log_id)
+                self.queue_write(query, params, key=('FactLogs.FactReadingTime', self.current_fact_log_id))
                 # Award XP (skip if timed out)
                 try:
                     self._award_for_elapsed(elapsed, timed_out=timed_out)
@@ -2506,10 +3910,10 @@ class FactDariApp:
             (profile_id,)
         )
         self.current_session_id = session_id
-        # Daily streak check-in and possible achievements
+        # Streak status (reset if a day was missed) and possible achievements; views advance it
         try:
             if getattr(self, 'gamify', None):
-                result = self.gamify.daily_checkin()
+                result = self.gamify.daily_checkin(active=False)
                 unlocked = result.get('unlocked', []) if isinstance(result, dict) else []
                 prof = result.get('profile', {}) if isinstance(result, dict) else {}
                 if prof and isinstance(prof, dict):
@@ -2572,24 +3976,25 @@ class FactDariApp:
                 if duration_seconds is None:
                     duration_seconds = 0
 
-                updated = self.execute_update(
-                    """
-                    UPDATE ReviewSessions
-                    SET EndTime = DATEADD(second, ?, StartTime),
-                        DurationSeconds = ?,
-                        TimedOut = ?
-                    WHERE SessionID = ?
-                    """,
-                    (
-                        duration_seconds,
-                        duration_seconds,
-                        1 if timed_out else 0,
-                        self.current_session_id
+                # Only set TimedOut if the migration has added the column
+                if self._timed_out_column_exists('ReviewSessions'):
+                    self.queue_write(
+                        """
+                        UPDATE ReviewSessions
+                        SET EndTime = DATEADD(second, ?, StartTime),
+                            DurationSeconds = ?,
+                            TimedOut = ?
+                        WHERE SessionID = ?
+                        """,
+                        (
+                            duration_seconds,
+                            duration_seconds,
+                            1 if timed_out else 0,
+                            self.current_session_id
+                        )
                     )
-                )
-                if not updated:
-                    # Fallback without TimedOut if migration hasn't applied yet
-                    self.execute_update(
+                else:
+                    self.queue_write(
                         """
                         UPDATE ReviewSessions
                         SET EndTime = DATEADD(second, ?, StartTime),
@@ -2602,6 +4007,8 @@ class FactDariApp:
                             self.current_session_id
                         )
                     )
+                # Make sure the whole session has reached the database
+                self.flush_telemetry()
         except Exception as e:
             print(f"Error ending session: {e}")
         finally:
@@ -2635,6 +4042,7 @@ class FactDariApp:
         if success:
             # Update local state
             self.current_fact_is_favorite = new_status
+            self._update_fact_index('set_favorite', self.current_fact_id, new_status)
 
             # Update star icon
             if new_status:
@@ -2720,6 +4128,7 @@ class FactDariApp:
             )
         if success:
             self.current_fact_is_easy = new_status
+            self._update_fact_index('set_known', self.current_fact_id, new_status)
             if new_status:
                 self.easy_button.config(image=self.easy_gold_icon)
                 self.status_label.config(text="Marked as known!", fg=self.GREEN_COLOR)
@@ -2874,6 +4283,23 @@ class FactDariApp:
                 self.clear_status_after_delay()
                 return
 
+            # Reworded copies slip past ContentKey; ask before adding a near-duplicate
+            near = self.find_near_duplicates(content)
+            if near:
+                _, similarity, existing = near[0]
+                snippet = " ".join(str(existing or "").split())
+                if len(snippet) > 160:
+                    snippet = snippet[:157] + "..."
+                if not self.confirm_dialog(
+                    "Possible Duplicate",
+                    f"This looks {similarity:.0%} similar to an existing fact:\n\n{snippet}\n\nAdd it anyway?",
+                    ok_text="Add Anyway",
+                    cancel_text="Cancel"
+                ):
+                    self.status_label.config(text="Fact not added (possible duplicate)", fg=self.STATUS_COLOR)
+                    self.clear_status_after_delay()
+                    return
+
             # Insert the new fact and get its ID
             new_fact_id = self.execute_insert_return_id(
                 """
@@ -2903,17 +4329,21 @@ class FactDariApp:
                     pass
                 self.status_label.config(text="New fact added successfully!", fg=self.GREEN_COLOR)
                 self.clear_status_after_delay()
-                self.update_fact_count()
+                self.stats.adjust_total_facts(1)
+                self._update_fact_index('add', new_fact_id, category_id, category)
+                self._update_search_index('add', new_fact_id, content)
+                self._update_near_duplicate_index('add', new_fact_id, content)
+                self._wake_question_pregen()
                 # Log the add action in current session (if any)
                 try:
                     if self.current_session_id:
-                        self.execute_update(
+                        self.queue_write(
                             """
                             UPDATE ReviewSessions SET FactsAdded = ISNULL(FactsAdded,0) + 1 WHERE SessionID = ?
                             """,
                             (self.current_session_id,)
                         )
-                        self.execute_update(
+                        self.queue_write(
                             """
                             INSERT INTO FactLogs (FactID, ReviewDate, SessionID, FactReadingTime, Action, FactContentSnapshot, CategoryIDSnapshot)
                             VALUES (?, dbo.LondonNow(), ?, 0, 'add', ?, ?)
@@ -2976,6 +4406,97 @@ class FactDariApp:
                                     font=(self.NORMAL_FONT[0], self.NORMAL_FONT[1], 'bold'))
         add_another_btn.pack(side='left', padx=6)
     
+    def show_import_dialog(self):
+        """Pick a CSV/JSON/Markdown file and bulk import its facts in the background"""
+        if self._block_popup_when_questioning("Reveal the answer before importing facts"):
+            return
+        try:
+            self.pause_review_timer()
+        except Exception:
+            pass
+        try:
+            path = filedialog.askopenfilename(
+                parent=self.root,
+                title="Import Facts",
+                filetypes=[("Fact files", "*.csv *.json *.jsonl *.ndjson *.md *.markdown"), ("All files", "*.*")]
+            )
+        finally:
+            try:
+                self.resume_review_timer()
+            except Exception:
+                pass
+        if not path:
+            return
+
+        # Rows without a category go into the selected category (if a real one is selected)
+        selected = self.category_var.get()
+        header_filters = {"All Categories", "Favorites", "Known", "Not Known", "Not Favorite"}
+        default_category = selected if selected and selected not in header_filters else None
+        profile_id = self.get_active_profile_id()
+        session_id = self.current_session_id
+        self.status_label.config(text="Importing facts...", fg=self.STATUS_COLOR)
+
+        def report_progress(result):
+            self._run_on_ui(lambda: self.status_label.config(
+                text=f"Importing... {result['inserted']} added", fg=self.STATUS_COLOR))
+
+        def worker():
+            try:
+                with self.get_db_pool().connection() as conn:
+                    importer = bulk_import.BulkImporter.from_config(
+                        conn, profile_id,
+                        default_category=default_category,
+                        session_id=session_id,
+                        progress=report_progress,
+                    )
+                    result = importer.run(bulk_import.read_facts(path))
+                unlocked = bulk_import.award_import(getattr(self, 'gamify', None), result['inserted'])
+            except Exception as e:
+                message = f"Import failed: {e}"
+                self._run_on_ui(lambda: (self.status_label.config(text=message, fg=self.RED_COLOR),
+                                         self.clear_status_after_delay()))
+                return
+            self._run_on_ui(lambda: self._on_import_finished(result, unlocked))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_import_finished(self, result, unlocked):
+        """Refresh counts, filters and indexes after a bulk import (UI thread)"""
+        message = f"Imported {result['inserted']} facts ({result['duplicates']} duplicates skipped)"
+        errors = result.get('errors', 0)
+        if errors:
+            message += f"; {errors} failed, see the log"
+        self.status_label.config(text=message, fg=self.RED_COLOR if errors else self.GREEN_COLOR)
+        self.clear_status_after_delay()
+        if not result['inserted']:
+            return
+        self.fact_index = None
+        self.update_fact_count()
+        self.update_category_dropdown()
+        threading.Thread(target=self._load_search_index, daemon=True).start()
+        if getattr(self, 'near_duplicate_index', None) is not None:
+            threading.Thread(target=self._load_near_duplicate_index, daemon=True).start()
+        self._wake_question_pregen()
+        if not self.is_home_page:
+            # Rebuild the deck but stay on the current card
+            current_id = self.current_fact_id
+            self.load_all_facts()
+            idx = self.all_facts.index_of(current_id) if current_id is not None else -1
+            if idx >= 0:
+                self.current_fact_index = idx
+            else:
+                self.answer_revealed = False
+                self.current_question_id = None
+                self.display_current_fact()
+        if unlocked:
+            self.status_label.config(text=f"Achievement: {unlocked[-1]['Name']} (+{unlocked[-1]['RewardXP']} XP)", fg=self.GREEN_COLOR)
+            self.clear_status_after_delay()
+            try:
+                self.gamify.mark_unlocked_notified_by_codes([u.get('Code') for u in unlocked if u.get('Code')])
+            except Exception:
+                pass
+        self.update_level_progress()
+
     def edit_current_fact(self):
         """Edit the current fact"""
         if not self._is_action_allowed("edit this fact") or not self.current_fact_id:
@@ -3121,16 +4642,22 @@ class FactDariApp:
                 except Exception:
                     pass
                 edit_window.destroy()
+                self._update_fact_index('move', self.current_fact_id, category_id, category)
+                self._update_search_index('add', self.current_fact_id, content)
+                self._update_near_duplicate_index('add', self.current_fact_id, content)
+                if content.strip() != (current_content or "").strip():
+                    self._invalidate_explanations(self.current_fact_id)
+                    self._invalidate_speech_audio(current_content, content)
                 self.status_label.config(text="Fact updated successfully!", fg=self.GREEN_COLOR)
                 self.clear_status_after_delay()
                 # Log the edit action in current session (if any)
                 try:
                     if self.current_session_id:
-                        self.execute_update(
+                        self.queue_write(
                             "UPDATE ReviewSessions SET FactsEdited = ISNULL(FactsEdited,0) + 1 WHERE SessionID = ?",
                             (self.current_session_id,)
                         )
-                        self.execute_update(
+                        self.queue_write(
                             """
                             INSERT INTO FactLogs (FactID, ReviewDate, SessionID, FactReadingTime, Action, FactEdited, FactContentSnapshot, CategoryIDSnapshot)
                             VALUES (?, dbo.LondonNow(), ?, 0, 'edit', 1, ?, ?)
@@ -3215,6 +4742,9 @@ class FactDariApp:
                     content_snapshot = None
                     category_snapshot = None
 
+                # Queued view logs for this fact must land before the row disappears
+                self.flush_telemetry()
+
                 # Log the delete action in FactLogs (before deleting the Fact)
                 try:
                     if self.current_session_id:
@@ -3226,7 +4756,7 @@ class FactDariApp:
                             (self.current_fact_id, self.current_session_id, content_snapshot, category_snapshot)
                         )
                         # Increment session counter
-                        self.execute_update(
+                        self.queue_write(
                             "UPDATE ReviewSessions SET FactsDeleted = ISNULL(FactsDeleted,0) + 1 WHERE SessionID = ?",
                             (self.current_session_id,)
                         )
@@ -3241,7 +4771,12 @@ class FactDariApp:
                 if success:
                     self.status_label.config(text="Fact deleted!", fg=self.RED_COLOR)
                     self.clear_status_after_delay()
-                    self.update_fact_count()
+                    self.stats.forget_fact(self.current_fact_id)
+                    self._update_fact_index('remove', self.current_fact_id)
+                    self._update_search_index('remove', self.current_fact_id)
+                    self._update_near_duplicate_index('remove', self.current_fact_id)
+                    self._invalidate_explanations(self.current_fact_id)
+                    self._invalidate_speech_audio(content_snapshot)
                     # Gamification: count delete
                     try:
                         if getattr(self, 'gamify', None):
@@ -3519,6 +5054,7 @@ class FactDariApp:
         )
         
         if success:
+            self._update_fact_index('rename_category', cat_id, new_name)
             refresh_callback()
             self.update_category_dropdown()
         else:
@@ -3557,6 +5093,9 @@ class FactDariApp:
             ):
                 return
         
+        # Queued view logs for these facts must land before the rows disappear
+        self.flush_telemetry()
+
         # Delete the category and its facts, logging deletes if a session is active
         success = self.execute_update(
             """
@@ -3592,9 +5131,15 @@ class FactDariApp:
         )
         
         if success:
+            self._update_fact_index('remove_category', cat_id)
+            # Rare bulk change: let the fingerprint check re-sync the search index
+            threading.Thread(target=self._load_search_index, daemon=True).start()
+            if getattr(self, 'near_duplicate_index', None) is not None:
+                threading.Thread(target=self._load_near_duplicate_index, daemon=True).start()
             refresh_callback()
             self.update_category_dropdown()
             self.update_fact_count()
+            self.update_review_stats()
             # Gamification: count deletes for removed facts
             if fact_count and fact_count > 0:
                 try:
@@ -0,0 +1,321 @@
+"""Local stand-in for the Together AI chat-completions endpoint.
+
+    python fake_together.py [--port 8765] [--latency lognormal:400:0.5] [--error-rate 0.02] [--chunk-delay-ms 20]
+
+Serves ``POST /v1/chat/completions`` with Together's reply shape: a JSON body
+with ``choices`` and ``usage``, or server-sent events when the request sets
+``stream``. Explanation prompts get two short paragraphs, question prompts a
+JSON array of 3 questions, and batch question prompts a JSON object keyed by
+the ``[<FactID>]`` ids in the request. Time to first byte, streaming speed,
+error rate and token counts are configurable, so the AI code paths can be
+load-tested offline (see ``benchmark_ai.py``).
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.fake_together')
+
+# Rough characters per token, used to derive usage from request and reply sizes
+CHARS_PER_TOKEN = 4
+
+_BATCH_FACT = re.compile(r"^\[(\d+)\]", re.MULTILINE)
+
+
+class LatencyModel:
+    """Time-to-first-byte distribution, in milliseconds.
+
+    Specs: ``fixed:MS``, ``uniform:LOW:HIGH`` or ``lognormal:MEDIAN:SIGMA``
+    (a long right tail, like a shared inference service under load).
+    """
+
+    KINDS = ('fixed', 'uniform', 'lognormal')
+
+    def __init__(self, kind: str = 'fixed', a: float = 0.0, b: float = 0.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.a = float(a)
+        self.b = float(b)
+
+    @classmethod
+    def parse(cls, spec):
+        """Build a model from a spec string (a bare number means fixed)."""
+        if isinstance(spec, cls):
+            return spec
+        parts = str(spec or '0').strip().split(':')
+        if len(parts) == 1:
+            return cls('fixed', float(parts[0]))
+        kind, values = parts[0].lower(), [float(v) for v in parts[1:]]
+        if kind == 'fixed' and len(values) == 1:
+            return cls(kind, values[0])
+        if kind in ('uniform', 'lognormal') and len(values) == 2:
+            return cls(kind, *values)
+        raise ValueError(f"Bad latency spec: {spec!r}")
+
+    def sample_ms(self, rng) -> float:
+        if self.kind == 'uniform':
+            return max(0.0, rng.uniform(self.a, self.b))
+        if self.kind == 'lognormal':
+            return max(0.0, rng.lognormvariate(math.log(max(self.a, 1e-6)), self.b))
+        return max(0.0, self.a)
+
+    def __repr__(self):
+        args = f"{self.a:g}" if self.kind == 'fixed' else f"{self.a:g}:{self.b:g}"
+        return f"LatencyModel({self.kind}:{args})"
+
+
+def count_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text or '') / CHARS_PER_TOKEN))
+
+
+def build_reply(body: dict) -> str:
+    """Reply text for a chat-completions request, shaped like the real model's output."""
+    messages = body.get('messages') or []
+    system = next((m.get('content') or '' for m in messages if m.get('role') == 'system'), '')
+    user = next((m.get('content') or '' for m in messages if m.get('role') == 'user'), '')
+    if 'JSON object' in system:
+        fact_ids = _BATCH_FACT.findall(user)
+        return json.dumps({fid: _questions(f"fact {fid}") for fid in fact_ids})
+    if 'JSON array' in system:
+        return json.dumps(_questions(user))
+    fact = user.split(':', 1)[-1].strip() or "this fact"
+    return (
+        f"{fact} This holds because of the way the underlying process works, "
+        "step by step, in everyday terms.\n\n"
+        "Think of it like a queue at a coffee shop: each step has to finish before the next one starts."
+    )
+
+
+def _questions(subject: str):
+    subject = subject.strip()[:60] or "the fact"
+    return [
+        f"What does {subject} describe?",
+        f"Why is {subject} true?",
+        f"What follows from {subject}?",
+    ]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this each reply waits on a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON", "type": "invalid_request_error"}})
+            return
+        delay_ms, status = fake._next_outcome(body, self.client_address[1], self.headers.get("Authorization"))
+        time.sleep(delay_ms / 1000.0)
+        if status != 200:
+            self._send_json(status, {"error": {"message": f"simulated {status}", "type": "fake_error"}})
+            return
+        content, usage, pieces = fake._reply(body)
+        if body.get("stream"):
+            self._send_stream(pieces, usage, fake.chunk_delay_ms)
+            return
+        time.sleep(fake.chunk_delay_ms * max(0, len(pieces) - 1) / 1000.0)
+        self._send_json(200, {
+            "id": "fake-completion",
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, pieces, usage, chunk_delay_ms):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, piece in enumerate(pieces):
+            if i and chunk_delay_ms:
+                time.sleep(chunk_delay_ms / 1000.0)
+            self._write_chunk({"choices": [{"index": 0, "delta": {"content": piece}}]})
+        self._write_chunk({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage})
+        self._write_raw(b"data: [DONE]\n\n")
+        self._write_raw(b"")
+
+    def _write_chunk(self, event):
+        self._write_raw(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+
+    def _write_raw(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeTogetherServer:
+    """In-process chat-completions server on a background thread.
+
+    ``latency`` is a LatencyModel or spec string for the delay before the
+    response headers. ``error_rate`` of requests fail with one of
+    ``error_statuses``. Replies are split into ``chunks`` pieces sent
+    ``chunk_delay_ms`` apart when streaming (non-streaming replies wait the
+    same total). Usage is derived from text length unless
+    ``completion_tokens`` is fixed.
+
+    For tests, replies can be scripted instead: ``statuses`` are returned in
+    order (then 200s) before the error rate applies, ``reply_chunks`` is sent
+    as the reply (one piece per streamed chunk) with a fixed ``usage``, and
+    ``responder(body) -> (content, usage)`` builds each reply from the
+    request. Every request body, client port and Authorization header is
+    recorded in ``requests``, ``client_ports`` and ``auth``.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency='fixed:0', error_rate: float = 0.0,
+                 error_statuses=(429, 503), chunks: int = 8, chunk_delay_ms: float = 0.0,
+                 completion_tokens=None, seed=None, statuses=(), reply_chunks=None, usage=None,
+                 responder=None):
+        self.host = host
+        self.port = int(port)
+        self.latency = LatencyModel.parse(latency)
+        self.error_rate = max(0.0, min(1.0, float(error_rate)))
+        self.error_statuses = tuple(error_statuses) or (503,)
+        self.chunks = max(1, int(chunks))
+        self.chunk_delay_ms = max(0.0, float(chunk_delay_ms))
+        self.completion_tokens = completion_tokens
+        self.statuses = list(statuses)
+        self.reply_chunks = reply_chunks
+        self.usage = usage
+        self.responder = responder
+        self.stats = {'requests': 0, 'errors': 0, 'streams': 0}
+        self.requests = []
+        self.client_ports = []
+        self.auth = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1/chat/completions"
+
+    def start(self):
+        if self._server is None:
+            server = ThreadingHTTPServer((self.host, self.port), _Handler)
+            server.daemon_threads = True
+            server.fake = self
+            self.port = server.server_address[1]
+            self._server = server
+            self._thread = threading.Thread(target=server.serve_forever, name='fake-together', daemon=True)
+            self._thread.start()
+            logger.info(f"Fake Together AI endpoint at {self.url} ({self.latency!r}, error rate {self.error_rate:g})")
+        return self
+
+    def stop(self):
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Handler helpers (server threads) ---
+    def _next_outcome(self, body, client_port=None, auth=None):
+        """(delay_ms, status) for one request."""
+        with self._lock:
+            self.stats['requests'] += 1
+            if body.get('stream'):
+                self.stats['streams'] += 1
+            self.requests.append(body)
+            self.client_ports.append(client_port)
+            self.auth.append(auth)
+            delay_ms = self.latency.sample_ms(self._rng)
+            status = 200
+            if self.statuses:
+                status = self.statuses.pop(0)
+                if status != 200:
+                    self.stats['errors'] += 1
+            elif self.error_rate and self._rng.random() < self.error_rate:
+                status = self._rng.choice(self.error_statuses)
+                self.stats['errors'] += 1
+        return delay_ms, status
+
+    def _reply(self, body):
+        """(content, usage, pieces) for a successful request."""
+        if self.responder is not None:
+            content, usage = self.responder(body)
+            return content, usage, self._split(content)
+        if self.reply_chunks is not None:
+            pieces = list(self.reply_chunks)
+            content = "".join(pieces)
+        else:
+            content = build_reply(body)
+            pieces = self._split(content)
+        usage = self.usage
+        if usage is None:
+            prompt_chars = "".join(m.get('content') or '' for m in body.get('messages') or [])
+            usage = self._usage(prompt_chars, content)
+        return content, usage, pieces or [""]
+
+    def _usage(self, prompt_text, content):
+        prompt_tokens = count_tokens(prompt_text)
+        completion = int(self.completion_tokens) if self.completion_tokens is not None else count_tokens(content)
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion,
+                "total_tokens": prompt_tokens + completion}
+
+    def _split(self, content):
+        size = max(1, math.ceil(len(content) / self.chunks))
+        return [content[i:i + size] for i in range(0, len(content), size)] or [""]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Together AI chat-completions API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='lognormal:400:0.5',
+                        help="fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA (time to first byte)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests that fail (0-1)")
+    parser.add_argument('--error-statuses', type=int, nargs='+', default=[429, 503])
+    parser.add_argument('--chunks', type=int, default=8, help="Pieces each reply is streamed in")
+    parser.add_argument('--chunk-delay-ms', type=float, default=20.0)
+    parser.add_argument('--completion-tokens', type=int, default=None, help="Fixed completion tokens per reply")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = FakeTogetherServer(
+        args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+        error_statuses=args.error_statuses, chunks=args.chunks, chunk_delay_ms=args.chunk_delay_ms,
+        completion_tokens=args.completion_tokens, seed=args.seed,
+    ).start()
+    print(f"Serving {server.url} (set FACTDARI_AI_ENDPOINT to use it); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    print(f"Served {server.stats['requests']} request(s), {server.stats['errors']} simulated error(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,4 +1,6 @@
+import argparse
 import pyodbc
+import threading
 from datetime import datetime, date, timedelta
 import config
 
@@ -12,44 +14,128 @@ ALLOWED_COUNTER_FIELDS = frozenset({
 })
 
 
+def advance_streak(current: int, longest: int, last_day, today, active: bool = True):
+    """Streak state machine; returns (current, longest, last_day, advanced).
+
+    The first active day after ``last_day`` extends the run when it is the
+    next day and starts a new run of 1 otherwise. Activity on a day that is
+    already counted changes nothing. Without activity, a run whose last day
+    is before yesterday drops to 0 (``longest`` is kept).
+    """
+    current = int(current or 0)
+    longest = int(longest or 0)
+    yesterday = today - timedelta(days=1)
+    if last_day is not None and last_day >= today:
+        return current, longest, last_day, False
+    if not active:
+        if last_day is None or last_day < yesterday:
+            current = 0
+        return current, longest, last_day, False
+    current = current + 1 if last_day == yesterday else 1
+    return current, max(longest, current), today, True
+
+
+class ProfileContext:
+    """Caches the active profile id for the lifetime of the app.
+
+    The id is resolved once (lazily, via ``resolver``) and reused until
+    ``invalidate()`` is called, e.g. when the profile row changes.
+    """
+
+    def __init__(self, resolver):
+        self._resolver = resolver
+        self._profile_id = None
+        self._lock = threading.Lock()
+
+    @property
+    def cached_id(self):
+        """The cached id, or None if it has not been resolved yet."""
+        return self._profile_id
+
+    @property
+    def profile_id(self) -> int:
+        pid = self._profile_id
+        if pid is None:
+            with self._lock:
+                if self._profile_id is None:
+                    self._profile_id = int(self._resolver())
+                pid = self._profile_id
+        return pid
+
+    def set(self, profile_id):
+        self._profile_id = int(profile_id) if profile_id is not None else None
+
+    def invalidate(self):
+        """Forget the cached id so the next access re-resolves it."""
+        self._profile_id = None
+
+
 class Gamification:
     """Lightweight gamification service backed by SQL Server.
 
     Stores a single user profile in GamificationProfile and a catalog of Achievements.
     """
 
-    def __init__(self, conn_str: str):
+    def __init__(self, conn_str: str, pool=None):
         self.conn_str = conn_str
+        # Optional db_pool.ConnectionPool shared with the widget
+        self.pool = pool
+        # Active profile id, resolved once and shared with the widget
+        self.profile = ProfileContext(self._resolve_profile_id)
+
+    def _connect(self):
+        """Open a connection context: pooled when a pool was supplied, direct otherwise."""
+        if self.pool is not None:
+            return self.pool.connection()
+        return pyodbc.connect(self.conn_str)
 
     def _get_or_create_profile_id(self, cur, conn=None) -> int:
-        """Return the active profile id, inserting the default row if missing."""
+        """Return the active profile id, inserting the default row if missing.
+
+        Uses the cached id when available so most calls skip the lookup.
+        """
+        cached = self.profile.cached_id
+        if cached is not None:
+            return cached
         cur.execute("SELECT TOP 1 ProfileID FROM GamificationProfile ORDER BY ProfileID")
         row = cur.fetchone()
         if row:
-            return int(row[0])
-        cur.execute("INSERT INTO GamificationProfile (XP, Level) VALUES (0,1)")
-        if conn:
-            conn.commit()
-        cur.execute("SELECT TOP 1 ProfileID FROM GamificationProfile ORDER BY ProfileID")
-        row = cur.fetchone()
-        return int(row[0]) if row else 1
+            pid = int(row[0])
+        else:
+            cur.execute("INSERT INTO GamificationProfile (XP, Level) VALUES (0,1)")
+            if conn:
+                conn.commit()
+            cur.execute("SELECT TOP 1 ProfileID FROM GamificationProfile ORDER BY ProfileID")
+            row = cur.fetchone()
+            pid = int(row[0]) if row else 1
+        self.profile.set(pid)
+        return pid
+
+    def _resolve_profile_id(self) -> int:
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                return self._get_or_create_profile_id(cur, conn)
 
     # --- Profile helpers ---
     def get_profile(self) -> dict:
-        with pyodbc.connect(self.conn_str) as conn:
+        query = """
+            SELECT ProfileID, XP, Level, TotalReviews, TotalKnown, TotalFavorites,
+                   TotalAdds, TotalEdits, TotalDeletes, TotalAITokens, TotalAICost,
+                   CurrentStreak, LongestStreak, LastCheckinDate
+            FROM GamificationProfile
+            WHERE ProfileID = ?
+            """
+        with self._connect() as conn:
             with conn.cursor() as cur:
                 pid = self._get_or_create_profile_id(cur, conn)
-                cur.execute(
-                    """
-                    SELECT ProfileID, XP, Level, TotalReviews, TotalKnown, TotalFavorites,
-                           TotalAdds, TotalEdits, TotalDeletes, TotalAITokens, TotalAICost,
-                           CurrentStreak, LongestStreak, LastCheckinDate
-                    FROM GamificationProfile
-                    WHERE ProfileID = ?
-                    """,
-                    (pid,)
-                )
+                cur.execute(query, (pid,))
                 row = cur.fetchone()
+                if row is None:
+                    # The cached profile no longer exists; resolve it again
+                    self.profile.invalidate()
+                    pid = self._get_or_create_profile_id(cur, conn)
+                    cur.execute(query, (pid,))
+                    row = cur.fetchone()
                 cols = [d[0] for d in cur.description]
                 return dict(zip(cols, row))
 
@@ -87,7 +173,7 @@ class Gamification:
         update_sql, select_sql = field_sql_map[field]
 
         try:
-            with pyodbc.connect(self.conn_str) as conn:
+            with self._connect() as conn:
                 with conn.cursor() as cur:
                     pid = self._get_or_create_profile_id(cur, conn)
                     cur.execute(update_sql, (amount, pid))
@@ -114,7 +200,7 @@ class Gamification:
             return self.get_profile()
 
         try:
-            with pyodbc.connect(self.conn_str) as conn:
+            with self._connect() as conn:
                 with conn.cursor() as cur:
                     pid = self._get_or_create_profile_id(cur, conn)
                     cur.execute(
@@ -134,7 +220,7 @@ class Gamification:
     def award_xp(self, amount: int) -> dict:
         if amount <= 0:
             return self.get_profile()
-        with pyodbc.connect(self.conn_str) as conn:
+        with self._connect() as conn:
             with conn.cursor() as cur:
                 pid = self._get_or_create_profile_id(cur, conn)
                 # Update XP for that profile
@@ -152,7 +238,7 @@ class Gamification:
         if level >= 100 and not self._all_achievements_unlocked():
             level = 99
 
-        with pyodbc.connect(self.conn_str) as conn:
+        with self._connect() as conn:
             with conn.cursor() as cur:
                 pid = self._get_or_create_profile_id(cur, conn)
                 cur.execute("UPDATE GamificationProfile SET Level = ? WHERE ProfileID = ?", (int(level), pid))
@@ -167,7 +253,7 @@ class Gamification:
         """
         unlocked = []
         try:
-            with pyodbc.connect(self.conn_str) as conn:
+            with self._connect() as conn:
                 with conn.cursor() as cur:
                     pid = self._get_or_create_profile_id(cur, conn)
                     cur.execute(
@@ -229,12 +315,31 @@ class Gamification:
             logger.warning(f"Could not fetch London date from SQL, falling back to date.today(): {e}")
         return date.today()
 
-    def daily_checkin(self) -> dict:
-        """Update streak based on last check-in date.
+    @staticmethod
+    def _as_date(value):
+        """Normalize a DATE/DATETIME column (or ISO string) to a date, or None."""
+        if isinstance(value, datetime):
+            return value.date()
+        if value is None or isinstance(value, date):
+            return value
+        try:
+            return datetime.strptime(str(value), '%Y-%m-%d').date()
+        except (ValueError, TypeError):
+            return None
+
+    def daily_checkin(self, active: bool = True) -> dict:
+        """Advance the stored streak for today in O(1).
+
+        ``active`` means a review was just logged today: the first such call of
+        a London day extends the streak (or starts a new one after a gap) and
+        awards the daily XP; later calls that day change nothing. With
+        ``active`` False (e.g. at session start) a broken streak is only reset
+        to 0. A profile that has never checked in is seeded once from the logs.
         Returns dict with 'profile' and 'unlocked' keys.
         """
         unlocked = []
-        with pyodbc.connect(self.conn_str) as conn:
+        advanced = False
+        with self._connect() as conn:
             with conn.cursor() as cur:
                 pid = self._get_or_create_profile_id(cur, conn)
                 cur.execute(
@@ -253,52 +358,70 @@ class Gamification:
                 prof = dict(zip(cols, row)) if row else {'ProfileID': pid}
 
                 today = self._london_today(cur)
-                last = prof.get('LastCheckinDate')
-                # Normalize to date
-                if isinstance(last, datetime):
-                    last = last.date()
-                elif last is not None and not isinstance(last, date):
-                    try:
-                        last = datetime.strptime(str(last), '%Y-%m-%d').date()
-                    except (ValueError, TypeError):
-                        last = None
-
-                # Derive streak from actual review activity (authoritative)
-                log_current, log_longest, log_last = self._calculate_streak_from_logs(cur, pid)
-                new_streak = log_current
-                longest = log_longest
-                changed = False
-
-                if log_last:
-                    # Persist derived values
-                    last_param = log_last
-                    if isinstance(log_last, (datetime, date)):
-                        # SQL Server accepts ISO date strings; avoid driver date binding issues
-                        last_param = log_last.strftime("%Y-%m-%d")
+                last = self._as_date(prof.get('LastCheckinDate'))
+                current = int(prof.get('CurrentStreak') or 0)
+                longest = int(prof.get('LongestStreak') or 0)
+
+                if last is None:
+                    # No stored state yet: derive it from the review history once
+                    new_current, new_longest, new_last = self._calculate_streak_from_logs(cur, pid)
+                    advanced = active and new_last == today
+                else:
+                    new_current, new_longest, new_last, advanced = advance_streak(current, longest, last, today, active)
+
+                if (new_current, new_longest, new_last) != (current, longest, last):
+                    # Guarded so a concurrent check-in for the same day cannot advance it twice
                     cur.execute(
-                        "UPDATE GamificationProfile SET CurrentStreak = ?, LongestStreak = ?, LastCheckinDate = ? WHERE ProfileID = ?",
-                        (int(new_streak), int(longest), last_param, pid)
+                        """
+                        UPDATE GamificationProfile
+                        SET CurrentStreak = ?, LongestStreak = ?, LastCheckinDate = ?
+                        WHERE ProfileID = ? AND (LastCheckinDate IS NULL OR LastCheckinDate < ?)
+                        """,
+                        (int(new_current), int(new_longest), self._date_param(new_last), pid, self._date_param(today))
                     )
+                    if cur.rowcount == 0:
+                        advanced = False
                     conn.commit()
-                    # Award daily XP only once per new day
-                    if last != today and log_last == today:
-                        changed = True
-
-                # Award daily check-in XP (only when day advanced or first time)
-                if changed:
-                    daily_xp = int(config.XP_CONFIG.get('xp_daily_checkin', 0))
-                    if daily_xp > 0:
-                        # award_xp recomputes level
-                        self.award_xp(daily_xp)
-
-                    # Unlock streak achievements if thresholds crossed
-                    unlocked = self.unlock_achievements_if_needed('streak', new_streak)
-
-                # Return updated profile snapshot
-                prof['CurrentStreak'] = new_streak
-                prof['LongestStreak'] = longest
-                prof['LastCheckinDate'] = log_last
-                return {'profile': prof, 'unlocked': unlocked}
+
+        # Award daily check-in XP only on the first active check-in of a day
+        if advanced:
+            daily_xp = int(config.XP_CONFIG.get('xp_daily_checkin', 0))
+            if daily_xp > 0:
+                # award_xp recomputes level
+                self.award_xp(daily_xp)
+            # Unlock streak achievements if thresholds crossed
+            unlocked = self.unlock_achievements_if_needed('streak', new_current)
+
+        # Return updated profile snapshot
+        prof['CurrentStreak'] = new_current
+        prof['LongestStreak'] = new_longest
+        prof['LastCheckinDate'] = new_last
+        return {'profile': prof, 'unlocked': unlocked}
+
+    @staticmethod
+    def _date_param(value):
+        # SQL Server accepts ISO date strings; avoid driver date binding issues
+        if isinstance(value, (datetime, date)):
+            return value.strftime("%Y-%m-%d")
+        return value
+
+    def rebuild_streak(self) -> dict:
+        """Recompute the stored streak from the full FactLogs history.
+
+        Repair command for the incremental state kept by daily_checkin; it
+        scans every review day of the profile, so it is not run per view.
+        Returns the rebuilt CurrentStreak, LongestStreak and LastCheckinDate.
+        """
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                pid = self._get_or_create_profile_id(cur, conn)
+                current, longest, last = self._calculate_streak_from_logs(cur, pid)
+                cur.execute(
+                    "UPDATE GamificationProfile SET CurrentStreak = ?, LongestStreak = ?, LastCheckinDate = ? WHERE ProfileID = ?",
+                    (int(current), int(longest), self._date_param(last), pid)
+                )
+                conn.commit()
+        return {'CurrentStreak': current, 'LongestStreak': longest, 'LastCheckinDate': last}
 
     def _calculate_streak_from_logs(self, cur, profile_id: int):
         """Compute current and longest streak from FactLogs (view/null actions only) for a profile."""
@@ -446,7 +569,7 @@ class Gamification:
             'streak': int(prof.get('CurrentStreak', 0) or 0),
         }
         out = []
-        with pyodbc.connect(self.conn_str) as conn:
+        with self._connect() as conn:
             with conn.cursor() as cur:
                 # Compute current states from Facts
                 try:
@@ -500,7 +623,7 @@ class Gamification:
     def mark_unlocked_notified_by_codes(self, codes: list):
         if not codes:
             return
-        with pyodbc.connect(self.conn_str) as conn:
+        with self._connect() as conn:
             with conn.cursor() as cur:
                 pid = self._get_or_create_profile_id(cur, conn)
                 # Update Notified for unlock rows that match codes and are not yet notified
@@ -576,7 +699,7 @@ class Gamification:
         return level
 
     def _all_achievements_unlocked(self) -> bool:
-        with pyodbc.connect(self.conn_str) as conn:
+        with self._connect() as conn:
             with conn.cursor() as cur:
                 pid = self._get_or_create_profile_id(cur, conn)
                 cur.execute("SELECT COUNT(*) FROM Achievements")
@@ -586,3 +709,21 @@ class Gamification:
                 cur.execute("SELECT COUNT(*) FROM AchievementUnlocks WHERE ProfileID = ?", (pid,))
                 unlocked = int(cur.fetchone()[0])
                 return unlocked >= total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FactDari gamification maintenance.")
+    parser.add_argument('--rebuild-streak', action='store_true',
+                        help="Recompute the active profile's streak from its full review history")
+    args = parser.parse_args(argv)
+    if not args.rebuild_streak:
+        parser.print_help()
+        return 1
+    result = Gamification(config.get_connection_string()).rebuild_streak()
+    print(f"Current streak: {result['CurrentStreak']} day(s), longest: {result['LongestStreak']}, "
+          f"last active: {result['LastCheckinDate'] or 'never'}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,252 @@
+"""Near-duplicate detection for facts using MinHash signatures and LSH banding.
+
+Run as a script to list near-duplicate clusters across the whole library:
+
+    python near_duplicates.py [--threshold 0.6] [--profile 1]
+"""
+import argparse
+import hashlib
+import re
+import threading
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.near_duplicates')
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize(text):
+    """Lower-case words separated by single spaces (punctuation dropped)."""
+    return " ".join(_WORD_RE.findall(str(text or "").lower()))
+
+
+def shingles(text, size: int = 5):
+    """Character shingles of the normalised text."""
+    norm = normalize(text)
+    if not norm:
+        return set()
+    if len(norm) <= size:
+        return {norm}
+    return {norm[i:i + size] for i in range(len(norm) - size + 1)}
+
+
+def choose_bands(num_perm: int, threshold: float):
+    """Pick (bands, rows) so the LSH candidate threshold sits just below ``threshold``.
+
+    Candidates are verified against the estimated similarity afterwards, so
+    erring low keeps recall high without reporting false positives.
+    """
+    best = (num_perm, 1)
+    best_t = 0.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands < 1:
+            break
+        t = (1.0 / bands) ** (1.0 / rows)
+        if best_t < t <= threshold:
+            best, best_t = (bands, rows), t
+    return best
+
+
+class NearDuplicateIndex:
+    """MinHash + LSH index answering "which facts look like this text?" in sub-linear time.
+
+    Signatures use one-permutation hashing: every shingle is hashed once with a
+    keyed BLAKE2b (stable across runs and processes) and assigned to one of
+    ``num_perm`` bins, keeping the minimum per bin; empty bins borrow from the
+    next filled bin (rotation densification). Signatures are split into bands,
+    and facts that share any band are candidates whose similarity is then
+    estimated from the full signatures.
+    """
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.threshold = float(threshold)
+        self.num_perm = max(2, int(num_perm))
+        self.shingle_size = max(1, int(shingle_size))
+        self._key = hashlib.blake2b(str(seed).encode('ascii'), digest_size=16).digest()
+        self.bands, self.rows = choose_bands(self.num_perm, self.threshold)
+        self._signatures = {}   # FactID -> tuple
+        self._buckets = [dict() for _ in range(self.bands)]  # band -> {band values: set of FactIDs}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls):
+        cfg = config.NEAR_DUPLICATE_CONFIG
+        return cls(
+            threshold=cfg.get('threshold', 0.6),
+            num_perm=cfg.get('num_perm', 128),
+            shingle_size=cfg.get('shingle_size', 5),
+        )
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, fact_id):
+        return fact_id in self._signatures
+
+    # --- Signatures ---
+    def _hash(self, shingle):
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8, key=self._key).digest()
+        return int.from_bytes(digest, 'big')
+
+    def signature(self, text):
+        """MinHash signature for ``text`` (None when it has no words)."""
+        n = self.num_perm
+        bins = [None] * n
+        for shingle in shingles(text, self.shingle_size):
+            h = self._hash(shingle)
+            b, v = h % n, h // n
+            if bins[b] is None or v < bins[b]:
+                bins[b] = v
+        if all(v is None for v in bins):
+            return None
+        sig = list(bins)
+        for i in range(n):
+            if bins[i] is None:
+                step = 1
+                while bins[(i + step) % n] is None:
+                    step += 1
+                # Offset by distance so borrowed values only match the same borrow
+                sig[i] = bins[(i + step) % n] + (step << 64)
+        return tuple(sig)
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """Estimated Jaccard similarity of two signatures."""
+        if not sig_a or not sig_b:
+            return 0.0
+        same = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+        return same / len(sig_a)
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [sig[i * r:(i + 1) * r] for i in range(self.bands)]
+
+    # --- Updates ---
+    def add(self, fact_id, text):
+        """Index (or re-index) one fact."""
+        sig = self.signature(text)
+        with self._lock:
+            self.remove(fact_id)
+            if sig is None:
+                return
+            self._signatures[fact_id] = sig
+            for band, key in enumerate(self._band_keys(sig)):
+                self._buckets[band].setdefault(key, set()).add(fact_id)
+
+    def add_many(self, rows):
+        count = 0
+        for fact_id, text in rows:
+            self.add(fact_id, text)
+            count += 1
+        return count
+
+    def remove(self, fact_id):
+        with self._lock:
+            sig = self._signatures.pop(fact_id, None)
+            if sig is None:
+                return False
+            for band, key in enumerate(self._band_keys(sig)):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(fact_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+            return True
+
+    # --- Queries ---
+    def _candidates(self, sig):
+        found = set()
+        for band, key in enumerate(self._band_keys(sig)):
+            found.update(self._buckets[band].get(key, ()))
+        return found
+
+    def query(self, text, exclude=None, limit: int = 5):
+        """Facts at or above the threshold: [(FactID, similarity), ...] best first."""
+        sig = self.signature(text)
+        if sig is None:
+            return []
+        with self._lock:
+            matches = []
+            for fact_id in self._candidates(sig):
+                if fact_id == exclude:
+                    continue
+                sim = self.similarity(sig, self._signatures[fact_id])
+                if sim >= self.threshold:
+                    matches.append((fact_id, sim))
+        matches.sort(key=lambda m: (-m[1], m[0]))
+        return matches[:max(0, int(limit))]
+
+    def clusters(self):
+        """Group all indexed facts into near-duplicate clusters (lists of 2+ FactIDs)."""
+        with self._lock:
+            parent = {}
+
+            def find(x):
+                parent.setdefault(x, x)
+                while parent[x] != x:
+                    parent[x] = parent[parent[x]]
+                    x = parent[x]
+                return x
+
+            for fact_id, sig in self._signatures.items():
+                for other in self._candidates(sig):
+                    if other <= fact_id:
+                        continue
+                    if self.similarity(sig, self._signatures[other]) >= self.threshold:
+                        ra, rb = find(fact_id), find(other)
+                        if ra != rb:
+                            parent[max(ra, rb)] = min(ra, rb)
+            groups = {}
+            for fact_id in list(parent):
+                groups.setdefault(find(fact_id), []).append(fact_id)
+        clusters = [sorted(ids) for ids in groups.values()]
+        return sorted((c for c in clusters if len(c) > 1), key=lambda c: (-len(c), c[0]))
+
+
+def build_from_cursor(cursor, index=None, profile_id=None, batch_size: int = 2000):
+    """Stream (FactID, Content) rows with fetchmany into a NearDuplicateIndex."""
+    index = index if index is not None else NearDuplicateIndex.from_config()
+    if profile_id is None:
+        cursor.execute("SELECT FactID, Content FROM Facts")
+    else:
+        cursor.execute("SELECT FactID, Content FROM Facts WHERE CreatedBy = ?", (profile_id,))
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        index.add_many((row[0], row[1]) for row in rows)
+    return index
+
+
+def main(argv=None):
+    import pyodbc
+
+    parser = argparse.ArgumentParser(description="List clusters of near-duplicate facts.")
+    parser.add_argument('--threshold', type=float, default=config.NEAR_DUPLICATE_CONFIG['threshold'],
+                        help="Minimum estimated similarity (0-1)")
+    parser.add_argument('--profile', type=int, default=None, help="Only facts created by this ProfileID")
+    args = parser.parse_args(argv)
+
+    cfg = config.NEAR_DUPLICATE_CONFIG
+    index = NearDuplicateIndex(args.threshold, cfg['num_perm'], cfg['shingle_size'])
+    with pyodbc.connect(config.get_connection_string()) as conn:
+        with conn.cursor() as cursor:
+            build_from_cursor(cursor, index, profile_id=args.profile)
+        clusters = index.clusters()
+        print(f"Indexed {len(index)} facts; {len(clusters)} near-duplicate cluster(s) at >= {args.threshold:.2f}")
+        with conn.cursor() as cursor:
+            for number, ids in enumerate(clusters, start=1):
+                placeholders = ",".join("?" for _ in ids)
+                cursor.execute(f"SELECT FactID, Content FROM Facts WHERE FactID IN ({placeholders}) ORDER BY FactID", ids)
+                print(f"\nCluster {number} ({len(ids)} facts)")
+                for fact_id, content in cursor.fetchall():
+                    snippet = " ".join(str(content or "").split())
+                    print(f"  [{fact_id}] {snippet[:100]}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
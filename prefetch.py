@@ -0,0 +1,95 @@
+import queue
+import threading
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.prefetch')
+
+
+class Prefetcher:
+    """Background look-ahead that warms upcoming cards while the current one is read.
+
+    ``schedule(fact_ids)`` hands the ids of the next cards to a single worker
+    thread, which calls ``warm(fact_ids, cancelled)``. ``cancel()`` starts a new
+    epoch: queued work from the old epoch is skipped and ``cancelled()`` turns
+    True for the batch in progress, so the warm function can stop between steps
+    (e.g. after a category switch or reshuffle).
+    """
+
+    def __init__(self, warm, lookahead: int = 3):
+        self.warm = warm
+        self.lookahead = max(0, int(lookahead))
+        self._queue = queue.Queue()
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, warm):
+        """Build a prefetcher using the PREFETCH_CONFIG settings."""
+        return cls(warm, lookahead=config.PREFETCH_CONFIG.get('lookahead', 3))
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name='factdari-prefetch', daemon=True)
+                self._thread.start()
+        return self
+
+    def schedule(self, fact_ids):
+        """Queue the upcoming ids for warming under the current epoch."""
+        ids = [fid for fid in (fact_ids or []) if fid is not None][:self.lookahead]
+        if not ids or self._closed:
+            return False
+        self._queue.put((self._epoch, ids))
+        return True
+
+    def cancel(self):
+        """Invalidate queued and in-progress prefetch work."""
+        with self._lock:
+            self._epoch += 1
+        # Drop stale batches now rather than letting the worker skip them one by one
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def close(self, timeout=None):
+        if self._closed:
+            return
+        self.cancel()
+        self._closed = True
+        self._queue.put(None)
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout if timeout is not None else 2.0)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            epoch, ids = item
+            # Only the newest batch matters; older ones are for cards already passed
+            while True:
+                try:
+                    newer = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if newer is None:
+                    return
+                epoch, ids = newer
+            if epoch != self._epoch:
+                continue
+            try:
+                self.warm(ids, lambda e=epoch: e != self._epoch)
+            except Exception as e:
+                logger.error(f"Prefetch failed: {e}")
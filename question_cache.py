@@ -0,0 +1,156 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.question_cache')
+
+
+class QuestionCache:
+    """Per-fact cache of generated questions with in-memory TimesShown counts.
+
+    ``put_many`` loads questions for a batch of facts (facts with none are
+    remembered as empty, so they are not queried again). ``pick`` returns the
+    least-shown question of a fact, breaking ties at random, without touching
+    the database. ``mark_shown`` bumps the in-memory count and records a
+    pending delta; ``drain`` hands the deltas over to be written in one batch.
+    Bounded by ``max_facts`` (least recently used facts are dropped; their
+    pending deltas are kept until drained).
+    """
+
+    def __init__(self, max_facts: int = 5000, rng=None, clock=time.monotonic):
+        self.max_facts = max(1, int(max_facts))
+        self._rng = rng or random
+        self._clock = clock
+        self._facts = OrderedDict()  # fact_id -> [[QuestionID, QuestionText, TimesShown], ...]
+        self._by_question = {}       # QuestionID -> fact_id
+        self._pending = {}           # QuestionID -> [shown count, clock time of last show]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        return cls(config.QUESTION_CACHE_CONFIG.get('max_facts', 5000))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._facts)
+
+    def __contains__(self, fact_id):
+        with self._lock:
+            return fact_id in self._facts
+
+    def _store(self, fact_id, rows):
+        old = self._facts.pop(fact_id, None)
+        for entry in old or []:
+            self._by_question.pop(entry[0], None)
+        entries = []
+        for question_id, text, times_shown in rows:
+            pending = self._pending.get(question_id)
+            # Shows not flushed yet are not in the database count
+            shown = int(times_shown or 0) + (pending[0] if pending else 0)
+            entries.append([question_id, text, shown])
+            self._by_question[question_id] = fact_id
+        self._facts[fact_id] = entries
+        while len(self._facts) > self.max_facts:
+            _, dropped = self._facts.popitem(last=False)
+            for entry in dropped:
+                self._by_question.pop(entry[0], None)
+
+    def put(self, fact_id, rows):
+        """Replace a fact's questions with ``rows`` of (QuestionID, QuestionText, TimesShown)."""
+        with self._lock:
+            self._store(fact_id, rows)
+
+    def put_many(self, grouped, fact_ids=None):
+        """Load {fact_id: rows} for facts not cached yet.
+
+        Ids in ``fact_ids`` missing from ``grouped`` are cached as having no
+        questions. Facts cached while the rows were being read keep their
+        (newer) entry.
+        """
+        with self._lock:
+            for fact_id in fact_ids if fact_ids is not None else grouped:
+                if fact_id not in self._facts:
+                    self._store(fact_id, grouped.get(fact_id) or [])
+
+    def add(self, fact_id, rows):
+        """Append newly generated questions to a fact."""
+        with self._lock:
+            current = [tuple(entry) for entry in self._facts.get(fact_id, [])]
+            self._store(fact_id, current + [tuple(row) for row in rows])
+
+    def keep_only(self, fact_id, question_ids):
+        """Drop every question of a fact except ``question_ids`` (after a refresh)."""
+        keep = set(question_ids)
+        with self._lock:
+            if fact_id in self._facts:
+                self._store(fact_id, [tuple(e) for e in self._facts[fact_id] if e[0] in keep])
+
+    def invalidate(self, fact_id):
+        with self._lock:
+            for entry in self._facts.pop(fact_id, None) or []:
+                self._by_question.pop(entry[0], None)
+
+    def clear(self):
+        with self._lock:
+            self._facts.clear()
+            self._by_question.clear()
+
+    def missing(self, fact_ids):
+        """Ids (in order, de-duplicated) whose questions are not loaded."""
+        with self._lock:
+            seen = set()
+            out = []
+            for fact_id in fact_ids:
+                if fact_id not in self._facts and fact_id not in seen:
+                    seen.add(fact_id)
+                    out.append(fact_id)
+            return out
+
+    def get(self, fact_id):
+        """The fact's cached rows as (QuestionID, QuestionText, TimesShown), or None if not loaded."""
+        with self._lock:
+            entries = self._facts.get(fact_id)
+            if entries is None:
+                return None
+            self._facts.move_to_end(fact_id)
+            return [tuple(entry) for entry in entries]
+
+    def pick(self, fact_id):
+        """(QuestionID, QuestionText) of the least-shown question, or None."""
+        with self._lock:
+            entries = self._facts.get(fact_id)
+            if not entries:
+                return None
+            self._facts.move_to_end(fact_id)
+            fewest = min(entry[2] for entry in entries)
+            entry = self._rng.choice([e for e in entries if e[2] == fewest])
+            return entry[0], entry[1]
+
+    def mark_shown(self, question_id):
+        """Count one show of a question; returns the number of questions with unflushed shows."""
+        with self._lock:
+            fact_id = self._by_question.get(question_id)
+            for entry in self._facts.get(fact_id, []):
+                if entry[0] == question_id:
+                    entry[2] += 1
+                    break
+            pending = self._pending.setdefault(question_id, [0, None])
+            pending[0] += 1
+            pending[1] = self._clock()
+            return len(self._pending)
+
+    def drain(self):
+        """Take the unflushed shows: [(QuestionID, shows, seconds since the last show)]."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        now = self._clock()
+        return [(qid, count, max(0, int(now - last))) for qid, (count, last) in pending.items()]
+
+    @property
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
@@ -0,0 +1,280 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.question_pregen')
+
+
+class RateLimiter:
+    """Spaces calls evenly so at most ``per_minute`` start in any minute (0 = no limit)."""
+
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self.interval = 60.0 / float(per_minute) if per_minute and per_minute > 0 else 0.0
+        self._clock = clock
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, stop_event=None) -> bool:
+        """Block until the next call may start; False if ``stop_event`` was set meanwhile."""
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        delay = start - now
+        if delay <= 0:
+            return not (stop_event is not None and stop_event.is_set())
+        if stop_event is None:
+            time.sleep(delay)
+            return True
+        return not stop_event.wait(delay)
+
+
+class QuestionPregenerator:
+    """Background service that generates questions before their facts are reached.
+
+    Each pass asks ``find_candidates(limit)`` for ``(fact_id, content, refresh)``
+    tuples (facts without questions, or whose refresh countdown is nearly
+    spent) and runs ``generate(fact_id, content, refresh)`` for them on a pool
+    of ``workers`` threads. ``generate`` returns a truthy value on success.
+    With ``generate_batch`` set, up to ``facts_per_call`` candidates share one
+    call: ``generate_batch(items)`` returns the ids of the facts that got
+    questions.
+
+    Before each call the day's spend from ``spent_today()`` -> (tokens, cost)
+    is checked against the budgets; calls already running can overshoot the
+    budget by at most ``workers`` calls. Calls are spaced by a rate limiter,
+    and nothing starts while ``is_busy()`` returns True. A fact whose
+    generation failed is not retried for ``retry_seconds``. ``on_done(fact_id,
+    ok)`` is called on the worker thread after each attempt.
+    """
+
+    def __init__(self, find_candidates, generate, spent_today=None, is_busy=None, on_done=None,
+                 generate_batch=None, facts_per_call: int = 1, workers: int = 2, batch_size: int = 20, daily_token_budget: int = 0,
+                 daily_cost_budget: float = 0.0, rate_per_minute: float = 6, idle_seconds: float = 120,
+                 retry_seconds: float = 3600):
+        self.find_candidates = find_candidates
+        self.generate = generate
+        self.spent_today = spent_today
+        self.is_busy = is_busy
+        self.on_done = on_done
+        self.generate_batch = generate_batch
+        self.facts_per_call = max(1, int(facts_per_call)) if generate_batch is not None else 1
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.daily_token_budget = max(0, int(daily_token_budget or 0))
+        self.daily_cost_budget = max(0.0, float(daily_cost_budget or 0))
+        self.idle_seconds = max(0.0, float(idle_seconds))
+        self.retry_seconds = max(0.0, float(retry_seconds))
+        self.rate = RateLimiter(rate_per_minute)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._executor = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._in_progress = set()
+        self._failed_at = {}  # fact_id -> monotonic time of the last failed attempt
+        self._requested = []  # (fact_id, content, refresh) handled before find_candidates()
+        self._thread = None
+        self._stats = {
+            'generated': 0,
+            'failed': 0,
+            'passes': 0,
+            'state': 'idle',  # idle | running | paused | over_budget | stopped
+        }
+
+    @classmethod
+    def from_config(cls, find_candidates, generate, spent_today=None, is_busy=None, on_done=None, generate_batch=None):
+        """Build a pre-generator using the QUESTION_PREGEN_CONFIG settings."""
+        cfg = config.QUESTION_PREGEN_CONFIG
+        return cls(
+            find_candidates, generate, spent_today=spent_today, is_busy=is_busy, on_done=on_done,
+            generate_batch=generate_batch,
+            facts_per_call=config.AI_REQUEST_CONFIG.get('question_batch_size', 1),
+            workers=cfg.get('workers', 2),
+            batch_size=cfg.get('batch_size', 20),
+            daily_token_budget=cfg.get('daily_token_budget', 0),
+            daily_cost_budget=cfg.get('daily_cost_budget', 0.0),
+            rate_per_minute=cfg.get('rate_per_minute', 6),
+            idle_seconds=cfg.get('idle_seconds', 120),
+        )
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='factdari-pregen')
+                self._thread = threading.Thread(target=self._run, name='factdari-question-pregen', daemon=True)
+                self._thread.start()
+        return self
+
+    def request(self, fact_id, content, refresh=False):
+        """Put a fact at the front of the next pass (e.g. its questions were just purged)."""
+        with self._lock:
+            if all(item[0] != fact_id for item in self._requested):
+                self._requested.append((fact_id, content, refresh))
+        self._wake.set()
+
+    def wake(self):
+        """Start the next pass now instead of after the idle wait (e.g. after facts were added)."""
+        self._wake.set()
+
+    def close(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout if timeout is not None else 2.0)
+        executor = self._executor
+        if executor is not None:
+            # Calls already sent are left to finish on their daemon threads
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._set_state('stopped')
+
+    def in_progress(self, fact_id) -> bool:
+        with self._lock:
+            return fact_id in self._in_progress
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._stats)
+            data['in_progress'] = len(self._in_progress)
+        return data
+
+    def _set_state(self, state):
+        with self._lock:
+            self._stats['state'] = state
+
+    def _bump(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    # --- Budget / pause checks ---
+    def over_budget(self) -> bool:
+        if self.spent_today is None or not (self.daily_token_budget or self.daily_cost_budget):
+            return False
+        try:
+            tokens, cost = self.spent_today()
+        except Exception as e:
+            logger.warning(f"Could not read today's question generation spend: {e}")
+            return True  # fail closed: never spend without knowing the total
+        if self.daily_token_budget and int(tokens or 0) >= self.daily_token_budget:
+            return True
+        return bool(self.daily_cost_budget and float(cost or 0) >= self.daily_cost_budget)
+
+    def paused(self) -> bool:
+        if self.is_busy is None:
+            return False
+        try:
+            return bool(self.is_busy())
+        except Exception:
+            return False
+
+    def _blocked(self):
+        """Name of the state that stops new calls, or None."""
+        if self._stop.is_set():
+            return 'stopped'
+        if self.paused():
+            return 'paused'
+        if self.over_budget():
+            return 'over_budget'
+        return None
+
+    # --- Work ---
+    def run_once(self, wait: bool = True) -> int:
+        """Run one pass; returns how many calls were started."""
+        self._bump('passes')
+        blocked = self._blocked()
+        if blocked:
+            self._set_state(blocked)
+            return 0
+        with self._lock:
+            candidates, self._requested = self._requested[:self.batch_size], self._requested[self.batch_size:]
+        try:
+            if len(candidates) < self.batch_size:
+                requested = {item[0] for item in candidates}
+                found = self.find_candidates(self.batch_size - len(candidates)) or []
+                candidates += [item for item in found if item[0] not in requested]
+        except Exception as e:
+            logger.error(f"Finding facts for question pre-generation failed: {e}")
+        if not candidates:
+            self._set_state('idle')
+            return 0
+
+        self._set_state('running')
+        executor = self._executor or ThreadPoolExecutor(max_workers=self.workers)
+        now = time.monotonic()
+        with self._lock:
+            ready = [
+                item for item in candidates
+                if item[0] not in self._in_progress
+                and not (item[0] in self._failed_at and now - self._failed_at[item[0]] < self.retry_seconds)
+            ]
+        groups = [ready[i:i + self.facts_per_call] for i in range(0, len(ready), self.facts_per_call)]
+        futures = []
+        for group in groups:
+            # A free slot first, so budget and pause are re-checked right before each call
+            acquired = False
+            while not acquired and not self._stop.is_set():
+                acquired = self._slots.acquire(timeout=0.5)
+            if not acquired:
+                break
+            blocked = self._blocked()
+            if blocked or not self.rate.wait(self._stop):
+                self._slots.release()
+                self._set_state(blocked or 'stopped')
+                break
+            with self._lock:
+                self._in_progress.update(item[0] for item in group)
+            futures.append(executor.submit(self._generate_group, group))
+        if wait:
+            for future in futures:
+                future.exception()
+        if executor is not self._executor:
+            executor.shutdown(wait=wait)
+        with self._lock:
+            if self._stats['state'] == 'running':
+                self._stats['state'] = 'idle'
+        return len(futures)
+
+    def _generate_group(self, group):
+        """One call: a single fact via ``generate`` or several via ``generate_batch``."""
+        ok_ids = set()
+        try:
+            if len(group) == 1:
+                fact_id, content, refresh = group[0]
+                if self.generate(fact_id, content, refresh):
+                    ok_ids.add(fact_id)
+            else:
+                ok_ids = set(self.generate_batch(group) or ())
+        except Exception as e:
+            logger.error(f"Question pre-generation for facts {[item[0] for item in group]} failed: {e}")
+        finally:
+            with self._lock:
+                for fact_id, _, _ in group:
+                    self._in_progress.discard(fact_id)
+                    if fact_id in ok_ids:
+                        self._failed_at.pop(fact_id, None)
+                    else:
+                        self._failed_at[fact_id] = time.monotonic()
+            self._slots.release()
+        for fact_id, _, _ in group:
+            ok = fact_id in ok_ids
+            self._bump('generated' if ok else 'failed')
+            if self.on_done is not None:
+                try:
+                    self.on_done(fact_id, ok)
+                except Exception:
+                    pass
+        return ok_ids
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = self.run_once()
+            if self._stop.is_set():
+                return
+            if started == 0:
+                self._wake.wait(self.idle_seconds)
+                self._wake.clear()
@@ -0,0 +1,227 @@
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.search_index')
+
+INDEX_VERSION = 1
+
+# Common English words that carry no ranking signal
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the
+this to was were which with
+""".split())
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Fingerprint of the Facts table; stored with the index and compared on load so
+# a stale file (facts changed by another client) triggers a rebuild
+FINGERPRINT_SQL = """
+    SELECT COUNT(*), MAX(FactID), CHECKSUM_AGG(BINARY_CHECKSUM(FactID, Content))
+    FROM Facts
+"""
+
+
+def tokenize(text):
+    """Lower-cased word tokens without stopwords."""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+class SearchIndex:
+    """In-memory inverted index over fact text, ranked with BM25.
+
+    Postings map each term to {FactID: term frequency}, and each document keeps
+    the set of its terms so it can be replaced or removed by touching only its
+    own postings. Documents are added, replaced and removed incrementally, and the whole index is saved as JSON so
+    it can be loaded on startup without re-tokenising every fact.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = float(k1)
+        self.b = float(b)
+        self.fingerprint = None
+        self._postings = {}   # term -> {FactID: tf}
+        self._doc_len = {}    # FactID -> token count
+        self._doc_terms = {}  # FactID -> tuple of distinct terms
+        self._total_len = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    def __contains__(self, fact_id):
+        return fact_id in self._doc_len
+
+    # --- Updates ---
+    def add(self, fact_id, content):
+        """Index (or re-index) one fact."""
+        tokens = tokenize(content)
+        counts = Counter(tokens)
+        with self._lock:
+            self.remove(fact_id)
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[fact_id] = tf
+            self._doc_terms[fact_id] = tuple(counts)
+            self._doc_len[fact_id] = len(tokens)
+            self._total_len += len(tokens)
+            self.fingerprint = None
+
+    def add_many(self, rows):
+        """Index (FactID, Content) rows, e.g. a streamed cursor."""
+        count = 0
+        for fact_id, content in rows:
+            self.add(fact_id, content)
+            count += 1
+        return count
+
+    def remove(self, fact_id):
+        """Drop a fact from the postings of its own terms."""
+        with self._lock:
+            length = self._doc_len.pop(fact_id, None)
+            if length is None:
+                return False
+            self._total_len -= length
+            for term in self._doc_terms.pop(fact_id, ()):
+                docs = self._postings.get(term)
+                if docs and docs.pop(fact_id, None) is not None and not docs:
+                    del self._postings[term]
+            self.fingerprint = None
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._postings = {}
+            self._doc_len = {}
+            self._doc_terms = {}
+            self._total_len = 0
+            self.fingerprint = None
+
+    # --- Queries ---
+    def search(self, query, limit: int = 20):
+        """Return [(FactID, score), ...] best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            n = len(self._doc_len)
+            if n == 0:
+                return []
+            avg_len = (self._total_len / n) or 1.0
+            scores = {}
+            for term in terms:
+                docs = self._postings.get(term)
+                if not docs:
+                    continue
+                df = len(docs)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for fact_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[fact_id] / avg_len)
+                    scores[fact_id] = scores.get(fact_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:max(0, int(limit))]
+
+    # --- Persistence ---
+    def save(self, path, fingerprint=None):
+        """Write the index to ``path`` atomically."""
+        with self._lock:
+            if fingerprint is not None:
+                self.fingerprint = list(fingerprint)
+            data = {
+                'version': INDEX_VERSION,
+                'fingerprint': self.fingerprint,
+                'k1': self.k1,
+                'b': self.b,
+                'doc_len': {str(k): v for k, v in self._doc_len.items()},
+                'postings': {t: [[fid, tf] for fid, tf in docs.items()] for t, docs in self._postings.items()},
+            }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A unique temp file: the widget and the analytics server may save at the same time
+        fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index; returns None if the file is missing or unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read search index {path}: {e}")
+            return None
+        if data.get('version') != INDEX_VERSION:
+            return None
+        index = cls(k1=data.get('k1', 1.2), b=data.get('b', 0.75))
+        index._doc_len = {int(k): int(v) for k, v in data.get('doc_len', {}).items()}
+        index._total_len = sum(index._doc_len.values())
+        index._postings = {t: {int(fid): int(tf) for fid, tf in docs} for t, docs in data.get('postings', {}).items()}
+        doc_terms = {fid: [] for fid in index._doc_len}
+        for term, docs in index._postings.items():
+            for fid in docs:
+                doc_terms.setdefault(fid, []).append(term)
+        index._doc_terms = {fid: tuple(terms) for fid, terms in doc_terms.items()}
+        index.fingerprint = data.get('fingerprint')
+        return index
+
+    def matches(self, fingerprint) -> bool:
+        """True if the index was saved against this Facts fingerprint."""
+        if self.fingerprint is None or fingerprint is None:
+            return False
+        return [None if v is None else int(v) for v in self.fingerprint] == \
+            [None if v is None else int(v) for v in fingerprint]
+
+
+def build_from_cursor(cursor, batch_size: int = 2000):
+    """Build a fresh index by streaming (FactID, Content) rows with fetchmany."""
+    index = SearchIndex()
+    cursor.execute("SELECT FactID, Content FROM Facts")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        index.add_many((row[0], row[1]) for row in rows)
+    return index
+
+
+def fetch_fingerprint(cursor):
+    """Current Facts fingerprint as [count, max FactID, checksum]."""
+    cursor.execute(FINGERPRINT_SQL)
+    row = cursor.fetchone()
+    return list(row) if row else None
+
+
+def load_or_build(conn, path):
+    """Load the saved index if it still matches the database, else rebuild and save it."""
+    with conn.cursor() as cursor:
+        fingerprint = fetch_fingerprint(cursor)
+        index = SearchIndex.load(path)
+        if index is not None and index.matches(fingerprint):
+            return index
+        logger.info("Search index missing or stale; rebuilding from Facts")
+        index = build_from_cursor(cursor)
+    try:
+        index.save(path, fingerprint)
+    except OSError as e:
+        logger.warning(f"Could not save search index {path}: {e}")
+    return index
@@ -0,0 +1,350 @@
+import itertools
+import os
+import queue
+import tempfile
+import threading
+import time
+import wave
+from collections import deque
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.speech')
+
+# Events passed to on_event(kind, utterance_id)
+EVENT_START = 'start'              # audio for the utterance began
+EVENT_END = 'end'                  # the utterance finished on its own
+EVENT_INTERRUPTED = 'interrupted'  # stopped, or replaced by a newer utterance
+EVENT_ERROR = 'error'              # the engine could not speak it
+
+
+def _default_engine():
+    import pyttsx3
+    return pyttsx3.init()
+
+
+class WavePlayer:
+    """Asynchronous WAV playback through winsound (Windows only)."""
+
+    def __init__(self):
+        import winsound
+        self._winsound = winsound
+
+    @staticmethod
+    def duration(path: str) -> float:
+        with wave.open(path, 'rb') as wav:
+            return wav.getnframes() / float(wav.getframerate() or 1)
+
+    def play(self, path: str) -> float:
+        """Start playing ``path``; returns its length in seconds."""
+        seconds = self.duration(path)
+        ws = self._winsound
+        ws.PlaySound(path, ws.SND_FILENAME | ws.SND_ASYNC | ws.SND_NODEFAULT)
+        return seconds
+
+    def stop(self):
+        self._winsound.PlaySound(None, 0)
+
+
+def _default_player():
+    try:
+        return WavePlayer()
+    except ImportError:
+        return None
+
+
+class SpeechService:
+    """Long-lived text-to-speech worker that owns one pyttsx3 engine.
+
+    The engine is created once on the service thread (the slow part of
+    speaking) and driven with pyttsx3's external event loop, so the thread
+    can take new requests between audio events. ``speak`` and ``stop`` only
+    queue a command and return at once; a new utterance interrupts the
+    current one, and only the latest request is spoken. ``on_event(kind,
+    utterance_id)`` is called on the service thread for every start, end,
+    interruption and error.
+
+    With an ``audio_cache`` (see audio_cache.py) text rendered earlier is
+    played from its file instead of being synthesised. ``render`` queues
+    text to be rendered into the cache; renders run one at a time whenever
+    nothing is being spoken, and one in progress is abandoned (and queued
+    again) as soon as ``speak``, ``stop`` or ``close`` is called.
+    """
+
+    def __init__(self, engine_factory=None, on_event=None, voice: str = '', rate: int = 0,
+                 volume: float = 1.0, poll_seconds: float = 0.02, audio_cache=None, player=None,
+                 render_timeout: float = 30.0):
+        self.engine_factory = engine_factory or _default_engine
+        self.on_event = on_event
+        self.audio_cache = audio_cache
+        self.player = player if player is not None or audio_cache is None else _default_player()
+        self.render_timeout = float(render_timeout)
+        self.voice = voice or ''
+        self.rate = int(rate or 0)
+        self.volume = float(volume)
+        self.poll_seconds = max(0.005, float(poll_seconds))
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._latest = 0     # newest speak/stop request; older queued ones are skipped
+        self._current = None  # utterance the engine is speaking (service thread only)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ready = threading.Event()
+        self._failed = False
+        self._closing = False
+        self._renders = deque()  # (text, on_done) waiting for an idle moment
+        self._render_pending = set()
+        self._playing_until = None  # end time of cached audio being played
+        self._scratch = os.path.join(tempfile.gettempdir(), f"factdari-tts-{os.getpid()}.wav")
+
+    @classmethod
+    def from_config(cls, on_event=None, engine_factory=None, audio_cache=None):
+        """Build a service using the SPEECH_CONFIG settings."""
+        cfg = config.SPEECH_CONFIG
+        return cls(
+            engine_factory=engine_factory,
+            on_event=on_event,
+            audio_cache=audio_cache,
+            voice=cfg.get('voice', ''),
+            rate=cfg.get('rate', 0),
+            volume=cfg.get('volume', 1.0),
+            poll_seconds=cfg.get('poll_ms', 20) / 1000.0,
+        )
+
+    @property
+    def voice_settings(self) -> tuple:
+        """(voice, rate, volume), e.g. for keying rendered audio."""
+        return (self.voice, self.rate, self.volume)
+
+    @property
+    def speaking(self) -> bool:
+        return self._current is not None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._ready.clear()
+                self._thread = threading.Thread(target=self._run, name='factdari-tts', daemon=True)
+                self._thread.start()
+        return self
+
+    def wait_ready(self, timeout=None) -> bool:
+        """Wait until the engine is initialised (True) or failed to start (False)."""
+        return self._ready.wait(timeout) and not self._failed
+
+    def speak(self, text: str):
+        """Speak ``text`` instead of anything playing or queued; returns its utterance id."""
+        with self._lock:
+            utterance_id = next(self._ids)
+            self._latest = utterance_id
+        self._queue.put(('say', utterance_id, text))
+        return utterance_id
+
+    def stop(self):
+        """Interrupt current speech and drop queued requests (does not wait)."""
+        with self._lock:
+            self._latest = next(self._ids)
+        self._queue.put(('stop', self._latest, None))
+
+    def render(self, text: str, on_done=None) -> bool:
+        """Queue ``text`` for rendering into the audio cache.
+
+        ``on_done(ok)`` runs on the service thread afterwards. Returns False
+        (and does nothing) without a cache or player, or when the text is
+        already cached or queued.
+        """
+        cache = self.audio_cache
+        if cache is None or self.player is None or not str(text or '').strip():
+            return False
+        with self._lock:
+            if text in self._render_pending or cache.has(text, self.voice_settings):
+                return False
+            self._render_pending.add(text)
+            self._renders.append((text, on_done))
+        self._queue.put(('wake', None, None))
+        return True
+
+    @property
+    def renders_pending(self) -> int:
+        with self._lock:
+            return len(self._renders)
+
+    def close(self, timeout=None):
+        self._closing = True
+        self._queue.put(('close', None, None))
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout if timeout is not None else 2.0)
+
+    # --- Service thread ---
+    def _emit(self, kind, utterance_id):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(kind, utterance_id)
+        except Exception as e:
+            logger.error(f"Speech event handler failed: {e}")
+
+    def _open_engine(self):
+        engine = self.engine_factory()
+        if self.voice:
+            engine.setProperty('voice', self.voice)
+        if self.rate:
+            engine.setProperty('rate', self.rate)
+        engine.setProperty('volume', self.volume)
+        engine.connect('started-utterance', self._on_started)
+        engine.connect('finished-utterance', self._on_finished)
+        engine.startLoop(False)
+        return engine
+
+    def _on_started(self, name):
+        if name == self._current:
+            self._emit(EVENT_START, name)
+
+    def _on_finished(self, name, completed=True):
+        # Utterances already reported as interrupted are ignored here
+        if name == self._current:
+            self._current = None
+            self._emit(EVENT_END if completed else EVENT_INTERRUPTED, name)
+
+    def _interrupt(self, engine):
+        utterance_id, self._current = self._current, None
+        if utterance_id is None:
+            return
+        try:
+            if self._playing_until is not None:
+                self._playing_until = None
+                self.player.stop()
+            elif engine is not None:
+                engine.stop()
+        except Exception as e:
+            logger.debug(f"Speech stop failed: {e}")
+        self._emit(EVENT_INTERRUPTED, utterance_id)
+
+    def _play_cached(self, utterance_id, text) -> bool:
+        """Play pre-rendered audio for ``text`` if the cache has it."""
+        if self.audio_cache is None or self.player is None:
+            return False
+        path = self.audio_cache.get(text, self.voice_settings)
+        if path is None:
+            return False
+        try:
+            seconds = self.player.play(self.audio_cache.extract(path, self._scratch))
+        except Exception as e:
+            logger.debug(f"Cached audio could not be played, speaking live: {e}")
+            return False
+        self._playing_until = time.monotonic() + seconds
+        self._emit(EVENT_START, utterance_id)
+        return True
+
+    def _say(self, engine, utterance_id, text):
+        self._current = utterance_id
+        if self._play_cached(utterance_id, text):
+            return
+        if engine is None:
+            self._current = None
+            self._emit(EVENT_ERROR, utterance_id)
+            return
+        try:
+            engine.say(text, utterance_id)
+        except Exception as e:
+            logger.error(f"Speech failed: {e}")
+            self._current = None
+            self._emit(EVENT_ERROR, utterance_id)
+
+    def _render_next(self, engine):
+        with self._lock:
+            text, on_done = self._renders.popleft()
+            latest = self._latest
+        ok = False
+        yielded = False
+        fd, wav_path = tempfile.mkstemp(prefix='factdari-render-', suffix='.wav')
+        os.close(fd)
+        try:
+            engine.save_to_file(text, wav_path, 'render')
+            # Some drivers write the file synchronously, others while the loop runs
+            deadline = time.monotonic() + self.render_timeout
+            while engine.isBusy() or os.path.getsize(wav_path) == 0:
+                if self._latest != latest or self._closing:
+                    # A speak/stop/close is waiting on this thread; render the text later
+                    yielded = True
+                    try:
+                        engine.stop()
+                    except Exception as e:
+                        logger.debug(f"Render stop failed: {e}")
+                    with self._lock:
+                        self._renders.appendleft((text, on_done))
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError("render timed out")
+                engine.iterate()
+                time.sleep(self.poll_seconds)
+            if not yielded:
+                self.audio_cache.store(text, self.voice_settings, wav_path)
+                ok = True
+        except Exception as e:
+            logger.error(f"Could not render speech to the audio cache: {e}")
+        finally:
+            if not yielded:
+                with self._lock:
+                    self._render_pending.discard(text)
+            try:
+                os.remove(wav_path)
+            except OSError:
+                pass
+        if yielded:
+            return
+        if on_done is not None:
+            try:
+                on_done(ok)
+            except Exception as e:
+                logger.error(f"Render callback failed: {e}")
+
+    def _run(self):
+        try:
+            engine = self._open_engine()
+        except Exception as e:
+            logger.error(f"Could not start text-to-speech engine: {e}")
+            engine = None
+            self._failed = True
+        self._ready.set()
+        while True:
+            busy = self._current is not None
+            try:
+                # Block while idle; while speaking (or with renders waiting) wake up often
+                command, utterance_id, text = self._queue.get(
+                    timeout=self.poll_seconds if busy or self._renders else None
+                )
+            except queue.Empty:
+                command = None
+            if command == 'close':
+                break
+            if command in ('say', 'stop') and utterance_id >= self._latest:
+                self._interrupt(engine)
+                if command == 'say':
+                    self._say(engine, utterance_id, text)
+            if self._playing_until is not None:
+                if time.monotonic() >= self._playing_until:
+                    utterance_id, self._current, self._playing_until = self._current, None, None
+                    self._emit(EVENT_END, utterance_id)
+            elif engine is not None and self._current is not None:
+                try:
+                    engine.iterate()
+                except Exception as e:
+                    logger.error(f"Speech engine loop failed: {e}")
+                    utterance_id, self._current = self._current, None
+                    self._emit(EVENT_ERROR, utterance_id)
+            if self._current is None and self._renders and self._queue.empty():
+                if engine is None:
+                    with self._lock:
+                        self._renders.clear()
+                        self._render_pending.clear()
+                else:
+                    self._render_next(engine)
+        self._interrupt(engine)
+        if engine is not None:
+            try:
+                engine.endLoop()
+            except Exception:
+                pass
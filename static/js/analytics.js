@@ -1189,6 +1189,7 @@
 
         // Question Analytics
         renderQuestionMetrics(data.question_summary, data.avg_question_reading_time, data.questions_generated_today);
+        renderQuestionPregenProgress(data.question_pregen);
         renderQuestionsGeneratedTimeline('questions_generated_timeline', 'questions-generated-timeline', data.questions_generated_timeline);
         pieChart('questions_by_category', 'questions-by-category', data.questions_by_category);
         pieChart('facts_question_coverage', 'facts-question-coverage', data.facts_question_coverage);
@@ -2724,6 +2725,13 @@
     setText('#avg-ai-latency', avgLatency > 0 ? `${Math.round(avgLatency)}ms` : '--');
     setText('#ai-success-rate', `${successRate}%`);
 
+    // Explanation cache (hits are not counted as AI calls above)
+    const cacheHits = summary.CacheHits || 0;
+    const cacheHitRate = parseFloat(summary.CacheHitRate || 0);
+    const costSaved = convertCurrency(parseFloat(summary.CostSaved || 0), currentCurrency);
+    setText('#ai-cache-hit-rate', cacheHits > 0 ? `${cacheHitRate.toFixed(1)}%` : '--%');
+    setText('#ai-cost-saved', formatCurrency(costSaved, currentCurrency));
+
     // Reading time stats
     setText('#avg-ai-reading-time', avgReadingTime > 0 ? `${Math.round(avgReadingTime)}s` : '--');
     setText('#min-ai-reading-time', minReadingTime > 0 ? `${Math.round(minReadingTime)}s` : '--');
@@ -3489,6 +3497,18 @@
       description: 'The percentage of AI API calls that completed successfully across all operations.',
       formula: 'SELECT (SUM(CASE WHEN Status = \'SUCCESS\' THEN 1 ELSE 0 END) * 100.0 / COUNT(*)) FROM AIUsageLogs WHERE ProfileID = ?'
     },
+    'ai-cache-hit-rate': {
+      icon: '♻️',
+      title: 'Cache Hit Rate',
+      description: 'The percentage of AI explanation requests answered from the explanation cache instead of a new paid call. Cache hits are excluded from the other AI call metrics.',
+      formula: 'SELECT SUM(CASE WHEN OperationType = \'EXPLANATION_CACHE_HIT\' THEN 1 ELSE 0 END) * 100.0 / COUNT(*) FROM AIUsageLogs WHERE ProfileID = ? AND OperationType IN (\'EXPLANATION\', \'EXPLANATION_CACHE_HIT\')'
+    },
+    'ai-cost-saved': {
+      icon: '💰',
+      title: 'Cost Saved',
+      description: 'What the cached explanations would have cost as new calls: the cost of the original call, counted once per reuse.',
+      formula: 'SELECT SUM(CostSaved) FROM AIUsageLogs WHERE ProfileID = ? AND OperationType = \'EXPLANATION_CACHE_HIT\''
+    },
     'total-questions': {
       icon: '❓',
       title: 'Total Questions',
@@ -3524,6 +3544,18 @@
       title: 'Generated Today',
       description: 'The number of questions generated today.',
       formula: 'SELECT COUNT(*) FROM Questions q JOIN Facts f ON q.FactID = f.FactID WHERE CONVERT(date, q.GeneratedAt) = CONVERT(date, dbo.LondonNow()) AND f.CreatedBy = ?'
+    },
+    'pregen-pending': {
+      icon: '⏳',
+      title: 'Awaiting Questions',
+      description: 'Facts the background generator still has to cover: facts with no questions, plus facts whose question set is about to be refreshed (QuestionsRefreshCountdown at or below the refresh threshold).',
+      formula: 'SELECT COUNT(*) FROM Facts f WHERE f.CreatedBy = ? AND (NOT EXISTS (SELECT 1 FROM Questions q WHERE q.FactID = f.FactID AND q.Status = \'SUCCESS\') OR f.QuestionsRefreshCountdown <= threshold)'
+    },
+    'pregen-budget-used': {
+      icon: '🧮',
+      title: 'Budget Used Today',
+      description: 'How much of today\'s question generation budget is spent (the larger of the token and cost shares). Background generation stops at 100% until tomorrow.',
+      formula: 'MAX(SUM(InputTokens + OutputTokens) / daily_token_budget, SUM(Cost) / daily_cost_budget) over today\'s QUESTION_GENERATION rows in AIUsageLogs'
     }
   };
 
@@ -3551,6 +3583,13 @@
     setText('#max-question-reading-time', maxReading > 0 ? `${Math.round(maxReading)}s` : '--');
   }
 
+  function renderQuestionPregenProgress(progress) {
+    const pending = (progress?.FactsWithoutQuestions || 0) + (progress?.FactsDueForRefresh || 0);
+    const usedPct = progress?.BudgetUsedPct;
+    setText('#pregen-pending', pending.toLocaleString());
+    setText('#pregen-budget-used', usedPct === null || usedPct === undefined ? '--' : `${parseFloat(usedPct).toFixed(0)}%`);
+  }
+
   function renderQuestionsGeneratedTimeline(key, elementId, payload) {
     const canvas = qs(`#${elementId}`);
     if (!canvas || !payload) return;
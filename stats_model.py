@@ -0,0 +1,89 @@
+from datetime import date
+
+
+class StatsModel:
+    """In-memory counters behind the widget's status bar.
+
+    Seeded once from the database, then kept current by events from the
+    add/delete/view/XP code paths. Listeners are only told about values that
+    actually changed, so labels are not re-rendered needlessly.
+    """
+
+    def __init__(self):
+        self.total_facts = None
+        self.level_text = None
+        self.coordinates = None
+        self._seen_day = None
+        self._seen_today = set()
+        self._listeners = []
+
+    # --- Listeners ---
+    def subscribe(self, callback):
+        """Register callback(name, value), called when a value changes."""
+        self._listeners.append(callback)
+
+    def _notify(self, name, value):
+        for callback in list(self._listeners):
+            try:
+                callback(name, value)
+            except Exception:
+                pass
+
+    def _set(self, name, value):
+        if getattr(self, name) == value:
+            return False
+        setattr(self, name, value)
+        self._notify(name, value)
+        return True
+
+    # --- Seeding ---
+    def seed(self, total_facts=None, seen_today=None, day=None):
+        """Load starting values (from the database) and notify listeners."""
+        if total_facts is not None:
+            self._set('total_facts', int(total_facts))
+        if seen_today is not None:
+            self._seen_day = day or date.today()
+            self._seen_today = set(seen_today)
+            self._notify('seen_today', len(self._seen_today))
+
+    @property
+    def seen_today(self) -> int:
+        return len(self._seen_today)
+
+    # --- Events ---
+    def adjust_total_facts(self, delta: int):
+        if self.total_facts is None:
+            return
+        self._set('total_facts', max(0, self.total_facts + int(delta)))
+
+    def roll_day(self, day=None):
+        """Reset the seen-today set when the calendar day changes."""
+        day = day or date.today()
+        if self._seen_day == day:
+            return False
+        before = len(self._seen_today)
+        self._seen_day = day
+        self._seen_today = set()
+        if before:
+            self._notify('seen_today', 0)
+        return True
+
+    def record_view(self, fact_id, day=None):
+        self.roll_day(day)
+        if fact_id is None or fact_id in self._seen_today:
+            return
+        self._seen_today.add(fact_id)
+        self._notify('seen_today', len(self._seen_today))
+
+    def forget_fact(self, fact_id):
+        """A fact was deleted: drop it from the total and today's views."""
+        self.adjust_total_facts(-1)
+        if fact_id in self._seen_today:
+            self._seen_today.discard(fact_id)
+            self._notify('seen_today', len(self._seen_today))
+
+    def set_level_text(self, text):
+        self._set('level_text', text)
+
+    def set_coordinates(self, x, y):
+        self._set('coordinates', (x, y))
@@ -0,0 +1,314 @@
+import queue
+import threading
+import time
+
+import config
+
+# Set up logging
+logger = config.setup_logging('factdari.telemetry')
+
+
+class PendingId:
+    """Placeholder for an identity value the write-behind worker fills in later.
+
+    Pass it as a parameter to later writes; the worker substitutes the real id
+    because writes are applied in submission order.
+    """
+
+    __slots__ = ('value', 'failed', '_event')
+
+    def __init__(self):
+        self.value = None
+        self.failed = False
+        self._event = threading.Event()
+
+    @property
+    def resolved(self) -> bool:
+        return self._event.is_set()
+
+    def set(self, value):
+        self.value = value
+        self.failed = value is None
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """Block until the id is known (or timeout) and return it."""
+        self._event.wait(timeout)
+        return self.value
+
+    def __repr__(self):
+        state = self.value if self.resolved else 'pending'
+        return f"PendingId({state})"
+
+
+class _WriteOp:
+    __slots__ = ('sql', 'params', 'key', 'result', 'on_done')
+
+    def __init__(self, sql, params, key, result, on_done):
+        self.sql = sql
+        self.params = tuple(params or ())
+        self.key = key
+        self.result = result
+        self.on_done = on_done
+
+
+class _FlushMarker:
+    __slots__ = ('event',)
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+_STOP = object()
+
+
+class TelemetryWriter:
+    """Write-behind queue for telemetry statements (logs, counters, timings).
+
+    - ``submit`` enqueues a statement and returns immediately; statements that
+      OUTPUT an identity return a PendingId.
+    - A single worker thread drains the queue in order, coalesces keyed writes
+      (the latest write for a key wins) and sends runs of identical statements
+      with ``executemany`` and ``fast_executemany``.
+    - When the queue is full, the caller is told (``on_backpressure``) and then
+      waits for room, so writes are never dropped.
+    """
+
+    def __init__(self, pool, max_queue: int = 1000, batch_size: int = 200,
+                 flush_interval_seconds: float = 0.25, put_timeout_seconds: float = 0.05,
+                 on_backpressure=None):
+        self.pool = pool
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_seconds = max(0.0, float(flush_interval_seconds))
+        self.put_timeout_seconds = max(0.0, float(put_timeout_seconds))
+        self.on_backpressure = on_backpressure
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            'submitted': 0,
+            'written': 0,
+            'coalesced': 0,
+            'failed': 0,
+            'batches': 0,
+            'backpressure_events': 0,
+            'max_depth': 0,
+        }
+
+    @classmethod
+    def from_config(cls, pool, on_backpressure=None):
+        """Build a writer using the TELEMETRY_CONFIG settings."""
+        cfg = config.TELEMETRY_CONFIG
+        return cls(
+            pool,
+            max_queue=cfg.get('max_queue', 1000),
+            batch_size=cfg.get('batch_size', 200),
+            flush_interval_seconds=cfg.get('flush_interval_ms', 250) / 1000.0,
+            put_timeout_seconds=cfg.get('put_timeout_ms', 50) / 1000.0,
+            on_backpressure=on_backpressure,
+        )
+
+    # --- Producer side ---
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name='factdari-telemetry', daemon=True)
+                self._thread.start()
+        return self
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._stats)
+        data['depth'] = self.depth
+        return data
+
+    def _bump(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _put(self, item):
+        try:
+            self._queue.put(item, timeout=self.put_timeout_seconds)
+        except queue.Full:
+            self._bump('backpressure_events')
+            depth = self.depth
+            logger.warning(f"Telemetry queue full ({depth} pending); waiting for the database")
+            if self.on_backpressure:
+                try:
+                    self.on_backpressure(depth)
+                except Exception:
+                    pass
+            self._queue.put(item)
+        depth = self.depth
+        with self._lock:
+            if depth > self._stats['max_depth']:
+                self._stats['max_depth'] = depth
+
+    def submit(self, sql, params=None, key=None, returns_id=False, on_done=None):
+        """Queue a write. Returns a PendingId when ``returns_id`` is set, else True.
+
+        ``key`` marks writes that overwrite earlier queued writes with the same key.
+        ``on_done`` is called on the worker thread with the fetched row (for
+        ``returns_id``) or True/False once the write was applied.
+        """
+        if self._closed:
+            raise RuntimeError("Telemetry writer is closed")
+        result = PendingId() if returns_id else None
+        self._put(_WriteOp(sql, params, key, result, on_done))
+        self._bump('submitted')
+        return result if returns_id else True
+
+    def flush(self, timeout=None) -> bool:
+        """Wait until everything submitted so far has been written."""
+        if self._thread is None or not self._thread.is_alive():
+            return self.depth == 0
+        marker = _FlushMarker()
+        self._put(marker)
+        return marker.event.wait(timeout)
+
+    def close(self, timeout=None):
+        """Flush pending writes and stop the worker thread."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=1.0)
+            except queue.Full:
+                pass
+            thread.join(timeout if timeout is not None else 5.0)
+
+    # --- Worker side ---
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            items = [item]
+            # Give bursts a moment to accumulate, then drain what is queued
+            if item is not _STOP and not isinstance(item, _FlushMarker) and self.flush_interval_seconds:
+                time.sleep(self.flush_interval_seconds)
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            ops = []
+            markers = []
+            for it in items:
+                if it is _STOP:
+                    stop = True
+                elif isinstance(it, _FlushMarker):
+                    markers.append(it)
+                else:
+                    ops.append(it)
+            if ops:
+                try:
+                    self._write_batch(ops)
+                except Exception as e:
+                    logger.error(f"Telemetry batch failed: {e}")
+            for m in markers:
+                m.event.set()
+            if stop:
+                return
+
+    def _coalesce(self, ops):
+        """Drop queued keyed writes that a later write with the same key replaces."""
+        last_index = {}
+        for i, op in enumerate(ops):
+            if op.key is not None:
+                last_index[op.key] = i
+        kept = [op for i, op in enumerate(ops) if op.key is None or last_index[op.key] == i]
+        dropped = len(ops) - len(kept)
+        if dropped:
+            self._bump('coalesced', dropped)
+        return kept
+
+    @staticmethod
+    def _resolve(params):
+        """Substitute PendingId values (None if the write that owned them failed)."""
+        return tuple(p.value if isinstance(p, PendingId) else p for p in params)
+
+    def _groups(self, ops):
+        """Split ops into runs that can share one executemany call."""
+        group = []
+        for op in ops:
+            if op.result is not None:
+                if group:
+                    yield group
+                    group = []
+                yield [op]
+                continue
+            if group and group[0].sql != op.sql:
+                yield group
+                group = []
+            group.append(op)
+        if group:
+            yield group
+
+    def _write_batch(self, ops):
+        ops = self._coalesce(ops)
+        self._bump('batches')
+        finished = set()
+        try:
+            # No automatic retry here: a replay could duplicate rows already written
+            with self.pool.connection() as conn:
+                for group in self._groups(ops):
+                    self._write_group(conn, group, finished)
+        except Exception as e:
+            logger.error(f"Telemetry batch could not be written: {e}")
+            for op in ops:
+                if id(op) not in finished:
+                    self._bump('failed')
+                    self._finish(op, False, finished=finished)
+
+    def _finish(self, op, ok, row=None, finished=None):
+        if finished is not None:
+            finished.add(id(op))
+        if op.result is not None:
+            op.result.set(row[0] if ok and row else None)
+        if op.on_done:
+            try:
+                op.on_done(row if op.result is not None else ok)
+            except Exception as e:
+                logger.error(f"Telemetry callback failed: {e}")
+
+    def _write_group(self, conn, group, finished):
+        resolved = [(op, self._resolve(op.params)) for op in group]
+        row = None
+        try:
+            with conn.cursor() as cursor:
+                if len(resolved) == 1:
+                    op, params = resolved[0]
+                    cursor.execute(op.sql, params)
+                    if op.result is not None:
+                        row = cursor.fetchone()
+                else:
+                    cursor.fast_executemany = True
+                    cursor.executemany(resolved[0][0].sql, [p for _, p in resolved])
+            conn.commit()
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            if len(resolved) > 1:
+                # Retry one by one so a single bad row does not sink the whole run
+                for op in group:
+                    self._write_group(conn, [op], finished)
+                return
+            logger.error(f"Telemetry write failed: {e}")
+            self._bump('failed', len(resolved))
+            for op, _ in resolved:
+                self._finish(op, False, finished=finished)
+            return
+        self._bump('written', len(resolved))
+        for op, _ in resolved:
+            self._finish(op, True, row=row, finished=finished)
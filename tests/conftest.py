@@ -45,6 +45,23 @@ def disable_rate_limiting():
     yield
 
 
+@pytest.fixture
+def fake_together():
+    """Local Together AI endpoint (fake_together.FakeTogetherServer); yields (server, url).
+
+    Set server.reply_chunks/usage/statuses, or server.responder(body) -> (content, usage)
+    to build replies from the request.
+    """
+    from fake_together import FakeTogetherServer
+
+    server = FakeTogetherServer(
+        reply_chunks=["ok"],
+        usage={"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    ).start()
+    yield server, server.url
+    server.stop()
+
+
 @pytest.fixture
 def mock_env_vars(monkeypatch):
     """Set up mock environment variables for testing."""
@@ -0,0 +1,111 @@
+"""
+Unit tests for ai_client.py (keep-alive session, retries, timing and SSE streaming).
+The fake_together fixture (conftest.py) stands in for Together AI.
+"""
+from unittest.mock import MagicMock
+
+from ai_client import AIClient, iter_sse
+
+
+class TestAIClient:
+    """Tests for connection reuse, retry/backoff and timing."""
+
+    def test_connection_is_reused_between_calls(self, fake_together):
+        server, url = fake_together
+        client = AIClient(timeout=5, backoff_factor=0)
+
+        for _ in range(3):
+            resp, timing = client.post(url, json={"x": 1}, api_key="key")
+            assert resp.status_code == 200
+
+        assert len(set(server.client_ports)) == 1
+        assert timing["connect_ms"] == 0
+        assert server.auth == ["Bearer key"] * 3
+        client.close()
+
+    def test_timing_is_reported(self, fake_together):
+        _, url = fake_together
+        client = AIClient(timeout=5)
+
+        resp, timing = client.post(url, json={})
+
+        assert resp.json()["choices"][0]["message"]["content"] == "ok"
+        assert set(timing) == {"connect_ms", "ttfb_ms", "total_ms"}
+        assert 0 <= timing["ttfb_ms"] <= timing["total_ms"]
+        assert client.last_timing == timing
+        client.close()
+
+    def test_retries_overloaded_responses(self, fake_together):
+        server, url = fake_together
+        server.statuses = [503, 429]
+        client = AIClient(timeout=5, max_retries=2, backoff_factor=0)
+
+        resp, _ = client.post(url, json={})
+
+        assert resp.status_code == 200
+        assert len(server.client_ports) == 3
+        client.close()
+
+    def test_gives_up_after_max_retries(self, fake_together):
+        server, url = fake_together
+        server.statuses = [503, 503, 503]
+        client = AIClient(timeout=5, max_retries=1, backoff_factor=0)
+
+        resp, _ = client.post(url, json={})
+
+        assert resp.status_code == 503
+        assert len(server.client_ports) == 2
+        client.close()
+
+
+class TestStreaming:
+    """Tests for SSE parsing and stream_chat."""
+
+    def test_stream_chat_delivers_deltas_and_usage(self, fake_together):
+        server, url = fake_together
+        server.reply_chunks = ["Water ", "boils ", "at 100C."]
+        client = AIClient(timeout=5)
+        deltas = []
+
+        resp, text, usage, timing = client.stream_chat(url, json={"model": "m"}, api_key="key", on_delta=deltas.append)
+
+        assert resp.status_code == 200
+        assert deltas == ["Water ", "boils ", "at 100C."]
+        assert text == "Water boils at 100C."
+        assert usage["completion_tokens"] == 5
+        assert server.requests[0]["stream"] is True
+        assert 0 <= timing["ttft_ms"] <= timing["total_ms"]
+        client.close()
+
+    def test_stream_connection_is_reused(self, fake_together):
+        server, url = fake_together
+        client = AIClient(timeout=5)
+
+        client.stream_chat(url, json={})
+        client.stream_chat(url, json={})
+
+        assert len(set(server.client_ports)) == 1
+        client.close()
+
+    def test_stream_error_status_returns_no_text(self, fake_together):
+        server, url = fake_together
+        server.statuses = [400]
+        client = AIClient(timeout=5, max_retries=0)
+
+        resp, text, _, timing = client.stream_chat(url, json={})
+
+        assert resp.status_code == 400
+        assert text == "" and timing["ttft_ms"] is None
+        client.close()
+
+    def test_iter_sse_skips_comments_and_stops_at_done(self):
+        resp = MagicMock()
+        resp.iter_lines.return_value = iter([
+            ": keep-alive", "",
+            'data: {"a": 1}', "",
+            "event: ping", 'data: {"b":', 'data: 2}', "",
+            "data: [DONE]", "",
+            'data: {"c": 3}', "",
+        ])
+
+        assert list(iter_sse(resp)) == [{"a": 1}, {"b": 2}]
@@ -0,0 +1,252 @@
+"""
+Unit tests for ai_engine.py (priority scheduling, per-operation limits,
+cancellation and single-flight coalescing of AI jobs).
+"""
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from ai_engine import (
+    AIEngine, AIJob, Cancelled, SingleFlight,
+    PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, PRIORITY_VIEW,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = AIEngine(limits={'QUESTION_GENERATION': 1}, workers=1).start()
+    yield engine
+    engine.close(timeout=5)
+
+
+def blocker(engine, op='EXPLANATION'):
+    """Submit a job that holds a worker until the returned event is set."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def work(job):
+        started.set()
+        release.wait(5)
+    job = engine.submit(op, work, PRIORITY_INTERACTIVE)
+    assert started.wait(5)
+    return job, release
+
+
+class TestAIJob:
+    """Tests for running, delivering and cancelling a single job."""
+
+    def test_run_delivers_result_through_deliver(self):
+        delivered = []
+        results = []
+        job = AIJob('EXPLANATION', lambda job: 42, on_done=results.append,
+                    deliver=lambda fn: delivered.append(fn))
+
+        job.run()
+
+        assert job.result(1) == 42
+        assert results == []
+        delivered[0]()
+        assert results == [42]
+
+    def test_errors_go_to_on_error(self):
+        errors = []
+
+        def fail(job):
+            raise ValueError("bad reply")
+        job = AIJob('EXPLANATION', fail, on_error=errors.append)
+
+        job.run()
+
+        assert isinstance(errors[0], ValueError)
+        with pytest.raises(ValueError):
+            job.result(1)
+
+    def test_cancelled_job_delivers_nothing(self):
+        results = []
+        job = AIJob('EXPLANATION', lambda job: job.check(), on_done=results.append)
+
+        assert job.cancel() is True
+        assert job.cancel() is False
+        job.run()
+
+        assert results == [] and not job.started
+        with pytest.raises(CancelledError):
+            job.result(1)
+
+    def test_check_raises_once_cancelled(self):
+        job = AIJob('EXPLANATION', lambda job: None)
+        job.check()
+        job.cancel()
+        with pytest.raises(Cancelled):
+            job.check()
+
+
+class TestSingleFlight:
+    """Tests for coalescing jobs that share a key."""
+
+    def make_job(self, calls, priority=PRIORITY_BACKGROUND):
+        def build():
+            calls.append(1)
+            return AIJob('QUESTION_GENERATION', lambda job: [1, 2], priority)
+        return build
+
+    def test_concurrent_callers_share_one_job(self):
+        flights = SingleFlight()
+        calls = []
+        results = []
+
+        job, _, created = flights.join((7, 'QUESTION_GENERATION', 'abc'), self.make_job(calls), on_done=results.append)
+        again, _, joined_created = flights.join((7, 'QUESTION_GENERATION', 'abc'), self.make_job(calls), on_done=results.append)
+        other, _, _ = flights.join((7, 'QUESTION_GENERATION', 'def'), self.make_job(calls))
+
+        assert job is again and other is not job
+        assert created and not joined_created
+        assert len(calls) == 2
+        job.run()
+        assert results == [[1, 2], [1, 2]]
+        assert flights.find(lambda key: key[2] == 'abc') == []
+
+    def test_finished_key_starts_a_new_job(self):
+        flights = SingleFlight()
+        calls = []
+        job, _, _ = flights.join('key', self.make_job(calls))
+        job.run()
+
+        again, _, created = flights.join('key', self.make_job(calls))
+
+        assert created and again is not job
+
+    def test_higher_priority_joiner_promotes_job(self):
+        promoted = []
+        flights = SingleFlight(promote=lambda job, priority: promoted.append(priority))
+        flights.join('key', self.make_job([]))
+
+        flights.join('key', self.make_job([]), priority=PRIORITY_BACKGROUND)
+        flights.join('key', self.make_job([]), priority=PRIORITY_VIEW)
+
+        assert promoted == [PRIORITY_VIEW]
+
+    def test_job_is_cancelled_when_the_last_listener_leaves(self):
+        flights = SingleFlight()
+        results = []
+        job, first, _ = flights.join('key', self.make_job([]), on_done=results.append)
+        _, second, _ = flights.join('key', self.make_job([]), on_done=results.append)
+
+        flights.leave(job, first)
+        assert not job.cancelled
+        flights.leave(job, second)
+        assert job.cancelled
+
+    def test_started_job_can_be_left_running(self):
+        flights = SingleFlight()
+        results = []
+        job, listener, _ = flights.join('key', self.make_job([]), on_done=results.append)
+        _, waiting, _ = flights.join('key', self.make_job([]), on_done=results.append)
+        job.started = True
+
+        flights.leave(job, listener, cancel_running=False)
+        flights.leave(job, waiting, cancel_running=False)
+        job.run()
+
+        assert not job.cancelled and job.result(1) == [1, 2]
+        assert results == []
+
+    def test_listener_added_after_finish_gets_result(self):
+        job = AIJob('EXPLANATION', lambda job: 'text')
+        job.run()
+        results = []
+
+        job.listen(results.append)
+
+        assert results == ['text']
+
+
+class TestAIEngine:
+    """Tests for priority order, limits and cancellation on the loop thread."""
+
+    def test_higher_priority_runs_first(self, engine):
+        order = []
+        held, release = blocker(engine)
+        low = engine.submit('QUESTION_GENERATION', lambda job: order.append('background'), PRIORITY_BACKGROUND)
+        high = engine.submit('EXPLANATION', lambda job: order.append('explanation'), PRIORITY_INTERACTIVE)
+        mid = engine.submit('QUESTION_GENERATION', lambda job: order.append('view'), PRIORITY_VIEW)
+
+        release.set()
+        for job in (held, low, high, mid):
+            job.result(5)
+
+        assert order == ['explanation', 'view', 'background']
+
+    def test_operation_limit_lets_other_operations_through(self):
+        engine = AIEngine(limits={'QUESTION_GENERATION': 1}, workers=2).start()
+        try:
+            held, release = blocker(engine, op='QUESTION_GENERATION')
+            queued = engine.submit('QUESTION_GENERATION', lambda job: 'q', PRIORITY_VIEW)
+            other = engine.submit('EXPLANATION', lambda job: 'e', PRIORITY_BACKGROUND)
+
+            assert other.result(5) == 'e'
+            assert not queued.started
+            assert engine.stats()['running'].get('QUESTION_GENERATION') == 1
+
+            release.set()
+            assert queued.result(5) == 'q'
+        finally:
+            engine.close(timeout=5)
+
+    def test_promote_moves_queued_job_ahead(self, engine):
+        order = []
+        held, release = blocker(engine)
+        first = engine.submit('QUESTION_GENERATION', lambda job: order.append('first'), PRIORITY_BACKGROUND)
+        second = engine.submit('QUESTION_GENERATION', lambda job: order.append('second'), PRIORITY_BACKGROUND)
+
+        engine.promote(second, PRIORITY_VIEW)
+        release.set()
+        for job in (held, first, second):
+            job.result(5)
+
+        assert order == ['second', 'first']
+
+    def test_cancelled_queued_job_never_runs(self, engine):
+        ran = []
+        held, release = blocker(engine)
+        job = engine.submit('QUESTION_GENERATION', lambda job: ran.append(1))
+
+        job.cancel()
+        assert engine.stats()['queued'] == 0
+        release.set()
+        held.result(5)
+        follow_up = engine.submit('EXPLANATION', lambda job: 'done')
+
+        assert follow_up.result(5) == 'done'
+        assert ran == []
+
+    def test_cancelling_running_job_stops_it_at_next_check(self, engine):
+        results = []
+        started = threading.Event()
+        stopped = threading.Event()
+
+        def stream(job):
+            started.set()
+            try:
+                while True:
+                    job.check()
+                    stopped.wait(0.01)
+            finally:
+                stopped.set()
+        job = engine.submit('EXPLANATION', stream, on_done=results.append)
+        assert started.wait(5)
+
+        job.cancel()
+
+        assert stopped.wait(5)
+        with pytest.raises(CancelledError):
+            job.result(1)
+        assert results == []
+
+    def test_closed_engine_refuses_jobs(self):
+        engine = AIEngine().start()
+        engine.close(timeout=5)
+
+        with pytest.raises(RuntimeError):
+            engine.submit('EXPLANATION', lambda job: None)
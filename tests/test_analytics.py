@@ -26,6 +26,7 @@ class TestFlaskApp:
             rules = [rule.rule for rule in app.url_map.iter_rules()]
             assert '/' in rules
             assert '/api/chart-data' in rules
+            assert '/api/search' in rules
 
 
 class TestIndexRoute:
@@ -101,6 +102,80 @@ class TestChartDataRoute:
         assert response.status_code == 200
 
 
+class TestSearchRoute:
+    """Tests for the full-text search API route."""
+
+    @patch('analytics_factdari.fetch_query')
+    @patch('analytics_factdari.get_default_profile_id')
+    @patch('analytics_factdari.get_search_index')
+    def test_search_returns_ranked_results(self, mock_index, mock_profile, mock_fetch):
+        mock_index.return_value.search.return_value = [(2, 3.5), (7, 1.25)]
+        mock_profile.return_value = 1
+        mock_fetch.return_value = [
+            {'FactID': 7, 'Content': 'Second', 'CategoryName': 'Science'},
+            {'FactID': 2, 'Content': 'First', 'CategoryName': 'Science'},
+        ]
+
+        from analytics_factdari import app
+        response = app.test_client().get('/api/search?q=light')
+
+        assert response.status_code == 200
+        assert [r['FactID'] for r in response.get_json()['results']] == [2, 7]
+        assert 'LIKE' not in mock_fetch.call_args[0][0]
+
+    @patch('analytics_factdari.get_search_index')
+    def test_empty_query_skips_index(self, mock_index):
+        from analytics_factdari import app
+        response = app.test_client().get('/api/search?q=')
+
+        assert response.get_json()['results'] == []
+        mock_index.assert_not_called()
+
+
+class TestExplanationCacheStats:
+    """Tests for explanation cache hit rate and savings."""
+
+    @patch('analytics_factdari.fetch_query')
+    def test_hit_rate_and_savings(self, mock_fetch):
+        mock_fetch.return_value = [{'CacheHits': 3, 'ExplanationRequests': 4, 'CostSaved': 0.0012}]
+
+        from analytics_factdari import fetch_explanation_cache_stats
+        result = fetch_explanation_cache_stats(1)
+
+        assert result == {'CacheHits': 3, 'CacheHitRate': 75.0, 'CostSaved': 0.0012}
+
+    @patch('analytics_factdari.fetch_query')
+    def test_old_schema_returns_empty(self, mock_fetch):
+        mock_fetch.side_effect = Exception("Invalid column name 'CostSaved'")
+
+        from analytics_factdari import fetch_explanation_cache_stats
+        assert fetch_explanation_cache_stats(1) == {}
+
+
+class TestQuestionPregenProgress:
+    """Tests for background question generation progress."""
+
+    @patch('analytics_factdari.fetch_query')
+    def test_budget_share_uses_larger_of_tokens_and_cost(self, mock_fetch):
+        mock_fetch.return_value = [{'FactsWithoutQuestions': 4, 'FactsDueForRefresh': 2, 'TokensToday': 10000, 'CostToday': 0.2}]
+
+        from analytics_factdari import fetch_question_pregen_progress, config
+        with patch.dict(config.QUESTION_PREGEN_CONFIG, {'daily_token_budget': 50000, 'daily_cost_budget': 0.25}):
+            result = fetch_question_pregen_progress(1)
+
+        assert result['FactsWithoutQuestions'] == 4
+        assert result['FactsDueForRefresh'] == 2
+        assert result['BudgetUsedPct'] == 80.0
+
+    @patch('analytics_factdari.fetch_query')
+    def test_no_budget_reports_none(self, mock_fetch):
+        mock_fetch.return_value = [{'FactsWithoutQuestions': 0, 'FactsDueForRefresh': 0, 'TokensToday': 0, 'CostToday': 0}]
+
+        from analytics_factdari import fetch_question_pregen_progress, config
+        with patch.dict(config.QUESTION_PREGEN_CONFIG, {'daily_token_budget': 0, 'daily_cost_budget': 0}):
+            assert fetch_question_pregen_progress(1)['BudgetUsedPct'] is None
+
+
 class TestFetchQuery:
     """Tests for the fetch_query function."""
 
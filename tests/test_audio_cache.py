@@ -0,0 +1,75 @@
+"""
+Unit tests for audio_cache.py (size-bounded on-disk LRU of rendered speech).
+"""
+import os
+
+from audio_cache import AudioCache
+
+VOICE = ('', 0, 1.0)
+
+
+def write_wav(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))  # random bytes barely compress
+    return str(path)
+
+
+class TestAudioCache:
+    """Tests for storing, reading, evicting and invalidating audio."""
+
+    def test_store_and_extract_round_trip(self, tmp_path):
+        cache = AudioCache(str(tmp_path / "cache"))
+        wav = write_wav(tmp_path, "in.wav", 1000)
+
+        stored = cache.store("Fact text", VOICE, wav)
+
+        assert stored.endswith(".wav.gz")
+        assert cache.get("Fact text", VOICE) == stored
+        assert cache.get("Fact  text ", VOICE) == stored  # whitespace-normalised
+        out = AudioCache.extract(stored, str(tmp_path / "out.wav"))
+        assert open(out, "rb").read() == open(wav, "rb").read()
+
+    def test_voice_settings_are_part_of_the_key(self, tmp_path):
+        cache = AudioCache(str(tmp_path / "cache"))
+        cache.store("Fact", VOICE, write_wav(tmp_path, "in.wav", 100))
+
+        assert cache.has("Fact", VOICE)
+        assert not cache.has("Fact", ('', 180, 1.0))
+        assert cache.get("Fact", ('', 180, 1.0)) is None
+
+    def test_least_recently_played_is_evicted(self, tmp_path):
+        cache = AudioCache(str(tmp_path / "cache"), max_bytes=2500)
+        for text in ("A", "B"):
+            cache.store(text, VOICE, write_wav(tmp_path, "in.wav", 1000))
+        cache.get("A", VOICE)
+
+        cache.store("C", VOICE, write_wav(tmp_path, "in.wav", 1000))
+
+        assert cache.has("A", VOICE) and cache.has("C", VOICE)
+        assert not cache.has("B", VOICE)
+        assert cache.size_bytes <= 2500
+        assert len(os.listdir(tmp_path / "cache")) == 2
+
+    def test_invalidate_drops_every_voice(self, tmp_path):
+        cache = AudioCache(str(tmp_path / "cache"))
+        cache.store("Old text", VOICE, write_wav(tmp_path, "in.wav", 100))
+        cache.store("Old text", ('', 180, 1.0), write_wav(tmp_path, "in.wav", 100))
+        cache.store("Other", VOICE, write_wav(tmp_path, "in.wav", 100))
+
+        assert cache.invalidate("Old text") == 2
+
+        assert len(cache) == 1 and cache.has("Other", VOICE)
+
+    def test_index_and_recency_survive_restart(self, tmp_path):
+        directory = str(tmp_path / "cache")
+        cache = AudioCache(directory)
+        first = cache.store("A", VOICE, write_wav(tmp_path, "in.wav", 1000))
+        second = cache.store("B", VOICE, write_wav(tmp_path, "in.wav", 1000))
+        os.utime(first, (100, 100))
+        os.utime(second, (200, 200))
+        open(os.path.join(directory, "stale.wav.gz.tmp"), "wb").close()
+
+        reopened = AudioCache(directory, max_bytes=1500)
+
+        assert len(reopened) == 1 and reopened.has("B", VOICE)
+        assert sorted(os.listdir(directory)) == [os.path.basename(second)]
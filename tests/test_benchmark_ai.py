@@ -0,0 +1,41 @@
+"""
+Unit tests for benchmark_ai.py (AI latency benchmark against the local
+fake_together server).
+"""
+import pytest
+
+import benchmark_ai
+from fake_together import FakeTogetherServer
+
+
+def test_percentile_interpolates():
+    assert benchmark_ai.percentile([], 50) is None
+    assert benchmark_ai.percentile([5], 99) == 5
+    assert benchmark_ai.percentile([1, 2, 3, 4], 50) == 2.5
+    assert benchmark_ai.percentile(range(101), 95) == 95
+
+
+@pytest.mark.parametrize("workload", benchmark_ai.WORKLOADS)
+def test_workload_runs_through_the_client_and_logs_usage(workload):
+    with FakeTogetherServer(chunks=3) as server:
+        app = benchmark_ai.build_app(server.url, concurrency=2)
+        result = benchmark_ai.run_workload(app, workload, requests=6, concurrency=2, batch_size=3)
+
+    assert result["requests"] == 6 and result["errors"] == 0
+    assert result["latency_ms"]["count"] == 6
+    assert result["latency_ms"]["p50"] <= result["latency_ms"]["p99"]
+    assert result["logging_ms"]["count"] == 6
+    assert result["throughput_rps"] > 0
+    assert (result["ttft_ms"]["count"] == 6) == (workload == "stream")
+    rows = app.execute_insert_return_id.__self__.rows
+    assert len(rows) == 6 and all(row[4] == "SUCCESS" for row in rows)
+
+
+def test_failed_calls_are_counted_and_logged_as_failed():
+    with FakeTogetherServer(error_rate=1.0) as server:
+        app = benchmark_ai.build_app(server.url)
+        result = benchmark_ai.run_workload(app, "questions", requests=3, concurrency=1)
+
+    assert result["errors"] == 3
+    assert [row[4] for row in app.execute_insert_return_id.__self__.rows] == ["FAILED"] * 3
+    assert "questions" in benchmark_ai.format_report([result])
@@ -0,0 +1,129 @@
+"""
+Unit tests for bulk_export.py (keyset-paged, resumable table export).
+A small in-memory fake stands in for SQL Server.
+"""
+import csv
+import gzip
+import json
+import re
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from bulk_export import Exporter
+
+
+class FakeCursor:
+    """Serves TOP (n) ... WHERE key > ? ORDER BY key pages from in-memory tables."""
+
+    def __init__(self, tables, fail_after=None):
+        self.tables = tables
+        self.fail_after = fail_after
+        self.executed = []
+        self.description = None
+        self._rows = []
+        self._fetched = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, params))
+        top = int(re.search(r"TOP \((\d+)\)", sql).group(1))
+        table = re.search(r"FROM (\w+)", sql).group(1)
+        columns, rows = self.tables[table]
+        if params:
+            rows = [r for r in rows if r[0] > params[0]]
+        self.description = [(c,) for c in columns]
+        self._rows = rows[:top]
+
+    def fetchmany(self, size):
+        if self.fail_after is not None and self._fetched >= self.fail_after:
+            raise RuntimeError("connection lost")
+        chunk, self._rows = self._rows[:size], self._rows[size:]
+        self._fetched += len(chunk)
+        return chunk
+
+
+def make_conn(tables, fail_after=None):
+    cursor = FakeCursor(tables, fail_after)
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    return conn, cursor
+
+
+FACTS = (
+    ['FactID', 'Content', 'DateAdded'],
+    [(i, f"Fact {i}", datetime(2024, 1, i)) for i in range(1, 8)],
+)
+
+
+def read_csv_gz(path):
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        return list(csv.reader(f))
+
+
+class TestExporter:
+    """Tests for paging, formats and resume."""
+
+    def test_csv_export_pages_through_table(self, tmp_path):
+        conn, cursor = make_conn({'Facts': FACTS})
+        exporter = Exporter(conn, str(tmp_path), 'csv', page_size=3, chunk_size=2)
+
+        assert exporter.run(['Facts']) == {'Facts': 7}
+
+        rows = read_csv_gz(tmp_path / "Facts.csv.gz")
+        assert rows[0] == ['FactID', 'Content', 'DateAdded']
+        assert [r[0] for r in rows[1:]] == [str(i) for i in range(1, 8)]
+        assert rows[1][2] == "2024-01-01T00:00:00"
+        assert [params for _, params in cursor.executed] == [(), (3,), (6,)]
+
+    def test_jsonl_export(self, tmp_path):
+        conn, _ = make_conn({'Facts': FACTS})
+        Exporter(conn, str(tmp_path), 'jsonl', page_size=5).run(['Facts'])
+
+        with gzip.open(tmp_path / "Facts.jsonl.gz", 'rt', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert len(records) == 7
+        assert records[0] == {'FactID': 1, 'Content': "Fact 1", 'DateAdded': "2024-01-01T00:00:00"}
+
+    def test_resume_continues_after_last_checkpoint(self, tmp_path):
+        conn, _ = make_conn({'Facts': FACTS}, fail_after=4)
+        with pytest.raises(RuntimeError):
+            Exporter(conn, str(tmp_path), 'csv', page_size=3, chunk_size=2).run(['Facts'])
+
+        conn, cursor = make_conn({'Facts': FACTS})
+        assert Exporter(conn, str(tmp_path), 'csv', page_size=3, chunk_size=2).run(['Facts']) == {'Facts': 7}
+
+        rows = read_csv_gz(tmp_path / "Facts.csv.gz")
+        assert [r[0] for r in rows[1:]] == [str(i) for i in range(1, 8)]
+        assert cursor.executed[0][1] == (3,)
+
+    def test_finished_table_is_not_exported_again(self, tmp_path):
+        conn, _ = make_conn({'Facts': FACTS})
+        Exporter(conn, str(tmp_path), 'csv', page_size=10).run(['Facts'])
+
+        conn, cursor = make_conn({'Facts': FACTS})
+        assert Exporter(conn, str(tmp_path), 'csv').run(['Facts']) == {'Facts': 7}
+        assert cursor.executed == []
+
+    def test_no_resume_starts_over(self, tmp_path):
+        conn, _ = make_conn({'Facts': FACTS})
+        Exporter(conn, str(tmp_path), 'csv', page_size=10).run(['Facts'])
+
+        conn, cursor = make_conn({'Facts': FACTS})
+        Exporter(conn, str(tmp_path), 'csv', page_size=10, resume=False).run(['Facts'])
+
+        assert len(read_csv_gz(tmp_path / "Facts.csv.gz")) == 8
+        assert len(cursor.executed) == 1
+
+    def test_unknown_table_and_format_are_rejected(self, tmp_path):
+        conn, _ = make_conn({})
+        with pytest.raises(ValueError):
+            Exporter(conn, str(tmp_path), 'xml')
+        with pytest.raises(ValueError):
+            Exporter(conn, str(tmp_path)).run(['Secrets'])
@@ -0,0 +1,177 @@
+"""
+Unit tests for bulk_import.py (streaming readers and batched importer).
+A MagicMock connection stands in for SQL Server.
+"""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+import bulk_import
+from bulk_import import BulkImporter, content_key
+
+
+def make_conn(categories=((1, "Science"),), keys=()):
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.__exit__.return_value = None
+    cursor.fetchall.return_value = list(categories)
+    cursor.fetchmany.side_effect = [[(k,) for k in keys], []]
+    cursor.fetchone.side_effect = [(99,), (100,)]
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    return conn, cursor
+
+
+def executemany_rows(cursor):
+    rows = []
+    for call in cursor.executemany.call_args_list:
+        rows.extend(call[0][1])
+    return rows
+
+
+class TestReaders:
+    """Tests for the CSV, JSON Lines and Markdown readers."""
+
+    def test_csv(self, tmp_path):
+        path = tmp_path / "facts.csv"
+        path.write_text("Category,Content\nScience,Water boils at 100C\n,No category here\n", encoding="utf-8")
+
+        assert list(bulk_import.read_facts(str(path))) == [
+            ("Science", "Water boils at 100C"),
+            (None, "No category here"),
+        ]
+
+    def test_jsonl(self, tmp_path):
+        path = tmp_path / "facts.jsonl"
+        path.write_text(json.dumps({"category": "History", "content": "Rome was not built in a day"}) + "\n", encoding="utf-8")
+
+        assert list(bulk_import.read_facts(str(path))) == [("History", "Rome was not built in a day")]
+
+    def test_markdown(self, tmp_path):
+        path = tmp_path / "facts.md"
+        path.write_text("## Space\n- The Sun is a star\n- Mars has two moons,\n  Phobos and Deimos\n\n## Animals\n1. Octopuses have three hearts\n", encoding="utf-8")
+
+        assert list(bulk_import.read_facts(str(path))) == [
+            ("Space", "The Sun is a star"),
+            ("Space", "Mars has two moons, Phobos and Deimos"),
+            ("Animals", "Octopuses have three hearts"),
+        ]
+
+    def test_unsupported_extension(self, tmp_path):
+        try:
+            bulk_import.read_facts(str(tmp_path / "facts.xlsx"))
+        except ValueError as e:
+            assert "Unsupported" in str(e)
+        else:
+            raise AssertionError("expected ValueError")
+
+
+class TestBulkImporter:
+    """Tests for dedupe, batching and the set-based follow-up."""
+
+    def test_content_key_matches_sql_normalisation(self):
+        assert content_key("  Water\tBoils\r\nat 100C ") == "water boils  at 100c"
+
+    def test_dedupes_against_existing_and_within_file(self):
+        conn, cursor = make_conn(keys=[content_key("Known fact")])
+        importer = BulkImporter(conn, profile_id=1, batch_size=2)
+
+        result = importer.run([
+            ("Science", "Known fact"),
+            ("Science", "New fact one"),
+            ("Science", "new fact ONE"),
+            ("Science", "New fact two"),
+            ("Science", "   "),
+        ])
+
+        assert result['inserted'] == 2
+        assert result['duplicates'] == 2
+        assert result['skipped'] == 1
+        assert executemany_rows(cursor) == [(1, "New fact one", 1), (1, "New fact two", 1)]
+        assert cursor.fast_executemany is True
+
+    def test_batches_by_batch_size(self):
+        conn, cursor = make_conn()
+        importer = BulkImporter(conn, profile_id=1, batch_size=2)
+
+        importer.run([("Science", f"Fact {i}") for i in range(5)])
+
+        assert [len(c[0][1]) for c in cursor.executemany.call_args_list] == [2, 2, 1]
+
+    def test_unknown_category_is_created_once(self):
+        conn, cursor = make_conn()
+        importer = BulkImporter(conn, profile_id=1)
+
+        result = importer.run([("Space", "The Sun is a star"), ("space", "Mars has two moons")])
+
+        assert result['categories_created'] == 1
+        assert {row[0] for row in executemany_rows(cursor)} == {99}
+
+    def test_uncategorised_rows_use_default_or_are_skipped(self):
+        conn, cursor = make_conn()
+        result = BulkImporter(conn, profile_id=1, create_categories=False).run([(None, "Orphan"), ("Nope", "Missing")])
+        assert result['skipped'] == 2
+
+        conn, cursor = make_conn()
+        result = BulkImporter(conn, profile_id=1, default_category="Science").run([(None, "Orphan")])
+        assert result['inserted'] == 1
+
+    def test_follow_up_is_set_based_and_logs_session(self):
+        conn, cursor = make_conn()
+        importer = BulkImporter(conn, profile_id=1, session_id=7)
+
+        importer.run([("Science", f"Fact {i}") for i in range(3)])
+
+        statements = [c[0][0] for c in cursor.execute.call_args_list]
+        assert sum("INSERT INTO ProfileFacts" in s for s in statements) == 1
+        assert sum("INSERT INTO FactLogs" in s for s in statements) == 1
+        cursor.execute.assert_any_call(
+            "UPDATE ReviewSessions SET FactsAdded = ISNULL(FactsAdded,0) + ? WHERE SessionID = ?", (3, 7)
+        )
+
+    def test_follow_up_uses_only_captured_ids(self):
+        conn, cursor = make_conn()
+        importer = BulkImporter(conn, profile_id=1, session_id=7)
+
+        importer.run([("Science", "Fact")])
+
+        insert_sql = cursor.executemany.call_args[0][0]
+        assert "OUTPUT INSERTED.FactID INTO #ImportedFacts" in insert_sql
+        statements = [c[0][0] for c in cursor.execute.call_args_list]
+        follow_up = [s for s in statements if "INSERT INTO ProfileFacts" in s or "INSERT INTO FactLogs" in s]
+        assert all("#ImportedFacts" in s and "FactID >=" not in s for s in follow_up)
+        assert statements[-1] == "DROP TABLE #ImportedFacts"
+
+    @pytest.mark.parametrize("error, bucket", [
+        (Exception('23000', "[23000] Violation of UNIQUE KEY constraint (2627) Cannot insert duplicate key"), 'duplicates'),
+        (Exception('23000', "[23000] The INSERT statement conflicted with the FOREIGN KEY constraint (547)"), 'errors'),
+        (Exception('08S01', "[08S01] Communication link failure"), 'errors'),
+    ])
+    def test_row_fallback_counts_only_key_violations_as_duplicates(self, error, bucket):
+        conn, cursor = make_conn()
+        cursor.executemany.side_effect = Exception("batch failed")
+        inserts = []
+
+        def execute(sql, params=None):
+            if "INSERT INTO Facts" in sql:
+                inserts.append(params)
+                if len(inserts) == 1:
+                    raise error
+        cursor.execute.side_effect = execute
+
+        result = BulkImporter(conn, profile_id=1).run([("Science", "Fact one"), ("Science", "Fact two")])
+
+        assert result['inserted'] == 1
+        assert result[bucket] == 1
+        assert result['duplicates'] + result['errors'] == 1
+
+    def test_award_import_rolls_up_once(self):
+        gamify = MagicMock()
+        gamify.increment_counter.return_value = 120
+
+        bulk_import.award_import(gamify, 50)
+
+        gamify.increment_counter.assert_called_once_with('TotalAdds', 50)
+        gamify.unlock_achievements_if_needed.assert_called_once_with('adds', 120)
+        gamify.award_xp.assert_called_once()
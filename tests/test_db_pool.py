@@ -0,0 +1,176 @@
+"""
+Unit tests for db_pool.py.
+pyodbc.connect is patched so no database is required.
+"""
+import threading
+from unittest.mock import MagicMock
+
+import pyodbc
+import pytest
+
+import db_pool
+
+
+def make_connect(monkeypatch):
+    created = []
+
+    def fake_connect(conn_str):
+        conn = MagicMock(name=f"conn{len(created)}")
+        created.append(conn)
+        return conn
+
+    monkeypatch.setattr(db_pool.pyodbc, "connect", fake_connect)
+    return created
+
+
+class TestCheckout:
+    """Tests for checkout/return behaviour."""
+
+    def test_connection_is_reused(self, monkeypatch):
+        created = make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn", pool_size=2, max_overflow=0)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is second
+        assert len(created) == 1
+        first.commit.assert_called()
+
+    def test_error_rolls_back_and_keeps_healthy_connection(self, monkeypatch):
+        created = make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn", pool_size=1, max_overflow=0)
+
+        with pytest.raises(ValueError):
+            with pool.connection():
+                raise ValueError("bad statement")
+
+        created[0].rollback.assert_called()
+        assert pool.stats()['idle'] == 1
+
+    def test_overflow_connections_are_closed_on_return(self, monkeypatch):
+        created = make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn", pool_size=1, max_overflow=1)
+
+        first = pool.acquire()
+        second = pool.acquire()
+        pool.release(first)
+        pool.release(second)
+
+        assert len(created) == 2
+        assert pool.stats()['idle'] == 1
+        second.raw.close.assert_called_once()
+
+    def test_checkout_times_out_when_exhausted(self, monkeypatch):
+        make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn", pool_size=1, max_overflow=0,
+                                      checkout_timeout_seconds=0.05)
+        held = pool.acquire()
+
+        with pytest.raises(db_pool.PoolTimeoutError):
+            pool.acquire()
+
+        pool.release(held)
+        assert pool.acquire() is held
+
+    def test_threads_get_distinct_connections(self, monkeypatch):
+        created = make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn", pool_size=2, max_overflow=0)
+        seen = []
+        barrier = threading.Barrier(2)
+
+        def worker():
+            with pool.connection() as conn:
+                seen.append(conn)
+                barrier.wait(timeout=2)
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=2)
+
+        assert len(created) == 2
+        assert seen[0] is not seen[1]
+
+
+class TestHealthAndReconnect:
+    """Tests for health checks and reconnect-on-disconnect."""
+
+    def test_stale_connection_failing_ping_is_replaced(self, monkeypatch):
+        created = make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn", pool_size=1, max_overflow=0,
+                                      health_check_after_seconds=0)
+        with pool.connection():
+            pass
+        created[0].cursor.return_value.execute.side_effect = pyodbc.Error("08S01", "link failure")
+
+        with pool.connection() as conn:
+            assert conn is created[1]
+
+        created[0].close.assert_called_once()
+
+    def test_fresh_connection_is_not_pinged(self, monkeypatch):
+        created = make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn", pool_size=1, max_overflow=0,
+                                      health_check_after_seconds=0)
+
+        with pool.connection():
+            pass
+
+        created[0].cursor.assert_not_called()
+
+    def test_run_retries_once_on_disconnect(self, monkeypatch):
+        created = make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn", pool_size=1, max_overflow=0)
+        calls = []
+
+        def work(conn):
+            calls.append(conn)
+            if len(calls) == 1:
+                raise pyodbc.OperationalError("08S01", "Communication link failure")
+            return "ok"
+
+        assert pool.run(work) == "ok"
+        assert calls[0] is created[0]
+        assert calls[1] is created[1]
+        created[0].close.assert_called_once()
+
+    def test_run_does_not_retry_non_idempotent_work(self, monkeypatch):
+        created = make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn", pool_size=1, max_overflow=0)
+        work = MagicMock(side_effect=pyodbc.OperationalError("08S01", "Communication link failure"))
+
+        with pytest.raises(pyodbc.OperationalError):
+            pool.run(work, idempotent=False)
+        assert work.call_count == 1
+        created[0].close.assert_called_once()
+
+    def test_run_does_not_retry_other_errors(self, monkeypatch):
+        make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn")
+        work = MagicMock(side_effect=pyodbc.ProgrammingError("42S02", "Invalid object name"))
+
+        with pytest.raises(pyodbc.ProgrammingError):
+            pool.run(work)
+        assert work.call_count == 1
+
+    def test_is_disconnect_error(self):
+        assert db_pool.is_disconnect_error(pyodbc.Error("08S01", "x"))
+        assert db_pool.is_disconnect_error(pyodbc.Error("HY000", "Communication link failure"))
+        assert not db_pool.is_disconnect_error(pyodbc.Error("23000", "duplicate key"))
+        assert not db_pool.is_disconnect_error(ValueError("08S01"))
+
+    def test_close_rejects_new_checkouts(self, monkeypatch):
+        created = make_connect(monkeypatch)
+        pool = db_pool.ConnectionPool("dsn")
+        with pool.connection():
+            pass
+
+        pool.close()
+
+        created[0].close.assert_called_once()
+        with pytest.raises(db_pool.PoolTimeoutError):
+            pool.acquire()
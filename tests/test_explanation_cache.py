@@ -0,0 +1,104 @@
+"""
+Unit tests for explanation_cache.py (content-hash keys, in-memory LRU and the
+AIExplanationCache table). A MagicMock connection stands in for SQL Server.
+"""
+from unittest.mock import MagicMock
+
+from explanation_cache import ExplanationCache, cache_key, content_hash
+
+
+def make_run(row=None, fail=False):
+    """A ConnectionPool.run stand-in; returns (run, cursor)."""
+    cursor = MagicMock()
+    cursor.fetchone.return_value = row
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    def run(work):
+        if fail:
+            raise RuntimeError("database unavailable")
+        return work(conn)
+    return run, cursor
+
+
+class TestCacheKey:
+    """Tests for content hashing and key composition."""
+
+    def test_content_hash_ignores_surrounding_whitespace(self):
+        assert content_hash("  Water boils at 100C.\n") == content_hash("Water boils at 100C.")
+        assert content_hash("Water boils at 100C.") != content_hash("Water boils at 90C.")
+
+    def test_key_changes_with_each_component(self):
+        base = cache_key("fact", "model-a", 1, 0.7)
+
+        assert cache_key(" fact ", "model-a", 1, 0.7) == base
+        assert cache_key("other fact", "model-a", 1, 0.7) != base
+        assert cache_key("fact", "model-b", 1, 0.7) != base
+        assert cache_key("fact", "model-a", 2, 0.7) != base
+        assert cache_key("fact", "model-a", 1, 0.2) != base
+        assert len(base) == 64
+
+
+class TestExplanationCache:
+    """Tests for the memory tier, the database tier and invalidation."""
+
+    def test_memory_tier_is_lru(self):
+        cache = ExplanationCache(max_entries=2)
+        cache.put("a", 1, "A")
+        cache.put("b", 2, "B")
+        cache.get("a")
+        cache.put("c", 3, "C")
+
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+        assert cache.get("b") is None
+
+    def test_database_hit_is_promoted_to_memory(self):
+        run, cursor = make_run(row=(7, "Because...", 120, 80, 0.0004))
+        cache = ExplanationCache(run)
+
+        entry = cache.get("key")
+
+        assert entry == {'fact_id': 7, 'text': "Because...", 'input_tokens': 120, 'output_tokens': 80, 'cost': 0.0004}
+        assert "key" in cache
+        cache.get("key")
+        assert cursor.execute.call_count == 1
+
+    def test_database_miss_returns_none(self):
+        run, _ = make_run(row=None)
+        assert ExplanationCache(run).get("key") is None
+
+    def test_put_upserts_row(self):
+        run, cursor = make_run()
+        cache = ExplanationCache(run)
+
+        cache.put("key", 7, "Because...", model="m", prompt_version=1, temperature=0.7,
+                  input_tokens=120, output_tokens=80, cost=0.0004, content_sha="abc")
+
+        sql, params = cursor.execute.call_args[0]
+        assert "UPDATE AIExplanationCache" in sql and "INSERT INTO AIExplanationCache" in sql
+        assert params[5] == "key" and params[6] == "key"
+        assert cache.get("key")['text'] == "Because..."
+
+    def test_invalidate_fact_drops_memory_and_rows(self):
+        run, cursor = make_run()
+        cache = ExplanationCache(run)
+        cache.put("a", 1, "A")
+        cache.put("b", 2, "B")
+
+        cache.invalidate_fact(1)
+
+        assert "a" not in cache and "b" in cache
+        sql, params = cursor.execute.call_args[0]
+        assert "DELETE FROM AIExplanationCache" in sql
+        assert params == (1,)
+
+    def test_database_errors_are_treated_as_misses(self):
+        run, _ = make_run(fail=True)
+        cache = ExplanationCache(run)
+
+        assert cache.get("key") is None
+        cache.put("key", 1, "A")
+        cache.invalidate_fact(1)
+        assert "key" not in cache
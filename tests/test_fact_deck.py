@@ -0,0 +1,128 @@
+"""
+Unit tests for fact_deck.py (lazily loaded fact deck and in-memory filter index).
+"""
+import random
+
+from fact_deck import ContentCache, FactDeck, FactIndex
+
+
+def make_deck(n=5, cache_size=10, prefetch_size=3):
+    calls = []
+
+    def loader(ids):
+        calls.append(list(ids))
+        return {fid: f"Fact {fid}" for fid in ids}
+
+    entries = [(fid, fid % 2 == 0, False) for fid in range(1, n + 1)]
+    deck = FactDeck(entries, loader=loader, cache=ContentCache(cache_size), prefetch_size=prefetch_size)
+    return deck, calls
+
+
+class TestContentCache:
+    """Tests for the LRU content cache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = ContentCache(2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        cache.get(1)
+        cache.put(3, "c")
+
+        assert 2 not in cache
+        assert cache.get(1) == "a" and cache.get(3) == "c"
+
+    def test_missing_returns_uncached_ids_once(self):
+        cache = ContentCache(5)
+        cache.put(1, "a")
+
+        assert cache.missing([1, 2, 2, 3]) == [2, 3]
+
+
+class TestFactDeck:
+    """Tests for indexing, prefetch and shuffling."""
+
+    def test_getitem_loads_content_with_batch_prefetch(self):
+        deck, calls = make_deck()
+
+        assert deck[0] == (1, "Fact 1", False, False)
+        assert deck[1][1] == "Fact 2"
+        assert calls == [[1, 2, 3]]
+
+    def test_setitem_updates_flags_and_cached_content(self):
+        deck, calls = make_deck()
+
+        deck[0] = (1, "Edited", True, True)
+
+        assert deck[0] == (1, "Edited", True, True)
+        assert calls == []
+
+    def test_pop_drops_entry_and_cached_body(self):
+        deck, _ = make_deck()
+        deck[0]
+
+        deck.pop(0)
+
+        assert len(deck) == 4
+        assert 1 not in deck.cache
+
+    def test_shuffle_keeps_last_fact_off_the_top(self):
+        deck, _ = make_deck(n=2)
+
+        for seed in range(10):
+            deck.shuffle(avoid_first_id=deck.fact_id_at(0), rng=random.Random(seed))
+            first = deck.fact_id_at(0)
+            deck.shuffle(avoid_first_id=first, rng=random.Random(seed))
+            assert deck.fact_id_at(0) != first
+
+    def test_loader_failure_returns_empty_content(self):
+        def loader(ids):
+            raise RuntimeError("connection lost")
+
+        deck = FactDeck([(7, False, False)], loader=loader)
+
+        assert deck[0] == (7, "", False, False)
+
+
+class TestFactIndex:
+    """Tests for the in-memory filter index."""
+
+    def make_index(self):
+        return FactIndex([
+            (1, 10, "Physics", True, False),
+            (2, 10, "Physics", False, True),
+            (3, 20, "History", True, True),
+        ])
+
+    def test_header_filters(self):
+        index = self.make_index()
+
+        assert [e[0] for e in index.for_filter("All Categories")] == [1, 2, 3]
+        assert [e[0] for e in index.for_filter("Favorites")] == [1, 3]
+        assert [e[0] for e in index.for_filter("Not Known")] == [1]
+        assert [e[0] for e in index.for_filter("History")] == [3]
+
+    def test_combined_filter(self):
+        index = self.make_index()
+
+        assert index.query(category="Physics", favorite=True, known=False) == [(1, True, False)]
+
+    def test_updates_are_reflected_in_queries(self):
+        index = self.make_index()
+
+        index.set_favorite(2, True)
+        index.move(3, 10, "Physics")
+        index.remove(1)
+        index.add(4, 20, "History")
+
+        assert [e[0] for e in index.query(category="Physics", favorite=True)] == [2, 3]
+        assert [e[0] for e in index.for_filter("History")] == [4]
+
+    def test_category_rename_and_delete(self):
+        index = self.make_index()
+
+        index.rename_category(20, "World History")
+        assert [e[0] for e in index.for_filter("World History")] == [3]
+        assert index.for_filter("History") == []
+
+        index.remove_category(10)
+        assert [e[0] for e in index.for_filter("All Categories")] == [3]
@@ -4,12 +4,23 @@ These tests use stubs/mocks to avoid GUI and database dependencies.
 """
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock
+import json
+import threading
 import time
 
+import pytest
 import requests
 
 import config
 import factdari
+import search_index
+import near_duplicates
+import ai_client
+import explanation_cache
+import question_cache
+import question_pregen
+import ai_engine
+import speech
 
 
 class DummyVar:
@@ -292,6 +303,7 @@ def test_finalize_current_fact_view_uses_last_activity_on_timeout():
     app.timer_paused = False
     app.pause_started_at = None
     app.execute_update = MagicMock(return_value=True)
+    app.column_exists = MagicMock(return_value=True)
     app._award_for_elapsed = MagicMock()
 
     app.finalize_current_fact_view(timed_out=True)
@@ -303,6 +315,51 @@ def test_finalize_current_fact_view_uses_last_activity_on_timeout():
     assert app.current_fact_start_time is None
 
 
+def test_finalize_current_fact_view_queues_write_behind():
+    app = make_app()
+    pending = factdari.telemetry.PendingId()
+    app.current_fact_log_id = pending
+    app.current_fact_start_time = datetime.now() - timedelta(seconds=20)
+    app.timer_paused = False
+    app.pause_started_at = None
+    app.telemetry = MagicMock()
+    app.telemetry.submit.return_value = True
+    app.execute_update = MagicMock()
+    app.column_exists = MagicMock(return_value=True)
+    app._award_for_elapsed = MagicMock()
+
+    app.finalize_current_fact_view()
+
+    args, kwargs = app.telemetry.submit.call_args
+    assert args[1][2] is pending
+    assert kwargs["key"] == ("FactLogs.FactReadingTime", pending)
+    app.execute_update.assert_not_called()
+    assert app.current_fact_log_id is None
+
+
+def test_finalize_current_fact_view_queues_reduced_update_without_timed_out_column():
+    app = make_app()
+    app.current_fact_log_id = 123
+    app.current_fact_start_time = datetime.now() - timedelta(seconds=20)
+    app.timer_paused = False
+    app.pause_started_at = None
+    app.telemetry = MagicMock()
+    app.execute_update = MagicMock()
+    app.column_exists = MagicMock(return_value=False)
+    app._award_for_elapsed = MagicMock()
+
+    app.finalize_current_fact_view(timed_out=True)
+    app.current_fact_log_id = 124
+    app.current_fact_start_time = datetime.now()
+    app.finalize_current_fact_view()
+
+    query, params = app.telemetry.submit.call_args_list[0][0]
+    assert "TimedOut" not in query
+    assert params[1] == 123 and len(params) == 2
+    app.column_exists.assert_called_once_with('FactLogs', 'TimedOut')
+    app.execute_update.assert_not_called()
+
+
 def test_adjust_font_size_bounds():
     app = make_app()
     assert app.adjust_font_size("Short text") == 11
@@ -320,14 +377,15 @@ def test_estimate_ai_cost_typical():
     assert abs(cost - 0.00043) < 0.00001
 
 
-def test_call_together_ai_timeout_sets_failed(monkeypatch):
+def test_call_together_ai_timeout_sets_failed():
     app = make_app()
     app.ai_endpoint = "https://example.com"
     app.ai_timeout_seconds = 5
     app.ai_explanation_max_tokens = 100
     app.ai_explanation_temperature = 0.5
 
-    monkeypatch.setattr(factdari.requests, "post", MagicMock(side_effect=requests.exceptions.Timeout))
+    app.ai_client = MagicMock()
+    app.ai_client.post.side_effect = requests.exceptions.Timeout
 
     message, usage = app._call_together_ai("Fact text", "key")
 
@@ -335,14 +393,15 @@ def test_call_together_ai_timeout_sets_failed(monkeypatch):
     assert usage["status"] == "FAILED"
 
 
-def test_call_together_ai_connection_error_sets_failed(monkeypatch):
+def test_call_together_ai_connection_error_sets_failed():
     app = make_app()
     app.ai_endpoint = "https://example.com"
     app.ai_timeout_seconds = 5
     app.ai_explanation_max_tokens = 100
     app.ai_explanation_temperature = 0.5
 
-    monkeypatch.setattr(factdari.requests, "post", MagicMock(side_effect=requests.exceptions.ConnectionError))
+    app.ai_client = MagicMock()
+    app.ai_client.post.side_effect = requests.exceptions.ConnectionError
 
     message, usage = app._call_together_ai("Fact text", "key")
 
@@ -350,7 +409,7 @@ def test_call_together_ai_connection_error_sets_failed(monkeypatch):
     assert usage["status"] == "FAILED"
 
 
-def test_call_together_ai_payload_uses_v4_pro_non_think(monkeypatch):
+def test_call_together_ai_payload_uses_v4_pro_non_think():
     app = make_app()
     app.ai_endpoint = "https://example.com"
     app.ai_timeout_seconds = 5
@@ -366,39 +425,358 @@ def test_call_together_ai_payload_uses_v4_pro_non_think(monkeypatch):
         "choices": [{"message": {"content": "An explanation."}}],
         "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30},
     }
-    mock_post = MagicMock(return_value=mock_resp)
-    monkeypatch.setattr(factdari.requests, "post", mock_post)
+    app.ai_client = MagicMock()
+    app.ai_client.post.return_value = (mock_resp, {"connect_ms": 0, "ttfb_ms": 120, "total_ms": 150})
 
     message, usage = app._call_together_ai("Fact text", "key")
 
     assert message == "An explanation."
     assert usage["status"] == "SUCCESS"
-    payload = mock_post.call_args.kwargs["json"]
+    assert usage["connect_ms"] == 0 and usage["ttfb_ms"] == 120
+    payload = app.ai_client.post.call_args.kwargs["json"]
     assert payload["model"] == "deepseek-ai/DeepSeek-V4-Pro"
     assert payload["reasoning"] == {"enabled": False}
 
 
+def test_call_together_ai_streams_deltas(fake_together):
+    server, url = fake_together
+    server.reply_chunks = ["Light ", "bends ", "in water."]
+    app = make_app()
+    app.ai_endpoint = url
+    app.ai_timeout_seconds = 5
+    app.ai_explanation_max_tokens = 100
+    app.ai_explanation_temperature = 0.5
+    app.ai_client = ai_client.AIClient(timeout=5)
+    deltas = []
+
+    message, usage = app._call_together_ai("Fact text", "key", on_delta=deltas.append)
+
+    assert message == "Light bends in water."
+    assert deltas == ["Light ", "bends ", "in water."]
+    assert usage["status"] == "SUCCESS"
+    assert usage["output_tokens"] == 5
+    assert usage["ttft_ms"] is not None
+    app.ai_client.close()
+
+
+def question_responder(drop=()):
+    """Stub reply for question prompts; tokens are counted as words so prompt size shows up in usage."""
+    def respond(body):
+        system, user = body["messages"][0]["content"], body["messages"][1]["content"]
+        prompt_tokens = len(system.split()) + len(user.split())
+        if user.startswith("Facts:"):
+            ids = [line[1:line.index("]")] for line in user.splitlines()[1:]]
+            content = json.dumps({fid: [f"Q{n} about {fid}?" for n in range(3)] for fid in ids if fid not in drop})
+        else:
+            content = json.dumps(["Q0?", "Q1?", "Q2?"])
+        completion_tokens = len(content.split())
+        return content, {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens}
+    return respond
+
+
+def make_question_app(monkeypatch, url):
+    app = make_app()
+    app.ai_endpoint = url
+    app.ai_timeout_seconds = 5
+    app.ai_question_max_tokens = 100
+    app.ai_question_temperature = 0.7
+    app.ai_client = ai_client.AIClient(timeout=5)
+    app._log_ai_usage = MagicMock()
+    ids = iter(range(1000, 2000))
+    app.execute_insert_return_id = MagicMock(side_effect=lambda *a: next(ids))
+    monkeypatch.setattr(config, "get_together_api_key", lambda: "key")
+    return app
+
+
+FACTS = [(i, f"Fact number {i} says something fairly specific about the world.") for i in range(1, 6)]
+
+
+def test_batched_question_generation_costs_fewer_tokens_per_fact(monkeypatch, fake_together):
+    server, url = fake_together
+    server.responder = question_responder()
+
+    single = make_question_app(monkeypatch, url)
+    for fact_id, content in FACTS:
+        single._generate_questions_for_fact(fact_id, content)
+    single_tokens = sum(c.kwargs["input_tokens"] for c in single._log_ai_usage.call_args_list)
+
+    monkeypatch.setitem(config.AI_REQUEST_CONFIG, "question_batch_size", 5)
+    batched = make_question_app(monkeypatch, url)
+    result = batched._generate_questions_for_facts(FACTS)
+    batch_tokens = sum(c.kwargs["input_tokens"] for c in batched._log_ai_usage.call_args_list)
+
+    assert sorted(result) == [1, 2, 3, 4, 5]
+    assert len(server.requests) == 6
+    assert batched._log_ai_usage.call_count == 5
+    assert batch_tokens / 5 < single_tokens / 5 / 2
+    # Each fact's share adds back up to what the API reported
+    assert batch_tokens == server.responder(server.requests[-1])[1]["prompt_tokens"]
+    single.ai_client.close()
+    batched.ai_client.close()
+
+
+def test_batched_question_generation_falls_back_for_bad_entries(monkeypatch, fake_together):
+    server, url = fake_together
+    server.responder = question_responder(drop=("2",))
+    monkeypatch.setitem(config.AI_REQUEST_CONFIG, "question_batch_size", 3)
+    app = make_question_app(monkeypatch, url)
+
+    result = app._generate_questions_for_facts(FACTS[:3])
+
+    assert sorted(result) == [1, 2, 3]
+    assert [r["messages"][1]["content"].split(":")[0] for r in server.requests] == ["Facts", "Fact"]
+    statuses = [(c.kwargs["fact_id"], c.kwargs["status"]) for c in app._log_ai_usage.call_args_list]
+    assert statuses == [(1, "SUCCESS"), (2, "FAILED"), (2, "SUCCESS"), (3, "SUCCESS")]
+    app.ai_client.close()
+
+
+def test_split_tokens_is_proportional_and_exact():
+    assert factdari.FactDariApp._split_tokens(10, [1, 1, 1]) == [4, 3, 3]
+    assert factdari.FactDariApp._split_tokens(100, [3, 1]) == [75, 25]
+    assert factdari.FactDariApp._split_tokens(7, [0, 0]) == [4, 3]
+    assert factdari.FactDariApp._split_tokens(None, [1, 2]) == [None, None]
+
+
+class FakeText:
+    """Just enough of tk.Text to compare rendered output."""
+
+    def __init__(self):
+        self.content = ""
+
+    def config(self, **kwargs):
+        pass
+
+    def tag_configure(self, *args, **kwargs):
+        pass
+
+    def insert(self, index, text, tag=None):
+        self.content += text
+
+    def delete(self, start, end):
+        self.content = "" if start == "1.0" else self.content[:int(start)]
+
+    def index(self, index):
+        return str(len(self.content))
+
+
+def test_render_markdown_stream_matches_full_render():
+    app = make_app()
+    app.NORMAL_FONT = ("Segoe UI", 10)
+    text = "\n### Why\nLight **slows** in water,\nso it *bends*.\n\nLike a car hitting sand."
+    full = FakeText()
+    app._render_markdown_to_text(full, text)
+
+    streamed = FakeText()
+    state = {}
+    for end in range(1, len(text) + 1):
+        app._render_markdown_stream(streamed, state, text[:end])
+
+    assert streamed.content == full.content
+
+
+def test_log_ai_usage_writes_ttft_when_column_exists():
+    app = make_app()
+    app.gamify = None
+    app.get_active_profile_id = MagicMock(return_value=1)
+    app.column_exists = MagicMock(return_value=True)
+    app.execute_insert_return_id = MagicMock(return_value=5)
+
+    app._log_ai_usage(1, None, "EXPLANATION", "SUCCESS", "m", "p", 10, 5, 15, 0.001, 900, ttft_ms=120)
+
+    query, params = app.execute_insert_return_id.call_args[0]
+    assert "TimeToFirstTokenMs" in query
+    assert 120 in params
+
+
+def test_log_ai_usage_skips_ttft_on_old_schema():
+    app = make_app()
+    app.gamify = None
+    app.get_active_profile_id = MagicMock(return_value=1)
+    app.column_exists = MagicMock(return_value=False)
+    app.execute_insert_return_id = MagicMock(return_value=5)
+
+    app._log_ai_usage(1, None, "EXPLANATION", "SUCCESS", "m", "p", 10, 5, 15, 0.001, 900, ttft_ms=120)
+    app._log_ai_usage(1, None, "EXPLANATION", "SUCCESS", "m", "p", 10, 5, 15, 0.001, 900, ttft_ms=80)
+
+    assert all("TimeToFirstTokenMs" not in c[0][0] for c in app.execute_insert_return_id.call_args_list)
+    app.column_exists.assert_called_once()
+
+
+def test_log_ai_usage_writes_cost_saved():
+    app = make_app()
+    app.gamify = None
+    app.get_active_profile_id = MagicMock(return_value=1)
+    app.column_exists = MagicMock(return_value=True)
+    app.execute_insert_return_id = MagicMock(return_value=5)
+
+    app._log_ai_usage(1, None, "EXPLANATION_CACHE_HIT", "SUCCESS", "m", "p", None, None, None, 0.0, None, cost_saved=0.0004)
+
+    query, params = app.execute_insert_return_id.call_args[0]
+    assert "CostSaved" in query and "TimeToFirstTokenMs" not in query
+    assert params[-2] == 0.0004
+
+
+def make_explanation_app(cache):
+    app = make_app()
+    app.ai_model = "deepseek-ai/DeepSeek-V4-Pro"
+    app.ai_provider = "together"
+    app.ai_explanation_temperature = 0.5
+    app.explanation_cache = cache
+    app.ai_prompt_cost_per_1k = 0.001
+    app.ai_completion_cost_per_1k = 0.002
+    return app
+
+
+def test_get_explanation_serves_cache_hit_without_ai_call():
+    cache = explanation_cache.ExplanationCache()
+    app = make_explanation_app(cache)
+    cache.put(app._explanation_cache_key("Fact text"), 1, "Cached explanation.", cost=0.0004)
+    app._call_together_ai = MagicMock()
+
+    text, usage, from_cache = app._get_explanation(1, "Fact text", "key")
+
+    assert (text, from_cache) == ("Cached explanation.", True)
+    assert usage["operation_type"] == "EXPLANATION_CACHE_HIT"
+    assert usage["cost"] == 0.0 and usage["cost_saved"] == 0.0004
+    app._call_together_ai.assert_not_called()
+
+
+def test_get_explanation_stores_fresh_result():
+    cache = explanation_cache.ExplanationCache()
+    app = make_explanation_app(cache)
+    app._call_together_ai = MagicMock(return_value=(
+        "Fresh explanation.", {"status": "SUCCESS", "model": app.ai_model, "input_tokens": 100, "output_tokens": 50}
+    ))
+
+    text, usage, from_cache = app._get_explanation(1, "Fact text", "key")
+
+    assert (text, from_cache) == ("Fresh explanation.", False)
+    assert cache.get(app._explanation_cache_key(" Fact text "))["text"] == "Fresh explanation."
+
+
+def test_get_explanation_force_bypasses_cache():
+    cache = explanation_cache.ExplanationCache()
+    app = make_explanation_app(cache)
+    key = app._explanation_cache_key("Fact text")
+    cache.put(key, 1, "Old explanation.")
+    app._call_together_ai = MagicMock(return_value=("New explanation.", {"status": "SUCCESS"}))
+
+    text, _, from_cache = app._get_explanation(1, "Fact text", "key", force=True)
+
+    assert (text, from_cache) == ("New explanation.", False)
+    assert cache.get(key)["text"] == "New explanation."
+
+
+def test_failed_explanation_is_not_cached():
+    cache = explanation_cache.ExplanationCache()
+    app = make_explanation_app(cache)
+    app._call_together_ai = MagicMock(return_value=("Error: timeout", {"status": "FAILED"}))
+
+    app._get_explanation(1, "Fact text", "key")
+
+    assert len(cache) == 0
+
+
+def test_explanation_cache_key_tracks_model_and_temperature():
+    app = make_explanation_app(None)
+    key = app._explanation_cache_key("Fact text")
+
+    app.ai_explanation_temperature = 0.2
+    assert app._explanation_cache_key("Fact text") != key
+    app.ai_explanation_temperature = 0.5
+    app.ai_model = "other-model"
+    assert app._explanation_cache_key("Fact text") != key
+
+
 def test_speak_text_returns_early_on_home_page():
     app = make_app()
     app.is_home_page = True
-    app.stop_speaking = MagicMock()
+    app.speech = MagicMock()
 
     app.speak_text()
 
-    app.stop_speaking.assert_not_called()
+    app.speech.speak.assert_not_called()
 
 
-def test_stop_speaking_stops_engine_and_clears_reference():
+def test_speak_text_queues_label_text_on_speech_service():
     app = make_app()
-    engine = MagicMock()
-    app.active_tts_engine = engine
-    app.speaking_thread = MagicMock()
-    app.speaking_thread.is_alive.return_value = False
+    app.is_home_page = False
+    app.fact_label = MagicMock()
+    app.fact_label.cget.return_value = "Fact text"
+    app.speech = MagicMock()
+    app.speech.speak.return_value = 7
+
+    app.speak_text()
+
+    app.speech.speak.assert_called_once_with("Fact text")
+    assert app.speech_utterance_id == 7
+
+
+def test_stop_speaking_interrupts_without_waiting():
+    app = make_app()
+    app.speech = MagicMock()
+    app.speech_utterance_id = 3
+    app.speaker_button = MagicMock()
 
     app.stop_speaking()
 
-    engine.stop.assert_called_once()
-    assert app.active_tts_engine is None
+    app.speech.stop.assert_called_once()
+    app.speaker_button.config.assert_called_once_with(state="normal")
+    assert app.speech_utterance_id is None
+
+
+def test_speech_events_drive_speaker_button_for_latest_utterance():
+    app = make_app()
+    app.speaker_button = MagicMock()
+    app._run_on_ui = lambda func: func()
+    app.speech_utterance_id = 2
+
+    app._on_speech_event(speech.EVENT_START, 2)
+    app.speaker_button.config.assert_called_with(state="disabled")
+    app._on_speech_event(speech.EVENT_INTERRUPTED, 1)
+    app.speaker_button.config.assert_called_with(state="disabled")
+    app._on_speech_event(speech.EVENT_END, 2)
+
+    app.speaker_button.config.assert_called_with(state="normal")
+    assert app.speech_utterance_id is None
+
+
+def test_prerender_speech_queues_fact_and_question_text():
+    app = make_app()
+    app.audio_cache = MagicMock()
+    app.speech = MagicMock()
+    app.speech.render.side_effect = lambda text, on_done=None: text != "Known?"
+    app.content_cache = factdari.fact_deck.ContentCache(10)
+    app.content_cache.put(1, "Fact one")
+    app._load_fact_contents = MagicMock(return_value={2: "Fact two"})
+    app.question_cache = question_cache.QuestionCache()
+    app.question_cache.put(1, [(10, "Known?", 0), (11, "Why?", 0)])
+
+    queued = app._prerender_speech([1, 2])
+
+    app._load_fact_contents.assert_called_once_with([2])
+    assert [c.args[0] for c in app.speech.render.call_args_list] == ["Fact one", "Known?", "Why?", "Fact two"]
+    assert queued == 3
+
+
+def test_prerender_speech_is_a_no_op_without_audio_cache():
+    app = make_app()
+    app.speech = MagicMock()
+
+    assert app._prerender_speech([1]) == 0
+    app.speech.render.assert_not_called()
+
+
+def test_changed_fact_text_drops_old_audio_and_renders_new():
+    app = make_app()
+    app.audio_cache = MagicMock()
+    app.speech = MagicMock()
+
+    app._invalidate_speech_audio("Old text", "New text")
+
+    app.audio_cache.invalidate.assert_called_once_with("Old text")
+    app.speech.render.assert_called_once_with("New text")
 
 
 def test_set_static_position_applies_geometry_and_updates_coordinates():
@@ -436,28 +814,247 @@ def test_update_category_dropdown_defaults_when_missing():
     assert app.category_var.get() == "All Categories"
 
 
-def test_get_or_generate_question_blocks_duplicate_inflight(monkeypatch):
+def hold_question_generation(app, fact_id, content, priority=ai_engine.PRIORITY_BACKGROUND, func=None):
+    """Register a question generation job as in flight; returns (job, listener)."""
+    key = (fact_id, "QUESTION_GENERATION", explanation_cache.content_hash(content))
+    job, listener, _ = app._ai_flights().join(
+        key, lambda: ai_engine.AIJob("QUESTION_GENERATION", func or (lambda job: None), priority),
+        on_done=lambda _: None,
+    )
+    return job, listener
+
+
+def test_get_or_generate_question_joins_generation_in_flight(monkeypatch):
+    app = make_app()
+    app.fetch_query = MagicMock(return_value=[])
+    app.ai_flights = ai_engine.SingleFlight(promote=MagicMock())
+    job, _ = hold_question_generation(app, 42, "Fact text")
+    app.question_generation_last_attempt = {42: time.time()}
+    app.question_generation_cooldown_seconds = 60
+    app._schedule_ai_job = MagicMock()
+    app.root = MagicMock()
+
+    monkeypatch.setattr(config, "get_together_api_key", lambda: "key")
+
+    assert app._get_or_generate_question(42, "Fact text") == (None, None)
+    assert app._get_or_generate_question(42, "Fact text") == (None, None)
+
+    app._schedule_ai_job.assert_not_called()
+    assert job.listeners == 2
+    app.ai_flights.promote.assert_called_once_with(job, ai_engine.PRIORITY_VIEW)
+
+
+def test_get_or_generate_question_waits_for_pregenerator(monkeypatch):
     app = make_app()
     app.fetch_query = MagicMock(return_value=[])
-    app.question_request_inflight = True
-    app.question_generation_fact_id = 42
     app.question_generation_last_attempt = {}
     app.question_generation_cooldown_seconds = 60
+    app.question_pregen = MagicMock()
+    app.question_pregen.in_progress.side_effect = lambda fid: fid == 42
     app.root = MagicMock()
 
     monkeypatch.setattr(config, "get_together_api_key", lambda: "key")
 
-    question, q_id = app._get_or_generate_question(42, "Fact text")
+    assert app._get_or_generate_question(42, "Fact text") == (None, None)
+    assert app._ai_flights().find(lambda key: True) == []
 
-    assert question is None
-    assert q_id is None
+
+def test_generate_questions_once_shares_one_call():
+    app = make_app()
+    app.ai_engine = None
+    app.root = MagicMock()
+    release = threading.Event()
+    app._generate_questions_for_fact = MagicMock(side_effect=lambda *args, **kwargs: release.wait(5) and [1, 2])
+    finished = []
+
+    first, _ = app._generate_questions_once(7, "Fact", ai_engine.PRIORITY_BACKGROUND, finished.append)
+    second, _ = app._generate_questions_once(7, " Fact ", ai_engine.PRIORITY_VIEW, finished.append)
+    other, _ = app._generate_questions_once(7, "Edited fact", ai_engine.PRIORITY_VIEW)
+
+    assert first is second and other is not first
+    assert app._question_generation_busy(7)
+    release.set()
+    assert first.result(5) == [1, 2] and other.result(5) == [1, 2]
+    assert app._generate_questions_for_fact.call_count == 2
+    assert not app._question_generation_busy(7)
+    for call in app.root.after.call_args_list:
+        call[0][1]()
+    assert finished == [[1, 2], [1, 2]]
+
+
+def test_leaving_a_card_drops_its_unshared_question_job(monkeypatch):
+    monkeypatch.setattr(config, "get_together_api_key", lambda: None)
+    app = make_app()
+    app.fetch_query = MagicMock(return_value=[(10, "Ready?", 0)])
+    alone = hold_question_generation(app, 1, "Fact 1", ai_engine.PRIORITY_VIEW)
+    shared = hold_question_generation(app, 2, "Fact 2", ai_engine.PRIORITY_VIEW)
+    hold_question_generation(app, 2, "Fact 2")  # the prefetcher waits on it too
+
+    app._question_view = (1, *alone)
+    app._get_or_generate_question(4, "Fact 4")
+    app._question_view = (2, *shared)
+    app._get_or_generate_question(4, "Fact 4")
+
+    assert alone[0].cancelled
+    assert not shared[0].cancelled and shared[0].listeners == 1
+    assert not app._question_generation_busy(1)
+
+
+def test_find_question_pregen_candidates_skips_recent_attempts():
+    app = make_app()
+    app.get_active_profile_id = MagicMock(return_value=1)
+    app.fetch_query = MagicMock(return_value=[(1, "No questions", 0), (2, "Tried", 0), (3, "Due", 1), (4, "Busy", 0)])
+    hold_question_generation(app, 4, "Busy")
+    app.question_generation_last_attempt = {2: time.time()}
+    app.question_generation_cooldown_seconds = 60
+
+    candidates = app._find_question_pregen_candidates(10)
+
+    assert candidates == [(1, "No questions", False), (3, "Due", True)]
+    assert app.fetch_query.call_args[0][1][:2] == (10, 1)
+
+
+def test_pregenerate_questions_refresh_replaces_old_set():
+    app = make_app()
+    app.question_generation_last_attempt = {}
+    app.question_cache = question_cache.QuestionCache()
+    app.question_cache.put(5, [(1, "Old?", 3), (11, "New?", 0)])
+    app._generate_questions_for_fact = MagicMock(return_value=[11, 12, 13])
+    app.execute_update = MagicMock(return_value=True)
+
+    assert app._pregenerate_questions(5, "Fact", refresh=True) is True
+
+    app.execute_update.assert_called_once()
+    sql, params = app.execute_update.call_args[0]
+    assert "BEGIN TRANSACTION" in sql and "ROLLBACK TRANSACTION" in sql
+    assert "DELETE FROM Questions" in sql and "NOT IN (?,?,?)" in sql
+    assert "UPDATE Facts SET QuestionsRefreshCountdown = @ResetTo" in sql
+    assert params == (5, factdari.QUESTIONS_REFRESH_COUNTDOWN, 11, 12, 13)
+    assert app.question_cache.get(5) == [(11, "New?", 0)]
+
+
+def test_pregenerate_questions_refresh_keeps_cache_when_replace_fails():
+    app = make_app()
+    app.question_generation_last_attempt = {}
+    app.question_cache = question_cache.QuestionCache()
+    app.question_cache.put(5, [(1, "Old?", 3), (11, "New?", 0)])
+    app._generate_questions_for_fact = MagicMock(return_value=[11])
+    app.execute_update = MagicMock(return_value=False)
+
+    app._pregenerate_questions(5, "Fact", refresh=True)
+
+    assert app.question_cache.get(5) == [(1, "Old?", 3), (11, "New?", 0)]
+
+
+def test_pregenerate_question_batch_runs_through_pregenerator():
+    app = make_app()
+    app.question_generation_last_attempt = {}
+    app._generate_questions_for_facts = MagicMock(return_value={1: [11, 12], 2: [21]})
+    app._finish_pregenerated_questions = MagicMock()
+    hold_question_generation(app, 3, "Shown on the card")
+    app.question_pregen = question_pregen.QuestionPregenerator(
+        find_candidates=lambda limit: [(1, "One", False), (2, "Two", True), (3, "Shown on the card", False)],
+        generate=MagicMock(return_value=False),
+        generate_batch=app._pregenerate_question_batch,
+        facts_per_call=3,
+        rate_per_minute=0,
+    )
+
+    assert app.question_pregen.run_once() == 1
+
+    app._generate_questions_for_facts.assert_called_once_with([(1, "One"), (2, "Two")])
+    app._finish_pregenerated_questions.assert_any_call(2, [21], True)
+    assert app.question_pregen.stats()['failed'] == 1
+
+
+def test_pregenerate_questions_joins_card_generating_itself():
+    app = make_app()
+    app.question_generation_last_attempt = {}
+    job, _ = hold_question_generation(app, 5, "Fact", ai_engine.PRIORITY_VIEW, func=lambda job: [21, 22])
+    app._generate_questions_for_fact = MagicMock()
+    app._finish_pregenerated_questions = MagicMock()
+    threading.Timer(0.05, job.run).start()
+
+    assert app._pregenerate_questions(5, "Fact", refresh=True) is True
+    app._generate_questions_for_fact.assert_not_called()
+    app._finish_pregenerated_questions.assert_called_once_with(5, [21, 22], True)
+
+
+def test_question_generation_spent_today_raises_when_unreadable():
+    app = make_app()
+    app.fetch_query = MagicMock(return_value=[])
+
+    with pytest.raises(RuntimeError):
+        app._question_generation_spent_today()
+
+    app.fetch_query = MagicMock(return_value=[(1200, 0.0042)])
+    assert app._question_generation_spent_today() == (1200, 0.0042)
+
+
+def make_countdown_app(refreshed):
+    app = make_app()
+    app.execute_returning_row = MagicMock(return_value=(1 if refreshed else 0,))
+    app.execute_update = MagicMock()
+    app.fetch_query = MagicMock()
+    app.question_cache = question_cache.QuestionCache()
+    app.question_cache.put(9, [(1, "Old?", 0)])
+    app.question_pregen = MagicMock()
+    return app
+
+
+def test_decrement_question_countdown_is_one_round_trip():
+    app = make_countdown_app(refreshed=False)
+
+    assert app._decrement_question_countdown(9, "Fact") is False
+
+    app.execute_returning_row.assert_called_once()
+    sql, params = app.execute_returning_row.call_args[0]
+    assert "OUTPUT DELETED.QuestionsRefreshCountdown" in sql and "DELETE FROM Questions" in sql
+    assert params == (9, factdari.QUESTIONS_REFRESH_COUNTDOWN)
+    app.execute_update.assert_not_called()
+    app.fetch_query.assert_not_called()
+    app.question_pregen.request.assert_not_called()
+    assert app.question_cache.get(9) == [(1, "Old?", 0)]
+
+
+def test_decrement_question_countdown_schedules_regeneration_after_purge(monkeypatch):
+    monkeypatch.setitem(config.QUESTION_PREGEN_CONFIG, "regenerate_on_refresh", True)
+    app = make_countdown_app(refreshed=True)
+
+    assert app._decrement_question_countdown(9, "Fact") is True
+
+    app.question_pregen.request.assert_called_once_with(9, "Fact")
+    assert app.question_cache.get(9) == []
+
+
+def test_decrement_question_countdown_regenerates_without_pregenerator(monkeypatch):
+    monkeypatch.setitem(config.QUESTION_PREGEN_CONFIG, "regenerate_on_refresh", True)
+    monkeypatch.setattr(config, "get_together_api_key", lambda: "key")
+
+    class InlineThread:
+        def __init__(self, target, daemon=None):
+            self.target = target
+
+        def start(self):
+            self.target()
+
+    monkeypatch.setattr(factdari.threading, "Thread", InlineThread)
+    app = make_countdown_app(refreshed=True)
+    app.question_pregen = None
+    app.question_generation_last_attempt = {}
+    app.root = MagicMock()
+    app._generate_questions_for_fact = MagicMock(return_value=[1, 2, 3])
+
+    app._decrement_question_countdown(9, "Fact")
+
+    app._generate_questions_for_fact.assert_called_once_with(9, "Fact", count=3)
+    assert not app._question_generation_busy(9)
+    app.root.after.assert_called_once()
 
 
 def test_get_or_generate_question_respects_cooldown(monkeypatch):
     app = make_app()
     app.fetch_query = MagicMock(return_value=[])
-    app.question_request_inflight = False
-    app.question_generation_fact_id = None
     app.question_generation_last_attempt = {42: time.time() - 10}
     app.question_generation_cooldown_seconds = 60
     app.root = MagicMock()
@@ -539,7 +1136,7 @@ def test_fetch_query_passes_params(monkeypatch):
     mock_cursor = MagicMock()
     mock_cursor.fetchall.return_value = [("row1",)]
     mock_conn = make_mock_conn(mock_cursor)
-    monkeypatch.setattr(factdari.pyodbc, "connect", MagicMock(return_value=mock_conn))
+    monkeypatch.setattr(factdari.db_pool.pyodbc, "connect", MagicMock(return_value=mock_conn))
 
     result = app.fetch_query("SELECT * FROM table WHERE id = ?", (1,))
 
@@ -550,7 +1147,7 @@ def test_fetch_query_passes_params(monkeypatch):
 def test_fetch_query_returns_empty_on_error(monkeypatch):
     app = make_app()
     app.CONN_STR = "conn"
-    monkeypatch.setattr(factdari.pyodbc, "connect", MagicMock(side_effect=Exception("boom")))
+    monkeypatch.setattr(factdari.db_pool.pyodbc, "connect", MagicMock(side_effect=Exception("boom")))
 
     assert app.fetch_query("SELECT 1") == []
 
@@ -558,7 +1155,7 @@ def test_fetch_query_returns_empty_on_error(monkeypatch):
 def test_execute_update_returns_false_on_error(monkeypatch):
     app = make_app()
     app.CONN_STR = "conn"
-    monkeypatch.setattr(factdari.pyodbc, "connect", MagicMock(side_effect=Exception("boom")))
+    monkeypatch.setattr(factdari.db_pool.pyodbc, "connect", MagicMock(side_effect=Exception("boom")))
 
     assert app.execute_update("UPDATE table SET col = 1") is False
 
@@ -566,7 +1163,7 @@ def test_execute_update_returns_false_on_error(monkeypatch):
 def test_execute_insert_return_id_returns_none_on_error(monkeypatch):
     app = make_app()
     app.CONN_STR = "conn"
-    monkeypatch.setattr(factdari.pyodbc, "connect", MagicMock(side_effect=Exception("boom")))
+    monkeypatch.setattr(factdari.db_pool.pyodbc, "connect", MagicMock(side_effect=Exception("boom")))
 
     assert app.execute_insert_return_id("INSERT INTO table OUTPUT INSERTED.ID VALUES (1)") is None
 
@@ -577,16 +1174,29 @@ def test_execute_insert_return_id_returns_new_id(monkeypatch):
     mock_cursor = MagicMock()
     mock_cursor.fetchone.return_value = (99,)
     mock_conn = make_mock_conn(mock_cursor)
-    monkeypatch.setattr(factdari.pyodbc, "connect", MagicMock(return_value=mock_conn))
+    monkeypatch.setattr(factdari.db_pool.pyodbc, "connect", MagicMock(return_value=mock_conn))
 
     assert app.execute_insert_return_id("INSERT INTO table OUTPUT INSERTED.ID VALUES (1)") == 99
 
 
+def test_db_helpers_reuse_pooled_connection(monkeypatch):
+    app = make_app()
+    app.CONN_STR = "conn"
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = []
+    mock_connect = MagicMock(return_value=make_mock_conn(mock_cursor))
+    monkeypatch.setattr(factdari.db_pool.pyodbc, "connect", mock_connect)
+
+    app.fetch_query("SELECT 1")
+    app.execute_update("UPDATE Facts SET TotalViews = 0")
+    app.fetch_query("SELECT 2")
+
+    assert mock_connect.call_count == 1
+
+
 def test_get_or_generate_question_returns_cached_question(monkeypatch):
     app = make_app()
     app.fetch_query = MagicMock(return_value=[(10, "Cached question", 1)])
-    app.question_request_inflight = False
-    app.question_generation_fact_id = None
     app.question_generation_last_attempt = {}
     app.question_generation_cooldown_seconds = 60
 
@@ -601,8 +1211,6 @@ def test_get_or_generate_question_returns_cached_question(monkeypatch):
 def test_get_or_generate_question_falls_back_without_api_key(monkeypatch):
     app = make_app()
     app.fetch_query = MagicMock(return_value=[])
-    app.question_request_inflight = False
-    app.question_generation_fact_id = None
     app.question_generation_last_attempt = {}
     app.question_generation_cooldown_seconds = 60
 
@@ -731,3 +1339,225 @@ def test_show_home_page_resets_state_and_calls_session_end():
     assert app.is_home_page is True
     assert app.answer_revealed is False
     assert app.current_question_id is None
+
+
+def make_tracking_app():
+    app = make_app()
+    app.record_activity = MagicMock()
+    app.get_active_profile_id = MagicMock(return_value=1)
+    app._award_for_elapsed = MagicMock()
+    app.start_new_session = MagicMock()
+    app.status_label = MagicMock()
+    app.clear_status_after_delay = MagicMock()
+    app.GREEN_COLOR = "#00ff00"
+    app.gamify = MagicMock()
+    app.current_session_id = 7
+    app.timer_paused = False
+    app.pause_started_at = None
+    return app
+
+
+def test_track_fact_view_records_view_in_one_batch():
+    app = make_tracking_app()
+    app.current_fact_log_id = 11
+    app.current_fact_start_time = datetime.now() - timedelta(seconds=30)
+    app.execute_update = MagicMock()
+    app.execute_returning_row = MagicMock(return_value=(12, 0, 3))
+
+    app.track_fact_view(5)
+
+    app.execute_returning_row.assert_called_once()
+    params = app.execute_returning_row.call_args.args[1]
+    assert params[0] == 5
+    assert params[2] == 7
+    assert params[3] == 11
+    assert 29 <= params[4] <= 31
+    app.execute_update.assert_not_called()
+    assert app.current_fact_log_id == 12
+    app._award_for_elapsed.assert_called_once()
+    # Already checked in today: no extra streak work
+    app.gamify.daily_checkin.assert_not_called()
+
+
+def test_track_fact_view_runs_checkin_when_due():
+    app = make_tracking_app()
+    app.current_fact_log_id = None
+    app.current_fact_start_time = None
+    app.execute_returning_row = MagicMock(return_value=(12, 1, 0))
+    app.gamify.daily_checkin.return_value = {'profile': {'CurrentStreak': 4}, 'unlocked': []}
+
+    app.track_fact_view(5)
+
+    app.gamify.daily_checkin.assert_called_once()
+    app._award_for_elapsed.assert_not_called()
+    assert app._streak_shown_today is True
+
+
+def test_track_fact_view_failed_batch_leaves_no_open_log():
+    app = make_tracking_app()
+    app.current_fact_log_id = 11
+    app.current_fact_start_time = datetime.now() - timedelta(seconds=5)
+    app.execute_returning_row = MagicMock(return_value=None)
+
+    app.track_fact_view(5)
+
+    assert app.current_fact_log_id is None
+    app._award_for_elapsed.assert_not_called()
+    app.gamify.daily_checkin.assert_not_called()
+
+
+def test_get_active_profile_id_uses_cached_context():
+    app = make_app()
+    app.profile_context = factdari.gamification.ProfileContext(MagicMock(return_value=5))
+    app.fetch_query = MagicMock()
+    app.gamify = MagicMock()
+
+    assert app.get_active_profile_id() == 5
+    assert app.get_active_profile_id() == 5
+
+    app.fetch_query.assert_not_called()
+    app.gamify.get_profile.assert_not_called()
+
+
+def test_update_ui_does_not_query_database():
+    app = make_app()
+    app.update_coordinates = MagicMock()
+    app.fetch_query = MagicMock()
+    app.gamify = MagicMock()
+    app.stats = factdari.stats_model.StatsModel()
+    app.root = MagicMock()
+    app.UI_UPDATE_INTERVAL_MS = 100
+    app.is_home_page = False
+    app.current_session_id = 1
+    app.timer_paused = False
+    app.idle_triggered = False
+    app.idle_timeout_seconds = 300
+    app.last_activity_time = datetime.now()
+
+    app.update_ui()
+
+    app.fetch_query.assert_not_called()
+    app.gamify.get_level_progress.assert_not_called()
+
+
+def test_load_all_facts_builds_compact_deck_without_newid():
+    app = make_app()
+    app.category_var = MagicMock()
+    app.category_var.get.return_value = "All Categories"
+    app.get_active_profile_id = MagicMock(return_value=1)
+    app.fetch_query = MagicMock(side_effect=[
+        [(1, 10, "Physics", 0, 0), (2, 10, "Physics", 1, 0)],
+        [(1, "Fact 1"), (2, "Fact 2")],
+    ])
+
+    app.load_all_facts()
+
+    query = app.fetch_query.call_args_list[0][0][0]
+    assert "NEWID" not in query and "Content" not in query
+    assert len(app.all_facts) == 2
+    fact = app.all_facts[0]
+    assert fact[1] == f"Fact {fact[0]}"
+    assert app.fetch_query.call_count == 2
+
+
+def test_category_switch_is_answered_from_fact_index():
+    app = make_app()
+    app.category_var = MagicMock()
+    app.get_active_profile_id = MagicMock(return_value=1)
+    app.fetch_query = MagicMock(return_value=[
+        (1, 10, "Physics", 1, 0),
+        (2, 10, "Physics", 0, 1),
+        (3, 20, "History", 1, 0),
+    ])
+
+    app.category_var.get.return_value = "All Categories"
+    app.load_all_facts()
+    app.fetch_query.reset_mock()
+
+    app.category_var.get.return_value = "Favorites"
+    app.load_all_facts()
+    assert sorted(app.all_facts.fact_id_at(i) for i in range(len(app.all_facts))) == [1, 3]
+
+    app._update_fact_index('set_known', 1, True)
+    app.category_var.get.return_value = "Not Known"
+    app.load_all_facts()
+    assert [app.all_facts.fact_id_at(i) for i in range(len(app.all_facts))] == [3]
+
+    app.fetch_query.assert_not_called()
+
+
+def test_get_or_generate_question_picks_from_question_cache():
+    app = make_app()
+    app.question_cache = question_cache.QuestionCache()
+    app.question_cache.put(7, [(70, "Seen?", 2), (71, "Fresh?", 0)])
+    app.fetch_query = MagicMock()
+
+    question, q_id = app._get_or_generate_question(7, "Fact 7")
+
+    assert (question, q_id) == ("Fresh?", 71)
+    app.fetch_query.assert_not_called()
+
+
+def test_get_or_generate_question_caches_rows_read_on_a_miss():
+    app = make_app()
+    app.question_cache = question_cache.QuestionCache()
+    app.fetch_query = MagicMock(return_value=[(70, "Read?", 0)])
+
+    assert app._get_or_generate_question(7, "Fact 7") == ("Read?", 70)
+    assert app._get_or_generate_question(7, "Fact 7") == ("Read?", 70)
+    app.fetch_query.assert_called_once()
+
+
+def test_question_shows_are_flushed_in_batches(monkeypatch):
+    monkeypatch.setitem(config.QUESTION_CACHE_CONFIG, "flush_every", 2)
+    app = make_app()
+    app.question_cache = question_cache.QuestionCache()
+    app.question_cache.put(7, [(70, "A?", 0), (71, "B?", 0)])
+    app.queue_write = MagicMock()
+
+    app._update_question_shown(70)
+    app._update_question_shown(70)
+    app.queue_write.assert_not_called()
+    app._update_question_shown(71)
+
+    writes = sorted(call[0][1] for call in app.queue_write.call_args_list)
+    assert writes == [(1, 0, 71), (2, 0, 70)]
+    assert "TimesShown = TimesShown + ?" in app.queue_write.call_args[0][0]
+    assert app.question_cache.get(7) == [(70, "A?", 2), (71, "B?", 1)]
+
+
+def test_store_questions_adds_to_question_cache():
+    app = make_app()
+    app.question_cache = question_cache.QuestionCache()
+    app.question_cache.put(7, [])
+    app.execute_insert_return_id = MagicMock(side_effect=[80, 81])
+
+    assert app._store_questions(7, ["One?", "Two?"]) == [80, 81]
+    assert app.question_cache.get(7) == [(80, "One?", 0), (81, "Two?", 0)]
+
+
+def test_search_facts_returns_rows_in_rank_order():
+    app = make_app()
+    app.search_index = search_index.SearchIndex()
+    app.search_index.add(1, "Light travels fast")
+    app.search_index.add(2, "Light light light bends around gravity")
+    app.get_active_profile_id = MagicMock(return_value=1)
+    app.fetch_query = MagicMock(return_value=[(1, "Light travels fast", "Physics"), (2, "Light light light", "Physics")])
+
+    results = app.search_facts("light")
+
+    assert [r[0] for r in results] == [2, 1]
+    assert "IN (?,?)" in app.fetch_query.call_args[0][0]
+
+
+def test_find_near_duplicates_returns_existing_content():
+    app = make_app()
+    app.near_duplicate_index = near_duplicates.NearDuplicateIndex(threshold=0.6)
+    app.near_duplicate_index.add(4, "The Eiffel Tower is about 330 metres tall and was completed in 1889.")
+    app.get_active_profile_id = MagicMock(return_value=1)
+    app.fetch_query = MagicMock(return_value=[(4, "The Eiffel Tower is about 330 metres tall and was completed in 1889.")])
+
+    matches = app.find_near_duplicates("The Eiffel Tower is roughly 330 metres tall and was completed in 1889!")
+
+    assert [m[0] for m in matches] == [4]
+    assert matches[0][2].startswith("The Eiffel Tower")
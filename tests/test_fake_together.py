@@ -0,0 +1,104 @@
+"""
+Unit tests for fake_together.py (local chat-completions stand-in: latency
+models, simulated errors, usage and SSE streaming).
+"""
+import json
+import random
+
+import pytest
+
+from ai_client import AIClient
+from fake_together import FakeTogetherServer, LatencyModel, build_reply
+
+
+def chat(system, user, stream=False):
+    body = {"model": "m", "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}]}
+    if stream:
+        body["stream"] = True
+    return body
+
+
+class TestLatencyModel:
+    """Tests for parsing and sampling latency specs."""
+
+    def test_parse_specs(self):
+        assert LatencyModel.parse("250").sample_ms(random.Random(0)) == 250
+        assert LatencyModel.parse("fixed:40").sample_ms(random.Random(0)) == 40
+        uniform = LatencyModel.parse("uniform:10:20")
+        assert all(10 <= uniform.sample_ms(random.Random(i)) <= 20 for i in range(20))
+
+    def test_lognormal_is_centred_on_the_median(self):
+        model = LatencyModel.parse("lognormal:100:0.5")
+        rng = random.Random(1)
+        samples = sorted(model.sample_ms(rng) for _ in range(2001))
+
+        assert 85 < samples[1000] < 115
+        assert samples[-1] > 200  # long right tail
+
+    @pytest.mark.parametrize("spec", ["gamma:1:2", "uniform:5", "fixed:a"])
+    def test_bad_specs_are_rejected(self, spec):
+        with pytest.raises(ValueError):
+            LatencyModel.parse(spec)
+
+
+class TestBuildReply:
+    """Tests for prompt-shaped replies."""
+
+    def test_question_prompt_gets_a_json_array(self):
+        questions = json.loads(build_reply(chat("Output ONLY a valid JSON array of exactly 3 strings", "Fact: x")))
+        assert len(questions) == 3
+
+    def test_batch_prompt_gets_one_entry_per_fact_id(self):
+        reply = build_reply(chat("Output ONLY a valid JSON object mapping each fact ID", "Facts:\n[4] a\n[9] b"))
+        assert sorted(json.loads(reply)) == ["4", "9"]
+
+
+class TestFakeTogetherServer:
+    """Tests for the served replies through the real AI client."""
+
+    def test_json_reply_with_usage(self):
+        with FakeTogetherServer(completion_tokens=42) as server:
+            resp, _ = AIClient(max_retries=0).post(server.url, json=chat("Explain", "Fact: water is wet"))
+
+        data = resp.json()
+        assert resp.status_code == 200
+        assert "water is wet" in data["choices"][0]["message"]["content"]
+        assert data["usage"]["completion_tokens"] == 42
+        assert data["usage"]["total_tokens"] == data["usage"]["prompt_tokens"] + 42
+
+    def test_streamed_reply_arrives_in_chunks(self):
+        deltas = []
+        with FakeTogetherServer(chunks=4) as server:
+            resp, text, usage, timing = AIClient(max_retries=0).stream_chat(
+                server.url, json=chat("Explain", "Fact: sky"), on_delta=deltas.append
+            )
+            assert server.stats["streams"] == 1
+
+        assert resp.status_code == 200
+        assert len(deltas) == 4 and "".join(deltas) == text
+        assert usage["completion_tokens"] > 0
+        assert timing["ttft_ms"] is not None
+
+    def test_error_rate_returns_error_statuses(self):
+        with FakeTogetherServer(error_rate=1.0, error_statuses=(503,)) as server:
+            resp, _ = AIClient(max_retries=0).post(server.url, json=chat("Explain", "Fact: x"))
+            assert server.stats == {"requests": 1, "errors": 1, "streams": 0}
+
+        assert resp.status_code == 503
+
+    def test_scripted_statuses_replies_and_recording(self):
+        with FakeTogetherServer(statuses=[429], reply_chunks=["a", "b"], usage={"completion_tokens": 2}) as server:
+            client = AIClient(max_retries=1, backoff_factor=0)
+            resp, _ = client.post(server.url, json=chat("Explain", "Fact: x"), api_key="key")
+            _, text, usage, _ = client.stream_chat(server.url, json=chat("Explain", "Fact: y"))
+            server.responder = lambda body: ("custom", {"completion_tokens": 1})
+            custom, _ = client.post(server.url, json=chat("Explain", "Fact: z"))
+            client.close()
+
+        assert resp.status_code == 200 and resp.json()["choices"][0]["message"]["content"] == "ab"
+        assert text == "ab" and usage == {"completion_tokens": 2}
+        assert custom.json()["choices"][0]["message"]["content"] == "custom"
+        assert [r["messages"][1]["content"] for r in server.requests] == ["Fact: x", "Fact: x", "Fact: y", "Fact: z"]
+        assert server.auth[:2] == ["Bearer key", "Bearer key"]
+        assert len(set(server.client_ports)) == 1
+        assert server.stats["errors"] == 1
@@ -384,6 +384,120 @@ class TestDailyCheckin:
         assert isinstance(result['unlocked'], list)
 
 
+class TestAdvanceStreak:
+    """Tests for the incremental streak state machine."""
+
+    def test_next_day_extends_the_run(self):
+        from gamification import advance_streak
+        today = date(2024, 3, 10)
+
+        assert advance_streak(4, 6, today - timedelta(days=1), today) == (5, 6, today, True)
+        assert advance_streak(6, 6, today - timedelta(days=1), today) == (7, 7, today, True)
+
+    def test_gap_starts_a_new_run(self):
+        from gamification import advance_streak
+        today = date(2024, 3, 10)
+
+        assert advance_streak(9, 12, today - timedelta(days=3), today) == (1, 12, today, True)
+        assert advance_streak(0, 0, None, today) == (1, 1, today, True)
+
+    def test_later_activity_the_same_day_changes_nothing(self):
+        from gamification import advance_streak
+        today = date(2024, 3, 10)
+
+        assert advance_streak(3, 5, today, today) == (3, 5, today, False)
+        assert advance_streak(3, 5, today, today, active=False) == (3, 5, today, False)
+
+    def test_inactive_check_resets_only_broken_runs(self):
+        from gamification import advance_streak
+        today = date(2024, 3, 10)
+        yesterday = today - timedelta(days=1)
+
+        assert advance_streak(3, 5, yesterday, today, active=False) == (3, 5, yesterday, False)
+        assert advance_streak(3, 5, today - timedelta(days=2), today, active=False) == (0, 5, today - timedelta(days=2), False)
+
+
+PROFILE_COLUMNS = [
+    ('ProfileID',), ('XP',), ('Level',), ('TotalReviews',),
+    ('TotalKnown',), ('TotalFavorites',), ('TotalAdds',),
+    ('TotalEdits',), ('TotalDeletes',), ('TotalAITokens',),
+    ('TotalAICost',), ('CurrentStreak',), ('LongestStreak',),
+    ('LastCheckinDate',)
+]
+
+
+class TestIncrementalCheckin:
+    """Tests for daily_checkin updating stored streak state without scanning logs."""
+
+    def make(self, mock_connect, streak, longest, last_checkin, today):
+        from gamification import Gamification
+        gamify = Gamification("dummy_conn_str")
+        gamify.profile.set(1)
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [
+            (1, 100, 2, 10, 5, 3, 5, 2, 1, 0, 0.0, streak, longest, last_checkin),
+            (today,),
+        ]
+        cursor.description = PROFILE_COLUMNS
+        cursor.rowcount = 1
+        mock_connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = cursor
+        gamify.award_xp = MagicMock()
+        gamify.unlock_achievements_if_needed = MagicMock(return_value=[])
+        return gamify, cursor
+
+    @patch('pyodbc.connect')
+    def test_first_view_of_a_new_day_extends_streak(self, mock_connect):
+        today = date(2024, 3, 10)
+        gamify, cursor = self.make(mock_connect, 4, 6, today - timedelta(days=1), today)
+
+        result = gamify.daily_checkin()
+
+        cursor.fetchall.assert_not_called()  # no FactLogs scan
+        update = cursor.execute.call_args_list[-1]
+        assert "UPDATE GamificationProfile" in update.args[0]
+        assert update.args[1] == (5, 6, "2024-03-10", 1, "2024-03-10")
+        assert result['profile']['CurrentStreak'] == 5
+        gamify.unlock_achievements_if_needed.assert_called_once_with('streak', 5)
+
+    @patch('pyodbc.connect')
+    def test_later_check_in_the_same_day_writes_nothing(self, mock_connect):
+        today = date(2024, 3, 10)
+        gamify, cursor = self.make(mock_connect, 5, 6, today, today)
+
+        result = gamify.daily_checkin()
+
+        assert not any("UPDATE" in c.args[0] for c in cursor.execute.call_args_list)
+        gamify.award_xp.assert_not_called()
+        assert result['profile']['CurrentStreak'] == 5
+
+    @patch('pyodbc.connect')
+    def test_concurrent_check_in_does_not_award_twice(self, mock_connect):
+        today = date(2024, 3, 10)
+        gamify, cursor = self.make(mock_connect, 4, 6, today - timedelta(days=1), today)
+        cursor.rowcount = 0
+
+        gamify.daily_checkin()
+
+        gamify.award_xp.assert_not_called()
+        gamify.unlock_achievements_if_needed.assert_not_called()
+
+    @patch('pyodbc.connect')
+    def test_rebuild_streak_recomputes_from_logs(self, mock_connect):
+        from gamification import Gamification
+        gamify = Gamification("dummy_conn_str")
+        gamify.profile.set(1)
+        today = date.today()
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (today,)
+        cursor.fetchall.return_value = [(today,), (today - timedelta(days=1),)]
+        mock_connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = cursor
+
+        result = gamify.rebuild_streak()
+
+        assert result == {'CurrentStreak': 2, 'LongestStreak': 2, 'LastCheckinDate': today}
+        assert cursor.execute.call_args_list[-1].args[1] == (2, 2, today.strftime("%Y-%m-%d"), 1)
+
+
 class TestProfileEnsure:
     """Tests for profile creation/retrieval."""
 
@@ -425,3 +539,44 @@ class TestGetAchievementsWithStatus:
 
             result = gamify.get_achievements_with_status()
             assert isinstance(result, list)
+
+
+class TestProfileContext:
+    """Tests for the cached active profile id."""
+
+    def test_resolves_once(self):
+        from gamification import ProfileContext
+        resolver = Mock(return_value=3)
+        ctx = ProfileContext(resolver)
+
+        assert ctx.profile_id == 3
+        assert ctx.profile_id == 3
+        resolver.assert_called_once()
+
+    def test_invalidate_forces_new_lookup(self):
+        from gamification import ProfileContext
+        resolver = Mock(side_effect=[3, 4])
+        ctx = ProfileContext(resolver)
+
+        assert ctx.profile_id == 3
+        ctx.invalidate()
+        assert ctx.cached_id is None
+        assert ctx.profile_id == 4
+
+    def test_profile_lookup_skipped_once_cached(self):
+        from gamification import Gamification
+        gamify = Gamification("dummy_conn_str")
+        gamify.profile.set(7)
+        cur = MagicMock()
+
+        assert gamify._get_or_create_profile_id(cur) == 7
+        cur.execute.assert_not_called()
+
+    def test_lookup_populates_cache(self):
+        from gamification import Gamification
+        gamify = Gamification("dummy_conn_str")
+        cur = MagicMock()
+        cur.fetchone.return_value = (2,)
+
+        assert gamify._get_or_create_profile_id(cur) == 2
+        assert gamify.profile.cached_id == 2
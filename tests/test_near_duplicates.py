@@ -0,0 +1,79 @@
+"""
+Unit tests for near_duplicates.py (MinHash/LSH near-duplicate index).
+"""
+from unittest.mock import MagicMock
+
+import near_duplicates
+from near_duplicates import NearDuplicateIndex, choose_bands
+
+EIFFEL = "The Eiffel Tower is about 330 metres tall and was completed in 1889."
+EIFFEL_REWORDED = "The Eiffel Tower is roughly 330 metres tall and was completed in 1889!"
+HONEY = "Honey never spoils; edible honey has been found in ancient Egyptian tombs."
+
+
+class TestSignatures:
+    """Tests for shingling and MinHash signatures."""
+
+    def test_signature_is_stable_across_instances(self):
+        assert NearDuplicateIndex().signature(EIFFEL) == NearDuplicateIndex().signature(EIFFEL)
+
+    def test_punctuation_and_case_are_ignored(self):
+        index = NearDuplicateIndex()
+
+        assert index.similarity(index.signature(EIFFEL), index.signature(EIFFEL.upper().replace(".", "!"))) == 1.0
+
+    def test_empty_text_has_no_signature(self):
+        assert NearDuplicateIndex().signature("  ...  ") is None
+
+    def test_band_threshold_does_not_exceed_similarity_threshold(self):
+        bands, rows = choose_bands(128, 0.6)
+
+        assert bands * rows <= 128
+        assert (1.0 / bands) ** (1.0 / rows) <= 0.6
+
+
+class TestNearDuplicateIndex:
+    """Tests for queries, updates and clustering."""
+
+    def make_index(self):
+        index = NearDuplicateIndex(threshold=0.6)
+        index.add_many([(1, EIFFEL), (2, HONEY)])
+        return index
+
+    def test_query_finds_reworded_copy(self):
+        index = self.make_index()
+
+        matches = index.query(EIFFEL_REWORDED)
+
+        assert [fact_id for fact_id, _ in matches] == [1]
+        assert matches[0][1] >= 0.6
+
+    def test_query_ignores_unrelated_and_excluded_facts(self):
+        index = self.make_index()
+
+        assert index.query("Octopuses have three hearts and blue blood.") == []
+        assert index.query(EIFFEL, exclude=1) == []
+
+    def test_remove_drops_fact_from_results(self):
+        index = self.make_index()
+
+        index.remove(1)
+
+        assert index.query(EIFFEL) == []
+        assert len(index) == 1
+
+    def test_clusters_group_near_duplicates(self):
+        index = self.make_index()
+        index.add(3, EIFFEL_REWORDED)
+        index.add(4, HONEY + " ")
+
+        assert index.clusters() == [[1, 3], [2, 4]]
+
+    def test_build_from_cursor_streams_rows(self):
+        cursor = MagicMock()
+        cursor.fetchmany.side_effect = [[(1, EIFFEL), (2, HONEY)], []]
+
+        index = near_duplicates.build_from_cursor(cursor, NearDuplicateIndex(), profile_id=5)
+
+        assert len(index) == 2
+        cursor.execute.assert_called_once_with("SELECT FactID, Content FROM Facts WHERE CreatedBy = ?", (5,))
@@ -0,0 +1,60 @@
+"""
+Unit tests for prefetch.py (look-ahead warming of upcoming cards).
+"""
+import threading
+
+from prefetch import Prefetcher
+
+
+class TestPrefetcher:
+    """Tests for scheduling, lookahead and cancellation."""
+
+    def test_schedule_warms_up_to_lookahead_ids(self):
+        done = threading.Event()
+        seen = []
+
+        def warm(ids, cancelled):
+            seen.append(list(ids))
+            done.set()
+
+        prefetcher = Prefetcher(warm, lookahead=2).start()
+        prefetcher.schedule([4, 5, 6])
+
+        assert done.wait(2)
+        assert seen == [[4, 5]]
+        prefetcher.close(timeout=2)
+
+    def test_cancel_drops_queued_work(self):
+        seen = []
+        prefetcher = Prefetcher(lambda ids, cancelled: seen.append(ids), lookahead=3)
+        prefetcher.schedule([1, 2])
+
+        prefetcher.cancel()
+        prefetcher.start()
+        prefetcher.close(timeout=2)
+
+        assert seen == []
+
+    def test_cancel_marks_batch_in_progress_as_cancelled(self):
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def warm(ids, cancelled):
+            started.set()
+            release.wait(2)
+            results.append(cancelled())
+
+        prefetcher = Prefetcher(warm, lookahead=3).start()
+        prefetcher.schedule([1])
+        assert started.wait(2)
+        prefetcher.cancel()
+        release.set()
+        prefetcher.close(timeout=2)
+
+        assert results == [True]
+
+    def test_zero_lookahead_schedules_nothing(self):
+        prefetcher = Prefetcher(lambda ids, cancelled: None, lookahead=0)
+
+        assert prefetcher.schedule([1, 2]) is False
@@ -0,0 +1,108 @@
+"""
+Unit tests for question_cache.py (per-fact question rotation and batched
+TimesShown counters).
+"""
+import random
+
+from question_cache import QuestionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQuestionCache:
+    """Tests for loading, picking, show counting and eviction."""
+
+    def test_pick_returns_least_shown_question(self):
+        cache = QuestionCache()
+        cache.put(1, [(10, "A?", 3), (11, "B?", 1), (12, "C?", 2)])
+
+        assert cache.pick(1) == (11, "B?")
+
+    def test_ties_are_broken_at_random(self):
+        cache = QuestionCache(rng=random.Random(0))
+        cache.put(1, [(10, "A?", 0), (11, "B?", 0)])
+
+        picks = {cache.pick(1)[0] for _ in range(50)}
+
+        assert picks == {10, 11}
+
+    def test_shown_questions_rotate(self):
+        cache = QuestionCache()
+        cache.put(1, [(10, "A?", 0), (11, "B?", 0)])
+
+        first = cache.pick(1)[0]
+        cache.mark_shown(first)
+        second = cache.pick(1)[0]
+
+        assert {first, second} == {10, 11}
+
+    def test_put_many_caches_facts_without_questions(self):
+        cache = QuestionCache()
+        cache.put(3, [(30, "Kept?", 5)])
+
+        cache.put_many({1: [(10, "A?", 0)], 3: [(30, "Stale?", 0)]}, [1, 2, 3])
+
+        assert cache.get(1) == [(10, "A?", 0)]
+        assert cache.get(2) == [] and cache.pick(2) is None
+        assert cache.get(3) == [(30, "Kept?", 5)]
+        assert cache.get(4) is None
+        assert cache.missing([4, 1, 4, 5]) == [4, 5]
+
+    def test_drain_returns_pending_shows_once(self):
+        clock = FakeClock()
+        cache = QuestionCache(clock=clock)
+        cache.put(1, [(10, "A?", 0), (11, "B?", 0)])
+
+        cache.mark_shown(10)
+        clock.now = 130.0
+        assert cache.mark_shown(10) == 1
+        assert cache.mark_shown(11) == 2
+        clock.now = 140.0
+
+        assert sorted(cache.drain()) == [(10, 2, 10), (11, 1, 10)]
+        assert cache.drain() == []
+        assert cache.get(1) == [(10, "A?", 2), (11, "B?", 1)]
+
+    def test_reloaded_rows_include_unflushed_shows(self):
+        cache = QuestionCache()
+        cache.put(1, [(10, "A?", 0)])
+        cache.mark_shown(10)
+
+        cache.put(1, [(10, "A?", 0), (11, "B?", 0)])
+
+        assert cache.get(1) == [(10, "A?", 1), (11, "B?", 0)]
+
+    def test_add_and_keep_only(self):
+        cache = QuestionCache()
+        cache.put(1, [(10, "Old?", 4)])
+
+        cache.add(1, [(20, "New?", 0), (21, "Newer?", 0)])
+        assert len(cache.get(1)) == 3
+        cache.keep_only(1, [20, 21])
+
+        assert cache.get(1) == [(20, "New?", 0), (21, "Newer?", 0)]
+
+    def test_least_recently_used_fact_is_dropped(self):
+        cache = QuestionCache(max_facts=2)
+        cache.put(1, [(10, "A?", 0)])
+        cache.put(2, [(20, "B?", 0)])
+        cache.pick(1)
+        cache.put(3, [(30, "C?", 0)])
+
+        assert 1 in cache and 3 in cache
+        assert 2 not in cache
+        assert len(cache) == 2
+
+    def test_shows_of_dropped_facts_are_still_drained(self):
+        cache = QuestionCache(max_facts=1)
+        cache.put(1, [(10, "A?", 0)])
+        cache.mark_shown(10)
+        cache.invalidate(1)
+
+        assert [item[:2] for item in cache.drain()] == [(10, 1)]
@@ -0,0 +1,179 @@
+"""
+Unit tests for question_pregen.py (background question generation with
+budget, rate limit and pause).
+"""
+import threading
+
+from question_pregen import QuestionPregenerator, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_pregen(candidates, generate=None, **kwargs):
+    kwargs.setdefault('rate_per_minute', 0)
+    return QuestionPregenerator(
+        lambda limit: candidates[:limit],
+        generate or (lambda fact_id, content, refresh: True),
+        **kwargs
+    )
+
+
+class TestRateLimiter:
+    """Tests for call spacing."""
+
+    def test_calls_are_spaced_by_interval(self):
+        clock = FakeClock()
+        limiter = RateLimiter(30, clock=clock)
+        stop = threading.Event()
+
+        assert limiter.wait(stop)
+        assert limiter._next == 102.0
+        clock.now = 102.0
+        assert limiter.wait(stop)
+        assert limiter._next == 104.0
+
+    def test_wait_returns_false_when_stopped(self):
+        clock = FakeClock()
+        limiter = RateLimiter(1, clock=clock)
+        stop = threading.Event()
+        limiter.wait(stop)
+        stop.set()
+
+        assert limiter.wait(stop) is False
+
+    def test_zero_rate_means_no_limit(self):
+        assert RateLimiter(0).interval == 0.0
+
+
+class TestQuestionPregenerator:
+    """Tests for passes, budget, pause and failures."""
+
+    def test_run_once_generates_each_candidate(self):
+        done = []
+        generated = []
+        lock = threading.Lock()
+
+        def generate(fact_id, content, refresh):
+            with lock:
+                generated.append((fact_id, content, refresh))
+            return True
+
+        pregen = make_pregen([(1, "A", False), (2, "B", True)], generate, workers=2,
+                             on_done=lambda fid, ok: done.append((fid, ok)))
+
+        assert pregen.run_once() == 2
+        assert sorted(generated) == [(1, "A", False), (2, "B", True)]
+        assert sorted(done) == [(1, True), (2, True)]
+        assert pregen.stats()['generated'] == 2
+        assert pregen.stats()['in_progress'] == 0
+
+    def test_batch_size_limits_candidates(self):
+        pregen = make_pregen([(i, "x", False) for i in range(10)], batch_size=3)
+        assert pregen.run_once() == 3
+
+    def test_batches_share_one_call(self):
+        batches = []
+
+        def generate_batch(items):
+            batches.append([item[0] for item in items])
+            return {item[0] for item in items if item[0] != 3}
+
+        done = []
+        pregen = make_pregen([(i, "x", False) for i in range(1, 6)], workers=1,
+                             generate_batch=generate_batch, facts_per_call=2,
+                             on_done=lambda fid, ok: done.append((fid, ok)))
+
+        assert pregen.run_once() == 3
+        assert sorted(batches) == [[1, 2], [3, 4]]
+        assert pregen.stats()['generated'] == 4 and pregen.stats()['failed'] == 1
+        assert (3, False) in done
+
+    def test_requested_facts_go_first(self):
+        seen = []
+        pregen = make_pregen([(1, "x", False), (2, "y", False)], lambda fid, c, r: seen.append(fid) or True,
+                             workers=1, batch_size=2)
+        pregen.request(2, "y")
+        pregen.request(5, "z")
+
+        assert pregen.run_once() == 2
+        assert seen == [2, 5]
+        assert pregen.run_once() == 2
+        assert seen[2:] == [1, 2]
+
+    def test_stops_when_budget_is_spent(self):
+        spent = {'tokens': 0}
+
+        def generate(fact_id, content, refresh):
+            spent['tokens'] += 400
+            return True
+
+        pregen = make_pregen([(i, "x", False) for i in range(5)], generate, workers=1,
+                             daily_token_budget=1000, spent_today=lambda: (spent['tokens'], 0.0))
+
+        assert pregen.run_once() == 3
+        assert pregen.stats()['state'] == 'over_budget'
+        assert pregen.run_once() == 0
+
+    def test_cost_budget_and_unreadable_spend_block_calls(self):
+        pregen = make_pregen([(1, "x", False)], daily_cost_budget=0.10, spent_today=lambda: (0, 0.25))
+        assert pregen.over_budget()
+
+        def broken():
+            raise RuntimeError("db down")
+        pregen = make_pregen([(1, "x", False)], daily_cost_budget=0.10, spent_today=broken)
+        assert pregen.run_once() == 0
+
+    def test_no_budget_means_no_limit(self):
+        pregen = make_pregen([(1, "x", False)], spent_today=lambda: (10 ** 9, 10 ** 3))
+        assert not pregen.over_budget()
+
+    def test_paused_while_busy(self):
+        busy = {'value': True}
+        pregen = make_pregen([(1, "x", False)], is_busy=lambda: busy['value'])
+
+        assert pregen.run_once() == 0
+        assert pregen.stats()['state'] == 'paused'
+        busy['value'] = False
+        assert pregen.run_once() == 1
+
+    def test_failed_fact_is_not_retried_immediately(self):
+        calls = []
+
+        def generate(fact_id, content, refresh):
+            calls.append(fact_id)
+            if fact_id == 1:
+                raise RuntimeError("bad response")
+            return True
+
+        pregen = make_pregen([(1, "x", False), (2, "y", False)], generate, workers=1)
+        pregen.run_once()
+        pregen.run_once()
+
+        assert calls.count(1) == 1
+        assert calls.count(2) == 2
+        assert pregen.stats()['failed'] == 1
+
+    def test_in_progress_while_generating(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def generate(fact_id, content, refresh):
+            started.set()
+            release.wait(5)
+            return True
+
+        pregen = make_pregen([(7, "x", False)], generate).start()
+        try:
+            assert started.wait(5)
+            assert pregen.in_progress(7)
+            release.set()
+        finally:
+            pregen.close(timeout=5)
+        assert not pregen.in_progress(7)
+        assert pregen.stats()['state'] == 'stopped'
@@ -0,0 +1,141 @@
+"""
+Unit tests for search_index.py (BM25 inverted index over fact text).
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+import search_index
+from search_index import SearchIndex, tokenize
+
+
+def make_index():
+    index = SearchIndex()
+    index.add_many([
+        (1, "The speed of light is about 300,000 km per second."),
+        (2, "Light from the Sun takes about eight minutes to reach Earth."),
+        (3, "The Great Wall of China is not visible from space."),
+    ])
+    return index
+
+
+class TestTokenize:
+    """Tests for tokenisation."""
+
+    def test_lowercases_and_drops_stopwords(self):
+        assert tokenize("The Speed of LIGHT") == ["speed", "light"]
+
+    def test_empty_text(self):
+        assert tokenize(None) == []
+
+
+class TestSearchIndex:
+    """Tests for ranking, updates and persistence."""
+
+    def test_ranks_matching_facts(self):
+        index = make_index()
+
+        results = index.search("speed of light")
+
+        assert [fact_id for fact_id, _ in results] == [1, 2]
+        assert results[0][1] > results[1][1]
+
+    def test_edit_and_remove_update_postings(self):
+        index = make_index()
+
+        index.add(2, "Sunlight reaches Earth in eight minutes.")
+        assert [fid for fid, _ in index.search("light")] == [1]
+
+        index.remove(1)
+        assert index.search("light") == []
+        assert len(index) == 2
+
+    def test_updates_touch_only_the_documents_own_postings(self):
+        class NoScan(dict):
+            def __iter__(self):
+                raise AssertionError("vocabulary was scanned")
+            keys = items = values = __iter__
+
+        index = make_index()
+        index._postings = NoScan(index._postings)
+
+        index.add(1, "Sound is slower than light.")
+        index.remove(3)
+
+        assert [fid for fid, _ in index.search("sound")] == [1]
+        assert index.search("speed") == [] and index.search("china") == []
+        assert "china" not in index._postings
+
+    def test_loaded_index_can_be_updated(self, tmp_path):
+        path = str(tmp_path / "search_index.json")
+        make_index().save(path)
+        loaded = SearchIndex.load(path)
+
+        loaded.remove(1)
+        loaded.add(2, "Mars has two moons.")
+
+        assert loaded.search("light") == []
+        assert [fid for fid, _ in loaded.search("moons")] == [2]
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        index = make_index()
+        path = str(tmp_path / "search_index.json")
+
+        index.save(path, fingerprint=[3, 3, 12345])
+        loaded = SearchIndex.load(path)
+
+        assert loaded.search("china") == index.search("china")
+        assert loaded.matches([3, 3, 12345])
+        assert not loaded.matches([4, 4, 999])
+
+    def test_save_uses_unique_temp_file_and_cleans_up_on_error(self, tmp_path, monkeypatch):
+        index = make_index()
+        path = str(tmp_path / "search_index.json")
+        index.save(path)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["search_index.json"]
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+        monkeypatch.setattr(search_index.json, "dump", fail)
+
+        with pytest.raises(OSError):
+            index.save(path)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["search_index.json"]
+        assert SearchIndex.load(path) is not None
+
+    def test_load_missing_file_returns_none(self, tmp_path):
+        assert SearchIndex.load(str(tmp_path / "missing.json")) is None
+
+
+class TestLoadOrBuild:
+    """Tests for startup loading against the database fingerprint."""
+
+    def make_conn(self, fingerprint, rows):
+        cursor = MagicMock()
+        cursor.__enter__.return_value = cursor
+        cursor.__exit__.return_value = None
+        cursor.fetchone.return_value = fingerprint
+        cursor.fetchmany.side_effect = [rows, []]
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        return conn, cursor
+
+    def test_uses_saved_index_when_fingerprint_matches(self, tmp_path):
+        path = str(tmp_path / "search_index.json")
+        make_index().save(path, fingerprint=[3, 3, 1])
+        conn, cursor = self.make_conn((3, 3, 1), [])
+
+        index = search_index.load_or_build(conn, path)
+
+        assert len(index) == 3
+        cursor.fetchmany.assert_not_called()
+
+    def test_rebuilds_stale_index(self, tmp_path):
+        path = str(tmp_path / "search_index.json")
+        make_index().save(path, fingerprint=[3, 3, 1])
+        conn, cursor = self.make_conn((1, 9, 2), [(9, "Octopuses have three hearts.")])
+
+        index = search_index.load_or_build(conn, path)
+
+        assert [fid for fid, _ in index.search("hearts")] == [9]
+        assert SearchIndex.load(path).matches([1, 9, 2])
@@ -0,0 +1,304 @@
+"""
+Unit tests for speech.py (long-lived text-to-speech service with
+interruptible, queued utterances).
+"""
+import os
+import threading
+
+from audio_cache import AudioCache
+from speech import (
+    SpeechService, EVENT_END, EVENT_ERROR, EVENT_INTERRUPTED, EVENT_START,
+)
+
+
+class FakeEngine:
+    """pyttsx3-like engine: an utterance starts on the next iterate and ends when released."""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.properties = {}
+        self.spoken = []
+        self.stops = 0
+        self.pending = None
+        self.playing = None
+        self.release = threading.Event()
+        self.threads = set()
+
+    def _touch(self):
+        self.threads.add(threading.current_thread().name)
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def connect(self, topic, cb):
+        self.callbacks[topic] = cb
+
+    def startLoop(self, use_driver_loop=True):
+        self._touch()
+        assert use_driver_loop is False
+
+    def endLoop(self):
+        self._touch()
+
+    def say(self, text, name=None):
+        self._touch()
+        self.spoken.append(text)
+        self.pending = name
+
+    def isBusy(self):
+        return False
+
+    def save_to_file(self, text, filename, name=None):
+        self._touch()
+        with open(filename, "wb") as f:
+            f.write(b"RIFF" + text.encode("utf-8"))
+
+    def stop(self):
+        self._touch()
+        self.stops += 1
+        self.pending = None
+        if self.playing is not None:
+            name, self.playing = self.playing, None
+            self.callbacks['finished-utterance'](name, completed=False)
+
+    def iterate(self):
+        self._touch()
+        if self.pending is not None:
+            self.playing, self.pending = self.pending, None
+            self.callbacks['started-utterance'](self.playing)
+        elif self.playing is not None and self.release.is_set():
+            name, self.playing = self.playing, None
+            self.callbacks['finished-utterance'](name, completed=True)
+
+
+class SlowRenderEngine(FakeEngine):
+    """Renders write their file only once ``render_release`` is set; stop() abandons them."""
+
+    def __init__(self):
+        super().__init__()
+        self.render_release = threading.Event()
+        self.rendering = None
+        self.renders_started = []
+
+    def save_to_file(self, text, filename, name=None):
+        self._touch()
+        self.renders_started.append(text)
+        self.rendering = (text, filename)
+
+    def isBusy(self):
+        return self.rendering is not None
+
+    def stop(self):
+        self.rendering = None
+        super().stop()
+
+    def iterate(self):
+        if self.rendering is not None:
+            if self.render_release.is_set():
+                (text, filename), self.rendering = self.rendering, None
+                with open(filename, "wb") as f:
+                    f.write(b"RIFF" + text.encode("utf-8"))
+            return
+        super().iterate()
+
+
+class FakePlayer:
+    def __init__(self, seconds=60.0):
+        self.seconds = seconds
+        self.played = []
+        self.stops = 0
+
+    def play(self, path):
+        self.played.append(open(path, "rb").read())
+        return self.seconds
+
+    def stop(self):
+        self.stops += 1
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+        self.changed = threading.Condition()
+
+    def __call__(self, kind, utterance_id):
+        with self.changed:
+            self.events.append((kind, utterance_id))
+            self.changed.notify_all()
+
+    def wait_for(self, event, timeout=5):
+        with self.changed:
+            return self.changed.wait_for(lambda: event in self.events, timeout)
+
+
+def make_service(engine, recorder, **kwargs):
+    return SpeechService(engine_factory=lambda: engine, on_event=recorder, poll_seconds=0.005, **kwargs).start()
+
+
+class TestSpeechService:
+    """Tests for speaking, interrupting and reporting events."""
+
+    def test_engine_is_created_once_and_used_on_its_thread(self):
+        created = []
+        engine = FakeEngine()
+        engine.release.set()
+        recorder = Recorder()
+        service = SpeechService(engine_factory=lambda: created.append(1) or engine, on_event=recorder,
+                                rate=180, volume=0.5, poll_seconds=0.005).start()
+        try:
+            assert service.wait_ready(5)
+            first = service.speak("One")
+            assert recorder.wait_for((EVENT_END, first))
+            second = service.speak("Two")
+            assert recorder.wait_for((EVENT_END, second))
+        finally:
+            service.close(timeout=5)
+
+        assert created == [1]
+        assert engine.spoken == ["One", "Two"]
+        assert engine.threads == {'factdari-tts'}
+        assert engine.properties == {'rate': 180, 'volume': 0.5}
+        assert recorder.events == [(EVENT_START, first), (EVENT_END, first), (EVENT_START, second), (EVENT_END, second)]
+
+    def test_new_utterance_interrupts_current_one(self):
+        engine = FakeEngine()
+        recorder = Recorder()
+        service = make_service(engine, recorder)
+        try:
+            first = service.speak("Long fact")
+            assert recorder.wait_for((EVENT_START, first))
+            second = service.speak("Next fact")
+            assert recorder.wait_for((EVENT_START, second))
+        finally:
+            service.close(timeout=5)
+
+        assert (EVENT_INTERRUPTED, first) in recorder.events
+        assert (EVENT_END, first) not in recorder.events
+        assert engine.stops >= 1
+
+    def test_stop_returns_at_once_and_interrupts(self):
+        engine = FakeEngine()
+        recorder = Recorder()
+        service = make_service(engine, recorder)
+        try:
+            utterance = service.speak("Fact")
+            assert recorder.wait_for((EVENT_START, utterance))
+
+            service.stop()
+
+            assert recorder.wait_for((EVENT_INTERRUPTED, utterance))
+            assert not service.speaking
+        finally:
+            service.close(timeout=5)
+
+    def test_requests_superseded_while_queued_are_skipped(self):
+        engine = FakeEngine()
+        recorder = Recorder()
+        service = SpeechService(engine_factory=lambda: engine, on_event=recorder, poll_seconds=0.005)
+        service.speak("Skipped")
+        latest = service.speak("Spoken")
+        service.start()
+        try:
+            assert recorder.wait_for((EVENT_START, latest))
+        finally:
+            service.close(timeout=5)
+
+        assert engine.spoken == ["Spoken"]
+
+    def test_engine_failure_reports_errors(self):
+        def broken():
+            raise RuntimeError("no audio device")
+        recorder = Recorder()
+        service = SpeechService(engine_factory=broken, on_event=recorder).start()
+        try:
+            assert service.wait_ready(5) is False
+            utterance = service.speak("Fact")
+            assert recorder.wait_for((EVENT_ERROR, utterance))
+        finally:
+            service.close(timeout=5)
+
+
+class TestCachedSpeech:
+    """Tests for rendering into and playing from the audio cache."""
+
+    def test_render_then_play_from_cache(self, tmp_path):
+        engine = FakeEngine()
+        player = FakePlayer(seconds=0.01)
+        recorder = Recorder()
+        cache = AudioCache(str(tmp_path / "audio"))
+        service = make_service(engine, recorder, audio_cache=cache, player=player)
+        rendered = threading.Event()
+        try:
+            assert service.render("Fact", on_done=lambda ok: ok and rendered.set()) is True
+            assert rendered.wait(5)
+            assert service.render("Fact") is False  # already cached
+
+            utterance = service.speak("Fact")
+            assert recorder.wait_for((EVENT_END, utterance))
+        finally:
+            service.close(timeout=5)
+
+        assert player.played == [b"RIFFFact"]
+        assert engine.spoken == []
+        assert recorder.events == [(EVENT_START, utterance), (EVENT_END, utterance)]
+        assert [name for name in os.listdir(tmp_path / "audio")] == [AudioCache.file_name("Fact", service.voice_settings)]
+
+    def test_stop_interrupts_cached_playback(self, tmp_path):
+        engine = FakeEngine()
+        player = FakePlayer(seconds=60)
+        recorder = Recorder()
+        cache = AudioCache(str(tmp_path / "audio"))
+        wav = tmp_path / "in.wav"
+        wav.write_bytes(b"RIFF")
+        cache.store("Fact", ('', 0, 1.0), str(wav))
+        service = make_service(engine, recorder, audio_cache=cache, player=player)
+        try:
+            utterance = service.speak("Fact")
+            assert recorder.wait_for((EVENT_START, utterance))
+            service.stop()
+            assert recorder.wait_for((EVENT_INTERRUPTED, utterance))
+        finally:
+            service.close(timeout=5)
+
+        assert player.stops == 1 and engine.stops == 0
+
+    def test_uncached_text_is_spoken_live(self, tmp_path):
+        engine = FakeEngine()
+        recorder = Recorder()
+        service = make_service(engine, recorder, audio_cache=AudioCache(str(tmp_path / "audio")), player=FakePlayer())
+        try:
+            utterance = service.speak("New fact")
+            assert recorder.wait_for((EVENT_START, utterance))
+        finally:
+            service.close(timeout=5)
+
+        assert engine.spoken == ["New fact"]
+
+    def test_speak_interrupts_render_which_is_retried_later(self, tmp_path):
+        engine = SlowRenderEngine()
+        recorder = Recorder()
+        cache = AudioCache(str(tmp_path / "audio"))
+        service = make_service(engine, recorder, audio_cache=cache, player=FakePlayer())
+        rendered = threading.Event()
+        try:
+            service.render("Upcoming", on_done=lambda ok: ok and rendered.set())
+            for _ in range(500):
+                if engine.renders_started:
+                    break
+                threading.Event().wait(0.01)
+
+            utterance = service.speak("Now")
+            assert recorder.wait_for((EVENT_START, utterance))
+            assert not cache.has("Upcoming", service.voice_settings)
+
+            engine.release.set()
+            engine.render_release.set()
+            assert recorder.wait_for((EVENT_END, utterance))
+            assert rendered.wait(5)
+        finally:
+            service.close(timeout=5)
+
+        assert engine.spoken == ["Now"]
+        assert engine.renders_started == ["Upcoming", "Upcoming"]
+        assert cache.has("Upcoming", service.voice_settings)
+        assert not [name for name in os.listdir(tmp_path / "audio") if name.endswith('.tmp')]
@@ -0,0 +1,73 @@
+"""
+Unit tests for stats_model.py (event-driven status bar counters).
+"""
+from datetime import date, timedelta
+
+from stats_model import StatsModel
+
+
+def make_model():
+    model = StatsModel()
+    changes = []
+    model.subscribe(lambda name, value: changes.append((name, value)))
+    return model, changes
+
+
+class TestStatsModel:
+    """Tests for seeding, events and change notification."""
+
+    def test_seed_notifies_listeners(self):
+        model, changes = make_model()
+        model.seed(total_facts=10, seen_today={1, 2}, day=date(2024, 1, 1))
+
+        assert ('total_facts', 10) in changes
+        assert ('seen_today', 2) in changes
+
+    def test_repeated_view_of_same_fact_does_not_rerender(self):
+        model, changes = make_model()
+        day = date(2024, 1, 1)
+        model.seed(total_facts=10, seen_today=set(), day=day)
+        changes.clear()
+
+        model.record_view(5, day)
+        model.record_view(5, day)
+
+        assert changes == [('seen_today', 1)]
+
+    def test_unchanged_values_are_not_published(self):
+        model, changes = make_model()
+        model.set_coordinates(10, 20)
+        model.set_coordinates(10, 20)
+        model.set_level_text("Level 2 - 150 XP (50 to next)")
+        model.set_level_text("Level 2 - 150 XP (50 to next)")
+
+        assert len(changes) == 2
+
+    def test_add_and_delete_adjust_total(self):
+        model, changes = make_model()
+        day = date(2024, 1, 1)
+        model.seed(total_facts=3, seen_today={7}, day=day)
+
+        model.adjust_total_facts(1)
+        model.forget_fact(7)
+
+        assert model.total_facts == 3
+        assert model.seen_today == 0
+
+    def test_day_rollover_resets_seen_today(self):
+        model, changes = make_model()
+        day = date(2024, 1, 1)
+        model.seed(total_facts=3, seen_today={1, 2}, day=day)
+        changes.clear()
+
+        assert model.roll_day(day) is False
+        assert model.roll_day(day + timedelta(days=1)) is True
+
+        assert model.seen_today == 0
+        assert changes == [('seen_today', 0)]
+
+    def test_adjust_before_seed_is_ignored(self):
+        model, changes = make_model()
+        model.adjust_total_facts(1)
+        assert model.total_facts is None
+        assert changes == []
@@ -0,0 +1,124 @@
+"""
+Unit tests for telemetry.py (write-behind queue).
+A fake pool hands out a MagicMock connection so no database is required.
+"""
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import telemetry
+
+
+class FakePool:
+    def __init__(self):
+        self.cursor = MagicMock()
+        self.cursor.__enter__.return_value = self.cursor
+        self.cursor.__exit__.return_value = None
+        self.conn = MagicMock()
+        self.conn.cursor.return_value = self.cursor
+
+    @contextmanager
+    def connection(self):
+        yield self.conn
+
+
+def make_writer(**kwargs):
+    pool = FakePool()
+    kwargs.setdefault('flush_interval_seconds', 0)
+    writer = telemetry.TelemetryWriter(pool, **kwargs)
+    return writer, pool
+
+
+class TestWriteBehind:
+    """Tests for queueing, batching and flushing."""
+
+    def test_submit_does_not_touch_database_until_worker_runs(self):
+        writer, pool = make_writer()
+
+        assert writer.submit("UPDATE Questions SET TimesShown = TimesShown + 1 WHERE QuestionID = ?", (1,)) is True
+
+        pool.cursor.execute.assert_not_called()
+        assert writer.depth == 1
+
+    def test_identical_statements_use_executemany(self):
+        writer, pool = make_writer()
+        sql = "UPDATE Questions SET TimesShown = TimesShown + 1 WHERE QuestionID = ?"
+        for qid in (1, 2, 3):
+            writer.submit(sql, (qid,))
+
+        writer.start()
+        assert writer.flush(timeout=2)
+
+        pool.cursor.executemany.assert_called_once_with(sql, [(1,), (2,), (3,)])
+        assert pool.cursor.fast_executemany is True
+        assert writer.stats()['written'] == 3
+        writer.close(timeout=2)
+
+    def test_pending_id_is_substituted_in_later_writes(self):
+        writer, pool = make_writer()
+        pool.cursor.fetchone.return_value = (55, 1, 0)
+        rows = []
+
+        pending = writer.submit("INSERT ... OUTPUT INSERTED.FactLogID", (9,), returns_id=True, on_done=rows.append)
+        writer.submit("UPDATE FactLogs SET FactReadingTime = ? WHERE FactLogID = ?", (12, pending))
+        writer.start()
+        assert writer.flush(timeout=2)
+
+        assert pending.wait(1) == 55
+        assert rows == [(55, 1, 0)]
+        pool.cursor.execute.assert_any_call("UPDATE FactLogs SET FactReadingTime = ? WHERE FactLogID = ?", (12, 55))
+        writer.close(timeout=2)
+
+    def test_keyed_writes_are_coalesced(self):
+        writer, pool = make_writer()
+        sql = "UPDATE FactLogs SET FactReadingTime = ? WHERE FactLogID = ?"
+        writer.submit(sql, (5, 1), key=('time', 1))
+        writer.submit(sql, (9, 1), key=('time', 1))
+
+        writer.start()
+        assert writer.flush(timeout=2)
+
+        pool.cursor.execute.assert_called_once_with(sql, (9, 1))
+        assert writer.stats()['coalesced'] == 1
+        writer.close(timeout=2)
+
+    def test_failed_insert_resolves_pending_to_none(self):
+        writer, pool = make_writer()
+        pool.cursor.execute.side_effect = RuntimeError("deadlock victim")
+        outcomes = []
+
+        pending = writer.submit("INSERT ...", (1,), returns_id=True, on_done=outcomes.append)
+        writer.start()
+        assert writer.flush(timeout=2)
+
+        assert pending.resolved and pending.value is None
+        assert outcomes == [None]
+        assert writer.stats()['failed'] == 1
+        writer.close(timeout=2)
+
+    def test_backpressure_is_reported_when_queue_full(self):
+        reports = []
+        writer, pool = make_writer(max_queue=1, put_timeout_seconds=0.01)
+
+        def on_backpressure(depth):
+            reports.append(depth)
+            writer.start()  # let the worker make room
+
+        writer.on_backpressure = on_backpressure
+        writer.submit("UPDATE A SET X = 1", ())
+        writer.submit("UPDATE B SET X = 1", ())
+        assert writer.flush(timeout=2)
+
+        assert reports == [1]
+        assert writer.stats()['backpressure_events'] == 1
+        assert writer.stats()['written'] == 2
+        writer.close(timeout=2)
+
+    def test_close_flushes_pending_writes(self):
+        writer, pool = make_writer()
+        writer.start()
+        writer.submit("UPDATE ReviewSessions SET FactsAdded = ISNULL(FactsAdded,0) + 1 WHERE SessionID = ?", (3,))
+
+        writer.close(timeout=2)
+
+        pool.cursor.execute.assert_called_once()
+        assert not writer._thread.is_alive()